@@ -9,6 +9,13 @@ Feature Flag: _useIsmsCoordinator = False (when integrated)
 
 from typing import Dict, Optional, List, Any
 import re
+from functools import lru_cache
+from agents.messageFeatures import getMessageFeatures
+from agents.ismsCommandParser import Command, commandFor
+from config.settings import Settings
+from tools.requestCache import onWrite
+from tools.veriniceEvents import onEvent
+from utils.staleWhileRevalidate import StaleWhileRevalidateCache
 from agents.instructions import (
     get_error_message,
     VERINICE_OBJECT_TYPES,
@@ -22,6 +29,60 @@ from agents.instructions import (
 )
 
 
+@lru_cache(maxsize=64)
+def _simpleFormatPatterns(createPattern: str, objectType: str) -> Dict[str, Any]:
+    """Compiled patterns for ISMSCoordinator._extractSimpleFormat, cached per (create keywords, object type)"""
+    def compiled(pattern: str):
+        return re.compile(pattern, re.IGNORECASE)
+    
+    return {
+        'controllerNamed': (
+            compiled(rf'(?:{createPattern})\s+(?:a\s+)?["\']controller["\']\s+(?:named|called|name|call)\s+["\']([^"\']+)["\']'),  # "Create a \"Controller\" named 'X'"
+            compiled(rf'(?:{createPattern})\s+(?:a\s+)?["\']?controller["\']?\s+(?:named|called|name|call)\s+["\']([^"\']+)["\']'),  # Fallback with optional quotes
+        ),
+        'quotedWithSubType': compiled(rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+"([^"]+)"\s+"([^"]+)"\s+"([^"]+)"'),
+        'quoted': compiled(rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+"([^"]+)"\s+"([^"]+)"'),
+        'quotedNameDesc': compiled(rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+([A-Za-z0-9_-]+?)\s+"([^"]+)"'),
+        'quotedName': compiled(rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+"([^"]+)"\s+(.+?)(?:\s+subType|\s+status|$)'),
+        'quotedNameUnquoted': compiled(rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+([A-Za-z0-9_-]+?)\s+(.+?)(?:\s+subType|\s+status|$)'),
+        'standard': compiled(rf'{createPattern}\s+{objectType}\s+([A-Za-z0-9_\s-]+?)\s+([A-Za-z0-9_-]{{1,20}})\s+(.+?)(?:\s+subType|\s+status|$)'),
+        'nameAbbreviation': compiled(rf'{createPattern}\s+{objectType}\s+([A-Za-z0-9_\s-]+?)\s+([A-Za-z0-9_-]{{1,20}})(?:\s+subType|\s+status|$)'),
+    }
+
+
+# Process-wide: list views are the same for every session against one backend.
+# Any write through VeriniceTool drops it, so a create/delete is never hidden.
+_LIST_CACHE = StaleWhileRevalidateCache(
+    'isms-list',
+    staleSeconds=Settings.LIST_CACHE_STALE_SECONDS,
+    freshSeconds=Settings.LIST_CACHE_FRESH_SECONDS
+)
+onWrite(lambda methodName, args: _LIST_CACHE.invalidate())
+
+
+def _invalidateListsFor(event):
+    """Drop the cached lists a veo change event affects (keys: type, domain, unit, subtype)"""
+    if event.eventType == 'resync':
+        _LIST_CACHE.invalidate()
+    elif event.isElement:
+        _LIST_CACHE.invalidate(lambda key: key[0] == event.resourceType and (
+            key[1] is None or key[1] in event.domainIds or not event.domainIds))
+    elif event.resourceType == 'unit':
+        _LIST_CACHE.invalidate(lambda key: key[2] is None or key[2] == event.resourceId)
+    elif event.resourceType == 'domain':
+        _LIST_CACHE.invalidate(lambda key: key[1] is None or key[1] in event.domainIds)
+
+
+onEvent(_invalidateListsFor)
+
+
+def getListCacheMetrics() -> Dict[str, Any]:
+    return _LIST_CACHE.getMetrics()
+
+
+_NATURAL_LANGUAGE_CREATE = re.compile(r'(?:in\s+(?:our|the)\s+(?:isms|system)|named|called|name\s+it|call\s+it)', re.IGNORECASE)
+
+
 class ISMSCoordinator:
     """
     Coordinates all ISMS operations with clean separation of concerns.
@@ -64,7 +125,8 @@ class ISMSCoordinator:
     
     # ==================== PUBLIC INTERFACE ====================
     
-    def handleOperation(self, operation: str, objectType: str, message: str) -> Dict:
+    def handleOperation(self, operation: str, objectType: str, message: str,
+                        command: Optional[Command] = None) -> Dict:
         """
         Handle ISMS CRUD operations (main entry point).
         
@@ -74,6 +136,8 @@ class ISMSCoordinator:
             operation: Operation type (create, list, get, update, delete)
             objectType: ISMS object type (asset, scope, person, etc.)
             message: User's original message
+            command: Deterministic Command parsed from message (ISMSFastPath); its
+                operation and type win, and the extractors read its name/fields
         
         Returns:
             Dict with response data:
@@ -96,6 +160,9 @@ class ISMSCoordinator:
         Raises:
             None - returns error dict instead
         """
+        if command is not None and command.isDeterministic:
+            operation, objectType = command.operation, command.objectType
+        
         domainId, unitId = self._getDefaults()
         
         # Allow listing scopes without domain (scopes can be listed at unit level)
@@ -172,7 +239,8 @@ class ISMSCoordinator:
                 'text': str,  # Success message
                 'report': {
                     'format': 'pdf',
-                    'data': str,  # Base64 encoded PDF
+                    'handle': str,  # Report store handle
+                    'url': str,  # /api/agent/reports/{handle}
                     'reportType': str,
                     'scope': str
                 }
@@ -470,7 +538,53 @@ class ISMSCoordinator:
     
     def _handleList(self, objectType: str, message: str, domainId: str, unitId: str) -> Dict:
         """
-        List operation handler (internal).
+        List operation handler (internal) - stale-while-revalidate.
+        
+        A repeat of a recent list is answered from _LIST_CACHE immediately and
+        re-fetched in the background; if the refreshed table differs it is
+        pushed to the session as a 'table_refresh' event. Lists older than
+        Settings.LIST_CACHE_STALE_SECONDS (or never seen) load synchronously.
+        
+        Args:
+            objectType: Type of object to list
+            message: User's message (may contain subtype filter)
+            domainId: Domain ID
+            unitId: Unit ID
+        
+        Returns:
+            Dict with list results; data['listCache'] tells whether it was cached
+        """
+        if not Settings.LIST_CACHE_ENABLED:
+            return self._loadList(objectType, message, domainId, unitId)
+        
+        subtypeFilter = self._extractSubType(message, objectType)
+        cacheKey = (objectType, domainId, unitId, (subtypeFilter or '').lower())
+        
+        def loader():
+            result = self._loadList(objectType, message, domainId, unitId)
+            return result, result.get('type') == 'success'
+        
+        # The current turn's session callback, captured now: the refresh
+        # finishes after the turn and the state may belong to another session by then
+        eventCallback = self.state.get('_event_callback')
+        
+        def onChange(refreshed: Dict):
+            if eventCallback:
+                eventCallback('table_refresh', {
+                    'content': refreshed.get('text', ''),
+                    'objectType': objectType,
+                    'domainId': domainId,
+                    'subType': subtypeFilter
+                })
+        
+        result, cacheInfo = _LIST_CACHE.get(cacheKey, loader, onChange=onChange)
+        result = dict(result)
+        result['data'] = {**(result.get('data') or {}), 'listCache': cacheInfo}
+        return result
+    
+    def _loadList(self, objectType: str, message: str, domainId: str, unitId: str) -> Dict:
+        """
+        List objects from the backend (uncached, see _handleList).
         
         Supports subtype filtering: list assets subType AST_IT-System
         
@@ -508,6 +622,12 @@ class ISMSCoordinator:
                         filtered.append(item)
             return filtered if filtered else items  # Return all if no matches (might be wrong filter)
         
+        def listInDomain(d_id: str) -> tuple:
+            """List in one domain, pushing the subtype down to the API when it resolves to a key"""
+            serverSubType = self.veriniceTool.resolveSubType(objectType, d_id, subtypeFilter) if subtypeFilter else None
+            res = self.veriniceTool.listObjects(objectType, d_id, {'subType': serverSubType} if serverSubType else None)
+            return res, bool(serverSubType)
+        
         # Special handling for scopes - can be listed without domain
         if objectType == 'scope' and not domainId:
             if unitId:
@@ -584,14 +704,16 @@ class ISMSCoordinator:
                 return self._error(get_error_message('operation_failed', 'list_no_domain', objectType=objectType))
             
             all_items = []
+            serverFiltered = bool(subtypeFilter)
             domains = domainsResult.get('domains', [])
             for d in domains:
                 d_id = d.get('id') if isinstance(d, dict) else d
                 if not d_id:
                     continue
-                res = self.veriniceTool.listObjects(objectType, d_id)
+                res, pushedDown = listInDomain(d_id)
                 if not res.get('success'):
                     continue
+                serverFiltered = serverFiltered and pushedDown
                 objects = res.get('objects', {})
                 items = objects.get('items', []) if isinstance(objects, dict) else (objects if isinstance(objects, list) else [])
                 all_items.extend(items)
@@ -612,8 +734,8 @@ class ISMSCoordinator:
                     seen_ids.add(item_id)
                     unique_items.append(item)
             
-            # Apply subtype filter if specified
-            if subtypeFilter:
+            # Apply subtype filter if specified (and not already applied by the API)
+            if subtypeFilter and not serverFiltered:
                 unique_items = filterBySubtype(unique_items, subtypeFilter)
             
             aggregated_result = {
@@ -629,13 +751,13 @@ class ISMSCoordinator:
             return _aggregate_from_all_domains()
         
         # Try listing in the given domain first
-        result = self.veriniceTool.listObjects(objectType, domainId)
+        result, serverFiltered = listInDomain(domainId)
         if result.get('success'):
             objects = result.get('objects', {})
             items = objects.get('items', []) if isinstance(objects, dict) else (objects if isinstance(objects, list) else [])
             
-            # Apply subtype filter if specified
-            if subtypeFilter:
+            # Apply subtype filter if specified (and not already applied by the API)
+            if subtypeFilter and not serverFiltered:
                 items = filterBySubtype(items, subtypeFilter)
                 if isinstance(objects, dict):
                     objects['items'] = items
@@ -849,6 +971,10 @@ class ISMSCoordinator:
         Returns:
             New name or None (if no name change)
         """
+        command = commandFor(message, objectType)
+        if command is not None:
+            return command.fields.get('name')
+        
         messageLower = message.lower()
         
         # Pattern 1: "update asset OldName to NewName" (simple "to" pattern)
@@ -1038,7 +1164,13 @@ class ISMSCoordinator:
         Returns:
             Extracted name or None
         """
+        command = commandFor(message, objectType)
+        if command is not None and command.name:
+            return command.name
+        
         message_lower = message.lower()
+        # Quoted-name patterns below can only match when the message has a quoted span
+        hasQuoted = bool(getMessageFeatures(message, self.state.get('_messageFeatures')).quoted)
         
         # Common phrases to skip (not part of the name)
         skip_phrases = [
@@ -1050,7 +1182,7 @@ class ISMSCoordinator:
         
         # Pattern 0: Handle "create a new Data Protection Officer 'John'" - extract 'John' as name
         # This must come BEFORE other patterns to avoid extracting "Data Protection Officer" as the name
-        if objectType.lower() == 'person':
+        if hasQuoted and objectType.lower() == 'person':
             # Build create keywords pattern from JSON config
             create_keywords_pattern = self._getCreateKeywordsPattern()
             dpo_pattern = rf'(?:{create_keywords_pattern})\s+(?:a\s+)?(?:new\s+)?(?:Data\s+Protection\s+Officer|DPO|Security\s+Officer)\s+["\']([^"\']+)["\']'
@@ -1064,7 +1196,7 @@ class ISMSCoordinator:
         # This must come before Pattern 1 to ensure Controller pattern matches
         # NOTE: "Controller" is a subtype of scope, not control, but we check for both objectType == 'scope' and 'control'
         # because the router might route it as either depending on detection order
-        if objectType.lower() in ['scope', 'control']:
+        if hasQuoted and objectType.lower() in ['scope', 'control']:
             create_keywords_pattern = self._getCreateKeywordsPattern()
             controller_patterns = [
                 rf'(?:{create_keywords_pattern})\s+(?:a\s+)?["\']controller["\']\s+(?:named|called|name|call)\s+["\']([^"\']+)["\']',  # "Create a \"Controller\" named 'X'"
@@ -1094,7 +1226,7 @@ class ISMSCoordinator:
             rf'(?:{create_keywords_pattern})\s+{object_type_pattern}\s+(?:in\s+(?:our|the)\s+(?:isms|system))?\s*(?:,?\s*and\s+)?(?:named|called|name|call)\s+["\']([^"\']+)["\']',  # Fallback
             rf'(?:{create_keywords_pattern})\s+(?:a\s+)?{object_type_pattern}\s+(?:in\s+(?:our|the)\s+(?:isms|system))?\s*(?:,?\s*and\s+)?(?:named|called|name|call)\s+(?:it\s+)?["\']([^"\']+)["\']',  # With optional quotes around objectType
         ]
-        for pattern in quoted_patterns:
+        for pattern in (quoted_patterns if hasQuoted else []):
             match = re.search(pattern, message, re.IGNORECASE)
             if match:
                 name = match.group(1).strip()
@@ -1224,6 +1356,10 @@ class ISMSCoordinator:
         Returns:
             Extracted abbreviation or None
         """
+        command = commandFor(message)
+        if command is not None:
+            return command.fields.get('abbreviation')
+        
         patterns = [
             r'abbreviation[:\s]+([A-Za-z0-9_-]{1,10})',
             r'abbrev[:\s]+([A-Za-z0-9_-]{1,10})',
@@ -1248,6 +1384,10 @@ class ISMSCoordinator:
         Returns:
             Extracted description or None
         """
+        command = commandFor(message)
+        if command is not None:
+            return command.fields.get('description')
+        
         patterns = [
             r'description[:\s]+(.+?)(?:\s+subType|\s+status|$)',
             r'desc[:\s]+(.+?)(?:\s+subType|\s+status|$)',
@@ -1277,6 +1417,10 @@ class ISMSCoordinator:
         Returns:
             Extracted description or None
         """
+        command = commandFor(message)
+        if command is not None:
+            return command.fields.get('description')
+        
         patterns = [
             r"(?:change|set|update)\s+(?:its\s+)?description\s+to\s+['\"]?([^'\"]+)['\"]?",
             r"description\s+(?:is|to|should be|will be)\s+['\"]?([^'\"]+)['\"]?",
@@ -1306,6 +1450,10 @@ class ISMSCoordinator:
         Returns:
             Dict with property names and values
         """
+        command = commandFor(message)
+        if command is not None:
+            return {k: v for k, v in command.fields.items() if k not in ('name', 'description')}
+        
         properties = {}
         message_lower = message.lower()
         
@@ -1349,6 +1497,10 @@ class ISMSCoordinator:
         Returns:
             Extracted subtype or None
         """
+        command = commandFor(message, objectType)
+        if command is not None:
+            return command.fields.get('subType')
+        
         # Pattern 1: "create a new Data Protection Officer 'John'" or "create a DPO 'John'"
         # Extract subtype before the quoted name - this handles "create a new Data Protection Officer 'John'"
         # CRITICAL: Only extract if objectType is 'person', otherwise it might be a different object type
@@ -1444,20 +1596,20 @@ class ISMSCoordinator:
         Returns:
             Dict with extracted fields or None
         """
-        # Use create keywords from JSON config
-        createPattern = self._getCreateKeywordsPattern()
+        # Keyword clauses ("with description ...") are not the positional format
+        command = commandFor(message, objectType)
+        if command is not None and command.fields:
+            return None
+        
+        # Use create keywords from JSON config (patterns compiled once per keyword set and type)
+        patterns = _simpleFormatPatterns(self._getCreateKeywordsPattern(), objectType)
         
         # CRITICAL: Handle "Create a \"Controller\" named 'X'" pattern FIRST (before any other patterns)
         # Pattern: "Create a \"Controller\" named 'MFA for VPN'"
         # This pattern works regardless of objectType - if message has "Controller", handle it specially
         if 'controller' in message.lower():
-            create_keywords_pattern = self._getCreateKeywordsPattern()
-            controller_named_patterns = [
-                rf'(?:{create_keywords_pattern})\s+(?:a\s+)?["\']controller["\']\s+(?:named|called|name|call)\s+["\']([^"\']+)["\']',  # "Create a \"Controller\" named 'X'"
-                rf'(?:{create_keywords_pattern})\s+(?:a\s+)?["\']?controller["\']?\s+(?:named|called|name|call)\s+["\']([^"\']+)["\']',  # Fallback with optional quotes
-            ]
-            for pattern in controller_named_patterns:
-                controller_match = re.search(pattern, message, re.IGNORECASE)
+            for pattern in patterns['controllerNamed']:
+                controller_match = pattern.search(message)
                 if controller_match:
                     name = controller_match.group(1).strip()
                     if name:
@@ -1471,8 +1623,7 @@ class ISMSCoordinator:
                         }
         
         # Pattern 1: All quoted with subtype
-        quotedWithSubTypePattern = rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+"([^"]+)"\s+"([^"]+)"\s+"([^"]+)"'
-        quotedWithSubTypeMatch = re.search(quotedWithSubTypePattern, message, re.IGNORECASE)
+        quotedWithSubTypeMatch = patterns['quotedWithSubType'].search(message)
         if quotedWithSubTypeMatch:
             return {
                 'name': quotedWithSubTypeMatch.group(1).strip(),
@@ -1485,8 +1636,7 @@ class ISMSCoordinator:
         # CRITICAL: Only match if objectType matches (not "Controller" when objectType is "control")
         # Skip this pattern for "control" type if message contains "Controller" - let Controller-specific patterns handle it
         if not (objectType.lower() == 'control' and 'controller' in message.lower()):
-            quotedPattern = rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+"([^"]+)"\s+"([^"]+)"'
-            quotedMatch = re.search(quotedPattern, message, re.IGNORECASE)
+            quotedMatch = patterns['quoted'].search(message)
             if quotedMatch:
                 return {
                     'name': quotedMatch.group(1).strip(),
@@ -1495,8 +1645,7 @@ class ISMSCoordinator:
                 }
         
         # Pattern 3: Quoted name and description, unquoted abbreviation
-        quotedNameDescPattern = rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+([A-Za-z0-9_-]+?)\s+"([^"]+)"'
-        quotedNameDescMatch = re.search(quotedNameDescPattern, message, re.IGNORECASE)
+        quotedNameDescMatch = patterns['quotedNameDesc'].search(message)
         if quotedNameDescMatch:
             return {
                 'name': quotedNameDescMatch.group(1).strip(),
@@ -1505,8 +1654,7 @@ class ISMSCoordinator:
             }
         
         # Pattern 4: Quoted name and abbreviation, unquoted description
-        quotedNamePattern = rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+"([^"]+)"\s+(.+?)(?:\s+subType|\s+status|$)'
-        quotedNameMatch = re.search(quotedNamePattern, message, re.IGNORECASE)
+        quotedNameMatch = patterns['quotedName'].search(message)
         if quotedNameMatch:
             desc = quotedNameMatch.group(3).strip().strip('"').strip("'")
             return {
@@ -1516,8 +1664,7 @@ class ISMSCoordinator:
             }
         
         # Pattern 5: Quoted name only, unquoted abbreviation and description
-        quotedNameUnquotedPattern = rf'{createPattern}\s+{objectType}\s+"([^"]+)"\s+([A-Za-z0-9_-]+?)\s+(.+?)(?:\s+subType|\s+status|$)'
-        quotedNameUnquotedMatch = re.search(quotedNameUnquotedPattern, message, re.IGNORECASE)
+        quotedNameUnquotedMatch = patterns['quotedNameUnquoted'].search(message)
         if quotedNameUnquotedMatch:
             desc = quotedNameUnquotedMatch.group(3).strip().strip('"').strip("'")
             return {
@@ -1528,10 +1675,9 @@ class ISMSCoordinator:
         
         # Pattern 6: Standard format without quotes (underscores converted to spaces)
         # Skip if it contains natural language phrases that indicate named/called patterns
-        skip_natural_language = re.search(r'(?:in\s+(?:our|the)\s+(?:isms|system)|named|called|name\s+it|call\s+it)', message, re.IGNORECASE)
+        skip_natural_language = _NATURAL_LANGUAGE_CREATE.search(message)
         if not skip_natural_language:
-            pattern = rf'{createPattern}\s+{objectType}\s+([A-Za-z0-9_\s-]+?)\s+([A-Za-z0-9_-]{{1,20}})\s+(.+?)(?:\s+subType|\s+status|$)'
-            match = re.search(pattern, message, re.IGNORECASE)
+            match = patterns['standard'].search(message)
             if match:
                 name = match.group(1).strip().replace('_', ' ')
                 abbreviation = match.group(2).strip()
@@ -1548,8 +1694,7 @@ class ISMSCoordinator:
         # Pattern 7: Name and abbreviation only (no description)
         # Skip if it contains natural language phrases
         if not skip_natural_language:
-            pattern2 = rf'{createPattern}\s+{objectType}\s+([A-Za-z0-9_\s-]+?)\s+([A-Za-z0-9_-]{{1,20}})(?:\s+subType|\s+status|$)'
-            match2 = re.search(pattern2, message, re.IGNORECASE)
+            match2 = patterns['nameAbbreviation'].search(message)
             if match2:
                 name = match2.group(1).strip().replace('_', ' ')
                 abbreviation = match2.group(2).strip()
@@ -1616,6 +1761,9 @@ class ISMSCoordinator:
                             return (objectId, dId)
             return (objectId, domainId)  # Fallback to provided domainId
         
+        # A deterministic command already names its target
+        command = commandFor(nameOrId, objectType)
+        
         # Extract name from message
         # First, try to extract quoted names (handles "Update the asset 'Main_Firewall'" or "create 'Ascope' scope")
         # CRITICAL: Handle both single and double quotes, and handle period/comma/space after quote
@@ -1639,8 +1787,10 @@ class ISMSCoordinator:
             rf'(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']',
         ]
         
-        name = None
+        name = command.name if command is not None else None
         for pattern in quoted_patterns:
+            if name:
+                break
             match = re.search(pattern, nameOrId, re.IGNORECASE)
             if match:
                 name = match.group(1).strip()
@@ -9,6 +9,9 @@ import json
 from pathlib import Path
 from typing import Dict, List
 
+from utils.typoCorrector import TypoCorrector, buildTypoMap
+from utils.keywordIndex import KeywordIndex
+
 # ==================== LOAD JSON FILES ====================
 
 def _loadJSONFile(filename: str) -> Dict:
@@ -38,6 +41,7 @@ VERINICE_GET_KEYWORDS = _op_keywords.get('get', ['get', 'view'])
 VERINICE_UPDATE_KEYWORDS = _op_keywords.get('update', ['update', 'edit', 'modify'])
 VERINICE_DELETE_KEYWORDS = _op_keywords.get('delete', ['delete', 'remove'])
 VERINICE_ANALYZE_KEYWORDS = _op_keywords.get('analyze', ['analyze'])
+VERINICE_COMPARE_KEYWORDS = _op_keywords.get('compare', ['compare', 'comparison', 'diff', 'difference', 'differences'])
 
 # Question filters
 _question_filters = _verinice.get('question_filters', {})
@@ -100,6 +104,88 @@ ACTION_VERB_PATTERNS = _COMMON_INSTRUCTIONS.get('action_verbs', {})
 
 TYPO_VARIATIONS = _COMMON_INSTRUCTIONS.get('typo_variations', {})
 
+# Prebuilt single-pass correctors, shared by ChatRouter, MainAgent and IntentClassifier
+VERINICE_TYPO_CORRECTOR = TypoCorrector(VERINICE_TYPO_CORRECTIONS)
+AGENT_TYPO_CORRECTOR = TypoCorrector(buildTypoMap(TYPO_VARIATIONS, VERINICE_TYPO_CORRECTIONS))
+
+# AdvancedPatternMatcher keyword lists (group -> entry -> keywords); they are
+# part of VERINICE_KEYWORD_INDEX as substring families named 'group.entry'
+ADVANCED_PATTERN_KEYWORDS = {
+    # ISMS reconciliation patterns
+    'isms_reconciliation': {
+        'keywords': ['compare', 'reconcile', 'reconciliation', 'difference', 'drift', 'gap', 'discrepancy'],
+        'domain_keywords': ['domain', 'scope', 'environment', 'production', 'staging', 'dr'],
+        'comparison_phrases': ['vs', 'versus', 'against', 'and', 'with'],
+        'environment_keywords': ['production', 'staging', 'development', 'dr', 'disaster recovery', 'test'],
+    },
+
+    # Safety-critical operations
+    'safety_operations': {
+        'dangerous_keywords': [
+            'delete all', 'remove all', 'clean up', 'wipe', 'drop', 'truncate', 'destroy',
+            'erase all', 'clear all', 'purge', 'format', 'reset all', 'nuke', 'kill all'
+        ],
+        'protected_paths': [
+            'root', '/', '../', '..\\', 'config', 'secrets', 'password', 'credential',
+            '.env', '.git', 'node_modules', 'vendor', '__pycache__', '.venv',
+            'system', 'etc', 'usr', 'var', 'home', 'windows', 'system32'
+        ],
+        'bulk_operations': [
+            'all files', 'all data', 'everything', 'entire', 'whole',
+            'entire directory', 'whole folder', 'all directories', 'all folders'
+        ],
+        'confirmation_triggers': ['just do it', 'proceed', 'go ahead', 'execute', 'run it', 'do it now'],
+    },
+
+    # Multi-step operations
+    'multi_step': {
+        'connectors': ['then', 'and', 'after', 'next', 'also', 'while', 'during'],
+        'sequence_markers': ['first', 'second', 'step 1', 'step 2', 'phase', 'stage'],
+        # Reconciliation requests use "and" without being multi-step
+        'isms_exclusions': ['reconcile', 'compare', 'reconciliation', 'gap', 'difference', 'drift'],
+        # "update X. change Y and set Z" / "create X and mark its status" are single operations
+        'update_field_keywords': ['change', 'set', 'update', 'description', 'confidentiality', 'status', 'availability', 'integrity'],
+        'create_field_keywords': ['mark', 'set', 'add', 'note', 'status', 'description', 'confidentiality', 'saying'],
+    },
+
+    # Constraint extraction
+    'constraints': {
+        'preservation': ['preserve', 'maintain', 'keep', 'don\'t change', 'do not modify'],
+        'requirements': ['must', 'should', 'required', 'critical', 'important', 'ensure'],
+        'prohibitions': ['do not', 'don\'t', 'avoid', 'never', 'skip', 'ignore'],
+    },
+}
+
+# All routing keyword families in one automaton, scanned once per message
+# (MessageFeatures.keywordHits). Operation verbs match as whole words, the
+# rest keep the substring semantics of the checks they replace.
+
+def _buildKeywordIndex() -> KeywordIndex:
+    index = KeywordIndex()
+    for family, keywords in (
+        ('create', VERINICE_CREATE_KEYWORDS),
+        ('list', VERINICE_LIST_KEYWORDS),
+        ('get', VERINICE_GET_KEYWORDS),
+        ('update', VERINICE_UPDATE_KEYWORDS),
+        # ChatRouter always treated delete/remove/drop as deletes (already in the JSON list)
+        ('delete', VERINICE_DELETE_KEYWORDS + ['delete', 'remove', 'drop']),
+        ('analyze', VERINICE_ANALYZE_KEYWORDS),
+        ('compare', VERINICE_COMPARE_KEYWORDS),
+        ('link', ['link', 'connect', 'associate']),
+    ):
+        index.addFamily(family, keywords, wholeWord=True)
+    index.addFamily('question', VERINICE_QUESTION_WORDS)
+    index.addFamily('report', VERINICE_REPORT_KEYWORDS)
+    index.addFamily('report_type', VERINICE_REPORT_TYPES)
+    index.addFamily('object_type', VERINICE_OBJECT_TYPES)
+    for group, entries in ADVANCED_PATTERN_KEYWORDS.items():
+        for entry, keywords in entries.items():
+            index.addFamily(f'{group}.{entry}', keywords)
+    index.build()
+    return index
+
+VERINICE_KEYWORD_INDEX = _buildKeywordIndex()
+
 _knowledge = _COMMON_INSTRUCTIONS.get('knowledge_questions', {})
 KNOWLEDGE_QUESTION_STARTERS = _knowledge.get('question_starters', ['what', 'how', 'why'])
 KNOWLEDGE_QUESTION_PHRASES = _knowledge.get('question_phrases', ['how do', 'what is'])
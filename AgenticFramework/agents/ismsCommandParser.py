@@ -0,0 +1,391 @@
+"""
+ISMS Command Parser - tokenizer + grammar for the deterministic command language
+
+Parses commands like
+
+    create asset "Main Firewall" description "Perimeter firewall" abbreviation MF
+    list scopes
+    get person 'Ruby'
+    update asset Main Firewall status ACTIVE
+    update scope SCOPE1 set description to New text
+    update the asset 'Main Firewall'. Change its description to New text
+    delete control 1234abcd-...
+
+into a typed Command in one pass over the token stream. Anything the grammar
+does not fully consume (multi-step requests, questions, free text) is left in
+Command.remainder, and such commands are not deterministic - the caller falls
+back to the regex/LLM paths.
+
+Grammar:
+    command := [please] VERB filler* OBJTYPE [target] clause*
+    target  := UUID | QUOTED | ('named'|'called') value | words
+    clause  := ['.' | ',' | ';'] [with | where | and] FIELD [':' | '=' | 'to' | 'is' | 'as'] value
+             | ['.' | ',' | ';'] [with | where | and] ('set'|'change') [its | the] FIELD ('to' | '=' | 'as') value
+    value   := QUOTED | words (up to the next FIELD keyword, connector, 'set WORD to',
+               or container qualifier such as 'of scope')
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .instructions import (
+    VERINICE_OBJECT_TYPES,
+    VERINICE_CREATE_KEYWORDS,
+    VERINICE_LIST_KEYWORDS,
+    VERINICE_GET_KEYWORDS,
+    VERINICE_UPDATE_KEYWORDS,
+    VERINICE_DELETE_KEYWORDS,
+    AGENT_TYPO_CORRECTOR,
+)
+
+# ==================== TOKENIZER ====================
+
+QUOTED = 'QUOTED'
+UUID = 'UUID'
+WORD = 'WORD'
+PUNCT = 'PUNCT'
+
+_TOKEN_PATTERN = re.compile(r'''
+    "(?P<dq>[^"]*)"
+  | '(?P<sq>[^']*)'
+  | (?P<uuid>[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{12})(?![\w-])
+  | (?P<word>[^\s"'=:,.;!?]+(?:\.[^\s"'=:,.;!?]+)*)
+  | (?P<punct>[=:,.;!?])
+''', re.VERBOSE)
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str
+    value: str      # Quote contents for QUOTED, original text otherwise
+    start: int
+    end: int
+
+    @property
+    def lower(self) -> str:
+        return self.value.lower()
+
+
+def tokenize(text: str) -> List[Token]:
+    """Split a command into QUOTED / UUID / WORD / PUNCT tokens (single regex scan)"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        if match.group('dq') is not None:
+            tokens.append(Token(QUOTED, match.group('dq'), match.start(), match.end()))
+        elif match.group('sq') is not None:
+            tokens.append(Token(QUOTED, match.group('sq'), match.start(), match.end()))
+        elif match.group('uuid'):
+            tokens.append(Token(UUID, match.group('uuid'), match.start(), match.end()))
+        elif match.group('word'):
+            tokens.append(Token(WORD, match.group('word'), match.start(), match.end()))
+        else:
+            tokens.append(Token(PUNCT, match.group('punct'), match.start(), match.end()))
+    return tokens
+
+
+# ==================== GRAMMAR TABLES ====================
+
+def _verbTable() -> Dict[str, str]:
+    verbs: Dict[str, str] = {}
+    for operation, keywords in (
+        ('create', VERINICE_CREATE_KEYWORDS),
+        ('list', VERINICE_LIST_KEYWORDS),
+        ('get', VERINICE_GET_KEYWORDS),
+        ('update', VERINICE_UPDATE_KEYWORDS),
+        ('delete', VERINICE_DELETE_KEYWORDS),
+    ):
+        for keyword in keywords:
+            if ' ' not in keyword:
+                verbs.setdefault(keyword, operation)
+    # show/display list a type, or get one object when a target follows
+    verbs.update({'show': 'list', 'display': 'list', 'view': 'get'})
+    return verbs
+
+
+def _objectTypeTable() -> Dict[str, str]:
+    types: Dict[str, str] = {}
+    for objType in list(VERINICE_OBJECT_TYPES) + ['domain', 'domains', 'unit', 'units']:
+        if objType == 'processes':
+            types[objType] = 'process'
+        elif objType.endswith('s') and objType != 'process':
+            types[objType] = objType[:-1]
+        else:
+            types[objType] = objType
+    types['people'] = 'person'
+    return types
+
+
+VERBS = _verbTable()
+OBJECT_TYPES = _objectTypeTable()
+FIELDS = {
+    'name': 'name',
+    'description': 'description', 'desc': 'description',
+    'abbreviation': 'abbreviation', 'abbrev': 'abbreviation', 'abbr': 'abbreviation',
+    'subtype': 'subType', 'sub-type': 'subType',
+    'status': 'status',
+}
+FILLERS = {'a', 'an', 'the', 'new', 'all', 'me', 'my', 'our', 'of'}
+NAMING_WORDS = {'named', 'called'}
+FIELD_SEPARATORS = {':', '=', 'to', 'is', 'as'}
+SET_WORDS = {'set', 'change'}
+# "change its description to ..." / "set the status to ..."
+SET_FILLERS = {'its', 'the'}
+# "list assets with status ACTIVE", "... where status is NEW", "... and description X"
+CLAUSE_WORDS = {'with', 'where', 'and'}
+# "list the assets of scope X": a container filter, not part of the name
+QUALIFIER_WORDS = {'of', 'in', 'from', 'within'}
+# "... in our isms" / "... in the system" carries no information
+TRAILING_PHRASES = [('in', 'our', 'isms'), ('in', 'the', 'isms'), ('in', 'our', 'system'), ('in', 'the', 'system')]
+
+
+# ==================== AST ====================
+
+@dataclass(frozen=True)
+class Command:
+    """Parsed ISMS command (shared via the parse cache - treat as read-only)"""
+    operation: str
+    objectType: str
+    name: Optional[str] = None
+    objectId: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+    remainder: str = ''
+    text: str = ''
+
+    @property
+    def isDeterministic(self) -> bool:
+        """Fully parsed and complete enough to execute without any LLM help"""
+        if self.remainder or not self.objectType:
+            return False
+        if self.operation == 'list':
+            # The list handlers filter by subtype only
+            return not self.name and not self.objectId and set(self.fields) <= {'subType'}
+        if not (self.name or self.objectId):
+            return False
+        if self.operation == 'update':
+            return bool(self.fields)
+        return True
+
+    def toDict(self) -> Dict:
+        return {
+            'operation': self.operation,
+            'objectType': self.objectType,
+            'name': self.name,
+            'objectId': self.objectId,
+            'fields': dict(self.fields),
+            'remainder': self.remainder,
+            'deterministic': self.isDeterministic,
+        }
+
+
+# ==================== PARSER ====================
+
+class _Parser:
+    """Recursive-descent parser over the token list"""
+
+    def __init__(self, text: str, tokens: List[Token]):
+        self.text = text
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def peekWord(self, offset: int = 0) -> Optional[str]:
+        token = self.peek(offset)
+        if token is None or token.kind != WORD:
+            return None
+        return AGENT_TYPO_CORRECTOR.correct(token.lower)
+
+    def setFieldOffset(self, offset: int = 0) -> Optional[int]:
+        """Offset of the field name after 'set'/'change' [its|the] at offset, if any"""
+        if self.peekWord(offset) not in SET_WORDS:
+            return None
+        offset += 1
+        if self.peekWord(offset) in SET_FILLERS:
+            offset += 1
+        return offset if self.peekWord(offset) is not None else None
+
+    def atFieldKeyword(self) -> bool:
+        offset = 1 if self.peekWord() in CLAUSE_WORDS else 0
+        word = self.peekWord(offset)
+        if word in FIELDS:
+            return True
+        fieldOffset = self.setFieldOffset(offset)
+        return fieldOffset is not None and self.peekWord(fieldOffset) in FIELDS
+
+    def atSetPhrase(self) -> bool:
+        """'set'/'change' FIELD-ish WORD followed by a separator, also for fields the grammar does not know"""
+        fieldOffset = self.setFieldOffset()
+        if fieldOffset is None:
+            return False
+        token = self.peek(fieldOffset + 1)
+        return token is not None and (token.value in FIELD_SEPARATORS or token.lower in FIELD_SEPARATORS)
+
+    def atQualifier(self) -> bool:
+        """'of scope X', 'in the scope X' - a container, not part of a name"""
+        if self.peekWord() not in QUALIFIER_WORDS:
+            return False
+        offset = 2 if self.peekWord(1) == 'the' else 1
+        return self.peekWord(offset) in OBJECT_TYPES
+
+    def atConnector(self) -> bool:
+        """End of this command: 'then', 'and <verb>', or punctuation with more text after it"""
+        token = self.peek()
+        if token is None:
+            return False
+        if token.kind == PUNCT:
+            return self.peek(1) is not None
+        word = self.peekWord()
+        if word == 'then':
+            return True
+        if word in ('and', 'also'):
+            following = self.peekWord(1)
+            return following in VERBS or following in ('link', 'then', 'also', 'assign')
+        return False
+
+    def skipTrailingPhrase(self) -> bool:
+        for phrase in TRAILING_PHRASES:
+            if all(self.peekWord(i) == word for i, word in enumerate(phrase)):
+                self.pos += len(phrase)
+                return True
+        return False
+
+    def skipPunctBeforeClause(self):
+        """"update asset 'X'. Change its description to Y" - a sentence break before a clause"""
+        token = self.peek()
+        if token is not None and token.kind == PUNCT and token.value in '.,;':
+            self.pos += 1
+            if self.atFieldKeyword():
+                return
+            self.pos -= 1
+
+    def skipFinalPunct(self):
+        token = self.peek()
+        if token is not None and token.kind == PUNCT and self.peek(1) is None:
+            self.pos += 1
+
+    def span(self, first: Token, last: Token) -> str:
+        return self.text[first.start:last.end].strip()
+
+    def parseValue(self) -> Optional[str]:
+        """QUOTED, or the words up to the next field keyword / connector"""
+        token = self.peek()
+        if token is None:
+            return None
+        if token.kind == QUOTED:
+            self.pos += 1
+            return token.value.strip()
+        first = last = None
+        while True:
+            token = self.peek()
+            if token is None or token.kind == QUOTED or self.atFieldKeyword() or self.atConnector():
+                break
+            if first is not None and (self.atSetPhrase() or self.atQualifier()):
+                break
+            if self.skipTrailingPhrase():
+                break
+            if token.kind == PUNCT:
+                break
+            first = first or token
+            last = token
+            self.pos += 1
+        return self.span(first, last) if first else None
+
+    def parseClause(self, fields: Dict[str, str]) -> bool:
+        if self.peekWord() in CLAUSE_WORDS and self.atFieldKeyword():
+            self.pos += 1
+        word = self.peekWord()
+        fieldOffset = self.setFieldOffset()
+        if fieldOffset is not None and self.peekWord(fieldOffset) in FIELDS:
+            self.pos += fieldOffset
+            word = self.peekWord()
+        if word not in FIELDS:
+            return False
+        self.pos += 1
+        token = self.peek()
+        if token is not None and (token.value in FIELD_SEPARATORS or self.peekWord() in FIELD_SEPARATORS):
+            self.pos += 1
+        value = self.parseValue()
+        if value is None:
+            return False
+        fields[FIELDS[word]] = value
+        return True
+
+    def parse(self) -> Optional[Command]:
+        if self.peekWord() == 'please':
+            self.pos += 1
+        verb = self.peekWord()
+        operation = VERBS.get(verb)
+        if not operation:
+            return None
+        self.pos += 1
+
+        # 'new' is also a filler ("create a new scope"), never the object type
+        while self.peekWord() in FILLERS and self.peekWord() not in OBJECT_TYPES:
+            self.pos += 1
+        objectType = OBJECT_TYPES.get(self.peekWord() or '')
+        if not objectType:
+            return None
+        self.pos += 1
+        self.skipTrailingPhrase()
+
+        name = None
+        objectId = None
+        token = self.peek()
+        if token is not None and token.kind == UUID:
+            objectId = token.value
+            self.pos += 1
+        elif token is not None and not self.atFieldKeyword() and not self.atConnector() and not self.atQualifier():
+            if self.peekWord() in NAMING_WORDS:
+                self.pos += 1
+            name = self.parseValue()
+
+        # show/display with a target means "get that object"
+        if operation == 'list' and verb in ('show', 'display') and (name or objectId):
+            operation = 'get'
+
+        fields: Dict[str, str] = {}
+        while self.peek() is not None:
+            self.skipTrailingPhrase()
+            self.skipPunctBeforeClause()
+            if not self.parseClause(fields):
+                break
+        self.skipFinalPunct()
+
+        # "create asset name Foo" - the name came in as a field clause
+        if not name and not objectId and operation != 'update' and 'name' in fields:
+            name = fields.pop('name')
+
+        remainder = ''
+        if self.peek() is not None:
+            remainder = self.text[self.peek().start:].strip()
+        return Command(operation, objectType, name, objectId, fields, remainder, self.text)
+
+
+@lru_cache(maxsize=512)
+def parseCommand(text: str) -> Optional[Command]:
+    """
+    Parse an ISMS command (cached per text).
+
+    Returns:
+        Command, or None if the text does not start with VERB ... OBJTYPE
+    """
+    text = (text or '').strip()
+    if not text:
+        return None
+    return _Parser(text, tokenize(text)).parse()
+
+
+def commandFor(text: str, objectType: Optional[str] = None) -> Optional[Command]:
+    """
+    The deterministic Command for text, or None - also when the text parses
+    as a command on another object type than the caller is handling
+    """
+    command = parseCommand(text)
+    if command is None or not command.isDeterministic:
+        return None
+    if objectType and OBJECT_TYPES.get(objectType.lower(), objectType.lower()) != command.objectType:
+        return None
+    return command
@@ -15,6 +15,9 @@ import re
 import logging
 from typing import Dict, Any, Optional, Tuple, Callable
 
+from .messageFeatures import getMessageFeatures
+from .ismsCommandParser import parseCommand
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,6 +73,10 @@ class ISMSController:
         """
         if context is None:
             context = {}
+        # Reuse the turn's features (from MainAgent state) for tier detection and the fast path
+        context['messageFeatures'] = getMessageFeatures(
+            request, context.get('messageFeatures') or context.get('state', {}).get('_messageFeatures')
+        )
         
         # Detect tier with confidence scoring
         tier, confidence = self._detect_tier(request, context)
@@ -134,7 +141,13 @@ class ISMSController:
             - tier: 1, 2, or 3
             - confidence: 0.0 to 1.0 (if < 0.8, defaults to Tier 1 for safety)
         """
-        request_lower = request.lower().strip()
+        # Fully parsed single commands never need the agent tiers; anything the
+        # grammar leaves over is tiered by the patterns below
+        command = parseCommand(request)
+        if command and command.isDeterministic:
+            return (1, 0.95)
+        
+        request_lower = getMessageFeatures(request, context.get('messageFeatures')).lower
         
         # Tier 1 patterns (simple CRUD) - high confidence
         tier1_patterns = [
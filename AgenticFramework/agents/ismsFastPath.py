@@ -16,6 +16,9 @@ import re
 import logging
 from typing import Dict, Any, Optional, Callable
 
+from .messageFeatures import MessageFeatures, getMessageFeatures
+from .ismsCommandParser import parseCommand
+
 logger = logging.getLogger(__name__)
 
 
@@ -63,7 +66,7 @@ class ISMSFastPath:
             self.coordinator.state.update(context['state'])
         
         # Parse request to extract operation and object type
-        parsed = self._parse_request(request)
+        parsed = self._parse_request(request, context.get('messageFeatures'))
         if not parsed:
             return {
                 'status': 'error',
@@ -74,6 +77,7 @@ class ISMSFastPath:
         operation = parsed['operation']
         object_type = parsed['object_type']
         message = parsed.get('message', request)
+        command = parsed.get('command')
         
         # Emit event for fast path execution
         if self.event_callback:
@@ -87,7 +91,7 @@ class ISMSFastPath:
             # Route to coordinator
             if operation in ['create', 'list', 'get', 'view', 'show', 'update', 'delete', 'remove']:
                 # Use handleOperation for CRUD operations only
-                result = self.coordinator.handleOperation(operation, object_type, message)
+                result = self.coordinator.handleOperation(operation, object_type, message, command)
                 
                 # Convert coordinator format to MainAgent format
                 return self._format_response(result)
@@ -105,17 +109,38 @@ class ISMSFastPath:
                 'type': 'tool_result'
             }
     
-    def _parse_request(self, request: str) -> Optional[Dict]:
+    def _parse_request(self, request: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Parse simple ISMS request to extract operation and object type.
         
         Args:
             request: User's request
+            features: Precomputed MessageFeatures for this request (optional)
         
         Returns:
-            Dict with 'operation', 'object_type', 'message' or None if cannot parse
+            Dict with 'operation', 'object_type', 'message' (plus 'command' when the
+            grammar parsed it) or None if cannot parse
         """
-        request_lower = request.lower().strip()
+        # Grammar parse first: typed command, no regex scanning per pattern
+        command = parseCommand(request)
+        if command and command.isDeterministic:
+            return {
+                'operation': command.operation,
+                'object_type': command.objectType,
+                'message': request,
+                'command': command
+            }
+        if command:
+            # Partial parse: the verb and type are still right ("creat scope ..." after
+            # typo correction, "list the assets of scope X"); the handlers' regex
+            # extractors read name and fields from the whole request
+            return {
+                'operation': command.operation,
+                'object_type': command.objectType,
+                'message': request
+            }
+        
+        request_lower = getMessageFeatures(request, features).lower
         
         # Object types
         object_types = [
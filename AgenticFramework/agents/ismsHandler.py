@@ -4,11 +4,67 @@ import re
 import json
 import time
 import logging
+from functools import lru_cache
 from .instructions import get_error_message
+from .messageFeatures import getMessageFeatures
+from .ismsCommandParser import commandFor
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=64)
+def _resolveNamePatterns(objectType: str) -> tuple:
+    """Name-extraction patterns for ISMSHandler._resolveToId, compiled once per object type"""
+    # CRITICAL: Handle quoted names FIRST (e.g., "Update the asset 'Main Firewall'. Change...")
+    # For update commands, stop at field name (description, status, etc.)
+    # For get/delete commands, capture everything after object type
+    updateFieldKeywords = ['description', 'status', 'subtype', 'subType', 'name', 'abbreviation', 'abbr']
+    
+    patterns = [
+        # CRITICAL: Handle "Update the asset 'Main Firewall'. Change its description..."
+        # Pattern must match period/comma after quote, then space, then "Change" keyword
+        rf'(?:update|change|modify|edit|set)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']\s*[\.\,]\s+(?:change|set|update|description|confidentiality|status|name|abbreviation|subtype|subType|and|to)',
+        # Pattern with period/comma after quote: "Update the asset 'Main_Firewall'."
+        rf'(?:update|change|modify|edit|set)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']\s*[\.\,]',
+        # Pattern without punctuation after quote (but may have space and then text)
+        rf'(?:update|change|modify|edit|set)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\'](?:\s|\.|,|$)',
+        # CRITICAL: Handle role assignment patterns: "set role for the DPO for the person Ruby"
+        # Extract name after "for the person" or "for person" - must be more specific to avoid matching wrong "for the"
+        # Pattern: "set role for the X for the person Ruby" or "add in the X for the person Tommy"
+        # Use non-greedy match to get the LAST "for the person" in the message
+        rf'(?:set|add|assign).*?for\s+(?:the\s+)?person\s+["\']?([^"\']+)["\']?(?:\s|$|\.|,)',
+        # Get/delete with quoted names
+        rf'(?:get|view|show|delete|remove|analyze)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']',
+        rf'(?:update|change|modify|edit|set)\s+{objectType}\s+([A-Za-z0-9_\s-]+?)(?:\s+(?:{"|".join(updateFieldKeywords)}))',
+        # Get/delete command: "get asset Name" - capture everything
+        rf'(?:get|view|show|delete|remove|analyze)\s+{objectType}\s+(.+)',
+        # Generic: "asset Name"
+        rf'{objectType}\s+([A-Za-z0-9_\s-]+)',
+    ]
+    
+    if objectType.lower() == 'person':
+        # Pattern for "for the person X" - must come after other patterns to avoid false matches
+        patterns.insert(-2, rf'for\s+(?:the\s+)?person\s+["\']?([^"\']+)["\']?(?:\s|$|\.|,)')
+    
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+_RESOLVE_NAME_CLEANUP = re.compile(r'\s+(description|status|subtype|subType|name|abbreviation|abbr|field|value|to|is|as).*$', re.IGNORECASE)
+
+@lru_cache(maxsize=64)
+def _fieldValuePatterns(objectType: str) -> tuple:
+    """Field/value patterns for ISMSHandler._extractFieldAndValuePattern, compiled once per object type"""
+    patterns = [
+        r'(?:set|update|change)\s+(\w+)\s+(?:to|as|=)\s+(.+)',  # "set description to value"
+        rf'{objectType}\s+\w+\s+(\w+)\s+(.+)',                    # "scope NAME field value"
+        r'(\w+)\s*=\s*(.+)',                                      # "field = value"
+    ]
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+_FIELD_VALUE_CLEANUP = re.compile(r'\s+(in|for|with|using|to|the).*$', re.IGNORECASE)
+
+
 class ISMSHandler:
     """Handles all ISMS operations with clean, simple logic"""
     
@@ -45,13 +101,13 @@ class ISMSHandler:
             objectType: Object type (scope, asset, etc.)
             message: User's original message
             preDetectedSubType: Optional subtype detected by router (e.g., "Controllers" from "create Controllers named X")
-            subtypeFilter: Optional subtype filter for list operations (e.g., "IT-System" for filtering assets)
+            subtypeFilter: Optional subtype filter for list/count operations (e.g., "IT-System" for filtering assets)
         """
         domainId, unitId = self._getDefaults()
         
         # Allow listing scopes without domain (scopes can be listed at unit level)
         # Allow listing domains without requiring a domain
-        requiresDomain = operation != 'list_domains' and not (operation == 'list' and objectType == 'scope')
+        requiresDomain = operation != 'list_domains' and not (operation in ('list', 'count') and objectType == 'scope')
         
         if not domainId and requiresDomain:
             return self._error(get_error_message('not_found', 'domain'))
@@ -60,6 +116,7 @@ class ISMSHandler:
         handlers = {
             'create': self._handleCreate,
             'list': self._handleList,
+            'count': self._handleCount,
             'get': self._handleGet,
             'view': self._handleGet,  # view = get
             'update': self._handleUpdate,
@@ -82,8 +139,8 @@ class ISMSHandler:
             del self.state['_returnSubtype']  # Clear flag after use
             return handler(objectType, message, domainId, unitId, returnSubtype)
         
-        # For list operation, pass subtypeFilter if provided
-        if operation == 'list' and subtypeFilter:
+        # For list/count operations, pass subtypeFilter if provided
+        if operation in ('list', 'count') and subtypeFilter:
             return handler(objectType, message, domainId, unitId, subtypeFilter)
         
         # Special handling for compare - needs to extract two object names
@@ -578,10 +635,13 @@ class ISMSHandler:
         if not domainId:
             return self._error(get_error_message('operation_failed', 'list', objectType=objectType, error='No domain available. Please create a domain first.'))
         
-        result = self.veriniceTool.listObjects(objectType, domainId)
+        # Push the subtype down to the API when it resolves to one of the domain's keys;
+        # otherwise list everything and match client-side
+        serverSubType = self.veriniceTool.resolveSubType(objectType, domainId, subtypeFilter) if subtypeFilter else None
+        result = self.veriniceTool.listObjects(objectType, domainId, {'subType': serverSubType} if serverSubType else None)
         if result.get('success'):
             # Filter by subtype if specified
-            if subtypeFilter:
+            if subtypeFilter and not serverSubType:
                 objects = result.get('objects', {}).get('items', [])
                 if isinstance(objects, list):
                     filtered = self._filterObjectsBySubtype(objects, subtypeFilter, objectType)
@@ -606,6 +666,44 @@ class ISMSHandler:
         error_detail = self._extract_error_details(result)
         return self._error(f"Could not list {objectType}s: {error_detail}")
     
+    def _handleCount(self, objectType: str, message: str, domainId: str, unitId: str, subtypeFilter: Optional[str] = None) -> Dict:
+        """Count operation ("how many X") - one size=1 request instead of a full list"""
+        if not subtypeFilter:
+            subtypeFilter = self._extractSubType(message, objectType)
+        if subtypeFilter:
+            subtypeFilter = self._normalizeSubtypeFilter(subtypeFilter, objectType)
+        
+        serverSubType = self.veriniceTool.resolveSubType(objectType, domainId, subtypeFilter) if subtypeFilter else None
+        items = []
+        if subtypeFilter and not serverSubType:
+            # Fuzzy subtype the API cannot express: list and match client-side
+            result = self.veriniceTool.listObjects(objectType, domainId, unitId=unitId)
+            if not result.get('success'):
+                return self._error(get_error_message('operation_failed', 'list', objectType=objectType, error=self._extract_error_details(result)))
+            items = result.get('objects', {}).get('items', [])
+            items = self._filterObjectsBySubtype(items if isinstance(items, list) else [], subtypeFilter, objectType)
+            count = len(items)
+        else:
+            result = self.veriniceTool.countObjects(objectType, domainId, {'subType': serverSubType} if serverSubType else None, unitId=unitId)
+            if not result.get('success'):
+                return self._error(get_error_message('operation_failed', 'list', objectType=objectType, error=self._extract_error_details(result)))
+            count = result.get('count', 0)
+        
+        # Follow-ups ("delete them", "what are those") refer to the counted set.
+        # Without fetched items, 'subType' tells them which objects to list.
+        self.state['_last_list_result'] = {
+            'objectType': objectType,
+            'items': items,
+            'count': count,
+            'subType': serverSubType or subtypeFilter
+        }
+        
+        plural = self.veriniceTool.OBJECT_TYPES.get(objectType, f"{objectType}s")
+        label = objectType if count == 1 else plural
+        if subtypeFilter:
+            return self._success(f"There {'is' if count == 1 else 'are'} {count} {label} with subtype '{serverSubType or subtypeFilter}'.")
+        return self._success(f"There {'is' if count == 1 else 'are'} {count} {label}.")
+
     def _handleGet(self, objectType: str, message: str, domainId: str, unitId: str, returnSubtype: bool = False) -> Dict:
         """Get operation - find by name or ID"""
         objectId = self._resolveToId(objectType, message, domainId)
@@ -686,29 +784,35 @@ class ISMSHandler:
         updateData = {}
         messageLower = message.lower()
         
-        # 1. Check for keyword-based updates (priority)
-        # Handle subType/subtype
-        subtype_match = re.search(r'subtypes?[:\s]+([A-Za-z0-9_\s-]+)', message, re.IGNORECASE)
-        if subtype_match:
-            updateData['subType'] = subtype_match.group(1).strip()
+        # 0. A fully parsed command carries its fields ("name" is the new name)
+        command = commandFor(message, objectType)
+        if command is not None:
+            updateData.update(command.fields)
+        
+        # 1. Otherwise check for keyword-based updates (priority)
+        if command is None:
+            # Handle subType/subtype
+            subtype_match = re.search(r'subtypes?[:\s]+([A-Za-z0-9_\s-]+)', message, re.IGNORECASE)
+            if subtype_match:
+                updateData['subType'] = subtype_match.group(1).strip()
             
-        # Handle description
-        desc_match = re.search(r'description[:\s]+(.+?)(?:\s+subType|\s+status|$)', message, re.IGNORECASE)
-        if desc_match:
-            updateData['description'] = desc_match.group(1).strip().strip('"').strip("'")
+            # Handle description
+            desc_match = re.search(r'description[:\s]+(.+?)(?:\s+subType|\s+status|$)', message, re.IGNORECASE)
+            if desc_match:
+                updateData['description'] = desc_match.group(1).strip().strip('"').strip("'")
             
-        # Handle abbreviation
-        abbr_match = re.search(r'(?:abbreviation|abbr)[:\s]+([A-Za-z0-9_-]{1,10})', message, re.IGNORECASE)
-        if abbr_match:
-            updateData['abbreviation'] = abbr_match.group(1).strip()
+            # Handle abbreviation
+            abbr_match = re.search(r'(?:abbreviation|abbr)[:\s]+([A-Za-z0-9_-]{1,10})', message, re.IGNORECASE)
+            if abbr_match:
+                updateData['abbreviation'] = abbr_match.group(1).strip()
             
-        # Handle name change (explicit)
-        name_change_match = re.search(r'name[:\s]+["\']?([^"\']+)["\']?', message, re.IGNORECASE)
-        if name_change_match:
-            # Only use if it's not the same as currentName
-            new_name = name_change_match.group(1).strip()
-            if new_name.lower() != currentName.lower():
-                updateData['name'] = new_name
+            # Handle name change (explicit)
+            name_change_match = re.search(r'name[:\s]+["\']?([^"\']+)["\']?', message, re.IGNORECASE)
+            if name_change_match:
+                # Only use if it's not the same as currentName
+                new_name = name_change_match.group(1).strip()
+                if new_name.lower() != currentName.lower():
+                    updateData['name'] = new_name
 
         # 2. Fallback to positional parsing ONLY if no keywords found
         if not updateData:
@@ -843,18 +947,12 @@ If you cannot determine the field or value, return:
         Returns:
             (field, value) tuple or (None, None) if extraction fails
         """
-        patterns = [
-            r'(?:set|update|change)\s+(\w+)\s+(?:to|as|=)\s+(.+)',  # "set description to value"
-            rf'{objectType}\s+\w+\s+(\w+)\s+(.+)',                    # "scope NAME field value"
-            r'(\w+)\s*=\s*(.+)',                                      # "field = value"
-        ]
-        
-        for pattern in patterns:
-            fieldMatch = re.search(pattern, message, re.IGNORECASE)
+        for pattern in _fieldValuePatterns(objectType):
+            fieldMatch = pattern.search(message)
             if fieldMatch:
                 field = fieldMatch.group(1)
                 value = fieldMatch.group(2).strip()
-                value = re.sub(r'\s+(in|for|with|using|to|the).*$', '', value, flags=re.IGNORECASE).strip()
+                value = _FIELD_VALUE_CLEANUP.sub('', value).strip()
                 if field and value:
                     return (field, value)
         
@@ -1057,6 +1155,11 @@ If you cannot determine the field or value, return:
         - create scope scope_test scp2 scope_description
         - creat scope "SCOPE TEST" "SA-1" "SCOPE TESTING"  (typo "creat" supported)
         """
+        # Keyword clauses ("with description ...") are not the positional format
+        command = commandFor(message, objectType)
+        if command is not None and command.fields:
+            return None
+        
         # Support "creat" typo
         createPattern = r'(?:create|creat|new|add)'
         
@@ -1149,6 +1252,10 @@ If you cannot determine the field or value, return:
     
     def _extractName(self, message: str, objectType: str) -> Optional[str]:
         """Extract object name from message - enhanced patterns"""
+        command = commandFor(message, objectType)
+        if command is not None and command.name:
+            return command.name
+        
         # Also handle: "Create a new Scope named 'Project Phoenix' and immediately link it..."
         # Also handle: "Create a new Incident named 'Phishing Attempt Jan-24'. Then, find..."
         quoted_patterns = [
@@ -1205,6 +1312,10 @@ If you cannot determine the field or value, return:
     
     def _extractAbbreviation(self, message: str) -> Optional[str]:
         """Extract abbreviation from message"""
+        command = commandFor(message)
+        if command is not None:
+            return command.fields.get('abbreviation')
+        
         patterns = [
             r'abbreviation[:\s]+([A-Za-z0-9_-]{1,10})',
             r'abbrev[:\s]+([A-Za-z0-9_-]{1,10})',
@@ -1221,6 +1332,10 @@ If you cannot determine the field or value, return:
     
     def _extractDescription(self, message: str) -> Optional[str]:
         """Extract description from message"""
+        command = commandFor(message)
+        if command is not None:
+            return command.fields.get('description')
+        
         patterns = [
             r'description[:\s]+(.+?)(?:\s+subType|\s+status|$)',
             r'desc[:\s]+(.+?)(?:\s+subType|\s+status|$)',
@@ -1236,6 +1351,10 @@ If you cannot determine the field or value, return:
     
     def _extractSubType(self, message: str, objectType: str) -> Optional[str]:
         """Extract subType from message"""
+        command = commandFor(message, objectType)
+        if command is not None:
+            return command.fields.get('subType')
+        
         # Pattern 1: "assign his role to 'DPO'" or "assign her role to 'DPO'"
         assign_role_pattern = r'assign\s+(?:his|her|their|its)\s+role\s+to\s+["\']?([^"\']+)["\']?'
         match = re.search(assign_role_pattern, message, re.IGNORECASE)
@@ -1510,51 +1629,22 @@ If you cannot determine the field or value, return:
         3. List objects and find by name (try default domain first, then all domains)
         4. Return ID or None
         """
-        uuidMatch = re.search(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', message, re.IGNORECASE)
-        if uuidMatch:
-            return uuidMatch.group(1)
-        
-        # Extract name from message
-        # CRITICAL: Handle quoted names FIRST (e.g., "Update the asset 'Main Firewall'. Change...")
-        # For update commands, stop at field name (description, status, etc.)
-        # For get/delete commands, capture everything after object type
-        updateFieldKeywords = ['description', 'status', 'subtype', 'subType', 'name', 'abbreviation', 'abbr']
-        
-        patterns = [
-            # CRITICAL: Handle "Update the asset 'Main Firewall'. Change its description..."
-            # Pattern must match period/comma after quote, then space, then "Change" keyword
-            rf'(?:update|change|modify|edit|set)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']\s*[\.\,]\s+(?:change|set|update|description|confidentiality|status|name|abbreviation|subtype|subType|and|to)',
-            # Pattern with period/comma after quote: "Update the asset 'Main_Firewall'."
-            rf'(?:update|change|modify|edit|set)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']\s*[\.\,]',
-            # Pattern without punctuation after quote (but may have space and then text)
-            rf'(?:update|change|modify|edit|set)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\'](?:\s|\.|,|$)',
-            # CRITICAL: Handle role assignment patterns: "set role for the DPO for the person Ruby"
-            # Extract name after "for the person" or "for person" - must be more specific to avoid matching wrong "for the"
-            # Pattern: "set role for the X for the person Ruby" or "add in the X for the person Tommy"
-            # Use non-greedy match to get the LAST "for the person" in the message
-            rf'(?:set|add|assign).*?for\s+(?:the\s+)?person\s+["\']?([^"\']+)["\']?(?:\s|$|\.|,)',
-            # Get/delete with quoted names
-            rf'(?:get|view|show|delete|remove|analyze)\s+(?:the\s+)?{objectType}\s+["\']([^"\']+)["\']',
-            rf'(?:update|change|modify|edit|set)\s+{objectType}\s+([A-Za-z0-9_\s-]+?)(?:\s+(?:{"|".join(updateFieldKeywords)}))',
-            # Get/delete command: "get asset Name" - capture everything
-            rf'(?:get|view|show|delete|remove|analyze)\s+{objectType}\s+(.+)',
-            # Generic: "asset Name"
-            rf'{objectType}\s+([A-Za-z0-9_\s-]+)',
-        ]
-        
-        if objectType.lower() == 'person':
-            # Pattern for "for the person X" - must come after other patterns to avoid false matches
-            patterns.insert(-2, rf'for\s+(?:the\s+)?person\s+["\']?([^"\']+)["\']?(?:\s|$|\.|,)')
-        
-        name = None
-        for pattern in patterns:
-            if pattern is None:
-                continue
-            match = re.search(pattern, message, re.IGNORECASE)
+        features = getMessageFeatures(message, self.state.get('_messageFeatures'))
+        if features.firstUuid:
+            return features.firstUuid
+        
+        # A deterministic command already names its target; otherwise extract
+        # the name from the message (patterns compiled once per object type)
+        command = commandFor(message, objectType)
+        name = command.name if command is not None else None
+        for pattern in _resolveNamePatterns(objectType):
+            if name:
+                break
+            match = pattern.search(message)
             if match:
                 name = match.group(1).strip()
                 # Clean up - remove common trailing words that indicate field names
-                name = re.sub(r'\s+(description|status|subtype|subType|name|abbreviation|abbr|field|value|to|is|as).*$', '', name, flags=re.IGNORECASE).strip()
+                name = _RESOLVE_NAME_CLEANUP.sub('', name).strip()
                 if name:
                     break
         
@@ -1565,6 +1655,16 @@ If you cannot determine the field or value, return:
         def searchInDomain(dId: str) -> Optional[str]:
             if not self.veriniceTool:
                 return None
+            # Exact names are the common case: let the API narrow the list by name first
+            name_clean = name.strip("'\"")
+            if name_clean:
+                narrowed = self.veriniceTool.listObjects(objectType, dId, {'name': name_clean})
+                for item in (narrowed.get('objects', {}).get('items', []) if narrowed.get('success') else []):
+                    itemName = (item.get('name') or '').strip()
+                    if itemName.strip("'\"").lower() == name_clean.lower() or itemName.lower() == name.lower():
+                        return item.get('id') or item.get('resourceId')
+            
+            # No exact hit: fuzzy matching needs the full list
             listResult = self.veriniceTool.listObjects(objectType, dId)
             if not listResult.get('success'):
                 return None
@@ -1572,6 +1672,12 @@ If you cannot determine the field or value, return:
             objects = listResult.get('objects', {})
             items = objects.get('items', []) if isinstance(objects, dict) else (objects if isinstance(objects, list) else [])
             
+            # An exact name anywhere in the list beats a fuzzy match on an earlier item
+            for item in items:
+                itemName = (item.get('name') or '').strip()
+                if itemName and (itemName.strip("'\"").lower() == name_clean.lower() or itemName.lower() == name.lower()):
+                    return item.get('id') or item.get('resourceId')
+            
             # Find by name (exact match first, then fuzzy)
             for item in items:
                 itemName = item.get('name', '').strip()
@@ -1647,7 +1753,12 @@ If you cannot determine the field or value, return:
                     found_names = [o.get('name') for o in listResult.get('objects', {}).get('items', [])]
                     logger.error(f"[_resolveToId] DEBUG: Available objects in domain: {found_names}")
                 
-                time.sleep(delay_seconds)
+                # Backend down: the breaker would reject every retry anyway
+                if not self.veriniceTool.isBackendAvailable():
+                    logger.warning(f"[_resolveToId] Verinice unavailable, not retrying: {self.veriniceTool.lastError}")
+                    return None
+                if attempt < max_retries - 1:
+                    time.sleep(delay_seconds)
         
         # If not found in domain, try searching in the unit (if available)
         # Some objects might be created at unit level
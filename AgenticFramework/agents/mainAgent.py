@@ -7,26 +7,16 @@ from .baseAgent import BaseAgent
 from .ismsHandler import ISMSHandler
 from .instructions import (
     VERINICE_OBJECT_TYPES,
-    VERINICE_CREATE_KEYWORDS,
-    VERINICE_LIST_KEYWORDS,
-    VERINICE_GET_KEYWORDS,
-    VERINICE_UPDATE_KEYWORDS,
-    VERINICE_DELETE_KEYWORDS,
-    VERINICE_ANALYZE_KEYWORDS,
     VERINICE_QUESTION_STARTERS,
-    VERINICE_QUESTION_WORDS,
-    VERINICE_TYPO_CORRECTIONS,
     VERINICE_SUBTYPE_MAPPINGS,
-    VERINICE_REPORT_KEYWORDS,
-    VERINICE_REPORT_TYPES,
     VERINICE_REPORT_TYPE_MAPPINGS,
     KNOWLEDGE_QUESTION_STARTERS,
     KNOWLEDGE_QUESTION_PHRASES,
     KNOWLEDGE_WHAT_PATTERNS,
     KNOWLEDGE_HOW_TO_CREATE_PATTERNS,
-    TYPO_VARIATIONS,
     get_error_message,
 )
+from .messageFeatures import MessageFeatures, getMessageFeatures
 from .helpers import (
     parseSubtypeSelection,
     checkGreeting,
@@ -117,8 +107,31 @@ CRITICAL RULES:
     # ==================== CHAT MESSAGE PROCESSING ====================
     
     def _processChatMessage(self, message: str) -> Dict:
+        """Process chat message - one Verinice read cache per turn"""
+        # Every handler this turn shares one read cache: repeated lists/GETs
+        # (id resolution, linking, name lookups, default domain/unit) hit memory,
+        # and any write clears it so later reads in the turn stay fresh
+        from tools.veriniceTool import VeriniceTool
+        with VeriniceTool.requestScope() as readCache:
+            result = self._routeChatMessage(message)
+        stats = readCache.stats()
+        self.state['_readCacheStats'] = stats
+        if stats['hits']:
+            import logging
+            logging.getLogger(__name__).debug(
+                f"[MainAgent] Read cache saved {stats['hits']} Verinice call(s) "
+                f"({stats['misses']} sent, {stats['invalidations']} invalidation(s))"
+            )
+        return result
+    
+    def _routeChatMessage(self, message: str) -> Dict:
         """Process chat message - AI-driven natural routing"""
         try:
+            # Analyse the message once per turn; the router, handlers and coordinator
+            # read these features from state instead of re-running their own regexes
+            features = MessageFeatures(message)
+            self.state['_messageFeatures'] = features
+            
             # CRITICAL: Sync state BEFORE routing to ensure context is available for bulk delete
             # This ensures _last_list_result is available when _detectBulkDelete is called
             if self._ismsHandler and hasattr(self._ismsHandler, 'state'):
@@ -311,20 +324,16 @@ CRITICAL RULES:
             reasoningEngine = getattr(self, '_reasoningEngine', None)
             if reasoningEngine and reasoningEngine.isAvailable():
                 try:
-                    messageLower = message.lower().strip()
+                    messageLower = features.lower
                     isKnowledgeQuestion = any(
                         starter in messageLower 
                         for starter in KNOWLEDGE_QUESTION_STARTERS
                     ) or messageLower.endswith('?')
                     
                     # Route to ReasoningEngine if it's a knowledge question OR not an ISMS operation
-                    isISMSOp = any([
-                        'create' in messageLower and any(obj in messageLower for obj in VERINICE_OBJECT_TYPES),
-                        'list' in messageLower and any(obj in messageLower for obj in VERINICE_OBJECT_TYPES),
-                        'get' in messageLower and any(obj in messageLower for obj in VERINICE_OBJECT_TYPES),
-                        'update' in messageLower and any(obj in messageLower for obj in VERINICE_OBJECT_TYPES),
-                        'delete' in messageLower and any(obj in messageLower for obj in VERINICE_OBJECT_TYPES),
-                    ])
+                    isISMSOp = features.mentionsObjectType and any(
+                        verb in messageLower for verb in ('create', 'list', 'get', 'update', 'delete')
+                    )
                     
                     if isKnowledgeQuestion or not isISMSOp:
                         # This is a knowledge question or general query - use ReasoningEngine
@@ -382,7 +391,8 @@ CRITICAL RULES:
     def _detectVeriniceOp(self, message: str) -> Optional[Dict]:
         """Detect Verinice operation from message - ignore questions"""
         try:
-            messageLower = message.lower().strip()
+            features = getMessageFeatures(message, self.state.get('_messageFeatures'))
+            messageLower = features.lower
             
             # Skip questions - these should go to LLM for knowledge answers
             # BUT: subtype queries should be handled separately (checked before this)
@@ -397,17 +407,10 @@ CRITICAL RULES:
                 if not any(re.search(pattern, messageLower) for pattern in subtype_patterns):
                     return None
     
-            # Normalize typos - only replace whole words to avoid substring issues
-            # Build typo map from JSON (reverse lookup: typo -> correct)
-            typoMap = {}
-            for correct, typos in TYPO_VARIATIONS.items():
-                for typo in typos:
-                    typoMap[typo] = correct
-            typoMap.update(VERINICE_TYPO_CORRECTIONS)
-            for typo, correct in typoMap.items():
-                # Use word boundaries to only replace whole words, not substrings
-                pattern = r'\b' + re.escape(typo) + r'\b'
-                messageLower = re.sub(pattern, correct, messageLower)
+            # Normalize typos - whole words only, all corrections in one pass
+            # (map built once from TYPO_VARIATIONS + VERINICE_TYPO_CORRECTIONS)
+            messageLower = features.agentCorrectedLower
+            keywordHits = features.keywordHits(messageLower)
             
             # CRITICAL: Check if word after "create" is a subtype name, not an object type
             # This MUST happen BEFORE object type matching to avoid false matches
@@ -434,7 +437,7 @@ CRITICAL RULES:
                         detectedSubtype = potentialSubtype
                         
                         # Detect operation using keywords from JSON
-                        if any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_CREATE_KEYWORDS):
+                        if keywordHits.has('create'):
                             return {
                                 'operation': 'create',
                                 'objectType': objectType,
@@ -470,20 +473,20 @@ CRITICAL RULES:
         
             # Detect operation - use word boundaries to avoid false matches (e.g., "NEW" triggering "new")
             # Use keywords from JSON (ismsInstructions.json)
-            if any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_UPDATE_KEYWORDS):
+            if keywordHits.has('update'):
                 return {'operation': 'update', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_DELETE_KEYWORDS):
+            elif keywordHits.has('delete'):
                 return {'operation': 'delete', 'objectType': objectType}
             # Then CREATE
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_CREATE_KEYWORDS) and not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('create') and not keywordHits.has('question'):
                 return {'operation': 'create', 'objectType': objectType}
             # Then LIST/GET
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_LIST_KEYWORDS) and not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('list') and not keywordHits.has('question'):
                 return {'operation': 'list', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_GET_KEYWORDS) and not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('get') and not keywordHits.has('question'):
                 return {'operation': 'get', 'objectType': objectType}
             # Then ANALYZE
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_ANALYZE_KEYWORDS):
+            elif keywordHits.has('analyze'):
                 return {'operation': 'analyze', 'objectType': objectType}
             
             return None
@@ -493,10 +496,12 @@ CRITICAL RULES:
     
     def _detectReportGeneration(self, message: str) -> Optional[Dict]:
         """Detect report generation requests"""
-        messageLower = message.lower().strip()
+        features = getMessageFeatures(message, self.state.get('_messageFeatures'))
+        messageLower = features.lower
+        keywordHits = features.keywordHits()
         
-        hasReportKeyword = any(keyword in messageLower for keyword in VERINICE_REPORT_KEYWORDS)
-        hasReportType = any(reportType in messageLower for reportType in VERINICE_REPORT_TYPES)
+        hasReportKeyword = keywordHits.has('report')
+        hasReportType = keywordHits.has('report_type')
         
         if hasReportKeyword and hasReportType:
             # Extract report type using mappings from JSON
@@ -640,41 +645,103 @@ CRITICAL RULES:
             'timeZone': 'UTC'
         }
         
-        result = self._ismsHandler.veriniceTool.generateReport(reportType, domainId, params)
+        veriniceTool = self._ismsHandler.veriniceTool
+        # Frequently requested (report, scope) pairs are pre-generated off-peak
+        from tools.reportScheduler import recordReportRequest
+        recordReportRequest(reportType, domainId, params)
+        
+        # A current copy (pre-generated or requested before) is answered at once;
+        # storedReport only trusts copies while veo events keep the store's revisions current
+        stored = veriniceTool.storedReport(reportType, domainId, params)
+        if stored:
+            return self._reportReadyResponse(pending, selectedScope, stored)
+        
+        # Big scopes take tens of seconds: run as a background job and return now;
+        # progress and the download link arrive as SSE events
+        from tools.reportJobs import getReportJobRunner
+        runner = getReportJobRunner()
+        if runner is not None:
+            return self._submitReportJob(runner, pending, selectedScope, params)
+        
+        result = veriniceTool.generateReport(reportType, domainId, params)
         
         if result.get('success'):
-            scopeName = selectedScope.get('name', 'Unknown')
-            reportId = result.get('reportId', reportType)
-            reportSize = result.get('size', 0)
-            reportFormat = result.get('format', 'pdf')
-            
-            # Build success message with report details
-            message = f"✅ Report '{pending['reportName']}' generated successfully for scope '{scopeName}'.\n\n"
-            message += "Report Details:\n"
-            message += f"• Report ID: {reportId}\n"
-            message += f"• Format: {reportFormat.upper()}\n"
-            message += f"• Size: {reportSize:,} bytes\n"
-            message += f"• Scope: {scopeName}\n"
-            
-            # Include report data in response if available (for verification)
-            response_data = {
-                'status': 'success',
-                'result': message,
-                'type': 'chat_response',
-                'report': {
-                    'id': reportId,
-                    'type': reportType,
-                    'format': reportFormat,
-                    'size': reportSize,
-                    'scope': scopeName,
-                    'data': result.get('data'),
-                    'generated_at': result.get('generated_at')
-                }
-            }
-            return response_data
+            return self._reportReadyResponse(pending, selectedScope, result)
         else:
             return self._error(get_error_message('operation_failed', 'generate_report', error=result.get('error', 'Unknown error')))
     
+    def _reportReadyResponse(self, pending: Dict, selectedScope: Dict, result: Dict) -> Dict:
+        """Chat response for a generated (or stored) report"""
+        reportType = pending['reportType']
+        scopeName = selectedScope.get('name', 'Unknown')
+        reportId = result.get('reportId', reportType)
+        reportSize = result.get('size', 0)
+        reportFormat = result.get('format', 'pdf')
+        
+        # Build success message with report details
+        message = f"✅ Report '{pending['reportName']}' generated successfully for scope '{scopeName}'.\n\n"
+        message += "Report Details:\n"
+        message += f"• Report ID: {reportId}\n"
+        message += f"• Format: {reportFormat.upper()}\n"
+        message += f"• Size: {reportSize:,} bytes\n"
+        message += f"• Scope: {scopeName}\n"
+        if result.get('url'):
+            message += f"• Download: {result['url']}\n"
+        
+        # Stored reports travel as a handle (streamed from /api/agent/reports/{handle});
+        # inline base64 'data' only when the report store is disabled
+        response_data = {
+            'status': 'success',
+            'result': message,
+            'type': 'chat_response',
+            'report': {
+                'id': reportId,
+                'type': reportType,
+                'format': reportFormat,
+                'size': reportSize,
+                'scope': scopeName,
+                'handle': result.get('handle'),
+                'url': result.get('url'),
+                'cached': result.get('cached', False),
+                'data': result.get('data'),
+                'generated_at': result.get('generated_at')
+            }
+        }
+        return response_data
+    
+    def _submitReportJob(self, runner, pending: Dict, selectedScope: Dict, params: Dict) -> Dict:
+        """Queue the report and answer with the job (status at /api/agent/report-jobs/{jobId})"""
+        scopeName = selectedScope.get('name', 'Unknown')
+        job = runner.submit(
+            self._ismsHandler.veriniceTool,
+            pending['reportType'],
+            pending['domainId'],
+            params,
+            sessionId=self.state.get('_currentSessionId'),
+            emit=self.state.get('_event_callback') or getattr(self, '_event_callback', None),
+            meta={'reportName': pending['reportName'], 'scope': scopeName}
+        )
+        statusUrl = f"/api/agent/report-jobs/{job.jobId}"
+        
+        message = f"⏳ Generating report '{pending['reportName']}' for scope '{scopeName}'.\n\n"
+        message += "You will be notified when it is ready.\n"
+        message += f"• Job ID: {job.jobId}\n"
+        message += f"• Status: {statusUrl}\n"
+        
+        return {
+            'status': 'success',
+            'result': message,
+            'type': 'chat_response',
+            'report': {
+                'id': pending['reportType'],
+                'type': pending['reportType'],
+                'scope': scopeName,
+                'jobId': job.jobId,
+                'jobStatus': job.status,
+                'statusUrl': statusUrl
+            }
+        }
+    
     def _handleSubtypeFollowUp(self, message: str) -> Optional[Dict]:
         """Handle follow-up response for subtype selection (e.g., user replies "2" or "PER_DataProtectionOfficer")"""
         pending = self.state.get('_pendingSubtypeSelection')
@@ -895,8 +962,8 @@ CRITICAL RULES:
             veriniceTool = getattr(self, '_veriniceTool', None)
             if not veriniceTool:
                 try:
-                    from tools.veriniceTool import VeriniceTool
-                    veriniceTool = VeriniceTool()
+                    from tools.veriniceTool import getSharedVeriniceTool
+                    veriniceTool = getSharedVeriniceTool()
                     self._veriniceTool = veriniceTool
                 except Exception as e:
                     return self._error(f"Failed to initialize ISMS client: {str(e)}")
@@ -1074,8 +1141,8 @@ CRITICAL RULES:
         veriniceTool = getattr(self, '_veriniceTool', None)
         if not veriniceTool:
             try:
-                from tools.veriniceTool import VeriniceTool
-                veriniceTool = VeriniceTool()
+                from tools.veriniceTool import getSharedVeriniceTool
+                veriniceTool = getSharedVeriniceTool()
                 self._veriniceTool = veriniceTool
             except Exception as e:
                 self._emit_thought('error', f"Failed to initialize ISMS client: {str(e)}")
@@ -1272,8 +1339,8 @@ CRITICAL RULES:
         veriniceTool = getattr(self, '_veriniceTool', None)
         if not veriniceTool:
             try:
-                from tools.veriniceTool import VeriniceTool
-                veriniceTool = VeriniceTool()
+                from tools.veriniceTool import getSharedVeriniceTool
+                veriniceTool = getSharedVeriniceTool()
                 self._veriniceTool = veriniceTool
             except Exception as e:
                 self._emit_thought('error', f"Failed to initialize ISMS client: {str(e)}")
@@ -1592,8 +1659,8 @@ CRITICAL RULES:
         # Pass pre-detected subtype if available (from router detection)
         preDetectedSubType = command.get('subType') if command.get('isSubtypeFirst') else None
         
-        # Debug logging for conversational list operations
-        if command.get('operation') == 'list':
+        # Debug logging for conversational list operations (count = "how many", answered without listing)
+        if command.get('operation') in ('list', 'count'):
             import logging
             logger = logging.getLogger(__name__)
             logger.info(f"[_handleVeriniceOp] Executing list operation for {command.get('objectType')} from message: {message[:80]}")
@@ -1704,8 +1771,8 @@ CRITICAL RULES:
         veriniceTool = getattr(self, '_veriniceTool', None)
         if not veriniceTool:
             try:
-                from tools.veriniceTool import VeriniceTool
-                veriniceTool = VeriniceTool()
+                from tools.veriniceTool import getSharedVeriniceTool
+                veriniceTool = getSharedVeriniceTool()
                 self._veriniceTool = veriniceTool
             except Exception as e:
                 return self._error(f"Failed to initialize ISMS client: {str(e)}")
@@ -1720,31 +1787,42 @@ CRITICAL RULES:
         # Link each person to the target scope
         from mcp.tools.linking import link_objects
         
-        results = []
+        linked = []
         errors = []
         
-        for i, person_info in enumerate(persons_to_link, 1):
-            person_name = person_info.get('name')
-            person_id = person_info.get('objectId')
-            
-            self._emit_thought('thought', f"Linking {object_type} '{person_name}' to '{target_name}' ({i}/{len(persons_to_link)})...")
-            
-            # Use linking tool
-            link_result = link_objects(
-                verinice_tool=veriniceTool,
-                state=self.state,
-                source_type='scope',
-                source_name=target_name,
-                target_type=object_type,
-                target_name=person_id or person_name,
-                domain_id=domainId
-            )
-            
-            if link_result.get('success'):
-                results.append(f"✅ Linked {object_type} '{person_name}' to '{target_name}'")
+        # All links target the same scope: queue them and write the scope once
+        with veriniceTool.writeBatch() as batch:
+            for i, person_info in enumerate(persons_to_link, 1):
+                person_name = person_info.get('name')
+                person_id = person_info.get('objectId')
+                
+                self._emit_thought('thought', f"Linking {object_type} '{person_name}' to '{target_name}' ({i}/{len(persons_to_link)})...")
+                
+                # Use linking tool
+                link_result = link_objects(
+                    verinice_tool=veriniceTool,
+                    state=self.state,
+                    source_type='scope',
+                    source_name=target_name,
+                    target_type=object_type,
+                    target_name=person_id or person_name,
+                    domain_id=domainId
+                )
+                
+                if link_result.get('success'):
+                    linked.append((person_name, link_result.get('objectId')))
+                else:
+                    error_msg = link_result.get('error', 'Unknown error')
+                    errors.append(f"❌ Failed to link {object_type} '{person_name}': {error_msg}")
+        self.state['_writeBatchStats'] = batch.stats()
+        
+        results = []
+        for person_name, scopeId in linked:
+            flushError = batch.failedFor(scopeId) if scopeId else None
+            if flushError:
+                errors.append(f"❌ Failed to link {object_type} '{person_name}': {flushError}")
             else:
-                error_msg = link_result.get('error', 'Unknown error')
-                errors.append(f"❌ Failed to link {object_type} '{person_name}': {error_msg}")
+                results.append(f"✅ Linked {object_type} '{person_name}' to '{target_name}'")
         
         # Build response
         if results and not errors:
@@ -1771,8 +1849,8 @@ CRITICAL RULES:
         veriniceTool = getattr(self, '_veriniceTool', None)
         if not veriniceTool:
             try:
-                from tools.veriniceTool import VeriniceTool
-                veriniceTool = VeriniceTool()
+                from tools.veriniceTool import getSharedVeriniceTool
+                veriniceTool = getSharedVeriniceTool()
                 self._veriniceTool = veriniceTool
             except Exception as e:
                 return self._error(f"Failed to initialize ISMS client: {str(e)}")
@@ -1786,51 +1864,60 @@ CRITICAL RULES:
         
         from mcp.tools.linking import link_objects
         
-        results = []
+        linked = []
         errors = []
         
-        for link in links:
-            source = link.get('source', '').strip()
-            target = link.get('target', '').strip()
-            
-            # Infer types and extract subtypes
-            source_type = 'scope'  # Default
-            if source.upper().startswith('SCOPE-'):
-                source_type = 'scope'
-            
-            target_type = 'asset'  # Default
-            subtype = None
-            
-            # Check if target is a subtype
-            if 'it-system' in target.lower():
-                subtype = 'IT-System'
-                target_name = None
-            elif 'datatype' in target.lower():
-                subtype = 'Datatype'
-                target_name = None
-            else:
-                target_name = target
-            
-            logger.info(f"[_handleMultiLink] Linking: {source_type} '{source}' -> {target_type} '{target_name}' (subtype: {subtype})")
-            
-            link_result = link_objects(
-                verinice_tool=veriniceTool,
-                state=self.state,
-                source_type=source_type,
-                source_name=source,
-                target_type=target_type,
-                target_name=target_name,
-                subtype=subtype,
-                domain_id=domainId
-            )
-            
-            if link_result.get('success'):
-                if subtype:
-                    results.append(f"✅ Linked {source} to {subtype} assets")
+        # Links to the same scope are merged into one GET + PUT per scope when the batch flushes
+        with veriniceTool.writeBatch() as batch:
+            for link in links:
+                source = link.get('source', '').strip()
+                target = link.get('target', '').strip()
+                
+                # Infer types and extract subtypes
+                source_type = 'scope'  # Default
+                if source.upper().startswith('SCOPE-'):
+                    source_type = 'scope'
+                
+                target_type = 'asset'  # Default
+                subtype = None
+                
+                # Check if target is a subtype
+                if 'it-system' in target.lower():
+                    subtype = 'IT-System'
+                    target_name = None
+                elif 'datatype' in target.lower():
+                    subtype = 'Datatype'
+                    target_name = None
                 else:
-                    results.append(f"✅ Linked {source} to {target_name}")
+                    target_name = target
+                
+                logger.info(f"[_handleMultiLink] Linking: {source_type} '{source}' -> {target_type} '{target_name}' (subtype: {subtype})")
+                
+                link_result = link_objects(
+                    verinice_tool=veriniceTool,
+                    state=self.state,
+                    source_type=source_type,
+                    source_name=source,
+                    target_type=target_type,
+                    target_name=target_name,
+                    subtype=subtype,
+                    domain_id=domainId
+                )
+                
+                if link_result.get('success'):
+                    label = f"{subtype} assets" if subtype else target_name
+                    linked.append((source, label, link_result.get('objectId')))
+                else:
+                    errors.append(f"❌ Failed to link {source}: {link_result.get('error', 'Unknown error')}")
+        self.state['_writeBatchStats'] = batch.stats()
+        
+        results = []
+        for source, label, scopeId in linked:
+            flushError = batch.failedFor(scopeId) if scopeId else None
+            if flushError:
+                errors.append(f"❌ Failed to link {source}: {flushError}")
             else:
-                errors.append(f"❌ Failed to link {source}: {link_result.get('error', 'Unknown error')}")
+                results.append(f"✅ Linked {source} to {label}")
         
         if results and not errors:
             return self._success("\n".join(results))
@@ -1860,8 +1947,8 @@ CRITICAL RULES:
         veriniceTool = getattr(self, '_veriniceTool', None)
         if not veriniceTool:
             try:
-                from tools.veriniceTool import VeriniceTool
-                veriniceTool = VeriniceTool()
+                from tools.veriniceTool import getSharedVeriniceTool
+                veriniceTool = getSharedVeriniceTool()
                 self._veriniceTool = veriniceTool
             except Exception as e:
                 return self._error(f"Failed to initialize ISMS client: {str(e)}")
@@ -2033,8 +2120,8 @@ CRITICAL RULES:
         veriniceTool = getattr(self, '_veriniceTool', None)
         if not veriniceTool:
             try:
-                from tools.veriniceTool import VeriniceTool
-                veriniceTool = VeriniceTool()
+                from tools.veriniceTool import getSharedVeriniceTool
+                veriniceTool = getSharedVeriniceTool()
                 self._veriniceTool = veriniceTool
             except Exception as e:
                 self._emit_thought('error', f"Failed to initialize ISMS client: {str(e)}")
@@ -2118,9 +2205,11 @@ CRITICAL RULES:
             else:
                 return self._error(f"Failed to delete any {object_type}s. Please check permissions and try again.")
         else:
-            # No items in context - list all objects of this type and delete them
+            # No items in context - list the objects of this type (narrowed to the
+            # subtype of a preceding count, if any) and delete them
             self._emit_thought('thought', f"Listing all {object_type}s to delete...")
-            list_result = veriniceTool.listObjects(object_type, domainId)
+            subType = last_list.get('subType') if last_list.get('objectType') == object_type else None
+            list_result = veriniceTool.listObjects(object_type, domainId, {'subType': subType} if subType else None)
             if not list_result.get('success'):
                 error_detail = self._ismsHandler._extract_error_details(list_result)
                 return self._error(f"Could not list {object_type}s: {error_detail}")
@@ -2612,7 +2701,8 @@ CRITICAL RULES:
             # Route using new router (pass state by reference)
             intentClassifier = getattr(self, '_intentClassifier', None)
             print(f"[DEBUG _shadowTestNewRouter] Routing message: {message[:80]}")
-            decision = self._chatRouter.route(message, self.state, context, intentClassifier)
+            decision = self._chatRouter.route(message, self.state, context, intentClassifier,
+                                              features=self.state.get('_messageFeatures'))
             print(f"[DEBUG _shadowTestNewRouter] Router returned: route={decision.get('route')}, handler={decision.get('handler')}")
             return decision
         except Exception as e:
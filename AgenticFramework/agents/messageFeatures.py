@@ -0,0 +1,196 @@
+"""
+Message Features - per-turn message analysis shared across the pipeline
+
+The router, MainAgent, the ISMS handler/coordinator, the fast path and the
+pattern matcher all used to lowercase the message, search it for UUIDs and
+quoted names and scan it for object-type keywords on their own. A
+MessageFeatures is built once per turn (MainAgent stores it in
+state['_messageFeatures']) and every stage reads from it instead.
+
+Every feature is computed lazily on first access and then cached, so
+building one is free and stages only pay for what they use.
+"""
+import re
+from functools import cached_property
+from typing import Dict, List, Optional
+
+from utils.keywordIndex import KeywordHits
+
+from .instructions import (
+    VERINICE_OBJECT_TYPES,
+    VERINICE_CREATE_KEYWORDS,
+    VERINICE_LIST_KEYWORDS,
+    VERINICE_GET_KEYWORDS,
+    VERINICE_UPDATE_KEYWORDS,
+    VERINICE_DELETE_KEYWORDS,
+    VERINICE_ANALYZE_KEYWORDS,
+    VERINICE_QUESTION_STARTERS,
+    VERINICE_TYPO_CORRECTOR,
+    AGENT_TYPO_CORRECTOR,
+    VERINICE_KEYWORD_INDEX,
+)
+
+UUID_PATTERN = re.compile(r'[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}', re.IGNORECASE)
+QUOTED_PATTERN = re.compile(r'["\']([^"\']+)["\']')
+TOKEN_PATTERN = re.compile(r'\w+(?:-\w+)*')
+
+
+def _singular(objType: str) -> str:
+    if objType == 'processes':
+        return 'process'
+    if objType.endswith('s') and objType != 'process':
+        return objType[:-1]
+    return objType
+
+
+# Token -> singular object type ('people' is how users say persons)
+_OBJECT_TYPE_TOKENS: Dict[str, str] = {objType: _singular(objType) for objType in VERINICE_OBJECT_TYPES}
+_OBJECT_TYPE_TOKENS['people'] = 'person'
+
+# Single-word operation verbs -> operation
+_OPERATION_TOKENS: Dict[str, str] = {}
+for _operation, _keywords in (
+    ('create', VERINICE_CREATE_KEYWORDS),
+    ('list', VERINICE_LIST_KEYWORDS),
+    ('get', VERINICE_GET_KEYWORDS),
+    ('update', VERINICE_UPDATE_KEYWORDS),
+    ('delete', VERINICE_DELETE_KEYWORDS),
+    ('analyze', VERINICE_ANALYZE_KEYWORDS),
+):
+    for _keyword in _keywords:
+        if ' ' not in _keyword:
+            _OPERATION_TOKENS.setdefault(_keyword, _operation)
+
+
+class MessageFeatures:
+    """Precomputed, read-only view of one user message"""
+
+    def __init__(self, message: str):
+        self.raw = message or ''
+        self._keywordHits: Dict[str, KeywordHits] = {}
+
+    def matches(self, message: str) -> bool:
+        """Whether these features describe this exact message"""
+        return message == self.raw
+
+    @cached_property
+    def text(self) -> str:
+        """Message with surrounding whitespace removed"""
+        return self.raw.strip()
+
+    @cached_property
+    def lower(self) -> str:
+        """Stripped, lowercased message"""
+        return self.text.lower()
+
+    @cached_property
+    def correctedLower(self) -> str:
+        """lower with VERINICE_TYPO_CORRECTIONS applied (ChatRouter)"""
+        return VERINICE_TYPO_CORRECTOR.correct(self.lower)
+
+    @cached_property
+    def agentCorrectedLower(self) -> str:
+        """lower with TYPO_VARIATIONS + VERINICE_TYPO_CORRECTIONS applied (MainAgent)"""
+        return AGENT_TYPO_CORRECTOR.correct(self.lower)
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Lowercased word tokens (hyphenated words kept together, e.g. 'it-system')"""
+        return TOKEN_PATTERN.findall(self.lower)
+
+    @cached_property
+    def tokenSet(self) -> frozenset:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def uuids(self) -> List[str]:
+        """UUIDs in order of appearance"""
+        return UUID_PATTERN.findall(self.raw)
+
+    @property
+    def firstUuid(self) -> Optional[str]:
+        return self.uuids[0] if self.uuids else None
+
+    @cached_property
+    def quoted(self) -> List[str]:
+        """Contents of quoted spans ('...' or "..."), stripped, original case"""
+        return [span.strip() for span in QUOTED_PATTERN.findall(self.raw) if span.strip()]
+
+    @cached_property
+    def numbers(self) -> List[int]:
+        """Standalone integers (digits inside UUIDs or names like SCOPE-2 are not counted)"""
+        return [int(token) for token in self.tokens if token.isdigit()]
+
+    @cached_property
+    def objectTypes(self) -> List[str]:
+        """Singular object types named as whole words, in order, without duplicates"""
+        found = []
+        for token in self.tokens:
+            objType = _OBJECT_TYPE_TOKENS.get(token)
+            if objType and objType not in found:
+                found.append(objType)
+        return found
+
+    @cached_property
+    def mentionsObjectType(self) -> bool:
+        """Any VERINICE_OBJECT_TYPES entry occurs as a substring (legacy check semantics)"""
+        return self.keywordHits().has('object_type')
+
+    def keywordHits(self, text: Optional[str] = None) -> KeywordHits:
+        """
+        VERINICE_KEYWORD_INDEX families found in text, one automaton scan per distinct text.
+
+        Args:
+            text: One of this message's views (lower, correctedLower, ...); defaults to lower
+        """
+        text = self.lower if text is None else text
+        hits = self._keywordHits.get(text)
+        if hits is None:
+            hits = VERINICE_KEYWORD_INDEX.scan(text)
+            self._keywordHits[text] = hits
+        return hits
+
+    @cached_property
+    def operations(self) -> List[str]:
+        """Operations (create/list/get/update/delete/analyze) whose verbs appear as words"""
+        found = []
+        for token in self.tokens:
+            operation = _OPERATION_TOKENS.get(token)
+            if operation and operation not in found:
+                found.append(operation)
+        return found
+
+    @cached_property
+    def isQuestion(self) -> bool:
+        return self.lower.endswith('?') or any(self.lower.startswith(s) for s in VERINICE_QUESTION_STARTERS)
+
+    def hasWord(self, word: str) -> bool:
+        """Whole-word check against the lowercased tokens"""
+        return word.lower() in self.tokenSet
+
+    def toDict(self) -> Dict:
+        """Plain dict of the features (for logging/debugging)"""
+        return {
+            'text': self.text,
+            'tokens': self.tokens,
+            'objectTypes': self.objectTypes,
+            'operations': self.operations,
+            'uuids': self.uuids,
+            'quoted': self.quoted,
+            'numbers': self.numbers,
+            'isQuestion': self.isQuestion,
+            'keywords': self.keywordHits().toDict(),
+        }
+
+
+def getMessageFeatures(message: str, features: Optional[MessageFeatures] = None) -> MessageFeatures:
+    """
+    Reuse the turn's features when they belong to this message, else build new ones.
+
+    Args:
+        message: Message the caller is about to analyse
+        features: Features passed down the pipeline (e.g. state.get('_messageFeatures'))
+    """
+    if isinstance(features, MessageFeatures) and features.matches(message):
+        return features
+    return MessageFeatures(message)
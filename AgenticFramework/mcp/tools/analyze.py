@@ -190,7 +190,17 @@ def _get_relationships(
     verinice_tool,
     domain_id: Optional[str]
 ) -> Dict:
-    """Get relationships for an object"""
+    """
+    Get relationships for an object.
+    
+    Answered from the domain's relationship graph (direct members/parts in
+    both directions, plus what is transitively affected via 'impacted_objects');
+    falls back to scanning the asset list when the graph is unavailable.
+    """
+    graph = verinice_tool.relationshipGraph(domain_id) if hasattr(verinice_tool, 'relationshipGraph') else None
+    if graph is not None:
+        return _graph_relationships(graph, object_id)
+    
     relationships = {
         'linked_objects': [],
         'linked_scopes': [],
@@ -219,6 +229,31 @@ def _get_relationships(
     return relationships
 
 
+def _graph_relationships(graph, object_id: str) -> Dict:
+    """Relationships from the graph: O(degree) neighbours and a BFS for impact"""
+    related = graph.related(object_id)
+    relationships = {
+        'linked_objects': [],
+        'linked_scopes': [],
+        'linked_assets': [],
+        'linked_controls': [],
+        'impacted_objects': graph.impactOf(object_id)
+    }
+    seen = set()
+    for direction in ('children', 'parents'):
+        for node in related[direction]:
+            if node['id'] in seen:
+                continue
+            seen.add(node['id'])
+            entry = {'name': node.get('name'), 'id': node['id'], 'subType': node.get('subType'),
+                     'type': node.get('type'), 'relation': 'contains' if direction == 'children' else 'part_of'}
+            relationships['linked_objects'].append(entry)
+            bucket = f"linked_{node.get('type')}s"
+            if bucket in relationships:
+                relationships[bucket].append(entry)
+    return relationships
+
+
 def _build_summary(object_data: Dict, object_type: str, relationships: Dict) -> Dict:
     """Build summary of object analysis"""
     return {
@@ -256,6 +291,7 @@ Object Details:
 Relationships:
 - Linked Assets: {len(relationships.get('linked_assets', []))}
 - Linked Controls: {len(relationships.get('linked_controls', []))}
+- Objects affected if it is compromised (containing it, directly or indirectly): {len(relationships.get('impacted_objects', []))}
 
 ANALYSIS REQUIREMENTS:
 1. Summarize what this object is and its purpose in the ISMS
@@ -317,6 +353,8 @@ def _format_structured_analysis(analysis_data: Dict) -> str:
     text += f"**Relationships:**\n"
     text += f"- Linked Assets: {len(relationships.get('linked_assets', []))}\n"
     text += f"- Linked Controls: {len(relationships.get('linked_controls', []))}\n"
+    if relationships.get('impacted_objects'):
+        text += f"- Affected if compromised: {len(relationships['impacted_objects'])}\n"
     
     if relationships.get('linked_assets'):
         text += "\n**Linked Assets:**\n"
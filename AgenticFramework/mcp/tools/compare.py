@@ -84,26 +84,20 @@ def compare_objects(
                 'data': {}
             }
         
-        # Step 2: Get both objects
-        obj1_result = verinice_tool.getObject(obj1_type, domain_id, obj1_id)
-        obj2_result = verinice_tool.getObject(obj2_type, domain_id, obj2_id)
+        # Step 2: Get both objects (one concurrent round trip)
+        fetched = verinice_tool.getObjects(obj1_type, [obj1_id, obj2_id], domain_id)
+        errors = fetched.get('errors', {})
         
-        if not obj1_result.get('success'):
-            return {
-                'success': False,
-                'text': get_error_message('mcp', 'retrieve_object_failed', objectType=obj1_type, objectName=object1_name, error=obj1_result.get('error', 'Unknown error')),
-                'data': {}
-            }
-        
-        if not obj2_result.get('success'):
-            return {
-                'success': False,
-                'text': get_error_message('mcp', 'retrieve_object_failed', objectType=obj2_type, objectName=object2_name, error=obj2_result.get('error', 'Unknown error')),
-                'data': {}
-            }
+        for obj_id, obj_name in ((obj1_id, object1_name), (obj2_id, object2_name)):
+            if obj_id in errors or 'error' in fetched:
+                return {
+                    'success': False,
+                    'text': get_error_message('mcp', 'retrieve_object_failed', objectType=obj1_type, objectName=obj_name, error=errors.get(obj_id, fetched.get('error', 'Unknown error'))),
+                    'data': {}
+                }
         
-        obj1_data = obj1_result.get('data') or obj1_result.get('object', {})
-        obj2_data = obj2_result.get('data') or obj2_result.get('object', {})
+        obj1_data = fetched['objects'].get(obj1_id, {})
+        obj2_data = fetched['objects'].get(obj2_id, {})
         
         # Step 3: Use VeriniceTool's compareObjects if available
         compare_result = verinice_tool.compareObjects(obj1_type, obj1_id, obj2_id, domain_id)
@@ -9,6 +9,7 @@ from typing import Dict, Optional
 import logging
 import re
 from agents.instructions import get_error_message
+from tools.writeBatch import memberRefId
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,16 @@ def _resolve_object_id(verinice_tool, domain_id: str, object_type: str, name_or_
         # If get fails, it might not exist yet (newly created), return None to trigger retry
         return None
     
-    # Search by name (exact match first)
+    name_lower = name_or_id.lower().strip()
+    
+    # Exact names are the common case: let the API narrow the list by name first
+    narrowed = verinice_tool.listObjects(object_type, domain_id, {'name': name_or_id.strip()})
+    if narrowed.get('success'):
+        for obj in narrowed.get('objects', {}).get('items', []):
+            if isinstance(obj, dict) and (obj.get('name') or '').strip().lower() == name_lower:
+                return obj.get('id') or obj.get('resourceId')
+    
+    # No exact hit: the full list serves the fuzzy fallback
     list_result = verinice_tool.listObjects(object_type, domain_id)
     if not list_result.get('success'):
         # Try unit-level search for scopes
@@ -47,7 +57,8 @@ def _resolve_object_id(verinice_tool, domain_id: str, object_type: str, name_or_
                                     if scope_name.lower() == name_or_id.lower():
                                         return scope.get('id') or scope.get('resourceId')
         # If list failed and we haven't retried, try once more after a brief delay
-        if retry_count < 2:  # Retry up to 2 times
+        # (unless the backend's circuit breaker is open - retries would fail fast)
+        if retry_count < 2 and verinice_tool.isBackendAvailable():  # Retry up to 2 times
             import time
             time.sleep(1.0)  # Increased delay for newly created objects to appear
             return _resolve_object_id(verinice_tool, domain_id, object_type, name_or_id, retry_count=retry_count+1)
@@ -62,8 +73,6 @@ def _resolve_object_id(verinice_tool, domain_id: str, object_type: str, name_or_
             return _resolve_object_id(verinice_tool, domain_id, object_type, name_or_id, retry_count=retry_count+1)
         return None
     
-    name_lower = name_or_id.lower().strip()
-    
     # First try exact match
     for obj in objects:
         if isinstance(obj, dict):
@@ -432,29 +441,12 @@ def unlink_objects(
         if not isinstance(source_obj, dict):
             return {'success': False, 'error': get_error_message('validation', 'invalid_source_object_data')}
         
-        if source_type == 'scope':
-            members = source_obj.get('members', [])
-        elif source_type == 'scenario':
-            members = source_obj.get('parts', [])
-        else:
-            members = source_obj.get('parts', [])
-        if not isinstance(members, list):
-            members = []
+        members_key = 'members' if source_type == 'scope' else 'parts'
         
-        # Filter out the target
-        filtered_members = [
-            m for m in members
-            if isinstance(m, dict) and m.get('id') != target_id
-            and not (m.get('targetUri', '').endswith(f'/{target_id}'))
-        ]
-        
-        if source_type == 'scope':
-            update_data = {'members': filtered_members}
-        elif source_type == 'scenario':
-            update_data = {'parts': filtered_members}
-        else:
-            update_data = {'parts': filtered_members}
-        update_result = verinice_tool.updateObject(source_type or 'scope', domain_id, source_id, update_data)
+        # Remove the target as a delta, so a concurrent change to the member list is not overwritten
+        update_result = verinice_tool.stageUpdate(
+            source_type or 'scope', domain_id, source_id, membersKey=members_key, removeMembers=[target_id]
+        )
         
         if update_result.get('success'):
             return {
@@ -478,14 +470,6 @@ def _link_single_object(
     target_id: str
 ) -> Dict:
     """Link a single object to a source (typically scope)"""
-    get_result = verinice_tool.getObject(source_type, domain_id, source_id)
-    if not get_result.get('success'):
-        return {'success': False, 'error': get_error_message('operation_failed', 'get_source_object', error=get_result.get('error'))}
-    
-    source_obj = get_result.get('data', {})
-    if not isinstance(source_obj, dict):
-        return {'success': False, 'error': get_error_message('validation', 'invalid_source_object_data')}
-    
     # Prepare members/parts array
     # CRITICAL: Scenarios use 'parts' not 'members', and some relationships are reversed
     # For asset → scenario: add scenario to asset's parts
@@ -497,14 +481,27 @@ def _link_single_object(
     else:
         members_key = 'parts'  # Other types use 'parts'
     
-    members = source_obj.get(members_key, [])
-    if not isinstance(members, list):
-        members = []
-    
-    already_linked = any(
-        isinstance(m, dict) and (m.get('id') == target_id or m.get('targetUri', '').endswith(f'/{target_id}'))
-        for m in members
-    )
+    # The graph can only spare the GET when it has no such edge: a stale miss is
+    # harmless (adds are merged into the freshly read object on write), but a
+    # stale edge would skip a link that is needed, so that case is confirmed
+    graph = verinice_tool.relationshipGraph(domain_id)
+    in_graph = graph is not None and graph.describe(source_id) is not None
+    if in_graph and not graph.hasEdge(members_key, source_id, target_id):
+        linked = False
+    else:
+        get_result = verinice_tool.getObject(source_type, domain_id, source_id)
+        if not get_result.get('success'):
+            return {'success': False, 'error': get_error_message('operation_failed', 'get_source_object', error=get_result.get('error'))}
+        
+        source_obj = get_result.get('data', {})
+        if not isinstance(source_obj, dict):
+            return {'success': False, 'error': get_error_message('validation', 'invalid_source_object_data')}
+        
+        members = source_obj.get(members_key, [])
+        if not isinstance(members, list):
+            members = []
+        linked = any(memberRefId(m) == target_id for m in members)
+    already_linked = linked or target_id in verinice_tool.pendingMemberIds(domain_id, source_id, members_key)
     
     if already_linked:
         source_name = _get_object_name(verinice_tool, domain_id, source_type, source_id)
@@ -518,17 +515,15 @@ def _link_single_object(
     API_URL = Settings.VERINICE_API_URL
     plural = verinice_tool.OBJECT_TYPES.get(target_type.lower(), f"{target_type}s")
     
-    members.append({
-        'targetUri': f'{API_URL}/{plural}/{target_id}',
-        'id': target_id
-    })
-    
-    update_data = {members_key: members}
-    update_result = verinice_tool.updateObject(source_type, domain_id, source_id, update_data)
+    # Staged as a delta: inside a write batch it is merged with other links to the same source
+    update_result = verinice_tool.stageUpdate(
+        source_type, domain_id, source_id, membersKey=members_key,
+        addMembers=[{'targetUri': f'{API_URL}/{plural}/{target_id}', 'id': target_id}]
+    )
     
     if update_result.get('success'):
         # Message is already set in link_objects function with context-aware language
-        return {'success': True}
+        return {'success': True, 'objectId': source_id, 'queued': update_result.get('queued', False)}
     else:
         error_msg = update_result.get('error', 'Unknown error')
         return {'success': False, 'error': get_error_message('operation_failed', 'link_objects', error=error_msg)}
@@ -546,7 +541,9 @@ def _link_bulk_objects(
     logger.info(f"[_link_bulk_objects] Linking {target_type}s to {source_type} '{source_id}' in domain '{domain_id}'" + (f" with subtype '{subtype}'" if subtype else ""))
     
     # List target objects - CRITICAL: Use the same domain_id that was used for creation
-    list_result = verinice_tool.listObjects(target_type, domain_id)
+    # The subtype goes to the API as a query parameter when it resolves to a domain subtype key
+    server_subtype = verinice_tool.resolveSubType(target_type, domain_id, subtype) if subtype else None
+    list_result = verinice_tool.listObjects(target_type, domain_id, {'subType': server_subtype} if server_subtype else None)
     if not list_result.get('success'):
         error_detail = list_result.get('error', 'Unknown error')
         logger.error(f"[_link_bulk_objects] Failed to list {target_type}s in domain '{domain_id}': {error_detail}")
@@ -566,6 +563,7 @@ def _link_bulk_objects(
                 unit_objects = unit_result.get('objects', {}).get('items', [])
                 if isinstance(unit_objects, list):
                     objects = unit_objects
+                    server_subtype = None  # Unit lists are unfiltered
                     logger.info(f"[_link_bulk_objects] Found {len(objects)} {target_type}(s) in unit '{unit_id}'")
 
     if not isinstance(objects, list):
@@ -579,8 +577,8 @@ def _link_bulk_objects(
         if isinstance(obj, dict):
             logger.info(f"[_link_bulk_objects] Object {i}: name='{obj.get('name')}', subType='{obj.get('subType')}'")
 
-    # Filter by subtype if specified
-    if subtype:
+    # Filter by subtype if specified (and not already filtered by the API)
+    if subtype and not server_subtype:
         filtered = []
         subtype_normalized = subtype.lower().replace('-', '').replace('_', '').replace(' ', '')
         logger.error(f"[_link_bulk_objects] DEBUG: Filtering by subtype '{subtype}' (normalized: '{subtype_normalized}')")
@@ -644,61 +642,75 @@ def _link_bulk_objects(
     if len(objects) > 5:
         found_names.append(f"... and {len(objects) - 5} more")
     
-    get_result = verinice_tool.getObject(source_type, domain_id, source_id)
-    if not get_result.get('success'):
-        return {'success': False, 'error': get_error_message('operation_failed', 'get_source_object', error=get_result.get('error'))}
-    
-    source_obj = get_result.get('data', {})
-    if not isinstance(source_obj, dict):
-        return {'success': False, 'error': get_error_message('validation', 'invalid_source_object_data')}
-    
-    # Prepare members array
     members_key = 'members' if source_type == 'scope' else 'parts'
-    members = source_obj.get(members_key, [])
-    if not isinstance(members, list):
-        members = []
+    
+    # The source is only fetched when the domain graph links it to one of the
+    # targets: targets the graph does not link are added without a GET (a stale
+    # miss is merged away on write), while a graph edge may be stale and would
+    # wrongly skip a target, so the source's current members decide then
+    graph = verinice_tool.relationshipGraph(domain_id)
+    source_node = graph.describe(source_id) if graph is not None else None
+    target_ids = {obj.get('id') or obj.get('resourceId') for obj in objects if isinstance(obj, dict)}
+    if source_node is not None and not target_ids & set(graph.children(source_id, members_key)):
+        source_obj = {'name': source_node.get('name')}
+        linked_ids = set()
+    else:
+        get_result = verinice_tool.getObject(source_type, domain_id, source_id)
+        if not get_result.get('success'):
+            return {'success': False, 'error': get_error_message('operation_failed', 'get_source_object', error=get_result.get('error'))}
+        
+        source_obj = get_result.get('data', {})
+        if not isinstance(source_obj, dict):
+            return {'success': False, 'error': get_error_message('validation', 'invalid_source_object_data')}
+        
+        members = source_obj.get(members_key, [])
+        if not isinstance(members, list):
+            members = []
+        linked_ids = {memberRefId(m) for m in members if isinstance(m, dict)}
     
     from config.settings import Settings
     API_URL = Settings.VERINICE_API_URL
     plural = verinice_tool.OBJECT_TYPES.get(target_type.lower(), f"{target_type}s")
     
-    linked_count = 0
+    # Plus links queued earlier in this turn's write batch
+    linked_ids |= verinice_tool.pendingMemberIds(domain_id, source_id, members_key)
+    
+    new_members = []
     linked_names = []
     for obj in objects:
         if isinstance(obj, dict):
             obj_id = obj.get('id') or obj.get('resourceId')
             obj_name = obj.get('name', 'N/A')
-            if obj_id:
-                already_linked = any(
-                    isinstance(m, dict) and (m.get('id') == obj_id or m.get('targetUri', '').endswith(f'/{obj_id}'))
-                    for m in members
-                )
-                if not already_linked:
-                    members.append({
-                        'targetUri': f'{API_URL}/{plural}/{obj_id}',
-                        'id': obj_id
-                    })
-                    linked_count += 1
-                    linked_names.append(obj_name)
+            if obj_id and obj_id not in linked_ids:
+                linked_ids.add(obj_id)
+                new_members.append({
+                    'targetUri': f'{API_URL}/{plural}/{obj_id}',
+                    'id': obj_id
+                })
+                linked_names.append(obj_name)
+    linked_count = len(new_members)
+    
+    # The source object was just fetched; no need to GET it again for its name
+    source_name = source_obj.get('name') or _get_object_name(verinice_tool, domain_id, source_type, source_id)
     
     if linked_count == 0:
         subtype_msg = f" {subtype}" if subtype else ""
-        source_name = _get_object_name(verinice_tool, domain_id, source_type, source_id)
         return {
             'success': True, 
             'message': f"✅ All{subtype_msg} {target_type}s are already part of {source_name}. No changes needed."
         }
     
-    update_data = {members_key: members}
-    update_result = verinice_tool.updateObject(source_type, domain_id, source_id, update_data)
+    update_result = verinice_tool.stageUpdate(
+        source_type, domain_id, source_id, membersKey=members_key, addMembers=new_members
+    )
     
     if update_result.get('success'):
-        source_name = _get_object_name(verinice_tool, domain_id, source_type, source_id)
-        subtype_msg = f" {subtype}" if subtype else ""
+        batched = {'objectId': source_id, 'queued': update_result.get('queued', False)}
         if linked_count == 1:
             return {
                 'success': True,
-                'message': f"✅ Added {linked_names[0]} to {source_name}. The {target_type} is now part of this scope."
+                'message': f"✅ Added {linked_names[0]} to {source_name}. The {target_type} is now part of this scope.",
+                **batched
             }
         else:
             # Show which assets were found and linked
@@ -708,7 +720,8 @@ def _link_bulk_objects(
             subtype_info = f" ({subtype} subtype)" if subtype else ""
             return {
                 'success': True,
-                'message': f"✅ Linked {linked_count} {target_type}(s){subtype_info} to {source_name}:\n  • {names_list}"
+                'message': f"✅ Linked {linked_count} {target_type}(s){subtype_info} to {source_name}:\n  • {names_list}",
+                **batched
             }
     else:
         error_msg = update_result.get('error', 'Unknown error')
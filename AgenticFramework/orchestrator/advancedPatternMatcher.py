@@ -12,6 +12,10 @@ import re
 from typing import Dict, Optional, List, Tuple
 import logging
 
+from agents.instructions import ADVANCED_PATTERN_KEYWORDS, VERINICE_KEYWORD_INDEX
+from agents.messageFeatures import getMessageFeatures
+from utils.keywordIndex import KeywordHits
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,56 +25,27 @@ class AdvancedPatternMatcher:
     def __init__(self):
         self.patterns = self._load_patterns()
     
+    def _scan(self, message_lower: str, hits: Optional[KeywordHits] = None) -> KeywordHits:
+        """Hits for the detectors when called without the turn's (shared index) hits"""
+        return hits if hits is not None else VERINICE_KEYWORD_INDEX.scan(message_lower)
+    
     def _load_patterns(self) -> Dict:
-        """Load pattern definitions"""
-        return {
-            # ISMS reconciliation patterns
-            'isms_reconciliation': {
-                'keywords': ['compare', 'reconcile', 'reconciliation', 'difference', 'drift', 'gap', 'discrepancy'],
-                'object_patterns': [
-                    r"['\"]([A-Za-z0-9_\s-]+)['\"]",  # Quoted object names
-                    r'\b([A-Z][A-Za-z0-9_\s-]+)\b',  # Capitalized names (SCOPE1, Production)
-                ],
-                'domain_keywords': ['domain', 'scope', 'environment', 'production', 'staging', 'dr'],
-                'comparison_phrases': ['vs', 'versus', 'against', 'and', 'with'],
-            },
-            
-            # Safety-critical operations
-            'safety_operations': {
-                'dangerous_keywords': [
-                    'delete all', 'remove all', 'clean up', 'wipe', 'drop', 'truncate', 'destroy',
-                    'erase all', 'clear all', 'purge', 'format', 'reset all', 'nuke', 'kill all'
-                ],
-                'protected_paths': [
-                    'root', '/', '../', '..\\', 'config', 'secrets', 'password', 'credential',
-                    '.env', '.git', 'node_modules', 'vendor', '__pycache__', '.venv',
-                    'system', 'etc', 'usr', 'var', 'home', 'windows', 'system32'
-                ],
-                'bulk_operations': [
-                    'all files', 'all data', 'everything', 'entire', 'whole',
-                    'entire directory', 'whole folder', 'all directories', 'all folders'
-                ],
-                'confirmation_triggers': ['just do it', 'proceed', 'go ahead', 'execute', 'run it', 'do it now'],
-            },
-            
-            # Multi-step operations
-            'multi_step': {
-                'connectors': ['then', 'and', 'after', 'next', 'also', 'while', 'during'],
-                'sequence_markers': ['first', 'second', 'step 1', 'step 2', 'phase', 'stage'],
-            },
-            
-            # Constraint extraction
-            'constraints': {
-                'preservation': ['preserve', 'maintain', 'keep', 'don\'t change', 'do not modify'],
-                'requirements': ['must', 'should', 'required', 'critical', 'important', 'ensure'],
-                'prohibitions': ['do not', 'don\'t', 'avoid', 'never', 'skip', 'ignore'],
-            },
-        }
+        """Load pattern definitions (keyword lists are shared with VERINICE_KEYWORD_INDEX)"""
+        patterns = {group: dict(entries) for group, entries in ADVANCED_PATTERN_KEYWORDS.items()}
+        patterns['isms_reconciliation']['object_patterns'] = [
+            r"['\"]([A-Za-z0-9_\s-]+)['\"]",  # Quoted object names
+            r'\b([A-Z][A-Za-z0-9_\s-]+)\b',  # Capitalized names (SCOPE1, Production)
+        ]
+        return patterns
     
-    def detect_intent(self, message: str) -> Dict:
+    def detect_intent(self, message: str, features=None) -> Dict:
         """
         Detect intent from message using advanced pattern matching.
         
+        Args:
+            message: User's message
+            features: Precomputed MessageFeatures for this message (optional)
+        
         Returns:
             Dict with:
             - intent: str (isms_reconciliation, safety_check, multi_step, etc.)
@@ -78,23 +53,26 @@ class AdvancedPatternMatcher:
             - entities: Dict (extracted parameters)
             - requires_llm: bool (whether LLM is needed for full understanding)
         """
-        message_lower = message.lower().strip()
+        features = getMessageFeatures(message, features)
+        message_lower = features.lower
         original_message = message
+        # The turn's single keyword scan (shared with routing); the detectors only read the hits
+        hits = features.keywordHits()
         
         # IMPORTANT: Check safety FIRST (highest priority)
-        safety_intent = self._detect_safety_operation(original_message, message_lower)
+        safety_intent = self._detect_safety_operation(original_message, message_lower, hits)
         if safety_intent:
             return safety_intent
         
         # (ISMS reconciliation uses "and" but is not multi-step)
-        isms_intent = self._detect_isms_reconciliation(original_message, message_lower)
+        isms_intent = self._detect_isms_reconciliation(original_message, message_lower, hits)
         if isms_intent and isms_intent.get('confidence', 0) >= 0.6:
             return isms_intent
         
-        has_multi_step_indicators = self._has_multi_step_indicators(message_lower)
+        has_multi_step_indicators = self._has_multi_step_indicators(message_lower, hits)
         
         if has_multi_step_indicators:
-            multi_intent = self._detect_multi_step(original_message, message_lower)
+            multi_intent = self._detect_multi_step(original_message, message_lower, hits)
             if multi_intent:
                 step_count = multi_intent.get('entities', {}).get('step_count', 0)
                 if step_count >= 2:
@@ -107,7 +85,7 @@ class AdvancedPatternMatcher:
         
         # Final check: multi-step with lower threshold
         if has_multi_step_indicators:
-            multi_intent = self._detect_multi_step(original_message, message_lower)
+            multi_intent = self._detect_multi_step(original_message, message_lower, hits)
             if multi_intent:
                 return multi_intent
         
@@ -120,11 +98,11 @@ class AdvancedPatternMatcher:
             'reasoning': 'No matching patterns found'
         }
     
-    def _detect_isms_reconciliation(self, original: str, message_lower: str) -> Optional[Dict]:
+    def _detect_isms_reconciliation(self, original: str, message_lower: str, hits: Optional[KeywordHits] = None) -> Optional[Dict]:
         """Detect ISMS reconciliation/comparison requests"""
-        patterns = self.patterns['isms_reconciliation']
+        hits = self._scan(message_lower, hits)
         
-        has_keyword = any(keyword in message_lower for keyword in patterns['keywords'])
+        has_keyword = hits.has('isms_reconciliation.keywords')
         # Also check for "find gaps" which is a common reconciliation pattern
         has_gap_keyword = 'gap' in message_lower and ('find' in message_lower or 'between' in message_lower)
         
@@ -134,7 +112,7 @@ class AdvancedPatternMatcher:
         # Extract object names
         objects = self._extract_object_names(original, message_lower)
         
-        domains = self._extract_domains(message_lower)
+        domains = self._extract_domains(message_lower, hits)
         
         # If "reconcile" keyword is present, it's definitely reconciliation
         if 'reconcile' in message_lower:
@@ -166,13 +144,13 @@ class AdvancedPatternMatcher:
             'reasoning': f'Detected ISMS reconciliation: {len(objects)} objects, {len(domains)} domains'
         }
     
-    def _detect_safety_operation(self, original: str, message_lower: str) -> Optional[Dict]:
+    def _detect_safety_operation(self, original: str, message_lower: str, hits: Optional[KeywordHits] = None) -> Optional[Dict]:
         """Detect safety-critical operations"""
-        patterns = self.patterns['safety_operations']
+        hits = self._scan(message_lower, hits)
         
-        has_dangerous = any(keyword in message_lower for keyword in patterns['dangerous_keywords'])
-        has_bulk = any(keyword in message_lower for keyword in patterns['bulk_operations'])
-        has_protected = any(path in message_lower for path in patterns['protected_paths'])
+        has_dangerous = hits.has('safety_operations.dangerous_keywords')
+        has_bulk = hits.has('safety_operations.bulk_operations')
+        has_protected = hits.has('safety_operations.protected_paths')
         
         if not (has_dangerous or (has_bulk and has_protected)):
             return None
@@ -194,30 +172,28 @@ class AdvancedPatternMatcher:
             'action': 'block' if has_protected else 'confirm'
         }
     
-    def _has_multi_step_indicators(self, message_lower: str) -> bool:
+    def _has_multi_step_indicators(self, message_lower: str, hits: Optional[KeywordHits] = None) -> bool:
         """Quick check if message has multi-step indicators"""
-        patterns = self.patterns['multi_step']
-        has_connector = any(connector in message_lower for connector in patterns['connectors'])
-        has_sequence = any(marker in message_lower for marker in patterns['sequence_markers'])
+        hits = self._scan(message_lower, hits)
+        has_connector = hits.has('multi_step.connectors')
+        has_sequence = hits.has('multi_step.sequence_markers')
         
         # Exclude ISMS reconciliation patterns (they use "and" but aren't multi-step)
-        isms_keywords = ['reconcile', 'compare', 'reconciliation', 'gap', 'difference', 'drift']
-        if any(keyword in message_lower for keyword in isms_keywords):
+        if hits.has('multi_step.isms_exclusions'):
             # If it's an ISMS operation, don't treat "and" as multi-step connector
             return has_sequence  # Only sequence markers, not "and"
         
         return has_connector or has_sequence
     
-    def _detect_multi_step(self, original: str, message_lower: str) -> Optional[Dict]:
+    def _detect_multi_step(self, original: str, message_lower: str, hits: Optional[KeywordHits] = None) -> Optional[Dict]:
         """Detect multi-step operations"""
-        patterns = self.patterns['multi_step']
+        hits = self._scan(message_lower, hits)
         
         # Exclude single UPDATE operations with multiple fields
         # Pattern: "update X. Change Y and set Z" should be treated as single UPDATE, not multi-step
         if message_lower.startswith('update '):
-            update_field_keywords = ['change', 'set', 'update', 'description', 'confidentiality', 'status', 'availability', 'integrity']
             # If the message contains "update" followed by field keywords, it's likely a single UPDATE
-            if any(keyword in message_lower for keyword in update_field_keywords):
+            if hits.has('multi_step.update_field_keywords'):
                 # Only exclude if it's clearly a field update pattern, not "update X then update Y"
                 if ' then ' not in message_lower and '. then ' not in message_lower:
                     # This is a single UPDATE operation with multiple fields
@@ -227,9 +203,8 @@ class AdvancedPatternMatcher:
         # Pattern: "Create a Controller named 'X' and mark its status as 'Y'" should be treated as single CREATE, not multi-step
         if message_lower.startswith('create '):
             # Check if it's a single CREATE with field modifications (status, note, description, etc.)
-            create_field_keywords = ['mark', 'set', 'add', 'note', 'status', 'description', 'confidentiality', 'saying']
             # If the message contains "create" followed by field keywords, it's likely a single CREATE
-            if any(keyword in message_lower for keyword in create_field_keywords):
+            if hits.has('multi_step.create_field_keywords'):
                 # Only exclude if it's clearly a field modification pattern, not "create X then create Y"
                 if ' then ' not in message_lower and '. then ' not in message_lower:
                     # Also handle "Add a note" pattern and "Add a note saying..."
@@ -239,8 +214,8 @@ class AdvancedPatternMatcher:
                         # This is a single CREATE operation with multiple fields
                         return None
         
-        has_connector = any(connector in message_lower for connector in patterns['connectors'])
-        has_sequence = any(marker in message_lower for marker in patterns['sequence_markers'])
+        has_connector = hits.has('multi_step.connectors')
+        has_sequence = hits.has('multi_step.sequence_markers')
         
         if not (has_connector or has_sequence):
             return None
@@ -317,8 +292,7 @@ class AdvancedPatternMatcher:
             
             # Try splitting on "and" if it's not an ISMS operation
             if 'and' in message_lower and len(steps) < 2:
-                isms_keywords = ['reconcile', 'compare', 'reconciliation', 'gap', 'difference', 'drift']
-                if not any(keyword in message_lower for keyword in isms_keywords):
+                if not hits.has('multi_step.isms_exclusions'):
                     # Split on "and" but only if both parts are substantial
                     parts = re.split(r'\s+and\s+', message_lower, 1)
                     if len(parts) == 2:
@@ -453,16 +427,12 @@ class AdvancedPatternMatcher:
         
         return list(set(objects))  # Remove duplicates
     
-    def _extract_domains(self, message_lower: str) -> List[str]:
+    def _extract_domains(self, message_lower: str, hits: Optional[KeywordHits] = None) -> List[str]:
         """Extract domain/environment names"""
-        domains = []
-        domain_keywords = ['production', 'staging', 'development', 'dr', 'disaster recovery', 'test']
-        
-        for keyword in domain_keywords:
-            if keyword in message_lower:
-                domains.append(keyword)
-        
-        return domains
+        hits = self._scan(message_lower, hits)
+        environments = hits.keywords('isms_reconciliation.environment_keywords')
+        # Keep the declaration order of the keyword list
+        return [keyword for keyword in self.patterns['isms_reconciliation']['environment_keywords'] if keyword in environments]
     
     def _extract_comparison_type(self, message_lower: str) -> str:
         """Extract type of comparison"""
@@ -29,25 +29,20 @@ from typing import Dict, Optional, Any, List
 import re
 import logging
 from agents.instructions import (
-    VERINICE_CREATE_KEYWORDS,
-    VERINICE_LIST_KEYWORDS,
-    VERINICE_GET_KEYWORDS,
     VERINICE_SUBTYPE_MAPPINGS,
-    VERINICE_UPDATE_KEYWORDS,
-    VERINICE_DELETE_KEYWORDS,
-    VERINICE_ANALYZE_KEYWORDS,
     VERINICE_QUESTION_STARTERS,
     VERINICE_QUESTION_WORDS,
     VERINICE_CONVERSATIONAL_LIST,
     VERINICE_SUBTYPE_QUERIES,
-    VERINICE_REPORT_KEYWORDS,
-    VERINICE_REPORT_TYPES,
-    VERINICE_REPORT_TYPE_MAPPINGS,
-    VERINICE_TYPO_CORRECTIONS
+    VERINICE_REPORT_TYPE_MAPPINGS
 )
+from agents.messageFeatures import MessageFeatures, getMessageFeatures
 
 logger = logging.getLogger(__name__)
 
+# "how many ..." / "count ..." questions are answered with a count, not a listing
+_COUNT_QUERY = re.compile(r'^(?:\w+\s+){0,2}?(?:how\s+many|count)\b')
+
 
 class ChatRouter:
     """Routes chat messages to appropriate handlers based on intent and context"""
@@ -73,7 +68,16 @@ class ChatRouter:
         """
         self.veriniceObjectTypes = veriniceObjectTypes
     
-    def route(self, message: str, state: Dict, context: Dict, intentClassifier=None) -> Dict:
+    @staticmethod
+    def _featuresFor(message: str, features: Optional[MessageFeatures] = None) -> MessageFeatures:
+        """
+        Features of the message being routed. The router is shared across
+        sessions, so a turn's features travel as an argument, never on self.
+        """
+        return getMessageFeatures(message, features)
+    
+    def route(self, message: str, state: Dict, context: Dict, intentClassifier=None,
+              features: Optional[MessageFeatures] = None) -> Dict:
         """
         Route a chat message to the appropriate handler
         
@@ -82,6 +86,7 @@ class ChatRouter:
             state: Agent state (passed by REFERENCE - mutations are preserved)
             context: Session context with document/file information
             intentClassifier: Optional IntentClassifier instance for LLM-based routing
+            features: MessageFeatures for this turn (defaults to state['_messageFeatures'])
         
         Returns:
             Dict with routing decision:
@@ -94,21 +99,22 @@ class ChatRouter:
         """
         # Validate state (prevent Bug #3 regression)
         self._validateState(state)
+        features = getMessageFeatures(message, features or state.get('_messageFeatures'))
         
         # 0. PRIORITY: Check for follow-up responses FIRST
-        followUp = self._checkFollowUp(message, state)
+        followUp = self._checkFollowUp(message, state, features)
         if followUp:
             return followUp
         
         # 1. Quick greeting check
-        greeting = self._checkGreeting(message, state)
+        greeting = self._checkGreeting(message, state, features)
         if greeting:
             return greeting
         
         # 1.4.5. Check for subtype queries FIRST (BEFORE conversational list to avoid misrouting)
         # CRITICAL: Subtype queries like "show me all subtypes of Scopes" must be detected before
         # conversational list queries like "show all scopes" to avoid confusion
-        subtypeQuery = self._detectSubtypeQuery(message)
+        subtypeQuery = self._detectSubtypeQuery(message, features)
         if subtypeQuery:
             logger.info(f"[ROUTER] Subtype query detected: {subtypeQuery} for message: {message[:80]}")
             return {
@@ -121,7 +127,7 @@ class ChatRouter:
             logger.debug(f"[ROUTER] No subtype query detected for: {message[:80]}")
         
         # 1.4.5. Check for subtype-filtered list queries (e.g., "how many assets in our IT-System assets")
-        subtypeListQuery = self._detectSubtypeListQuery(message)
+        subtypeListQuery = self._detectSubtypeListQuery(message, features)
         if subtypeListQuery:
             logger.info(f"[ROUTER] Subtype-filtered list query detected: {subtypeListQuery} for message: {message[:80]}")
             return {
@@ -134,7 +140,7 @@ class ChatRouter:
         # 1.4.6. Check for conversational list queries (AFTER subtype queries to avoid misrouting)
         # Patterns like "show all scopes", "show me all assets in our isms", "display all controls"
         # This MUST be checked before generic fallback to catch natural language queries
-        conversationalList = self._detectConversationalList(message)
+        conversationalList = self._detectConversationalList(message, features)
         if conversationalList:
             logger.info(f"[ROUTER] Conversational list query detected: {conversationalList} for message: {message[:80]}")
             return {
@@ -149,7 +155,7 @@ class ChatRouter:
         # Patterns: "set role for the Data protection officer for the person Ruby"
         #           "add in the DPO for the person Tommy"
         #           "set subtype Controller for the scope Project Phoenix"
-        message_lower_check = message.lower().strip()
+        message_lower_check = features.lower
         # CRITICAL: Comprehensive list query detection - check multiple patterns
         list_query_starters = ['show', 'list', 'display', 'how many', 'what', 'do we have', 'are there', 'tell me']
         list_query_patterns = [
@@ -165,8 +171,9 @@ class ChatRouter:
         
         # CRITICAL: Also check if conversational list or subtype list query would match
         # This is a safety net to ensure list queries are never treated as role assignments
-        conversational_list_check = self._detectConversationalList(message)
-        subtype_list_check = self._detectSubtypeListQuery(message)
+        # (both detectors already ran above for this message; reuse their results)
+        conversational_list_check = conversationalList
+        subtype_list_check = subtypeListQuery
         
         is_list_query = (
             any(message_lower_check.startswith(starter) for starter in list_query_starters) or
@@ -176,7 +183,7 @@ class ChatRouter:
         )
         
         if not is_list_query:
-            roleAssignment = self._detectRoleSubtypeAssignment(message)
+            roleAssignment = self._detectRoleSubtypeAssignment(message, features)
             if roleAssignment:
                 logger.info(f"[ROUTER] Role/subtype assignment detected: {roleAssignment} for message: {message[:80]}")
                 return {
@@ -252,7 +259,7 @@ class ChatRouter:
             }
         
         # 1.7. Check for create-and-link operations (BEFORE general VeriniceOp)
-        createAndLink = self._detectCreateAndLink(message)
+        createAndLink = self._detectCreateAndLink(message, features)
         if createAndLink:
             logger.info(f"[ROUTER] Create-and-link detected: {createAndLink} for message: {message[:80]}")
             return {
@@ -273,7 +280,7 @@ class ChatRouter:
             logger.debug(f"[ROUTER] No multiple creates detected for: {message[:80]}")
         
         # 2. CRITICAL: Check for Verinice operations FIRST (before IntentClassifier)
-        veriniceOp = self._detectVeriniceOp(message)
+        veriniceOp = self._detectVeriniceOp(message, features)
         if veriniceOp:
             return {
                 'route': self.ROUTE_VERINICE,
@@ -283,7 +290,7 @@ class ChatRouter:
             }
         
         # 3. Check for report generation
-        reportGen = self._detectReportGeneration(message)
+        reportGen = self._detectReportGeneration(message, features)
         if reportGen:
             return {
                 'route': self.ROUTE_REPORT,
@@ -294,12 +301,12 @@ class ChatRouter:
         
         # 4. Use IntentClassifier (LLM-based) if available
         if intentClassifier:
-            intentRoute = self._useIntentClassifier(message, context, intentClassifier)
+            intentRoute = self._useIntentClassifier(message, context, intentClassifier, features)
             if intentRoute:
                 return intentRoute
         
         # 5. Check fallback knowledge base
-        if self._hasFallbackAnswer(message):
+        if self._hasFallbackAnswer(message, features):
             return {
                 'route': self.ROUTE_FALLBACK_KB,
                 'handler': '_getFallbackAnswer',
@@ -335,7 +342,7 @@ class ChatRouter:
     
     # ==================== FOLLOW-UP DETECTION ====================
     
-    def _checkFollowUp(self, message: str, state: Dict) -> Optional[Dict]:
+    def _checkFollowUp(self, message: str, state: Dict, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """Check for follow-up responses (subtype selection, report generation, bulk operations)"""
         # Report generation follow-up
         if state.get('pendingReportGeneration'):
@@ -357,7 +364,7 @@ class ChatRouter:
             }
         
         # Bulk delete/remove follow-up - check for "remove them all", "delete all", etc.
-        bulk_delete = self._detectBulkDelete(message, state)
+        bulk_delete = self._detectBulkDelete(message, state, features)
         if bulk_delete:
             return {
                 'route': self.ROUTE_VERINICE,
@@ -370,7 +377,7 @@ class ChatRouter:
     
     # ==================== BULK DELETE DETECTION ====================
     
-    def _detectBulkDelete(self, message: str, state: Dict) -> Optional[Dict]:
+    def _detectBulkDelete(self, message: str, state: Dict, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Detect bulk delete/remove operations that reference the last list result.
         
@@ -389,7 +396,7 @@ class ChatRouter:
         Returns:
             Dict with operation='delete', objectType, and isBulk=True if detected
         """
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         
         # Patterns for contextual single object deletion ("remove it", "delete it")
         single_context_patterns = [
@@ -558,7 +565,7 @@ class ChatRouter:
     
     # ==================== CONVERSATIONAL LIST DETECTION ====================
     
-    def _detectConversationalList(self, message: str) -> Optional[Dict]:
+    def _detectConversationalList(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Detect conversational list queries that should map to list operations.
         
@@ -583,7 +590,7 @@ class ChatRouter:
         Returns:
             Dict with operation='list' and objectType if detected, None otherwise
         """
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         
         # CRITICAL: First check if this is a subtype query - if so, skip it
         # Pattern: "show me all subtypes of X" or "show subtypes of X"
@@ -657,7 +664,7 @@ class ChatRouter:
                 if objectType in normalized_types or objectType in singular_types:
                     logger.info(f"[_detectConversationalList] ✅ Matched pattern '{pattern}' -> objectType: {objectType} for message: {message[:80]}")
                     return {
-                        'operation': 'list',
+                        'operation': 'count' if _COUNT_QUERY.match(messageLower) else 'list',
                         'objectType': objectType
                     }
                 else:
@@ -666,7 +673,7 @@ class ChatRouter:
         logger.debug(f"[_detectConversationalList] ❌ No match for message: {message[:80]}")
         return None
     
-    def _detectSubtypeListQuery(self, message: str) -> Optional[Dict]:
+    def _detectSubtypeListQuery(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Detect list queries filtered by subtype.
         
@@ -679,7 +686,7 @@ class ChatRouter:
         Returns:
             Dict with operation='list', objectType, and subtypeFilter if detected, None otherwise
         """
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         
         # Patterns for subtype-filtered list queries
         # Pattern: "how many/list/show {objectType} in our {subtype} {objectType}"
@@ -704,6 +711,9 @@ class ChatRouter:
             if match:
                 objectType = match.group(1).strip().lower()
                 subtype = match.group(2).strip()
+                # "how many assets in our isms" names no subtype - leave it to the conversational list
+                if subtype.lower() in ('our', 'the', 'isms', 'system', 'domain'):
+                    continue
                 
                 # Normalize object type to singular
                 if objectType.endswith('s') and objectType != 'process':
@@ -746,7 +756,8 @@ class ChatRouter:
                     
                     logger.info(f"[_detectSubtypeListQuery] ✅ Matched: objectType={objectType}, subtype={subtype_normalized} (from: '{subtype}') for message: {message[:80]}")
                     return {
-                        'operation': 'list',
+                        # "how many"/"count" only needs the total, not the objects
+                        'operation': 'count' if _COUNT_QUERY.match(messageLower) else 'list',
                         'objectType': objectType,
                         'subtypeFilter': subtype_normalized  # Add normalized subtype filter
                     }
@@ -755,7 +766,7 @@ class ChatRouter:
     
     # ==================== GREETING DETECTION ====================
     
-    def _detectSubtypeQuery(self, message: str) -> Optional[Dict]:
+    def _detectSubtypeQuery(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Detect questions about subtypes for an object type.
         
@@ -769,7 +780,7 @@ class ChatRouter:
         Returns:
             Dict with objectType if detected, None otherwise
         """
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         logger.debug(f"[_detectSubtypeQuery] Checking message: {message[:80]}")
         logger.debug(f"[_detectSubtypeQuery] Available object types: {self.veriniceObjectTypes}")
         
@@ -876,7 +887,7 @@ class ChatRouter:
         logger.debug(f"[_detectSubtypeQuery] ❌ No subtype query detected")
         return None
     
-    def _detectRoleSubtypeAssignment(self, message: str) -> Optional[Dict]:
+    def _detectRoleSubtypeAssignment(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Detect role/subtype assignment patterns like:
         - "set role for the Data protection officer for the person Ruby"
@@ -889,7 +900,7 @@ class ChatRouter:
         Returns:
             Dict with operation='update' or 'create', objectType, and subtype info if detected, None otherwise
         """
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         
         # CRITICAL: Skip list queries - these should NOT match role assignment patterns
         # Check if message starts with list query keywords or matches list query patterns
@@ -1096,7 +1107,7 @@ class ChatRouter:
         
         return None
     
-    def _detectCreateAndLink(self, message: str) -> Optional[Dict]:
+    def _detectCreateAndLink(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """
         Detect create-and-link operations like:
         - "Create a new Scope named 'Project Phoenix' and immediately link it with the 'IT-System assets' assets"
@@ -1105,7 +1116,7 @@ class ChatRouter:
         Returns:
             Dict with source_type, source_name, target_type, target_name if detected, None otherwise
         """
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         logger.debug(f"[_detectCreateAndLink] Checking message: {message[:100]}")
         
         # Pattern 1: create object X (named 'name') and immediately link it with target Y
@@ -1339,9 +1350,9 @@ class ChatRouter:
         logger.debug(f"[_detectCreateAndLink] No pattern matched for message: {message[:100]}")
         return None
     
-    def _checkGreeting(self, message: str, state: Dict) -> Optional[Dict]:
+    def _checkGreeting(self, message: str, state: Dict, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """Check if message is a greeting"""
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         greetings = ['hi', 'hello', 'hey', 'greetings', 'good morning', 
                     'good afternoon', 'good evening']
         
@@ -1358,10 +1369,11 @@ class ChatRouter:
     
     # ==================== VERINICE OPERATION DETECTION ====================
     
-    def _detectVeriniceOp(self, message: str) -> Optional[Dict]:
+    def _detectVeriniceOp(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """Detect Verinice operation from message - ignore questions"""
         try:
-            messageLower = message.lower().strip()
+            features = self._featuresFor(message, features)
+            messageLower = features.lower
             
             # CRITICAL: Check for standalone link operations FIRST (before question filtering)
             # Patterns: "link SCOPE-B with IT-System assets", "link DPO with SCOPE-A"
@@ -1472,11 +1484,9 @@ class ChatRouter:
                         if not has_operation_keyword:
                             return None
         
-            # Normalize typos - only replace whole words to avoid substring issues
-            for typo, correct in VERINICE_TYPO_CORRECTIONS.items():
-                # Use word boundaries to only replace whole words, not substrings
-                pattern = r'\b' + re.escape(typo) + r'\b'
-                messageLower = re.sub(pattern, correct, messageLower)
+            # Normalize typos - whole words only, all corrections in one pass
+            messageLower = features.correctedLower
+            keywordHits = features.keywordHits(messageLower)
             
             # CRITICAL: Handle asset type queries FIRST (before object type extraction)
             # These should GET the asset and return its subtype
@@ -1810,7 +1820,7 @@ class ChatRouter:
             
             # CRITICAL: Check for contextual linking BEFORE objectType check
             # This handles "link these person to SCOPE-A" even if objectType isn't explicitly detected
-            if any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in ['link', 'connect', 'associate']):
+            if keywordHits.has('link'):
                 contextual_link_patterns = [
                     r'link\s+(?:these|those|the)\s+(?:person|persons|people)\s+(?:to|with)\s+([A-Za-z0-9_\s-]+)',
                     r'link\s+them\s+(?:to|with)\s+([A-Za-z0-9_\s-]+)',
@@ -1879,7 +1889,7 @@ class ChatRouter:
             # Detect operation - only for direct commands, not questions
             # Use word boundaries to avoid false matches
             # CRITICAL: Check for link operations FIRST (before other operations) to handle "link these person"
-            if any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in ['link', 'connect', 'associate']):
+            if keywordHits.has('link'):
                 contextual_link_patterns = [
                     r'link\s+(?:these|those|the)\s+(?:person|persons|people)\s+(?:to|with)\s+([A-Za-z0-9_\s-]+)',
                     r'link\s+them\s+(?:to|with)\s+([A-Za-z0-9_\s-]+)',
@@ -1951,23 +1961,23 @@ class ChatRouter:
                 
                 # Regular link operation (fallback - minimal info)
                 return {'operation': 'link', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_DELETE_KEYWORDS + ['delete', 'remove', 'drop']):
+            elif keywordHits.has('delete'):
                 return {'operation': 'delete', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_CREATE_KEYWORDS) and not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('create') and not keywordHits.has('question'):
                 return {'operation': 'create', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_LIST_KEYWORDS) and not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('list') and not keywordHits.has('question'):
                 return {'operation': 'list', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_GET_KEYWORDS) and not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('get') and not keywordHits.has('question'):
                 return {'operation': 'get', 'objectType': objectType}
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_UPDATE_KEYWORDS):
+            elif keywordHits.has('update'):
                 return {'operation': 'update', 'objectType': objectType}
             # Compare operation - handle "compare X and Y"
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in ['compare', 'comparison', 'diff', 'difference', 'differences']):
-                if not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('compare'):
+                if not keywordHits.has('question'):
                     return {'operation': 'compare', 'objectType': objectType}
             # Analyze operation - handle "analyze on", "analyze the", etc.
-            elif any(re.search(r'\b' + re.escape(word) + r'\b', messageLower) for word in VERINICE_ANALYZE_KEYWORDS):
-                if not any(q in messageLower for q in VERINICE_QUESTION_WORDS):
+            elif keywordHits.has('analyze'):
+                if not keywordHits.has('question'):
                     return {'operation': 'analyze', 'objectType': objectType}
             
             return None
@@ -1976,12 +1986,14 @@ class ChatRouter:
     
     # ==================== REPORT GENERATION DETECTION ====================
     
-    def _detectReportGeneration(self, message: str) -> Optional[Dict]:
+    def _detectReportGeneration(self, message: str, features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """Detect report generation requests"""
-        messageLower = message.lower().strip()
+        features = self._featuresFor(message, features)
+        messageLower = features.lower
+        keywordHits = features.keywordHits()
         
-        hasReportKeyword = any(keyword in messageLower for keyword in VERINICE_REPORT_KEYWORDS)
-        hasReportType = any(reportType in messageLower for reportType in VERINICE_REPORT_TYPES)
+        hasReportKeyword = keywordHits.has('report')
+        hasReportType = keywordHits.has('report_type')
         
         # Also check for generic "report" (but only if it's not too ambiguous)
         hasGenericReport = 'report' in messageLower and not any(q in messageLower for q in VERINICE_QUESTION_WORDS + ['which'])
@@ -2019,7 +2031,8 @@ class ChatRouter:
     
     # ==================== INTENT CLASSIFIER ====================
     
-    def _useIntentClassifier(self, message: str, context: Dict, intentClassifier) -> Optional[Dict]:
+    def _useIntentClassifier(self, message: str, context: Dict, intentClassifier,
+                             features: Optional[MessageFeatures] = None) -> Optional[Dict]:
         """Use IntentClassifier (LLM-based) for routing"""
         try:
             classification = intentClassifier.classify(message, context)
@@ -2032,7 +2045,7 @@ class ChatRouter:
                 if intent in ['verinice_create', 'verinice_list', 'verinice_get', 
                              'verinice_update', 'verinice_delete']:
                     # Re-detect to get operation details
-                    veriniceOp = self._detectVeriniceOp(message)
+                    veriniceOp = self._detectVeriniceOp(message, features)
                     if veriniceOp:
                         return {
                             'route': self.ROUTE_INTENT_CLASSIFIER,
@@ -2522,9 +2535,9 @@ class ChatRouter:
     
     # ==================== FALLBACK ====================
     
-    def _hasFallbackAnswer(self, message: str) -> bool:
+    def _hasFallbackAnswer(self, message: str, features: Optional[MessageFeatures] = None) -> bool:
         """Check if message has a fallback knowledge base answer"""
-        messageLower = message.lower().strip()
+        messageLower = self._featuresFor(message, features).lower
         
         knowledgePatterns = [
             ('scope' in messageLower and 'asset' in messageLower and 
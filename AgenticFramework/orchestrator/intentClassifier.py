@@ -3,6 +3,8 @@ from typing import Dict, List, Any, Optional, Tuple
 import re
 import json
 
+from agents.instructions import AGENT_TYPO_CORRECTOR
+
 
 class IntentClassifier:
     """Classifies user intents intelligently using LLM with pattern fallback"""
@@ -54,7 +56,7 @@ class IntentClassifier:
     def _patternBasedClassification(self, query: str, context: Optional[Dict], 
                                    intentTypes: Optional[List[str]]) -> Dict[str, Any]:
         """Fast pattern-based classification"""
-        queryLower = query.lower()
+        queryLower = AGENT_TYPO_CORRECTOR.correct(query.lower())
         intent = 'unknown'
         confidence = 0.5
         entities = {}
@@ -19,24 +19,11 @@ from abc import ABC, abstractmethod
 from typing import Dict, Optional, Any, List
 import os
 import re
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Try to import Google Gemini
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    genai = None
+from utils.geminiClient import loadEnvironment, isGeminiInstalled, getModel, buildGenerationConfig
 
-# Load environment variables
-_agenticFrameworkDir = Path(__file__).parent.parent
-_envFile = _agenticFrameworkDir / '.env'
-if _envFile.exists():
-    load_dotenv(_envFile)
-else:
-    load_dotenv()
+# Installed check only - google.generativeai is imported on the first LLM call
+GEMINI_AVAILABLE = isGeminiInstalled()
 
 
 class ReasoningEngine(ABC):
@@ -116,6 +103,8 @@ class GeminiReasoningEngine(ReasoningEngine):
         if not GEMINI_AVAILABLE:
             raise RuntimeError("Google Generative AI library not installed. Run: pip install google-generativeai")
         
+        loadEnvironment()
+        
         # Default to gemini-2.5-flash
         self.model_name = model or os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
         self.api_key = api_key or os.getenv('GEMINI_API_KEY', '')
@@ -124,17 +113,14 @@ class GeminiReasoningEngine(ReasoningEngine):
         self.max_tokens = max_tokens
         self.response_mode = response_mode  # concise | normal | detailed
         self._is_available_cache = None
-        self.geminiClient = None
         
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY is required. Set it in environment variables or pass as api_key parameter.")
-        
-        # Configure Gemini
-        try:
-            genai.configure(api_key=self.api_key)
-            self.geminiClient = genai.GenerativeModel(self.model_name)
-        except Exception as e:
-            raise RuntimeError(f"Gemini setup failed: {e}")
+    
+    @property
+    def geminiClient(self):
+        """Shared GenerativeModel from the client factory (created on first use)"""
+        return getModel(self.model_name, self.api_key)
     
     def reason(self, query: str, context: Optional[Dict[str, Any]] = None, system_prompt: Optional[str] = None, response_mode: Optional[str] = None) -> str:
         """
@@ -185,7 +171,7 @@ class GeminiReasoningEngine(ReasoningEngine):
         try:
             response = self.geminiClient.generate_content(
                 full_prompt,
-                generation_config=genai.types.GenerationConfig(
+                generation_config=buildGenerationConfig(
                     max_output_tokens=effective_max_tokens,
                     temperature=self.temperature
                 )
@@ -288,13 +274,12 @@ class GeminiReasoningEngine(ReasoningEngine):
         Returns:
             bool: True if Gemini API is available, False otherwise
         """
-        # Basic validation: API key must be present and client initialized
-        if not self.api_key or not self.geminiClient:
+        # Basic validation: SDK installed and API key present
+        if not GEMINI_AVAILABLE or not self.api_key:
             return False
         
-        # Use cached result if available (valid for 5 minutes)
-        # For cloud API, we assume it's available if API key is set and client is initialized
-        # Actual availability will be tested on first request
+        # For cloud API, we assume it's available if API key is set
+        # The model handle is created and tested on first request
         return True
     
     def _detectQuestionType(self, query: str) -> str:
@@ -0,0 +1,11 @@
+"""Make AgenticFramework (tools.*, utils.*) and the SparksBM scripts importable"""
+import os
+import sys
+
+_testsDir = os.path.dirname(os.path.abspath(__file__))
+_agenticFrameworkPath = os.path.dirname(_testsDir)
+_scriptsPath = os.path.join(_agenticFrameworkPath, '..', 'SparksbmISMS', 'scripts')
+
+for path in (_agenticFrameworkPath, _scriptsPath):
+    if os.path.exists(path) and path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,75 @@
+"""ISMS command grammar and the tier / fast-path decisions built on it (agents/ismsCommandParser.py)"""
+import pytest
+
+from agents.ismsCommandParser import parseCommand
+from agents.ismsController import ISMSController
+from agents.ismsFastPath import ISMSFastPath
+
+
+def test_quoted_name_and_field_clauses():
+    command = parseCommand('create asset "Main Firewall" description "Perimeter firewall" abbreviation MF')
+
+    assert (command.operation, command.objectType, command.name) == ('create', 'asset', 'Main Firewall')
+    assert command.fields == {'description': 'Perimeter firewall', 'abbreviation': 'MF'}
+    assert command.isDeterministic
+
+
+def test_set_clause_after_a_sentence_break():
+    command = parseCommand("update the asset 'Main Firewall'. Change its description to X")
+
+    assert command.name == 'Main Firewall'
+    assert command.fields == {'description': 'X'}
+    assert command.isDeterministic
+
+
+def test_set_phrase_for_an_unknown_field_ends_the_name():
+    command = parseCommand('update asset Firewall set confidentiality to high')
+
+    assert command.name == 'Firewall'
+    assert command.remainder == 'set confidentiality to high'
+    assert not command.isDeterministic
+
+
+def test_container_qualifier_is_not_a_name():
+    command = parseCommand('list the assets of scope X')
+
+    assert (command.operation, command.objectType, command.name) == ('list', 'asset', None)
+    assert command.remainder == 'of scope X'
+    assert parseCommand('get asset Firewall in scope Main').name == 'Firewall'
+
+
+def test_words_like_set_inside_a_name_are_kept():
+    assert parseCommand('create asset Data Set').name == 'Data Set'
+
+
+def test_extra_positional_values_are_left_over():
+    command = parseCommand('creat scope "SCOPE TEST" "SA-1" "SCOPE TESTING"')
+
+    assert (command.operation, command.name) == ('create', 'SCOPE TEST')
+    assert command.remainder == '"SA-1" "SCOPE TESTING"'
+
+
+@pytest.mark.parametrize('request_, tier', [
+    ('list assets', 1),
+    ("update the asset 'Main Firewall'. Change its description to X", 1),
+    ('creat scope "SCOPE TEST" "SA-1" "SCOPE TESTING"', 1),
+    ('update asset Firewall set confidentiality to high', 1),
+    ('list the assets of scope X', 1),
+    ('create asset Foo and link it to scope Bar', 2),
+])
+def test_partial_parses_fall_back_to_the_tier_patterns(request_, tier):
+    assert ISMSController(None)._detect_tier(request_, {})[0] == tier
+
+
+@pytest.mark.parametrize('request_, operation, objectType, typed', [
+    ("update the asset 'Main Firewall'. Change its description to X", 'update', 'asset', True),
+    ('creat scope "SCOPE TEST" "SA-1" "SCOPE TESTING"', 'create', 'scope', False),
+    ('update asset Firewall set confidentiality to high', 'update', 'asset', False),
+    ('list the assets of scope X', 'list', 'asset', False),
+])
+def test_fast_path_keeps_partial_parses(request_, operation, objectType, typed):
+    parsed = ISMSFastPath(None)._parse_request(request_)
+
+    assert (parsed['operation'], parsed['object_type'], parsed['message']) == (operation, objectType, request_)
+    # Only complete parses hand their Command to the handlers; the rest use the regex extractors
+    assert ('command' in parsed) == typed
@@ -0,0 +1,57 @@
+"""Aho-Corasick keyword families (utils/keywordIndex.py) and the shared routing index"""
+from agents.instructions import VERINICE_KEYWORD_INDEX
+from agents.messageFeatures import MessageFeatures
+from utils.keywordIndex import KeywordIndex, _legacyScan
+
+
+def test_overlapping_keywords_are_all_reported():
+    index = KeywordIndex({'short': ['he', 'she'], 'long': ['hers', 'ushers']})
+    hits = index.scan('ushers')
+
+    assert hits.keywords('short') == ['she', 'he']
+    assert hits.keywords('long') == ['ushers', 'hers']
+
+
+def test_one_keyword_in_several_families():
+    index = KeywordIndex({'a': ['drift'], 'b': ['drift', 'gap']})
+    hits = index.scan('find the drift')
+
+    assert hits.has('a') and hits.hasKeyword('b', 'drift')
+    assert not hits.hasKeyword('b', 'gap')
+
+
+def test_whole_word_keywords_need_boundaries():
+    index = KeywordIndex()
+    index.add('verb', 'list', wholeWord=True)
+    index.add('substring', 'list')
+
+    hits = index.scan('show the checklist')
+    assert 'verb' not in hits and 'substring' in hits
+    assert index.scan('list, then stop').has('verb')
+
+
+def test_keywords_added_after_a_scan_are_picked_up():
+    index = KeywordIndex({'a': ['one']})
+    assert not index.scan('two').has('b')
+
+    index.add('b', 'two')
+    assert index.scan('two').has('b')
+
+
+def test_matches_per_keyword_in_checks():
+    families = {'dangerous': ['delete all', 'wipe'], 'connectors': ['then', 'and'], 'none': ['zzz']}
+    message = 'delete all assets and then wipe'
+
+    expected = {family for family, hit in _legacyScan(message, families).items() if hit}
+    assert set(KeywordIndex(families).scan(message).families) == expected
+
+
+def test_pattern_matcher_families_share_the_routing_automaton():
+    features = MessageFeatures('Compare scope Production with Staging then delete all')
+    hits = features.keywordHits()
+
+    assert hits.has('compare')
+    assert hits.has('isms_reconciliation.keywords', 'safety_operations.dangerous_keywords')
+    assert 'isms_reconciliation.keywords' in VERINICE_KEYWORD_INDEX.families
+    # One scan per distinct text
+    assert features.keywordHits() is hits
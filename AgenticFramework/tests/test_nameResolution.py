@@ -0,0 +1,56 @@
+"""Name -> id resolution: name-filtered list first, full list only for fuzzy matches
+(ISMSHandler._resolveToId, mcp/tools/linking._resolve_object_id)"""
+from agents.ismsHandler import ISMSHandler
+from mcp.tools.linking import _resolve_object_id
+
+_ITEMS = [
+    {'id': 'a1', 'name': 'Main Firewall'},
+    {'id': 'a2', 'name': 'Database Server'},
+]
+
+
+class _FakeTool:
+    """listObjects with the API's name semantics (case-insensitive contains); records each call"""
+
+    def __init__(self, items=_ITEMS):
+        self.items = items
+        self.calls = []
+
+    def listObjects(self, objectType, domainId=None, filters=None, unitId=None):
+        self.calls.append(dict(filters or {}))
+        name = (filters or {}).get('name')
+        items = [item for item in self.items if not name or name.lower() in item['name'].lower()]
+        return {'success': True, 'objects': {'items': items}}
+
+    def isBackendAvailable(self):
+        return True
+
+
+def test_linking_exact_name_needs_only_the_filtered_list():
+    tool = _FakeTool()
+
+    assert _resolve_object_id(tool, 'd1', 'asset', 'main firewall') == 'a1'
+    assert tool.calls == [{'name': 'main firewall'}]
+
+
+def test_linking_fuzzy_name_falls_back_to_the_full_list():
+    tool = _FakeTool()
+
+    assert _resolve_object_id(tool, 'd1', 'asset', 'Databases Server') == 'a2'
+    assert tool.calls == [{'name': 'Databases Server'}, {}]
+
+
+def test_handler_exact_name_needs_only_the_filtered_list():
+    tool = _FakeTool()
+    handler = ISMSHandler(tool, formatFunc=None)
+
+    assert handler._resolveToId('asset', 'get asset "Main Firewall"', 'd1') == 'a1'
+    assert tool.calls == [{'name': 'Main Firewall'}]
+
+
+def test_handler_fuzzy_name_falls_back_to_the_full_list():
+    tool = _FakeTool()
+    handler = ISMSHandler(tool, formatFunc=None)
+
+    assert handler._resolveToId('asset', 'get asset Main_Firewall', 'd1') == 'a1'
+    assert tool.calls == [{'name': 'Main_Firewall'}, {}]
@@ -0,0 +1,171 @@
+"""Members/parts adjacency, impact analysis and background builds (tools/relationshipGraph.py)"""
+import threading
+import time
+
+import pytest
+
+import tools.relationshipGraph as relationshipGraph
+from config.settings import Settings
+from tools.relationshipGraph import RelationshipGraph, getRelationshipGraph
+
+
+def _graph():
+    """scope s1 -> {a1, a2}, scope s0 -> {s1}, asset a1 -> part a3"""
+    graph = RelationshipGraph('d1')
+    graph.updateFromObject('scope', {'id': 's1', 'name': 'Main', 'members': [{'id': 'a1'}, {'id': 'a2'}]})
+    graph.updateFromObject('scope', {'id': 's0', 'name': 'Group', 'members': [{'targetUri': 'http://veo/scopes/s1'}]})
+    graph.updateFromObject('asset', {'id': 'a1', 'name': 'Server', 'parts': [{'id': 'a3'}]})
+    return graph
+
+
+def test_update_from_object_reads_id_and_target_uri_refs():
+    graph = _graph()
+
+    assert sorted(graph.children('s1')) == ['a1', 'a2']
+    assert graph.parents('s1') == ['s0']
+    assert graph.hasEdge('members', 's0', 's1')
+    assert not graph.hasEdge('parts', 's0', 's1')
+    assert graph.edgeCount == 4
+    assert len(graph) == 5
+
+
+def test_add_edge_reports_existing_edges():
+    graph = RelationshipGraph('d1')
+    assert graph.addEdge('members', 's1', 'a1') is True
+    assert graph.addEdge('members', 's1', 'a1') is False
+    assert graph.edgeCount == 1
+
+
+def test_update_from_object_replaces_outgoing_edges():
+    graph = _graph()
+    graph.updateFromObject('scope', {'id': 's1', 'members': [{'id': 'a2'}, {'id': 'a4'}]})
+
+    assert sorted(graph.children('s1')) == ['a2', 'a4']
+    assert graph.parents('a1') == []
+    # Objects without a members list keep their edges
+    graph.updateFromObject('scope', {'id': 's1', 'name': 'Renamed'})
+    assert sorted(graph.children('s1')) == ['a2', 'a4']
+    assert graph.describe('s1')['name'] == 'Renamed'
+
+
+def test_remove_object_drops_edges_both_ways():
+    graph = _graph()
+    graph.removeObject('s1')
+
+    assert graph.children('s0') == []
+    assert graph.parents('a1') == []
+    assert graph.describe('s1') is None
+    assert graph.edgeCount == 1
+
+
+def test_remove_edge():
+    graph = _graph()
+    assert graph.removeEdge('members', 's1', 'a1') is True
+    assert graph.removeEdge('members', 's1', 'a1') is False
+    assert graph.children('s1') == ['a2']
+
+
+def test_related_describes_both_directions():
+    related = _graph().related('s1')
+
+    assert sorted(c['id'] for c in related['children']) == ['a1', 'a2']
+    assert related['parents'] == [{'id': 's0', 'type': 'scope', 'name': 'Group', 'subType': None}]
+
+
+def test_impact_of_walks_containers_transitively():
+    impact = _graph().impactOf('a3')
+    assert [(i['id'], i['depth']) for i in impact] == [('a1', 1), ('s1', 2), ('s0', 3)]
+
+
+def test_impact_of_respects_max_depth():
+    impact = _graph().impactOf('a3', maxDepth=2)
+    assert [i['id'] for i in impact] == ['a1', 's1']
+
+
+def test_dependencies_of_walks_members_and_parts():
+    dependencies = _graph().dependenciesOf('s0')
+    assert sorted(d['id'] for d in dependencies) == ['a1', 'a2', 'a3', 's1']
+
+
+def test_cycles_terminate():
+    graph = RelationshipGraph('d1')
+    graph.addEdge('members', 's1', 's2')
+    graph.addEdge('members', 's2', 's1')
+    assert [i['id'] for i in graph.impactOf('s1')] == ['s2']
+
+
+def test_unknown_objects_have_no_neighbours():
+    graph = _graph()
+    assert graph.children('missing') == []
+    assert graph.impactOf('missing') == []
+    assert not graph.hasEdge('members', 'missing', 'a1')
+
+
+class _ListingTool:
+    """OBJECT_TYPES/listObjects for buildGraph; listings wait for `release`"""
+    OBJECT_TYPES = ['scope', 'asset']
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lists = 0
+
+    def listObjects(self, objectType, domainId=None):
+        self.release.wait(5)
+        self.lists += 1
+        items = [{'id': 's1', 'members': [{'id': 'a1'}]}] if objectType == 'scope' else []
+        return {'success': True, 'objects': {'items': items}}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(Settings, 'RELATION_GRAPH_ENABLED', True)
+    monkeypatch.setattr(Settings, 'RELATION_GRAPH_MAX_AGE_SECONDS', 60)
+    relationshipGraph.invalidate()
+    yield
+    relationshipGraph.invalidate()
+
+
+def _waitForBuilds():
+    for thread in threading.enumerate():
+        if thread.name.startswith('relation-graph-'):
+            thread.join(5)
+
+
+def test_lookups_never_build_on_the_callers_thread(registry):
+    tool = _ListingTool()
+
+    assert getRelationshipGraph(tool, 'd1') is None
+    assert getRelationshipGraph(tool, 'd1') is None
+    assert tool.lists == 0
+    tool.release.set()
+    _waitForBuilds()
+
+    graph = getRelationshipGraph(tool, 'd1')
+    assert graph.hasEdge('members', 's1', 'a1')
+    # One build for both lookups
+    assert tool.lists == len(tool.OBJECT_TYPES)
+
+
+def test_aged_graphs_are_served_while_they_refresh(registry):
+    tool = _ListingTool()
+    tool.release.set()
+    getRelationshipGraph(tool, 'd1')
+    _waitForBuilds()
+    aged = getRelationshipGraph(tool, 'd1')
+    aged.builtAt = time.time() - 120
+    tool.release.clear()
+
+    assert getRelationshipGraph(tool, 'd1') is aged
+    tool.release.set()
+    _waitForBuilds()
+    assert getRelationshipGraph(tool, 'd1') is not aged
+
+
+def test_builds_started_before_an_invalidate_are_discarded(registry):
+    tool = _ListingTool()
+    getRelationshipGraph(tool, 'd1')
+    relationshipGraph.invalidate('d1')
+    tool.release.set()
+    _waitForBuilds()
+
+    assert 'd1' not in relationshipGraph._graphs
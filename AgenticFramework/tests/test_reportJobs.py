@@ -0,0 +1,145 @@
+"""Background report generation (tools/reportJobs.py)"""
+import threading
+
+import pytest
+
+from tools.reportJobs import JOB_COMPLETED, JOB_FAILED, ReportJobRunner
+
+
+class FakeVeriniceTool:
+    """generateReport that reports progress and optionally blocks until released"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result or {'success': True, 'handle': 'h' * 64, 'url': '/api/agent/reports/x', 'size': 8}
+        self.error = error
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def generateReport(self, reportId, domainId, params, onProgress=None):
+        self.calls.append((reportId, domainId, params))
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        onProgress({'phase': 'generating'})
+        onProgress({'phase': 'downloading', 'bytes': 8})
+        return self.result
+
+
+class Recorder:
+    """emit() callback collecting (eventType, data) and signalling the final event"""
+
+    def __init__(self):
+        self.events = []
+        self.finished = threading.Event()
+
+    def __call__(self, eventType, data):
+        self.events.append((eventType, data))
+        if eventType in ('report_complete', 'report_error'):
+            self.finished.set()
+
+    @property
+    def types(self):
+        return [eventType for eventType, _ in self.events]
+
+
+@pytest.fixture
+def runner():
+    return ReportJobRunner(maxConcurrent=2)
+
+
+def test_job_emits_queued_progress_and_complete(runner):
+    tool, emit = FakeVeriniceTool(), Recorder()
+    job = runner.submit(tool, 'inventory', 'd1', {'scope': 's1'}, sessionId='s', emit=emit,
+                        meta={'reportName': 'Inventory'})
+
+    assert emit.finished.wait(5)
+    assert emit.types == ['report_queued', 'report_progress', 'report_progress', 'report_complete']
+    final = emit.events[-1][1]
+    assert final['status'] == JOB_COMPLETED
+    assert final['result']['url'] == '/api/agent/reports/x'
+    assert final['reportName'] == 'Inventory'
+    assert job.bytes == 8
+    assert runner.getJob(job.jobId) is job
+    assert runner.stats['completed'] == 1
+
+
+def test_inline_report_bodies_stay_out_of_job_state(runner):
+    tool = FakeVeriniceTool(result={'success': True, 'data': 'base64...', 'size': 3})
+    emit = Recorder()
+    job = runner.submit(tool, 'r', 'd1', emit=emit)
+
+    assert emit.finished.wait(5)
+    assert 'data' not in job.result
+
+
+def test_failures_emit_report_error(runner):
+    emit = Recorder()
+    job = runner.submit(FakeVeriniceTool(error=RuntimeError('reporting down')), 'r', 'd1', emit=emit)
+
+    assert emit.finished.wait(5)
+    assert emit.types[-1] == 'report_error'
+    assert job.status == JOB_FAILED
+    assert job.error == 'reporting down'
+    assert runner.stats['failed'] == 1
+
+
+def test_unsuccessful_results_emit_report_error(runner):
+    emit = Recorder()
+    job = runner.submit(FakeVeriniceTool(result={'success': False, 'error': 'no scope'}), 'r', 'd1', emit=emit)
+
+    assert emit.finished.wait(5)
+    assert (job.status, job.error, job.result) == (JOB_FAILED, 'no scope', None)
+
+
+def test_identical_requests_share_the_job_and_every_caller_gets_its_events(runner):
+    tool = FakeVeriniceTool()
+    tool.release.clear()
+    first, second = Recorder(), Recorder()
+
+    job = runner.submit(tool, 'r', 'd1', {'scope': 's1'}, sessionId='s1', emit=first)
+    again = runner.submit(tool, 'r', 'd1', {'scope': 's1'}, sessionId='s2', emit=second)
+    tool.release.set()
+
+    assert again is job
+    assert first.finished.wait(5) and second.finished.wait(5)
+    assert len(tool.calls) == 1
+    assert runner.stats['deduplicated'] == 1
+    assert first.types[0] == 'report_queued' and first.types[-1] == 'report_complete'
+    assert second.types[-1] == 'report_complete'
+    assert second.types.count('report_progress') >= 2
+    # The joining session sees the job too
+    assert runner.listJobs('s2') == [job]
+
+
+def test_different_params_run_separately(runner):
+    tool, first, second = FakeVeriniceTool(), Recorder(), Recorder()
+    runner.submit(tool, 'r', 'd1', {'scope': 's1'}, emit=first)
+    runner.submit(tool, 'r', 'd1', {'scope': 's2'}, emit=second)
+
+    assert first.finished.wait(5) and second.finished.wait(5)
+    assert len(tool.calls) == 2
+
+
+def test_finished_jobs_beyond_history_are_forgotten():
+    runner = ReportJobRunner(maxConcurrent=1, historySize=1)
+    tool = FakeVeriniceTool()
+    jobs = []
+    for reportId in ('a', 'b', 'c'):
+        emit = Recorder()
+        jobs.append(runner.submit(tool, reportId, 'd1', emit=emit))
+        assert emit.finished.wait(5)
+
+    assert runner.getJob(jobs[0].jobId) is None
+    assert runner.getJob(jobs[-1].jobId) is jobs[-1]
+
+
+def test_list_jobs_filters_by_session(runner):
+    tool = FakeVeriniceTool()
+    first, second = Recorder(), Recorder()
+    runner.submit(tool, 'a', 'd1', sessionId='s1', emit=first)
+    runner.submit(tool, 'b', 'd1', sessionId='s2', emit=second)
+    assert first.finished.wait(5) and second.finished.wait(5)
+
+    assert [job.reportId for job in runner.listJobs('s1')] == ['a']
+    assert len(runner.listJobs()) == 2
@@ -0,0 +1,61 @@
+"""Off-peak report pre-generation (tools/reportScheduler.py)"""
+import pytest
+
+import tools.reportJobs as reportJobs
+import tools.reportScheduler as reportScheduler
+from tools.reportScheduler import ReportScheduler
+
+_PARAMS = {'targets': [{'id': 's1', 'modelType': 'scope'}]}
+
+
+class FakeVeriniceTool:
+    def __init__(self, stored=False):
+        self.stored = stored
+        self.generated = []
+
+    def storedReport(self, reportId, domainId, params):
+        return {'success': True} if self.stored else None
+
+    def generateReport(self, reportId, domainId, params):
+        self.generated.append(reportId)
+        return {'success': True}
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(reportJobs, 'getReportJobRunner', lambda: None)
+    scheduler = ReportScheduler(str(tmp_path / 'popularity.json'), topN=5, halfLifeHours=72, minScore=1)
+    for _ in range(3):
+        scheduler.recordRequest('inventory', 'd1', _PARAMS)
+    return scheduler
+
+
+def test_runs_are_skipped_while_veo_events_are_not_connected(scheduler, monkeypatch):
+    monkeypatch.setattr(reportScheduler, 'servableSince', lambda: None)
+    tool = FakeVeriniceTool()
+
+    summary = scheduler.runOnce(tool)
+
+    assert 'skipped' in summary
+    assert tool.generated == []
+    assert scheduler.stats['skippedRuns'] == 1
+
+
+def test_pairs_without_a_current_copy_are_generated(scheduler, monkeypatch):
+    monkeypatch.setattr(reportScheduler, 'servableSince', lambda: 0.0)
+    tool = FakeVeriniceTool()
+
+    summary = scheduler.runOnce(tool)
+
+    assert (summary['pairs'], summary['submitted']) == (1, 1)
+    assert tool.generated == ['inventory']
+
+
+def test_pairs_with_a_current_copy_are_left_alone(scheduler, monkeypatch):
+    monkeypatch.setattr(reportScheduler, 'servableSince', lambda: 0.0)
+    tool = FakeVeriniceTool(stored=True)
+
+    summary = scheduler.runOnce(tool)
+
+    assert summary['current'] == 1
+    assert tool.generated == []
@@ -0,0 +1,114 @@
+"""On-disk report store: keys, revisions, streaming and eviction (tools/reportStore.py)"""
+import os
+import time
+
+import pytest
+
+from tools.reportStore import ReportStore, servableSince
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path), maxBytes=1024, maxAgeSeconds=3600)
+
+
+def test_report_key_is_stable_and_depends_on_params(store):
+    key = store.reportKey('inventory', 'd1', {'scope': 's1'})
+
+    assert key == store.reportKey('inventory', 'd1', {'scope': 's1'})
+    assert key != store.reportKey('inventory', 'd1', {'scope': 's2'})
+    assert key != store.reportKey('inventory', 'd2', {'scope': 's1'})
+
+
+def test_bump_revision_retires_keys_of_that_domain_only(store):
+    d1, d2 = store.reportKey('r', 'd1', {}), store.reportKey('r', 'd2', {})
+    store.bumpRevision('d1')
+
+    assert store.reportKey('r', 'd1', {}) != d1
+    assert store.reportKey('r', 'd2', {}) == d2
+
+
+def test_bump_revision_without_domain_retires_every_key(store):
+    d1 = store.reportKey('r', 'd1', {})
+    store.bumpRevision()
+    assert store.reportKey('r', 'd1', {}) != d1
+
+
+def test_revisions_survive_a_restart(tmp_path, store):
+    store.bumpRevision('d1')
+    key = store.reportKey('r', 'd1', {})
+
+    reopened = ReportStore(str(tmp_path), maxBytes=1024, maxAgeSeconds=3600)
+    assert reopened.reportKey('r', 'd1', {}) == key
+
+
+def test_put_streams_chunks_to_disk_and_get_serves_them(store):
+    handle = store.reportKey('r', 'd1', {})
+    meta = store.put(handle, iter([b'%PDF', b'', b'-1.7']), {'format': 'pdf'})
+
+    assert (meta['handle'], meta['size'], meta['format']) == (handle, 8, 'pdf')
+    assert store.get(handle)['size'] == 8
+    assert b''.join(store.iterChunks(handle, chunkSize=3)) == b'%PDF-1.7'
+    assert (store.stats['hits'], store.stats['downloads']) == (1, 1)
+
+
+def test_reports_stored_before_not_before_are_misses(store):
+    handle = store.reportKey('r', 'd1', {})
+    meta = store.put(handle, [b'x'], {})
+
+    assert store.get(handle, notBefore=meta['storedAt'] + 1) is None
+    assert store.get(handle, notBefore=meta['storedAt']) is not None
+    assert (store.stats['misses'], store.stats['hits']) == (1, 1)
+
+
+def test_stored_copies_are_not_servable_without_the_event_consumer(monkeypatch):
+    import tools.veriniceEvents as veriniceEvents
+    monkeypatch.setattr(veriniceEvents, '_consumer', None)
+    assert servableSince() is None
+
+
+def test_get_of_an_unknown_handle_is_a_miss(store):
+    assert store.get('0' * 64) is None
+    assert store.stats['misses'] == 1
+
+
+def test_invalid_handles_never_reach_the_filesystem(store):
+    assert store.lookup('../revisions') is None
+    with pytest.raises(ValueError):
+        store.put('../escape', [b'x'], {})
+
+
+def test_failed_writes_leave_no_partial_file(store, tmp_path):
+    handle = store.reportKey('r', 'd1', {})
+
+    def chunks():
+        yield b'partial'
+        raise IOError('connection reset')
+
+    with pytest.raises(IOError):
+        store.put(handle, chunks(), {})
+    assert store.lookup(handle) is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_expired_reports_are_not_served(tmp_path):
+    store = ReportStore(str(tmp_path), maxBytes=1024, maxAgeSeconds=0)
+    handle = store.reportKey('r', 'd1', {})
+    store.put(handle, [b'x'], {})
+    time.sleep(0.01)
+    assert store.get(handle) is None
+
+
+def test_least_recently_used_reports_are_evicted_above_max_bytes(tmp_path):
+    store = ReportStore(str(tmp_path), maxBytes=10, maxAgeSeconds=3600)
+    first, second, third = (store.reportKey(r, 'd1', {}) for r in ('a', 'b', 'c'))
+    store.put(first, [b'12345'], {})
+    store.put(second, [b'12345'], {})
+    # Age second so it is the least recently used
+    past = time.time() - 60
+    os.utime(os.path.join(str(tmp_path), f"{second}.bin"), (past, past))
+    store.put(third, [b'12345'], {})
+
+    assert store.lookup(second) is None
+    assert store.lookup(first) is not None and store.lookup(third) is not None
+    assert store.stats['evicted'] == 1
@@ -0,0 +1,100 @@
+"""Per-turn read memoisation (tools/requestCache.py)"""
+import threading
+
+import tools.requestCache as requestCache
+from tools.requestCache import cachedRead, invalidatesReads, onWrite, requestScope
+
+
+class _Tool:
+    """Stand-in for VeriniceTool: counts backend reads, writes through the decorators"""
+
+    def __init__(self):
+        self.reads = 0
+        self.fail = False
+
+    @cachedRead
+    def listObjects(self, objectType, domainId=None, filters=None):
+        self.reads += 1
+        if self.fail:
+            return {'success': False, 'error': 'down'}
+        return {'success': True, 'objects': {'items': [{'id': 'a1', 'name': 'Firewall'}]}}
+
+    @invalidatesReads
+    def updateObject(self, objectType, domainId, objectId, data):
+        return {'success': True}
+
+
+def test_reads_are_memoised_only_inside_a_scope():
+    tool = _Tool()
+    tool.listObjects('asset', 'd1')
+    tool.listObjects('asset', 'd1')
+    assert tool.reads == 2
+
+    with requestScope() as cache:
+        tool.listObjects('asset', 'd1')
+        tool.listObjects('asset', 'd1')
+        tool.listObjects('asset', 'd2')
+        tool.listObjects('asset', 'd1', filters={'name': 'Firewall'})
+    assert tool.reads == 5
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # The cache dies with the scope
+    tool.listObjects('asset', 'd1')
+    assert tool.reads == 6
+
+
+def test_nested_scopes_share_the_outer_cache():
+    tool = _Tool()
+    with requestScope() as outer:
+        tool.listObjects('asset', 'd1')
+        with requestScope() as inner:
+            tool.listObjects('asset', 'd1')
+    assert inner is outer
+    assert tool.reads == 1
+
+
+def test_scopes_are_per_thread():
+    tool = _Tool()
+    with requestScope():
+        tool.listObjects('asset', 'd1')
+        worker = threading.Thread(target=tool.listObjects, args=('asset', 'd1'))
+        worker.start()
+        worker.join()
+    assert tool.reads == 2
+
+
+def test_callers_get_deep_copies():
+    tool = _Tool()
+    with requestScope():
+        first = tool.listObjects('asset', 'd1')
+        first['objects']['items'][0]['name'] = 'changed'
+        second = tool.listObjects('asset', 'd1')
+        second['objects']['items'].clear()
+        third = tool.listObjects('asset', 'd1')
+    assert third['objects']['items'][0]['name'] == 'Firewall'
+
+
+def test_failed_reads_are_not_memoised():
+    tool = _Tool()
+    tool.fail = True
+    with requestScope():
+        tool.listObjects('asset', 'd1')
+        tool.fail = False
+        assert tool.listObjects('asset', 'd1')['success']
+    assert tool.reads == 2
+
+
+def test_writes_invalidate_the_scope_and_notify_listeners():
+    tool = _Tool()
+    seen = []
+    listener = onWrite(lambda methodName, args: seen.append((methodName, args[2])))
+    try:
+        with requestScope() as cache:
+            tool.listObjects('asset', 'd1')
+            tool.updateObject('asset', 'd1', 'a1', {'name': 'New'})
+            tool.listObjects('asset', 'd1')
+        assert tool.reads == 2
+        assert cache.invalidations == 1
+        assert seen == [('updateObject', 'a1')]
+    finally:
+        requestCache._writeListeners.remove(listener)
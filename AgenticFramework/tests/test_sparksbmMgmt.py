@@ -0,0 +1,186 @@
+"""SingleFlight and ConditionalGetCache (SparksbmISMS/scripts/sparksbmMgmt.py)"""
+import threading
+import time
+
+import requests
+
+from sparksbmMgmt import ConditionalGetCache, SingleFlight
+
+
+def _response(body: bytes, etag=None, status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = requests.structures.CaseInsensitiveDict({'ETag': etag} if etag else {})
+    response.encoding = 'utf-8'
+    response.url = 'http://veo/assets/1'
+    return response
+
+
+def _startCallers(count: int, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+# ==================== SingleFlight ====================
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return _response(b'{"id": 1}')
+
+    threads = _startCallers(4, lambda: results.append(flight.do(('GET', 'url'), call)))
+    # Wait until the followers are parked on the leader's flight
+    deadline = time.time() + 5
+    while flight.stats['coalesced'] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert [r.json() for r in results] == [{'id': 1}] * 4
+    # Followers get their own Response objects
+    assert len({id(r) for r in results}) == 4
+    assert flight.stats['executed'] == 1
+    assert flight.stats['coalesced'] == 3
+    assert flight.getMetrics()['inFlight'] == 0
+
+
+def test_single_flight_shares_the_leaders_exception():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    errors = []
+
+    def call():
+        release.wait(5)
+        raise requests.ConnectionError('down')
+
+    def caller():
+        try:
+            flight.do(('GET', 'url'), call)
+        except requests.ConnectionError as e:
+            errors.append(e)
+
+    threads = _startCallers(3, caller)
+    deadline = time.time() + 5
+    while flight.stats['coalesced'] < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3
+    assert flight.stats['errors'] == 1
+
+
+def test_single_flight_does_not_cache_after_completion():
+    flight = SingleFlight('test')
+    calls = []
+
+    def call():
+        calls.append(1)
+        return _response(b'{}')
+
+    flight.do(('GET', 'url'), call)
+    flight.do(('GET', 'url'), call)
+    assert len(calls) == 2
+    assert flight.stats['coalesced'] == 0
+
+
+
+def test_single_flight_calls_after_a_write_do_not_join_earlier_flights():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    bodies = iter([b'{"v": "before"}', b'{"v": "after"}'])
+    results = {}
+
+    def call():
+        body = next(bodies)
+        release.wait(5)
+        return _response(body)
+
+    before = threading.Thread(target=lambda: results.update(before=flight.do(('GET', 'url'), call)))
+    before.start()
+    deadline = time.time() + 5
+    while flight.getMetrics()['inFlight'] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+
+    flight.markWrite()
+    after = threading.Thread(target=lambda: results.update(after=flight.do(('GET', 'url'), call)))
+    after.start()
+    deadline = time.time() + 5
+    while flight.getMetrics()['inFlight'] < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    before.join(5)
+    after.join(5)
+
+    assert results['before'].json() == {'v': 'before'}
+    assert results['after'].json() == {'v': 'after'}
+    assert flight.stats['executed'] == 2 and flight.stats['coalesced'] == 0
+    assert flight.getMetrics()['inFlight'] == 0
+
+# ==================== ConditionalGetCache ====================
+
+def test_conditional_get_stores_only_responses_with_an_etag():
+    cache = ConditionalGetCache('test')
+    cache.store(('u1',), _response(b'no etag'))
+    assert cache.lookup(('u1',)) is None
+
+    cache.store(('u2',), _response(b'body', etag='"v1"'))
+    entry = cache.lookup(('u2',))
+    assert entry is not None and entry.etag == '"v1"'
+    assert cache.stats['conditional'] == 1
+
+
+def test_conditional_get_replays_the_stored_body_on_304():
+    cache = ConditionalGetCache('test')
+    cache.store(('u',), _response(b'{"name": "Firewall"}', etag='"v1"'))
+    entry = cache.lookup(('u',))
+
+    replayed = cache.replay(entry, _response(b'', status=304))
+
+    assert replayed.status_code == 200
+    assert replayed.json() == {'name': 'Firewall'}
+    assert replayed.headers['ETag'] == '"v1"'
+    assert cache.stats['notModified'] == 1
+    assert cache.stats['bytesSaved'] == len(b'{"name": "Firewall"}')
+
+
+def test_conditional_get_skips_bodies_above_the_size_limit():
+    cache = ConditionalGetCache('test', maxBodyBytes=4)
+    cache.store(('u',), _response(b'too large', etag='"v1"'))
+    assert cache.lookup(('u',)) is None
+
+
+def test_conditional_get_evicts_least_recently_used():
+    cache = ConditionalGetCache('test', maxEntries=2)
+    cache.store(('a',), _response(b'a', etag='"a"'))
+    cache.store(('b',), _response(b'b', etag='"b"'))
+    cache.lookup(('a',))
+    cache.store(('c',), _response(b'c', etag='"c"'))
+
+    assert cache.lookup(('b',)) is None
+    assert cache.lookup(('a',)) is not None
+    assert cache.stats['evictions'] == 1
+
+
+def test_conditional_get_invalidate_drops_every_get_of_the_url():
+    cache = ConditionalGetCache('test')
+    cache.store(('http://veo/assets/1', 'p=1'), _response(b'1', etag='"1"'))
+    cache.store(('http://veo/assets/1', 'p=2'), _response(b'2', etag='"2"'))
+    cache.store(('http://veo/assets/2', 'p=1'), _response(b'3', etag='"3"'))
+
+    cache.invalidate('http://veo/assets/1')
+
+    assert cache.getMetrics()['entries'] == 1
+    assert cache.stats['invalidations'] == 2
@@ -0,0 +1,134 @@
+"""StaleWhileRevalidateCache (utils/staleWhileRevalidate.py)"""
+import threading
+import time
+
+from utils.staleWhileRevalidate import StaleWhileRevalidateCache
+
+
+def _loader(*values, cacheable=True):
+    """Loader returning values in order (the last one repeats), counting calls"""
+    calls = []
+
+    def load():
+        calls.append(1)
+        return values[min(len(calls), len(values)) - 1], cacheable
+    return load, calls
+
+
+def test_miss_loads_synchronously_and_stores():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=60)
+    load, calls = _loader('v1')
+
+    value, info = cache.get('k', load)
+    assert (value, info['cached']) == ('v1', False)
+
+    value, info = cache.get('k', load)
+    assert (value, info['cached'], info['revalidating']) == ('v1', True, False)
+    assert len(calls) == 1
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+
+def test_failed_loads_are_not_stored():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=60)
+    load, calls = _loader({'success': False}, cacheable=False)
+
+    cache.get('k', load)
+    cache.get('k', load)
+    assert len(calls) == 2
+
+
+def test_entries_past_the_stale_bound_reload_synchronously():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=0, freshSeconds=0)
+    load, calls = _loader('v1', 'v2')
+
+    cache.get('k', load)
+    value, info = cache.get('k', load)
+    assert (value, info['cached']) == ('v2', False)
+    assert len(calls) == 2
+
+
+def test_stale_hit_serves_old_value_and_pushes_the_refreshed_one():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=0)
+    load, _ = _loader('v1', 'v2')
+    changed = threading.Event()
+    pushed = []
+
+    def onChange(value):
+        pushed.append(value)
+        changed.set()
+
+    cache.get('k', load)
+    value, info = cache.get('k', load, onChange=onChange)
+
+    assert (value, info['cached'], info['revalidating']) == ('v1', True, True)
+    assert changed.wait(5)
+    assert pushed == ['v2']
+    assert cache.stats['changed'] == 1
+
+
+def test_unchanged_refresh_does_not_call_on_change():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=0)
+    refreshed = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        if len(calls) > 1:
+            refreshed.set()
+        return 'same', True
+
+    pushed = []
+    cache.get('k', load)
+    cache.get('k', load, onChange=pushed.append)
+    assert refreshed.wait(5)
+    # The refresh thread stores and compares after the loader returns
+    time.sleep(0.1)
+    assert pushed == []
+    assert cache.stats['refreshes'] == 1
+
+
+def test_invalidate_discards_a_refresh_started_before_it():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=0)
+    release = threading.Event()
+    finished = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        if len(calls) == 2:
+            release.wait(5)
+            finished.set()
+            return 'stale refresh', True
+        return f'v{len(calls)}', True
+
+    pushed = []
+    cache.get('k', load)
+    cache.get('k', load, onChange=pushed.append)
+    cache.invalidate()
+    release.set()
+    assert finished.wait(5)
+    time.sleep(0.1)
+
+    value, info = cache.get('k', load)
+    assert value == 'v3' and info['cached'] is False
+    assert pushed == []
+
+
+def test_invalidate_with_predicate_keeps_other_keys():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=60)
+    cache.get(('asset', 'd1'), lambda: ('assets', True))
+    cache.get(('scope', 'd1'), lambda: ('scopes', True))
+
+    cache.invalidate(lambda key: key[0] == 'asset')
+
+    assert cache.getMetrics()['entries'] == 1
+    assert cache.get(('scope', 'd1'), lambda: ('reloaded', True))[0] == 'scopes'
+
+
+def test_max_entries_evicts_oldest():
+    cache = StaleWhileRevalidateCache('test', staleSeconds=60, freshSeconds=60, maxEntries=2)
+    for key in ('a', 'b', 'c'):
+        cache.get(key, lambda key=key: (key, True))
+
+    assert cache.getMetrics()['entries'] == 2
+    assert cache.get('a', lambda: ('reloaded', True))[0] == 'reloaded'
@@ -0,0 +1,37 @@
+"""Single-pass whole-word typo correction (utils/typoCorrector.py)"""
+from utils.typoCorrector import TypoCorrector, _legacyCorrect, buildTypoMap
+
+
+def test_corrects_whole_words_only():
+    corrector = TypoCorrector({'creat': 'create', 'assest': 'asset'})
+
+    assert corrector.correct('creat a new assest') == 'create a new asset'
+    # Substrings of longer words are left alone, as with r'\bTYPO\b'
+    assert corrector.correct('created the assests') == 'created the assests'
+
+
+def test_multi_word_typos_prefer_the_longer_entry():
+    corrector = TypoCorrector({'main firewal': 'main firewall', 'firewal': 'firewall', 'socpe': 'scope'})
+
+    assert corrector.correct('add main firewal to the socpe') == 'add main firewall to the scope'
+    assert corrector.correct('a firewal') == 'a firewall'
+    assert len(corrector) == 3
+
+
+def test_identity_and_empty_entries_are_dropped():
+    corrector = TypoCorrector({'scope': 'scope', '': 'x', 'scop': 'scope'})
+
+    assert len(corrector) == 1
+    assert corrector.correct('') == ''
+
+
+def test_matches_the_legacy_per_typo_loop():
+    corrections = {'creat': 'create', 'persn': 'person', 'scops': 'scopes', 'list all': 'list every'}
+    message = 'creat a persn and list all scops, then creat more'
+
+    assert TypoCorrector(corrections).correct(message) == _legacyCorrect(message, corrections)
+
+
+def test_build_typo_map_lets_corrections_override_variations():
+    typoMap = buildTypoMap({'asset': ['assest', 'aset'], 'scope': ['scop']}, {'aset': 'set'})
+    assert typoMap == {'assest': 'asset', 'aset': 'set', 'scop': 'scope'}
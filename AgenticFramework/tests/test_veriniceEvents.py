@@ -0,0 +1,163 @@
+"""veo change event parsing and the consumer's de-duplication (tools/veriniceEvents.py)"""
+import json
+import time
+
+import pytest
+
+import tools.veriniceEvents as veriniceEvents
+from tools.veriniceEvents import (
+    EVENT_DOMAIN_CREATION, EVENT_ENTITY_REVISION, EVENT_UNIT_DELETION,
+    InMemoryBroker, VeriniceEventConsumer, eventFromRevision, parseMessage
+)
+
+_ASSET_URI = 'http://veo/assets/a1'
+
+
+def _revision(changeType='MODIFICATION', uri=_ASSET_URI, content=None):
+    return {
+        'uri': uri, 'type': changeType, 'changeNumber': 3, 'time': '2026-01-01T00:00:00Z',
+        'content': content if content is not None else {
+            'name': 'Firewall',
+            'owner': {'targetUri': 'http://veo/units/u1'},
+            'domains': {'d1': {'subType': 'AST_IT', 'status': 'NEW'}, 'd2': {}}
+        }
+    }
+
+
+def _message(event, messageId=1):
+    """veo EventMessage envelope: the event JSON is a string in 'content'"""
+    return json.dumps({'id': messageId, 'routingKey': 'veo.message.x', 'content': json.dumps(event)})
+
+
+def test_event_from_revision_reads_uri_domains_and_unit():
+    event = eventFromRevision(_revision())
+
+    assert (event.resourceType, event.resourceId) == ('asset', 'a1')
+    assert event.domainIds == ['d1', 'd2']
+    assert event.unitId == 'u1'
+    assert event.isElement and not event.isDeletion
+
+
+def test_event_from_revision_maps_risks_to_their_element():
+    event = eventFromRevision(_revision(uri='http://veo/processes/p1/risks/s1', content={}))
+    assert (event.resourceType, event.resourceId) == ('process', 'p1')
+
+
+def test_event_from_revision_of_a_deletion_has_no_content():
+    event = eventFromRevision(_revision('HARD_DELETION', content={}))
+    assert event.isDeletion
+    assert event.domainIds == []
+
+
+def test_parse_message_unwraps_the_event_message_envelope():
+    body = _message({**_revision(), 'eventType': EVENT_ENTITY_REVISION}, messageId=42)
+    event = parseMessage('veo.message.entity_revision', body.encode('utf-8'))
+
+    assert event.eventType == EVENT_ENTITY_REVISION
+    assert event.messageId == 42
+    assert event.resourceId == 'a1'
+
+
+def test_parse_message_takes_the_event_type_from_the_routing_key():
+    event = parseMessage('veo.message.domain_creation', {'domainId': 'd9'})
+
+    assert event.eventType == EVENT_DOMAIN_CREATION
+    assert (event.resourceType, event.resourceId, event.domainIds) == ('domain', 'd9', ['d9'])
+
+
+def test_parse_message_unit_deletion():
+    event = parseMessage('veo.message.unit_deletion', _message({'eventType': EVENT_UNIT_DELETION, 'unitId': 'u1'}))
+    assert (event.resourceType, event.unitId, event.isDeletion) == ('unit', 'u1', True)
+
+
+def test_parse_message_ignores_non_objects():
+    assert parseMessage('veo.message.entity_revision', '[1, 2]') is None
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Capture dispatched events instead of running the process-wide listeners"""
+    events = []
+    monkeypatch.setattr(veriniceEvents, 'dispatchEvent', lambda event: events.append(event) or 0)
+    return events
+
+
+def test_consumer_drops_redelivered_messages(dispatched):
+    consumer = VeriniceEventConsumer(InMemoryBroker())
+    body = _message({**_revision(), 'eventType': EVENT_ENTITY_REVISION}, messageId=7)
+
+    assert consumer.handleMessage('veo.message.entity_revision', body) is not None
+    assert consumer.handleMessage('veo.message.entity_revision', body) is None
+
+    assert len(dispatched) == 1
+    assert consumer.stats['duplicates'] == 1
+    assert consumer.byType == {EVENT_ENTITY_REVISION: 1}
+
+
+def test_consumer_counts_unparseable_messages(dispatched):
+    consumer = VeriniceEventConsumer(InMemoryBroker())
+
+    assert consumer.handleMessage('veo.message.entity_revision', b'not json') is None
+    assert consumer.stats['parseErrors'] == 1
+    assert dispatched == []
+
+
+def test_consumer_receives_messages_published_on_the_in_memory_broker(dispatched):
+    broker = InMemoryBroker()
+    consumer = VeriniceEventConsumer(broker)
+    consumer.start()
+    try:
+        deadline = time.time() + 5
+        while not consumer.connected and time.time() < deadline:
+            time.sleep(0.01)
+        assert consumer.connectedSince is not None
+        broker.publish('veo.message.domain_creation', {'domainId': 'd9'})
+    finally:
+        consumer.stop()
+        consumer._thread.join(5)
+
+    assert [event.resourceId for event in dispatched] == ['d9']
+    assert (consumer.connected, consumer.connectedSince) == (False, None)
+
+
+def test_events_are_not_delivered_without_a_consumer(monkeypatch):
+    monkeypatch.setattr(veriniceEvents, '_consumer', None)
+    assert veriniceEvents.eventsDeliveredSince() is None
+
+
+# ==================== MIRROR ====================
+
+@pytest.fixture
+def mirror(monkeypatch):
+    """A fresh in-memory mirror with one synced asset list for d1"""
+    import tools.veriniceMirror as veriniceMirror
+    mirror = veriniceMirror.VeriniceMirror(':memory:')
+    mirror.replaceList('d1', 'asset', [{
+        'id': 'a1', 'name': 'Old name', 'subType': 'AST_IT', 'status': 'NEW',
+        'owner': {'targetUri': 'http://veo/units/u1'}, 'customAspects': {'x': 1}
+    }])
+    monkeypatch.setattr(veriniceMirror, 'getVeriniceMirror', lambda: mirror)
+    return mirror
+
+
+def test_revision_events_merge_into_the_mirrored_row(mirror):
+    veriniceEvents._applyToMirror(eventFromRevision(_revision(content={
+        'name': 'Firewall', 'domains': {'d1': {'status': 'RELEASED'}}
+    })))
+
+    listing = mirror.listObjects('d1', 'asset')
+    assert listing is not None
+    item = listing['objects']['items'][0]
+    assert (item['name'], item['status'], item['subType']) == ('Firewall', 'RELEASED', 'AST_IT')
+    # Fields the event does not carry are kept
+    assert item['customAspects'] == {'x': 1}
+    assert mirror.listObjects('d1', 'asset', {'status': 'RELEASED'})['count'] == 1
+
+
+def test_revision_events_for_unmirrored_objects_mark_the_list_stale(mirror):
+    veriniceEvents._applyToMirror(eventFromRevision(_revision(
+        uri='http://veo/assets/a2', content={'name': 'New', 'domains': {'d1': {}}}
+    )))
+
+    assert mirror.listObjects('d1', 'asset') is None
+    assert mirror._conn.execute("SELECT COUNT(*) FROM objects WHERE id = 'a2'").fetchone()[0] == 0
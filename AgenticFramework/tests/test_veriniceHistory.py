@@ -0,0 +1,183 @@
+"""Incremental veo-history sync: duplicate, gap and reject handling (tools/veriniceHistory.py)"""
+import logging
+
+import pytest
+
+import tools.veriniceHistory as veriniceHistory
+from tools.veriniceHistory import VeriniceHistorySync
+from tools.veriniceMirror import VeriniceMirror
+
+
+class FakeMirror:
+    def __init__(self):
+        self.stale = []
+        self.collectionDrops = 0
+        self.meta = {}
+        self.changeNumbers = {}
+        self.fullSyncs = 0
+
+    def markStale(self, domainId, objectType=None):
+        self.stale.append((domainId, objectType))
+
+    def dropCollection(self):
+        self.collectionDrops += 1
+
+    def getMeta(self, key):
+        return self.meta.get(key)
+
+    def setMeta(self, key, value):
+        self.meta[key] = value
+
+    def confirmCurrent(self):
+        pass
+
+    def sync(self, veriniceTool):
+        self.fullSyncs += 1
+        return {'errors': []}
+
+    def loadChangeNumbers(self, limit):
+        return dict(self.changeNumbers)
+
+    def storeChangeNumbers(self, changeNumbers, limit):
+        self.changeNumbers.update(changeNumbers)
+
+    def clearChangeNumbers(self):
+        self.changeNumbers.clear()
+
+
+def _revision(changeNumber, uri='http://veo/assets/a1', domains=('d1',)):
+    return {'uri': uri, 'type': 'MODIFICATION', 'changeNumber': changeNumber,
+            'time': '2026-01-01T00:00:00Z', 'content': {'domains': {d: {} for d in domains}}}
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    events = []
+    monkeypatch.setattr(veriniceHistory, 'dispatchEvent', lambda event: events.append(event) or 0)
+    return events
+
+
+@pytest.fixture
+def sync():
+    return VeriniceHistorySync(FakeMirror(), 'http://history')
+
+
+def test_first_revision_of_a_resource_is_not_a_gap(sync, dispatched):
+    summary = sync._apply([_revision(5)])
+
+    assert summary == {'changes': 1, 'applied': 1, 'duplicates': 0, 'gaps': 0}
+    assert sync.mirror.stale == []
+    assert len(dispatched) == 1
+
+
+def test_consecutive_revisions_apply_without_gaps(sync, dispatched):
+    summary = sync._apply([_revision(1), _revision(2), _revision(3)])
+
+    assert (summary['applied'], summary['gaps']) == (3, 0)
+    assert sync.mirror.stale == []
+
+
+def test_already_applied_revisions_are_duplicates(sync, dispatched):
+    sync._apply([_revision(1), _revision(2)])
+    summary = sync._apply([_revision(2), _revision(3)])
+
+    assert (summary['applied'], summary['duplicates']) == (1, 1)
+    assert len(dispatched) == 3
+    assert sync.stats['duplicates'] == 1
+
+
+def test_skipped_change_numbers_mark_the_element_lists_stale(sync, dispatched):
+    sync._apply([_revision(1, domains=('d1', 'd2'))])
+    summary = sync._apply([_revision(4, domains=('d1', 'd2'))])
+
+    assert summary['gaps'] == 1
+    assert sync.mirror.stale == [('d1', 'asset'), ('d2', 'asset')]
+    # The newer revision itself is still applied
+    assert summary['applied'] == 1
+    assert sync.stats['resourceGaps'] == 1
+
+
+def test_gaps_are_tracked_per_resource(sync, dispatched):
+    summary = sync._apply([_revision(1, uri='http://veo/assets/a1'), _revision(7, uri='http://veo/assets/a2')])
+    assert summary['gaps'] == 0
+
+
+def test_domain_gap_marks_the_domain_and_drops_the_collection(sync, dispatched):
+    sync._apply([_revision(1, uri='http://veo/domains/d1')])
+    sync._apply([_revision(3, uri='http://veo/domains/d1')])
+
+    assert sync.mirror.stale == [('d1', None)]
+    assert sync.mirror.collectionDrops == 1
+
+
+class _Response:
+    def __init__(self, status, body=None):
+        self.status_code = status
+        self.body = [] if body is None else body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.body
+
+
+class _HistoryTool:
+    """veriniceTool.client.session.get answering every history request with one status"""
+
+    def __init__(self, status):
+        self.status = status
+        self.gets = 0
+        self.client = self
+        self.session = self
+
+    def get(self, url, params=None, timeout=None):
+        self.gets += 1
+        return _Response(self.status)
+
+
+def test_rejects_warn_once_then_switch_off_incremental_sync(sync, dispatched, caplog):
+    sync.mirror.setMeta('history.cursor', '2026-01-01T00:00:00Z')
+    tool = _HistoryTool(404)
+
+    with caplog.at_level(logging.WARNING, logger=veriniceHistory.__name__):
+        sync.sync(tool)
+        assert len(caplog.records) == 1
+        assert 'VEO_HISTORY_CHANGES_PATH' in caplog.records[0].getMessage()
+        sync.sync(tool)
+        sync.sync(tool)
+        assert len(caplog.records) == 2
+
+    assert not sync.getMetrics()['incremental']
+    summary = sync.sync(tool)
+    assert summary['reason'] == 'incremental sync disabled'
+    assert tool.gets == 3
+    assert sync.mirror.fullSyncs == 4
+    assert sync.stats['rejects'] == 3
+
+
+def test_a_successful_request_resets_the_reject_count(sync, dispatched):
+    sync.mirror.setMeta('history.cursor', '2026-01-01T00:00:00Z')
+    tool = _HistoryTool(404)
+    sync.sync(tool)
+    sync.sync(tool)
+    tool.status = 200
+    sync.sync(tool)
+    tool.status = 404
+    sync.sync(tool)
+
+    assert sync.incremental
+    assert sync.stats['incrementalSyncs'] == 1
+
+
+def test_change_numbers_survive_a_restart(dispatched):
+    mirror = VeriniceMirror(':memory:', maxAgeSeconds=60)
+    VeriniceHistorySync(mirror, 'http://history')._apply([_revision(1), _revision(2)])
+
+    restarted = VeriniceHistorySync(mirror, 'http://history')
+    summary = restarted._apply([_revision(2), _revision(4)])
+
+    assert (summary['duplicates'], summary['gaps']) == (1, 1)
+    mirror.clearChangeNumbers()
+    assert mirror.loadChangeNumbers(10) == {}
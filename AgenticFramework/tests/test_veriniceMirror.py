@@ -0,0 +1,65 @@
+"""SQLite read mirror: listings vs. writes made while they were in flight (tools/veriniceMirror.py)"""
+import time
+
+import pytest
+
+from tools.veriniceMirror import VeriniceMirror
+
+
+@pytest.fixture
+def mirror():
+    return VeriniceMirror(':memory:', maxAgeSeconds=60)
+
+
+def _names(mirror, domainId='d1', objectType='asset'):
+    listing = mirror.listObjects(domainId, objectType, degraded=True)
+    return sorted(item['name'] for item in listing['objects']['items'])
+
+
+def _asset(objectId, name):
+    return {'id': objectId, 'name': name, 'subType': 'AST_IT', 'status': 'NEW'}
+
+
+def test_replace_list_replaces_older_rows(mirror):
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Old'), _asset('a2', 'Gone')])
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Firewall')])
+
+    assert _names(mirror) == ['Firewall']
+    assert mirror.listObjects('d1', 'asset')['count'] == 1
+
+
+def test_writes_during_a_listing_are_kept(mirror):
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Firewall')])
+    fetchedAt = time.time()
+    # Written through while the listing below was in flight
+    mirror.upsertObjects('d1', 'asset', [_asset('a1', 'Renamed'), _asset('a2', 'Created')])
+
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Firewall')], fetchedAt=fetchedAt)
+
+    assert _names(mirror) == ['Created', 'Renamed']
+
+
+def test_deletes_during_a_listing_stay_deleted(mirror):
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Firewall'), _asset('a2', 'Router')])
+    fetchedAt = time.time()
+    mirror.deleteObject('a2')
+
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Firewall'), _asset('a2', 'Router')], fetchedAt=fetchedAt)
+    assert _names(mirror) == ['Firewall']
+
+    mirror.upsertObjects('d1', 'asset', [_asset('a2', 'Router')], partial=True, fetchedAt=fetchedAt)
+    assert _names(mirror) == ['Firewall']
+
+
+def test_listings_fetched_after_a_delete_may_show_the_object_again(mirror):
+    mirror.deleteObject('a2')
+    # e.g. restored in veo; the tombstone only guards listings older than the delete
+    mirror.replaceList('d1', 'asset', [_asset('a2', 'Router')], fetchedAt=time.time() + 0.001)
+    assert _names(mirror) == ['Router']
+
+
+def test_list_age_counts_from_the_fetch(mirror):
+    mirror.replaceList('d1', 'asset', [_asset('a1', 'Firewall')], fetchedAt=time.time() - 90)
+
+    assert mirror.listAge('d1', 'asset') >= 90
+    assert mirror.listObjects('d1', 'asset') is None
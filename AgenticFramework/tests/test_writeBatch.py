@@ -0,0 +1,110 @@
+"""Per-object write coalescing and ETag conflict retry (tools/writeBatch.py)"""
+import copy
+
+import requests
+
+from tools.veriniceTool import VeriniceTool
+from tools.writeBatch import PendingWrite, WriteBatch
+
+
+def _ref(objectId):
+    return {'targetUri': f'http://veo/assets/{objectId}'}
+
+
+def test_staged_updates_merge_into_one_delta():
+    pending = PendingWrite('scope', 'd1', 's1')
+    pending.stage(fields={'description': 'old'})
+    pending.stage(fields={'description': 'new', 'status': 'ACTIVE'})
+    pending.stage(membersKey='members', add=[_ref('a1'), _ref('a2')])
+    pending.stage(membersKey='members', remove=['a2', 'a9'])
+    pending.stage(membersKey='members', add=[_ref('a9')])
+
+    assert pending.mutations == 5
+    assert pending.fields == {'description': 'new', 'status': 'ACTIVE'}
+    assert pending.memberIds('members') == {'a1', 'a9'}
+    assert pending.removeMembers['members'] == {'a2'}
+
+
+def test_apply_keeps_existing_members_and_skips_duplicates():
+    pending = PendingWrite('scope', 'd1', 's1')
+    pending.stage(membersKey='members', add=[_ref('a1'), _ref('a3')], remove=['a2'])
+    fullObject = {'name': 'S', 'members': [{'id': 'a1'}, _ref('a2'), _ref('a4')]}
+
+    pending.apply(fullObject)
+
+    assert [m.get('id') or m['targetUri'][-2:] for m in fullObject['members']] == ['a1', 'a4', 'a3']
+
+
+def test_batch_sends_one_write_per_object():
+    class Tool:
+        def __init__(self):
+            self.writes = []
+
+        def _updateInDomain(self, objectType, domainId, objectId, mutate, retryOnConflict=False):
+            target = {'members': []}
+            mutate(target)
+            self.writes.append((objectId, target, retryOnConflict))
+            return {'success': True}
+
+    batch = WriteBatch()
+    batch.stage('scope', 'd1', 's1', membersKey='members', add=[_ref('a1')])
+    batch.stage('scope', 'd1', 's1', membersKey='members', add=[_ref('a2')])
+    batch.stage('scope', 'd1', 's2', fields={'status': 'NEW'})
+    # Already-present change: no mutation, no PUT
+    batch.stage('scope', 'd1', 's3')
+    tool = Tool()
+    batch.flush(tool)
+
+    assert [(objectId, len(target['members']), retry) for objectId, target, retry in tool.writes] == [
+        ('s1', 2, True), ('s2', 0, True)
+    ]
+    assert batch.stats() == {'mutations': 3, 'puts': 2, 'putsSaved': 1, 'conflictRetries': 0}
+    assert batch.failedFor('s1') is None
+
+
+def _response(status, body=None, etag=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{}' if body is None else requests.compat.json.dumps(body).encode('utf-8')
+    response.headers = requests.structures.CaseInsensitiveDict({'ETag': etag} if etag else {})
+    response.url = 'http://veo/domains/d1/scopes/s1'
+    return response
+
+
+class _VeoScope:
+    """One scope behind If-Match: a concurrent writer adds a member before our first PUT"""
+
+    def __init__(self):
+        self.version = 1
+        self.body = {'id': 's1', 'name': 'S', 'owner': {'targetUri': 'http://veo/units/u1'},
+                     'subType': 'SCP_Scope', 'status': 'NEW', 'members': [_ref('a0')]}
+        self.puts = []
+
+    def makeRequest(self, method, url, json=None, headers=None):
+        if method == 'GET':
+            return _response(200, self.body, etag=f'"{self.version}"')
+        self.puts.append(copy.deepcopy(json))
+        if len(self.puts) == 1:
+            self.body['members'].append(_ref('aX'))
+            self.version += 1
+        if headers.get('If-Match') != f'"{self.version}"':
+            return _response(412)
+        self.body = json
+        self.version += 1
+        return _response(200)
+
+
+def test_conflict_rereads_and_reapplies_the_delta(monkeypatch):
+    tool = VeriniceTool(warmUp=False)
+    tool.client = _VeoScope()
+    monkeypatch.setattr(tool, '_ensureAuthenticated', lambda: True)
+
+    with tool.writeBatch() as batch:
+        tool.stageUpdate('scope', 'd1', 's1', membersKey='members', addMembers=[_ref('a1')])
+        tool.stageUpdate('scope', 'd1', 's1', membersKey='members', addMembers=[_ref('a2')])
+
+    assert batch.results['s1']['success']
+    assert batch.stats()['conflictRetries'] == 1
+    assert len(tool.client.puts) == 2
+    # The retry kept the concurrent writer's member and added both of ours
+    assert [m['targetUri'][-2:] for m in tool.client.body['members']] == ['a0', 'aX', 'a1', 'a2']
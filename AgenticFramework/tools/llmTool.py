@@ -2,51 +2,10 @@
 import os
 import json
 import re
-from pathlib import Path
 from typing import Dict, Optional, List, Any
-from dotenv import load_dotenv
+from utils.geminiClient import loadEnvironment, isGeminiInstalled, getModel, buildGenerationConfig
 
-# Load .env from AgenticFramework directory (explicit path)
-try:
-    _agenticFrameworkDir = Path(__file__).parent.parent
-    _envFile = _agenticFrameworkDir / '.env'
-    if _envFile.exists() and _envFile.is_file():
-        try:
-            load_dotenv(_envFile, override=True)
-        except Exception as e:
-            logger.warning(f"Could not read .env from AgenticFramework dir: {e}")
-            _projectRoot = _agenticFrameworkDir.parent
-            _envFileProject = _projectRoot / '.env'
-            if _envFileProject.exists() and _envFileProject.is_file():
-                try:
-                    load_dotenv(_envFileProject, override=False)
-                except Exception:
-                    load_dotenv(override=False)
-            else:
-                load_dotenv(override=False)
-    else:
-        _projectRoot = _agenticFrameworkDir.parent
-        _envFileProject = _projectRoot / '.env'
-        if _envFileProject.exists() and _envFileProject.is_file():
-            try:
-                load_dotenv(_envFileProject, override=False)
-            except Exception:
-                load_dotenv(override=False)
-        else:
-            load_dotenv(override=False)
-except Exception as e:
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Could not load .env from explicit path: {e}")
-    load_dotenv(override=False)
-
-# Try to import Google Gemini
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    genai = None
+GEMINI_AVAILABLE = isGeminiInstalled()
 
 
 class LLMTool:
@@ -57,6 +16,7 @@ class LLMTool:
         Args:
             provider: 'gemini' (only supported provider)
         """
+        loadEnvironment()
         self.provider = 'gemini'
         self.conversationHistory = []
         self.geminiApiKey = os.getenv('GEMINI_API_KEY', '')
@@ -69,18 +29,17 @@ class LLMTool:
         self._setup_gemini()
     
     def _setup_gemini(self):
-        """Setup Gemini client"""
+        """Validate Gemini setup - the model handle itself is created on first use"""
         if not GEMINI_AVAILABLE:
             raise RuntimeError("Google Generative AI library not installed. Run: pip install google-generativeai")
         
         if not self.geminiApiKey:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
-        
-        try:
-            genai.configure(api_key=self.geminiApiKey)
-            self.geminiClient = genai.GenerativeModel(self.geminiModel)
-        except Exception as e:
-            raise RuntimeError(f"Gemini setup failed: {e}")
+    
+    @property
+    def geminiClient(self):
+        """Shared GenerativeModel for the current model and key (lazy)"""
+        return getModel(self.geminiModel, self.geminiApiKey)
     
     def generate(self, prompt: str, systemPrompt: str = "", maxTokens: int = 512, provider: Optional[str] = None, retryOnRateLimit: bool = True, response_format: Optional[str] = None) -> str:
         """
@@ -129,7 +88,7 @@ class LLMTool:
                 # Generate content
                 response = self.geminiClient.generate_content(
                     full_prompt,
-                    generation_config=genai.types.GenerationConfig(**generation_config)
+                    generation_config=buildGenerationConfig(**generation_config)
                 )
                 
                 # Extract response text
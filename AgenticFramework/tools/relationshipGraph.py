@@ -0,0 +1,352 @@
+"""
+Relationship Graph
+
+In-memory graph of the members/parts links in one Verinice domain, so
+"what is linked to X", "is Y already linked to X" and impact analysis do not
+list and scan whole domains.
+
+Objects get dense integer node ids; each node has an array-backed forward
+(container -> member/part) and reverse (member/part -> container) edge list
+per link kind. Relationship queries and membership checks are O(degree);
+impact analysis is a BFS over the reverse edges (everything that contains X,
+directly or transitively, is affected when X is).
+
+A graph is built per domain from the domain's element lists and kept current
+incrementally: VeriniceTool feeds it every successful create/update/delete
+(updateFromObject / removeObject), and veo change events (tools/veriniceEvents)
+do the same for changes made elsewhere. It is rebuilt after
+RELATION_GRAPH_MAX_AGE_SECONDS or a full resync.
+
+Building lists every element type of the domain, so it never runs on the
+caller's thread: a lookup starts a background build and gets None (callers
+fall back to their list/GET path) until the graph exists; an aged graph keeps
+being served while its replacement builds.
+"""
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import Settings
+from tools.veriniceEvents import EVENT_RESYNC, onEvent
+from tools.writeBatch import memberRefId
+
+# Link kinds: scopes list their members, composite elements their parts
+EDGE_KINDS = ('members', 'parts')
+
+
+class RelationshipGraph:
+    """Members/parts adjacency for one domain"""
+
+    def __init__(self, domainId: str):
+        self.domainId = domainId
+        self.builtAt = time.time()
+        self._lock = threading.RLock()
+        self._nodeIds: Dict[str, int] = {}
+        self._objectIds: List[Optional[str]] = []
+        self._types: List[Optional[str]] = []
+        self._names: List[Optional[str]] = []
+        self._subTypes: List[Optional[str]] = []
+        self._out: Dict[str, List[array]] = {kind: [] for kind in EDGE_KINDS}
+        self._in: Dict[str, List[array]] = {kind: [] for kind in EDGE_KINDS}
+        self.edgeCount = 0
+
+    def __len__(self) -> int:
+        return len(self._nodeIds)
+
+    # ==================== NODES ====================
+
+    def _node(self, objectId: str) -> int:
+        """Node id for objectId, allocating one (with empty edge lists) if new"""
+        node = self._nodeIds.get(objectId)
+        if node is None:
+            node = len(self._objectIds)
+            self._nodeIds[objectId] = node
+            self._objectIds.append(objectId)
+            self._types.append(None)
+            self._names.append(None)
+            self._subTypes.append(None)
+            for kind in EDGE_KINDS:
+                self._out[kind].append(array('l'))
+                self._in[kind].append(array('l'))
+        return node
+
+    def addObject(self, objectId: str, objectType: Optional[str] = None, name: Optional[str] = None,
+                  subType: Optional[str] = None) -> int:
+        with self._lock:
+            node = self._node(objectId)
+            if objectType:
+                self._types[node] = objectType
+            if name is not None:
+                self._names[node] = name
+            if subType is not None:
+                self._subTypes[node] = subType
+            return node
+
+    def removeObject(self, objectId: str):
+        """Drop an object and every edge to or from it"""
+        with self._lock:
+            node = self._nodeIds.pop(objectId, None)
+            if node is None:
+                return
+            for kind in EDGE_KINDS:
+                for target in self._out[kind][node]:
+                    self._in[kind][target].remove(node)
+                    self.edgeCount -= 1
+                for source in self._in[kind][node]:
+                    self._out[kind][source].remove(node)
+                    self.edgeCount -= 1
+                self._out[kind][node] = array('l')
+                self._in[kind][node] = array('l')
+            self._objectIds[node] = None
+            self._types[node] = self._names[node] = self._subTypes[node] = None
+
+    def describe(self, objectId: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            node = self._nodeIds.get(objectId)
+            return self._describe(node) if node is not None else None
+
+    def _describe(self, node: int) -> Dict[str, Any]:
+        return {'id': self._objectIds[node], 'type': self._types[node],
+                'name': self._names[node], 'subType': self._subTypes[node]}
+
+    # ==================== EDGES ====================
+
+    def addEdge(self, kind: str, sourceId: str, targetId: str) -> bool:
+        """Link source -> target; False if it already existed"""
+        with self._lock:
+            source, target = self._node(sourceId), self._node(targetId)
+            out = self._out[kind][source]
+            if target in out:
+                return False
+            out.append(target)
+            self._in[kind][target].append(source)
+            self.edgeCount += 1
+            return True
+
+    def removeEdge(self, kind: str, sourceId: str, targetId: str) -> bool:
+        with self._lock:
+            source, target = self._nodeIds.get(sourceId), self._nodeIds.get(targetId)
+            if source is None or target is None or target not in self._out[kind][source]:
+                return False
+            self._out[kind][source].remove(target)
+            self._in[kind][target].remove(source)
+            self.edgeCount -= 1
+            return True
+
+    def setEdges(self, kind: str, sourceId: str, targetIds: Iterable[str]):
+        """Replace source's outgoing edges of one kind (from a fresh copy of the object)"""
+        wanted = {t for t in targetIds if t}
+        with self._lock:
+            current = set(self.children(sourceId, kind))
+            for targetId in current - wanted:
+                self.removeEdge(kind, sourceId, targetId)
+            for targetId in wanted - current:
+                self.addEdge(kind, sourceId, targetId)
+
+    def updateFromObject(self, objectType: str, obj: Dict):
+        """Node and outgoing edges from an element as the API returns it"""
+        objectId = obj.get('id') or obj.get('resourceId')
+        if not objectId:
+            return
+        with self._lock:
+            self.addObject(objectId, objectType, obj.get('name'), obj.get('subType'))
+            for kind in EDGE_KINDS:
+                refs = obj.get(kind)
+                if isinstance(refs, list):
+                    self.setEdges(kind, objectId, (memberRefId(ref) for ref in refs))
+
+    # ==================== QUERIES ====================
+
+    def hasEdge(self, kind: str, sourceId: str, targetId: str) -> bool:
+        """O(out-degree of source)"""
+        with self._lock:
+            source, target = self._nodeIds.get(sourceId), self._nodeIds.get(targetId)
+            return source is not None and target is not None and target in self._out[kind][source]
+
+    def _neighbours(self, adjacency: Dict[str, List[array]], objectId: str, kind: Optional[str]) -> List[int]:
+        node = self._nodeIds.get(objectId)
+        if node is None:
+            return []
+        kinds = (kind,) if kind else EDGE_KINDS
+        seen, nodes = set(), []
+        for k in kinds:
+            for other in adjacency[k][node]:
+                if other not in seen:
+                    seen.add(other)
+                    nodes.append(other)
+        return nodes
+
+    def children(self, objectId: str, kind: Optional[str] = None) -> List[str]:
+        """Object ids objectId lists as members/parts"""
+        with self._lock:
+            return [self._objectIds[n] for n in self._neighbours(self._out, objectId, kind)]
+
+    def parents(self, objectId: str, kind: Optional[str] = None) -> List[str]:
+        """Object ids that list objectId as a member/part"""
+        with self._lock:
+            return [self._objectIds[n] for n in self._neighbours(self._in, objectId, kind)]
+
+    def related(self, objectId: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Direct neighbours, described, split by direction"""
+        with self._lock:
+            return {
+                'children': [self._describe(n) for n in self._neighbours(self._out, objectId, None)],
+                'parents': [self._describe(n) for n in self._neighbours(self._in, objectId, None)],
+            }
+
+    def impactOf(self, objectId: str, maxDepth: int = 5) -> List[Dict[str, Any]]:
+        """
+        Everything that (transitively) contains objectId - what is affected if
+        it is compromised - in BFS order, each with its distance.
+        """
+        return self._bfs(self._in, objectId, maxDepth)
+
+    def dependenciesOf(self, objectId: str, maxDepth: int = 5) -> List[Dict[str, Any]]:
+        """Everything objectId (transitively) contains"""
+        return self._bfs(self._out, objectId, maxDepth)
+
+    def _bfs(self, adjacency: Dict[str, List[array]], objectId: str, maxDepth: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            start = self._nodeIds.get(objectId)
+            if start is None:
+                return []
+            seen = {start}
+            queue: deque = deque([(start, 0)])
+            found = []
+            while queue:
+                node, depth = queue.popleft()
+                if depth >= maxDepth:
+                    continue
+                for kind in EDGE_KINDS:
+                    for other in adjacency[kind][node]:
+                        if other not in seen:
+                            seen.add(other)
+                            found.append({**self._describe(other), 'depth': depth + 1})
+                            queue.append((other, depth + 1))
+            return found
+
+    def getMetrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'domainId': self.domainId, 'nodes': len(self._nodeIds), 'edges': self.edgeCount,
+                    'age': round(time.time() - self.builtAt, 1)}
+
+
+# ==================== PER-DOMAIN REGISTRY ====================
+
+_graphsLock = threading.Lock()
+_graphs: Dict[str, RelationshipGraph] = {}
+# Domains with a background build running, so each domain has at most one
+_building: set = set()
+# Bumped by invalidate(): a build that started before it must not be installed
+_generation = 0
+_stats = {'builds': 0, 'buildErrors': 0, 'incrementalUpdates': 0, 'lookups': 0, 'misses': 0, 'staleServed': 0}
+
+
+def buildGraph(veriniceTool, domainId: str) -> Tuple[Optional[RelationshipGraph], Optional[str]]:
+    """(graph, None) from the domain's element lists, or (None, error)"""
+    graph = RelationshipGraph(domainId)
+    for objectType in veriniceTool.OBJECT_TYPES:
+        result = veriniceTool.listObjects(objectType, domainId)
+        if not result.get('success'):
+            return None, result.get('error', f'Failed to list {objectType}s')
+        objects = result.get('objects', {})
+        items = objects.get('items', []) if isinstance(objects, dict) else []
+        for item in items:
+            if isinstance(item, dict):
+                graph.updateFromObject(objectType, item)
+    graph.builtAt = time.time()
+    return graph, None
+
+
+def getRelationshipGraph(veriniceTool, domainId: Optional[str]) -> Optional[RelationshipGraph]:
+    """The domain's graph if built (aged ones are refreshed in the background); None until then"""
+    if not Settings.RELATION_GRAPH_ENABLED or not domainId:
+        return None
+    with _graphsLock:
+        _stats['lookups'] += 1
+        graph = _graphs.get(domainId)
+        if graph is not None and time.time() - graph.builtAt < Settings.RELATION_GRAPH_MAX_AGE_SECONDS:
+            return graph
+        _stats['misses' if graph is None else 'staleServed'] += 1
+        if domainId in _building:
+            return graph
+        _building.add(domainId)
+        generation = _generation
+    threading.Thread(
+        target=_buildInBackground, args=(veriniceTool, domainId, generation),
+        name=f"relation-graph-{domainId}", daemon=True
+    ).start()
+    return graph
+
+
+def _buildInBackground(veriniceTool, domainId: str, generation: int):
+    try:
+        graph, _ = buildGraph(veriniceTool, domainId)
+    except Exception:
+        graph = None
+    with _graphsLock:
+        _building.discard(domainId)
+        if graph is None:
+            _stats['buildErrors'] += 1
+        elif generation == _generation:
+            _stats['builds'] += 1
+            _graphs[domainId] = graph
+
+
+def updateFromObject(domainId: Optional[str], objectType: str, obj: Dict):
+    """Apply a freshly written/received object to its domain's graph (if built)"""
+    graph = _graphs.get(domainId) if domainId else None
+    if graph is not None and isinstance(obj, dict):
+        graph.updateFromObject(objectType, obj)
+        with _graphsLock:
+            _stats['incrementalUpdates'] += 1
+
+
+def removeObject(objectId: str):
+    """Drop a deleted object from every built graph"""
+    with _graphsLock:
+        graphs = list(_graphs.values())
+        _stats['incrementalUpdates'] += 1
+    for graph in graphs:
+        graph.removeObject(objectId)
+
+
+def invalidate(domainId: Optional[str] = None):
+    global _generation
+    with _graphsLock:
+        _generation += 1
+        if domainId:
+            _graphs.pop(domainId, None)
+        else:
+            _graphs.clear()
+
+
+def _onVeriniceEvent(event):
+    """Keep graphs in step with changes made outside this process"""
+    if event.eventType == EVENT_RESYNC:
+        invalidate()
+    elif event.isElement and event.resourceId:
+        if event.isDeletion:
+            removeObject(event.resourceId)
+        elif event.content:
+            for domainId in event.domainIds:
+                association = (event.content.get('domains') or {}).get(domainId) or {}
+                updateFromObject(domainId, event.resourceType,
+                                 {**event.content, 'id': event.resourceId, 'subType': association.get('subType')})
+    elif event.resourceType == 'domain':
+        for domainId in event.domainIds:
+            invalidate(domainId)
+
+
+onEvent(_onVeriniceEvent)
+
+
+def getRelationshipGraphMetrics() -> Dict[str, Any]:
+    with _graphsLock:
+        graphs = list(_graphs.values())
+        stats = dict(_stats)
+        building = sorted(_building)
+    return {'enabled': Settings.RELATION_GRAPH_ENABLED, **stats, 'building': building,
+            'domains': [g.getMetrics() for g in graphs]}
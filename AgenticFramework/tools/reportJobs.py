@@ -0,0 +1,215 @@
+"""
+Report Jobs
+
+Background runner for VeriniceTool.generateReport. Reports of big scopes take
+tens of seconds; the chat turn submits a job and returns at once, the job runs
+on a bounded pool (REPORT_JOBS_MAX_CONCURRENT at a time, the rest wait in
+order) and reports progress through an emit(eventType, data) callback - the
+agent's '_event_callback', which feeds the session's SSE EventQueue.
+
+Events (data is ReportJob.toDict()):
+
+- report_queued      job accepted
+- report_progress    'generating', then 'downloading' with the byte count
+- report_complete    result carries the report store handle and download URL
+- report_error       generation failed; 'error' says why
+
+An identical request (same report, domain and params) while a job for it is
+still queued or running returns that job instead of starting another; the
+caller is subscribed to it, and every later event goes to every subscriber.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+EmitFn = Callable[[str, Dict[str, Any]], None]
+
+
+@dataclass
+class ReportJob:
+    """One report generation request and its outcome"""
+    jobId: str
+    reportId: str
+    domainId: Optional[str]
+    params: Dict[str, Any]
+    # Session that started the job
+    sessionId: Optional[str] = None
+    # Caller context shown with the job (report name, scope name, ...)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    status: str = JOB_QUEUED
+    phase: Optional[str] = None
+    bytes: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    createdAt: float = field(default_factory=time.time)
+    startedAt: Optional[float] = None
+    finishedAt: Optional[float] = None
+    # (sessionId, emit) of every caller waiting for this job, the starting one first
+    subscribers: List[Tuple[Optional[str], Optional[EmitFn]]] = field(default_factory=list, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def toDict(self) -> Dict[str, Any]:
+        return {
+            'jobId': self.jobId,
+            'reportId': self.reportId,
+            'domainId': self.domainId,
+            'status': self.status,
+            'phase': self.phase,
+            'bytes': self.bytes,
+            'result': self.result,
+            'error': self.error,
+            'createdAt': self.createdAt,
+            'startedAt': self.startedAt,
+            'finishedAt': self.finishedAt,
+            **self.meta
+        }
+
+
+class ReportJobRunner:
+    """Bounded pool of report generations with per-job status"""
+
+    def __init__(self, maxConcurrent: int, historySize: int = 200):
+        self.maxConcurrent = max(1, maxConcurrent)
+        self.historySize = historySize
+        self._executor = ThreadPoolExecutor(max_workers=self.maxConcurrent, thread_name_prefix='report-job')
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, ReportJob]' = OrderedDict()
+        self._active: Dict[tuple, ReportJob] = {}
+        self.stats = {'submitted': 0, 'deduplicated': 0, 'completed': 0, 'failed': 0}
+
+    @staticmethod
+    def _jobKey(reportId: str, domainId: Optional[str], params: Dict) -> tuple:
+        return reportId, domainId, repr(sorted((params or {}).items()))
+
+    def submit(self, veriniceTool, reportId: str, domainId: Optional[str], params: Optional[Dict] = None,
+               sessionId: Optional[str] = None, emit: Optional[EmitFn] = None,
+               meta: Optional[Dict[str, Any]] = None) -> ReportJob:
+        """Queue a report; returns at once with the (possibly already running) job"""
+        params = dict(params or {})
+        key = self._jobKey(reportId, domainId, params)
+        with self._lock:
+            existing = self._active.get(key)
+            if existing is not None:
+                self.stats['deduplicated'] += 1
+                existing.subscribers.append((sessionId, emit))
+            else:
+                job = ReportJob(jobId=uuid.uuid4().hex, reportId=reportId, domainId=domainId, params=params,
+                                sessionId=sessionId, meta=dict(meta or {}), subscribers=[(sessionId, emit)])
+                self._jobs[job.jobId] = job
+                self._active[key] = job
+                self.stats['submitted'] += 1
+                self._trim()
+        if existing is not None:
+            # The new subscriber learns where the shared job is; later events reach everyone
+            self._emitTo(emit, 'report_queued' if existing.status == JOB_QUEUED else 'report_progress', existing)
+            return existing
+        self._emitTo(emit, 'report_queued', job)
+        self._executor.submit(self._run, veriniceTool, job, key)
+        return job
+
+    def _run(self, veriniceTool, job: ReportJob, key: tuple):
+        job.status = JOB_RUNNING
+        job.startedAt = time.time()
+
+        def onProgress(progress: Dict):
+            job.phase = progress.get('phase')
+            job.bytes = progress.get('bytes', job.bytes)
+            self._emit(job, 'report_progress')
+
+        try:
+            result = veriniceTool.generateReport(job.reportId, job.domainId, dict(job.params), onProgress=onProgress)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        # Only the handle/URL is kept; an inline body (store disabled) stays out of job state
+        job.result = {k: v for k, v in result.items() if k != 'data'} if result.get('success') else None
+        job.error = None if result.get('success') else result.get('error', 'Unknown error')
+        job.status = JOB_COMPLETED if result.get('success') else JOB_FAILED
+        job.bytes = result.get('size', job.bytes) if result.get('success') else job.bytes
+        job.finishedAt = time.time()
+        with self._lock:
+            # No one can subscribe once the job is no longer active
+            self._active.pop(key, None)
+            self.stats['completed' if job.status == JOB_COMPLETED else 'failed'] += 1
+        self._emit(job, 'report_complete' if job.status == JOB_COMPLETED else 'report_error')
+
+    def _emit(self, job: ReportJob, eventType: str):
+        """Send an event to every subscriber of the job"""
+        with self._lock:
+            subscribers = list(job.subscribers)
+        for _, emit in subscribers:
+            self._emitTo(emit, eventType, job)
+
+    @staticmethod
+    def _emitTo(emit: Optional[EmitFn], eventType: str, job: ReportJob):
+        if emit is None:
+            return
+        try:
+            emit(eventType, job.toDict())
+        except Exception as e:
+            logger.debug(f"[ReportJobs] Could not emit {eventType} for {job.jobId}: {e}")
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond historySize (caller holds the lock)"""
+        excess = len(self._jobs) - self.historySize
+        for jobId in [j.jobId for j in self._jobs.values() if j.done][:max(0, excess)]:
+            del self._jobs[jobId]
+
+    def getJob(self, jobId: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(jobId)
+
+    def listJobs(self, sessionId: Optional[str] = None) -> List[ReportJob]:
+        with self._lock:
+            return [j for j in self._jobs.values()
+                    if sessionId is None or any(s == sessionId for s, _ in j.subscribers)]
+
+    def getMetrics(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            stats = dict(self.stats)
+        return {
+            'maxConcurrent': self.maxConcurrent,
+            'queued': sum(1 for j in jobs if j.status == JOB_QUEUED),
+            'running': sum(1 for j in jobs if j.status == JOB_RUNNING),
+            **stats
+        }
+
+
+_runner: Optional[ReportJobRunner] = None
+_runnerLock = threading.Lock()
+
+
+def getReportJobRunner() -> Optional[ReportJobRunner]:
+    """Process-wide runner, or None when REPORT_JOBS_ENABLED is off (reports are generated inline)"""
+    global _runner
+    if not Settings.REPORT_JOBS_ENABLED:
+        return None
+    with _runnerLock:
+        if _runner is None:
+            _runner = ReportJobRunner(Settings.REPORT_JOBS_MAX_CONCURRENT, Settings.REPORT_JOBS_HISTORY)
+        return _runner
+
+
+def getReportJobMetrics() -> Dict[str, Any]:
+    """Queued/running job counts and totals; {'enabled': False} when off"""
+    runner = getReportJobRunner()
+    if runner is None:
+        return {'enabled': False}
+    return {'enabled': True, **runner.getMetrics()}
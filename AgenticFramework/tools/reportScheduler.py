@@ -0,0 +1,264 @@
+"""
+Report Pre-generation
+
+Auditors ask for the same reports ("inventory-of-assets", "risk-assessment",
+"statement-of-applicability") of the same scopes again and again. Every
+report request for a scope is counted here (MainAgent records the (report,
+scope) pair when the user picks the scope), with exponential decay so old
+interest fades. A daemon thread wakes every REPORT_PREGEN_INTERVAL_SECONDS
+and, during off-peak hours (REPORT_PREGEN_OFF_PEAK_HOURS, local time),
+regenerates the top REPORT_PREGEN_TOP_N pairs whose stored copy is missing
+or outdated.
+
+Pre-generated reports land in the report store (tools/reportStore), so the
+next request is answered from disk without calling the reporting service.
+Staleness is the store's: any change in the scope's domain - made through
+VeriniceTool or reported by veo events - moves the domain revision, so the
+outdated copy is no longer served and the pair is regenerated on the next
+off-peak pass. A deleted scope is dropped from the ranking.
+
+Changes made in veo directly are only seen through events, so stored copies
+are served only while the event consumer is connected (reportStore.servableSince).
+Pre-generation therefore needs it too: a pass while it is disconnected is
+skipped, since nothing it produced could be served.
+
+Enable with REPORT_PREGEN_ENABLED=true (needs the report store and
+VERINICE_EVENTS_ENABLED).
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import Settings
+from tools.reportStore import servableSince
+from tools.requestCache import onWrite
+from tools.veriniceEvents import onEvent
+
+logger = logging.getLogger(__name__)
+
+_POPULARITY_FILE = 'popularity.json'
+
+
+def _targetScopeIds(params: Dict) -> List[str]:
+    return sorted(t.get('id') for t in (params or {}).get('targets') or [] if isinstance(t, dict) and t.get('id'))
+
+
+def _pairKey(reportId: str, domainId: Optional[str], params: Dict) -> str:
+    return json.dumps([reportId, domainId, _targetScopeIds(params)])
+
+
+def _isOffPeak(spec: str, hour: int) -> bool:
+    """'20-6' -> 20:00-05:59 (wraps midnight); empty -> always"""
+    if not spec:
+        return True
+    try:
+        start, end = (int(part) % 24 for part in spec.split('-', 1))
+    except ValueError:
+        return True
+    if start == end:
+        return True
+    return start <= hour < end if start < end else (hour >= start or hour < end)
+
+
+class ReportScheduler:
+    """Ranks (report, scope) pairs by decayed request count and keeps the top ones generated"""
+
+    def __init__(self, path: str, topN: int, halfLifeHours: float, minScore: float):
+        self.path = path
+        self.topN = topN
+        self.halfLifeSeconds = max(1.0, halfLifeHours * 3600)
+        self.minScore = minScore
+        self._lock = threading.Lock()
+        self._pairs: Dict[str, Dict[str, Any]] = self._load()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {'requestsRecorded': 0, 'runs': 0, 'skippedRuns': 0, 'pregenerated': 0,
+                      'alreadyCurrent': 0, 'errors': 0}
+        self.lastRun: Dict[str, Any] = {}
+
+    # ==================== POPULARITY ====================
+
+    def _decayed(self, entry: Dict[str, Any], now: float) -> float:
+        return entry['score'] * math.pow(0.5, (now - entry['updatedAt']) / self.halfLifeSeconds)
+
+    def recordRequest(self, reportId: str, domainId: Optional[str], params: Dict):
+        """Count one request for the report over the params' target scopes"""
+        if not _targetScopeIds(params):
+            return
+        now = time.time()
+        key = _pairKey(reportId, domainId, params)
+        with self._lock:
+            entry = self._pairs.get(key)
+            score = self._decayed(entry, now) if entry else 0.0
+            self._pairs[key] = {'reportId': reportId, 'domainId': domainId, 'params': params,
+                                'score': score + 1.0, 'updatedAt': now,
+                                'requests': (entry or {}).get('requests', 0) + 1}
+            self.stats['requestsRecorded'] += 1
+            self._save()
+
+    def forgetScope(self, scopeId: str):
+        with self._lock:
+            stale = [k for k, e in self._pairs.items() if scopeId in _targetScopeIds(e['params'])]
+            for key in stale:
+                del self._pairs[key]
+            if stale:
+                self._save()
+
+    def topPairs(self) -> List[Tuple[float, Dict[str, Any]]]:
+        """(current score, entry) of the top N pairs at or above minScore"""
+        now = time.time()
+        with self._lock:
+            ranked = sorted(((self._decayed(e, now), e) for e in self._pairs.values()),
+                            key=lambda item: item[0], reverse=True)
+        return [(score, e) for score, e in ranked[:self.topN] if score >= self.minScore]
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Persist the ranking (caller holds the lock)"""
+        tmpPath = f"{self.path}.tmp"
+        try:
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(self._pairs, f)
+            os.replace(tmpPath, self.path)
+        except OSError as e:
+            logger.warning(f"[ReportScheduler] Could not persist report popularity: {e}")
+
+    # ==================== PRE-GENERATION ====================
+
+    def runOnce(self, veriniceTool) -> Dict[str, Any]:
+        """Generate every top pair without a current stored copy"""
+        from tools.reportJobs import getReportJobRunner
+        runner = getReportJobRunner()
+        summary: Dict[str, Any] = {'startedAt': time.time(), 'pairs': 0, 'submitted': 0, 'current': 0, 'errors': []}
+        if servableSince() is None:
+            summary['skipped'] = 'veo event consumer not connected'
+            with self._lock:
+                self.stats['skippedRuns'] += 1
+                self.lastRun = summary
+            return summary
+        for score, entry in self.topPairs():
+            summary['pairs'] += 1
+            reportId, domainId, params = entry['reportId'], entry['domainId'], entry['params']
+            if veriniceTool.storedReport(reportId, domainId, params):
+                summary['current'] += 1
+                continue
+            if runner is not None:
+                # Shares the job cap with interactive requests; an identical running job is reused
+                runner.submit(veriniceTool, reportId, domainId, params,
+                              meta={'pregenerated': True, 'score': round(score, 2)})
+            else:
+                result = veriniceTool.generateReport(reportId, domainId, params)
+                if not result.get('success'):
+                    summary['errors'].append(f"{reportId} {_targetScopeIds(params)}: {result.get('error', '')[:200]}")
+                    continue
+            summary['submitted'] += 1
+        with self._lock:
+            self.stats['runs'] += 1
+            self.stats['pregenerated'] += summary['submitted']
+            self.stats['alreadyCurrent'] += summary['current']
+            self.stats['errors'] += len(summary['errors'])
+            self.lastRun = summary
+        return summary
+
+    def start(self, veriniceTool, intervalSeconds: float, offPeakHours: str) -> bool:
+        """Check every intervalSeconds on a daemon thread; generate only during off-peak hours"""
+        if intervalSeconds <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+
+        def loop():
+            while not self._stop.wait(intervalSeconds):
+                if not _isOffPeak(offPeakHours, time.localtime().tm_hour):
+                    continue
+                if veriniceTool.isBackendAvailable():
+                    try:
+                        self.runOnce(veriniceTool)
+                    except Exception as e:
+                        logger.warning(f"[ReportScheduler] Pre-generation failed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="report-pregen", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def getMetrics(self) -> Dict[str, Any]:
+        top = [{'reportId': e['reportId'], 'domainId': e['domainId'], 'scopes': _targetScopeIds(e['params']),
+                'score': round(score, 2), 'requests': e.get('requests', 0)} for score, e in self.topPairs()]
+        with self._lock:
+            return {'trackedPairs': len(self._pairs), 'topN': self.topN,
+                    'running': bool(self._thread and self._thread.is_alive()),
+                    'lastRun': self.lastRun, 'top': top, **self.stats}
+
+
+_scheduler: Optional[ReportScheduler] = None
+_schedulerLock = threading.Lock()
+
+
+def getReportScheduler() -> Optional[ReportScheduler]:
+    """Process-wide scheduler, or None when REPORT_PREGEN_ENABLED, the report store or veo events are off"""
+    global _scheduler
+    if not (Settings.REPORT_PREGEN_ENABLED and Settings.REPORT_STORE_ENABLED and Settings.VERINICE_EVENTS_ENABLED):
+        return None
+    with _schedulerLock:
+        if _scheduler is None:
+            os.makedirs(Settings.REPORT_STORE_PATH, exist_ok=True)
+            _scheduler = ReportScheduler(
+                os.path.join(Settings.REPORT_STORE_PATH, _POPULARITY_FILE),
+                topN=Settings.REPORT_PREGEN_TOP_N,
+                halfLifeHours=Settings.REPORT_PREGEN_HALF_LIFE_HOURS,
+                minScore=Settings.REPORT_PREGEN_MIN_SCORE
+            )
+        return _scheduler
+
+
+def recordReportRequest(reportId: str, domainId: Optional[str], params: Dict):
+    """Count a report request towards pre-generation (no-op when disabled)"""
+    scheduler = getReportScheduler()
+    if scheduler is not None:
+        scheduler.recordRequest(reportId, domainId, params)
+
+
+def startReportScheduler(veriniceTool) -> bool:
+    scheduler = getReportScheduler()
+    if scheduler is None:
+        return False
+    return scheduler.start(veriniceTool, Settings.REPORT_PREGEN_INTERVAL_SECONDS,
+                           Settings.REPORT_PREGEN_OFF_PEAK_HOURS)
+
+
+def _onWrite(methodName: str, args: tuple):
+    scheduler = _scheduler
+    # deleteObject(objectType, domainId, objectId)
+    if scheduler is not None and methodName == 'deleteObject' and len(args) > 2 and args[0] == 'scope':
+        scheduler.forgetScope(args[2])
+
+
+def _onVeriniceEvent(event):
+    scheduler = _scheduler
+    if scheduler is not None and event.resourceType == 'scope' and event.isDeletion and event.resourceId:
+        scheduler.forgetScope(event.resourceId)
+
+
+onWrite(_onWrite)
+onEvent(_onVeriniceEvent)
+
+
+def getReportSchedulerMetrics() -> Dict[str, Any]:
+    """Tracked (report, scope) pairs, current top N and pre-generation runs; {'enabled': False} when off"""
+    scheduler = getReportScheduler()
+    if scheduler is None:
+        return {'enabled': False}
+    return {'enabled': True, **scheduler.getMetrics()}
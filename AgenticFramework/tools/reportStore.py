@@ -0,0 +1,305 @@
+"""
+Report Store
+
+Generated reports are written to disk and handed around by handle instead of
+as base64 strings. VeriniceTool.generateReport streams the reporting
+service's response into the store in fixed-size chunks; the chat response
+carries only the handle and a download URL, and the API streams the file back
+from disk (GET /api/agent/reports/{handle}). Memory per report is one chunk
+buffer rather than the PDF bytes plus their base64 copies in agent state, the
+bridge and the JSON response.
+
+Reports are keyed by (reportId, targets, params, domain revision), so asking
+for the same report of the same scope again is served from disk. The domain
+revision is a persisted counter bumped on every element write through
+VeriniceTool and every veo change event for the domain (a full resync bumps
+all domains), which retires stored reports once their data changes.
+
+The counter only sees changes made elsewhere through veo events, so a stored
+copy is served only if the event consumer has been connected since it was
+written (servableSince). With VERINICE_EVENTS_ENABLED off, or while the
+consumer is disconnected, every request goes to the reporting service; the
+store then only carries the file to the download endpoint.
+
+Files older than REPORT_STORE_MAX_AGE_SECONDS are not served; the least
+recently used files are evicted above REPORT_STORE_MAX_BYTES.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from config.settings import Settings
+from tools.requestCache import onWrite
+from tools.veriniceEvents import EVENT_RESYNC, eventsDeliveredSince, onEvent
+
+logger = logging.getLogger(__name__)
+
+# Handles are sha256 hex digests; anything else never reaches the filesystem
+_HANDLE_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+_REVISIONS_FILE = 'revisions.json'
+# Revision key bumped for changes that cannot be tied to one domain
+_ALL_DOMAINS = '*'
+
+CONTENT_TYPES = {'pdf': 'application/pdf', 'json': 'application/json', 'html': 'text/html'}
+
+
+class ReportStore:
+    """Content files plus a JSON metadata sidecar per report, in one directory"""
+
+    def __init__(self, directory: str, maxBytes: int, maxAgeSeconds: float):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.maxAgeSeconds = maxAgeSeconds
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytesStored': 0, 'downloads': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._revisions: Dict[str, int] = self._loadRevisions()
+
+    # ==================== KEYS & REVISIONS ====================
+
+    def reportKey(self, reportId: str, domainId: Optional[str], params: Optional[Dict]) -> str:
+        """Handle for a report over the current revision of its domain"""
+        with self._lock:
+            revision = (self._revisions.get(_ALL_DOMAINS, 0), self._revisions.get(domainId or '', 0))
+        material = json.dumps({'reportId': reportId, 'domainId': domainId, 'params': params or {},
+                               'revision': revision}, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def bumpRevision(self, domainId: Optional[str] = None):
+        """Stored reports of domainId (all domains if None) no longer match new requests"""
+        key = domainId or _ALL_DOMAINS
+        with self._lock:
+            self._revisions[key] = self._revisions.get(key, 0) + 1
+            self._saveRevisions()
+
+    def _loadRevisions(self) -> Dict[str, int]:
+        try:
+            with open(os.path.join(self.directory, _REVISIONS_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {k: int(v) for k, v in data.items()} if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _saveRevisions(self):
+        path = os.path.join(self.directory, _REVISIONS_FILE)
+        tmpPath = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(self._revisions, f)
+            os.replace(tmpPath, path)
+        except OSError as e:
+            logger.warning(f"[ReportStore] Could not persist revisions: {e}")
+
+    # ==================== READ ====================
+
+    def _paths(self, handle: str):
+        return os.path.join(self.directory, f"{handle}.bin"), os.path.join(self.directory, f"{handle}.json")
+
+    def lookup(self, handle: str) -> Optional[Dict[str, Any]]:
+        """Metadata of a stored, unexpired report, or None"""
+        if not _HANDLE_PATTERN.match(handle or ''):
+            return None
+        contentPath, metaPath = self._paths(handle)
+        try:
+            with open(metaPath, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if not os.path.exists(contentPath):
+                return None
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta.get('storedAt', 0) > self.maxAgeSeconds:
+            self.remove(handle)
+            return None
+        return meta
+
+    def get(self, handle: str, notBefore: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        lookup() for a generation request; counts hits and misses. Reports
+        stored before notBefore are misses (see servableSince).
+        """
+        meta = self.lookup(handle)
+        if meta and notBefore is not None and meta.get('storedAt', 0) < notBefore:
+            meta = None
+        with self._lock:
+            self.stats['hits' if meta else 'misses'] += 1
+        if meta:
+            self._touch(handle)
+        return meta
+
+    def iterChunks(self, handle: str, chunkSize: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Stream a stored report's bytes, one chunk in memory at a time. The file
+        is opened here, so a report evicted meanwhile raises before streaming starts.
+        """
+        f = open(self._paths(handle)[0], 'rb')
+        chunkSize = chunkSize or Settings.REPORT_STREAM_CHUNK_BYTES
+        with self._lock:
+            self.stats['downloads'] += 1
+        self._touch(handle)
+
+        def chunks():
+            with f:
+                while True:
+                    chunk = f.read(chunkSize)
+                    if not chunk:
+                        break
+                    yield chunk
+        return chunks()
+
+    def _touch(self, handle: str):
+        """Mark as recently used (eviction goes by content file mtime)"""
+        try:
+            os.utime(self._paths(handle)[0])
+        except OSError:
+            pass
+
+    # ==================== WRITE ====================
+
+    def put(self, handle: str, chunks: Iterable[bytes], meta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write a report from an iterable of byte chunks (e.g. response.iter_content)
+        and return its metadata. The file appears atomically: readers see the old
+        report or the complete new one, never a partial file.
+        """
+        if not _HANDLE_PATTERN.match(handle):
+            raise ValueError(f"invalid report handle {handle!r}")
+        contentPath, metaPath = self._paths(handle)
+        tmpPath = f"{contentPath}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        try:
+            with open(tmpPath, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        size += len(chunk)
+            meta = {**meta, 'handle': handle, 'size': size, 'storedAt': time.time()}
+            os.replace(tmpPath, contentPath)
+            metaTmp = f"{metaPath}.{uuid.uuid4().hex}.tmp"
+            with open(metaTmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, default=str)
+            os.replace(metaTmp, metaPath)
+        finally:
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+        with self._lock:
+            self.stats['stored'] += 1
+            self.stats['bytesStored'] += size
+        self._evict()
+        return meta
+
+    def remove(self, handle: str):
+        for path in self._paths(handle):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        """(mtime, size, handle) of every stored report"""
+        entries = []
+        for name in os.listdir(self.directory):
+            handle, ext = os.path.splitext(name)
+            if ext != '.bin' or not _HANDLE_PATTERN.match(handle):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, handle))
+        return entries
+
+    def _evict(self):
+        """Drop expired reports, then least recently used ones above maxBytes"""
+        with self._lock:
+            entries = sorted(self._entries())
+            now = time.time()
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, handle in entries:
+                if total <= self.maxBytes and now - mtime <= self.maxAgeSeconds:
+                    continue
+                self.remove(handle)
+                total -= size
+                self.stats['evicted'] += 1
+
+    def getMetrics(self) -> Dict[str, Any]:
+        entries = self._entries()
+        with self._lock:
+            return {'directory': self.directory, 'reports': len(entries),
+                    'bytes': sum(size for _, size, _ in entries), 'maxBytes': self.maxBytes,
+                    **self.stats}
+
+
+_store: Optional[ReportStore] = None
+_storeLock = threading.Lock()
+
+
+def getReportStore() -> Optional[ReportStore]:
+    """Process-wide report store, or None when REPORT_STORE_ENABLED is off / the directory is unusable"""
+    global _store
+    if not Settings.REPORT_STORE_ENABLED:
+        return None
+    with _storeLock:
+        if _store is None:
+            try:
+                _store = ReportStore(Settings.REPORT_STORE_PATH, Settings.REPORT_STORE_MAX_BYTES,
+                                     Settings.REPORT_STORE_MAX_AGE_SECONDS)
+            except OSError as e:
+                logger.warning(f"[ReportStore] Disabled, cannot use {Settings.REPORT_STORE_PATH}: {e}")
+                return None
+        return _store
+
+
+def servableSince() -> Optional[float]:
+    """
+    Stored reports written at or after this time are current: every change
+    since then has moved the revision they are keyed on. None when no stored
+    copy can be trusted (veo event consumer off or disconnected).
+    """
+    return eventsDeliveredSince()
+
+
+def reportUrl(handle: str) -> str:
+    """Download URL of a stored report (served by the NotebookLLM API)"""
+    return f"/api/agent/reports/{handle}"
+
+
+def _onWrite(methodName: str, args: tuple):
+    store = _store
+    if store is None:
+        return
+    if methodName in ('createObject', '_updateInDomain', 'deleteObject'):
+        store.bumpRevision(args[1] if len(args) > 1 else None)
+    elif methodName == 'deleteDomain':
+        store.bumpRevision(args[0] if args else None)
+
+
+def _onVeriniceEvent(event):
+    store = _store
+    if store is None:
+        return
+    if event.eventType == EVENT_RESYNC:
+        store.bumpRevision()
+    elif event.isElement or event.resourceType == 'domain':
+        if event.domainIds:
+            for domainId in event.domainIds:
+                store.bumpRevision(domainId)
+        else:
+            store.bumpRevision()
+
+
+onWrite(_onWrite)
+onEvent(_onVeriniceEvent)
+
+
+def getReportStoreMetrics() -> Dict[str, Any]:
+    """Stored reports, bytes on disk, hit/miss and download counts; {'enabled': False} when off"""
+    store = getReportStore()
+    if store is None:
+        return {'enabled': False}
+    return {'enabled': True, **store.getMetrics()}
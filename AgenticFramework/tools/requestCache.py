@@ -0,0 +1,164 @@
+"""
+Request Read Cache
+
+Per-turn memoisation of VeriniceTool reads. One chat turn often asks the
+backend the same question several times (resolving source and target ids
+lists the same type twice, linking lists it again, name lookups re-GET the
+object, default domain/unit resolution calls listUnits repeatedly). Inside a
+requestScope() those repeats are answered from memory; any write through the
+tool clears the scope so later reads in the same turn see fresh data.
+
+Outside a scope the decorators are pass-through, so background jobs and
+callers that never open a scope behave exactly as before.
+"""
+import copy
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+
+_currentCache: ContextVar[Optional['RequestReadCache']] = ContextVar('veriniceReadCache', default=None)
+
+# Totals across all scopes since process start (for /debug/metrics/read-cache)
+_totalsLock = threading.Lock()
+_totals = {'scopes': 0, 'hits': 0, 'misses': 0, 'invalidations': 0}
+
+# Process-wide caches that must drop data after any write (see onWrite)
+_writeListeners = []
+
+
+class RequestReadCache:
+    """Read results memoised for the lifetime of one scope (one chat turn)"""
+
+    def __init__(self):
+        self._entries: Dict[Tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        if key in self._entries:
+            self.hits += 1
+            return True, self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: Tuple, value: Any):
+        self._entries[key] = value
+
+    def invalidate(self):
+        """Drop every memoised read (called after any write)"""
+        if self._entries:
+            self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'callsSaved': self.hits,
+            'entries': len(self._entries),
+        }
+
+
+def getActiveCache() -> Optional[RequestReadCache]:
+    return _currentCache.get()
+
+
+@contextmanager
+def requestScope():
+    """
+    Memoise VeriniceTool reads until the block exits.
+
+    Nested scopes share the outermost cache, so a handler that opens its own
+    scope inside a chat turn does not lose what the turn already fetched.
+    """
+    active = _currentCache.get()
+    if active is not None:
+        yield active
+        return
+    cache = RequestReadCache()
+    token = _currentCache.set(cache)
+    try:
+        yield cache
+    finally:
+        _currentCache.reset(token)
+        with _totalsLock:
+            _totals['scopes'] += 1
+            _totals['hits'] += cache.hits
+            _totals['misses'] += cache.misses
+            _totals['invalidations'] += cache.invalidations
+
+
+def _cacheKey(name: str, args: Tuple, kwargs: Dict) -> Optional[Tuple]:
+    try:
+        key = (name, args, tuple(sorted(kwargs.items())))
+        hash(key)
+        return key
+    except TypeError:
+        # dict/list arguments (filters) - fall back to their repr
+        try:
+            return (name, repr(args), repr(sorted(kwargs.items())))
+        except Exception:
+            return None
+
+
+def cachedRead(method):
+    """Memoise a VeriniceTool read method inside an active requestScope()"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = _currentCache.get()
+        if cache is None:
+            return method(self, *args, **kwargs)
+        key = _cacheKey(method.__name__, args, kwargs)
+        if key is None:
+            return method(self, *args, **kwargs)
+        found, value = cache.get(key)
+        if found:
+            # Callers enrich/mutate result dicts in place - never hand out the cached one
+            return copy.deepcopy(value)
+        result = method(self, *args, **kwargs)
+        # Only successful results are memoised; a failed read is retried next time
+        if not (isinstance(result, dict) and result.get('success') is False):
+            cache.put(key, copy.deepcopy(result))
+        return result
+    return wrapper
+
+
+def onWrite(listener):
+    """
+    Call listener(methodName, args) after every VeriniceTool write in this
+    process, scoped or not (longer-lived caches invalidate themselves here).
+    """
+    if listener not in _writeListeners:
+        _writeListeners.append(listener)
+    return listener
+
+
+def invalidatesReads(method):
+    """Clear the active scope's reads (and notify onWrite listeners) after a VeriniceTool write method"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            cache = _currentCache.get()
+            if cache is not None:
+                cache.invalidate()
+            for listener in list(_writeListeners):
+                try:
+                    listener(method.__name__, args)
+                except Exception:
+                    pass
+    return wrapper
+
+
+def getReadCacheMetrics() -> Dict[str, Any]:
+    """Cumulative hit/miss counts over all finished scopes"""
+    with _totalsLock:
+        totals = dict(_totals)
+    lookups = totals['hits'] + totals['misses']
+    totals['hitRate'] = round(totals['hits'] / lookups, 3) if lookups else 0.0
+    return totals
@@ -0,0 +1,443 @@
+"""
+Verinice Event Consumer
+
+veo publishes every stored change (element revisions, domain creation, element
+type definition updates, unit deletion) through its veo-message module to the
+'veo.entity_exchange' topic exchange on RabbitMQ, routing key
+'veo.message.<eventType>'. This consumer binds its own exclusive queue to that
+exchange and turns the messages into VeriniceEvent objects for the caches on
+this side:
+
+- the local mirror (tools/veriniceMirror.py) is updated or marked stale here
+- other caches register with onEvent(listener) - the ISMS list cache drops the
+  affected lists, VeriniceTool drops cached subtype definitions
+
+Cache TTLs stay in place as the fallback when the consumer is off or the
+broker is unreachable. The broker is pluggable: PikaBroker talks AMQP (needs
+the optional 'pika' package) and is what startVeriniceEventConsumer() uses;
+InMemoryBroker delivers published messages synchronously, for driving the
+consumer without RabbitMQ (tests/test_veriniceEvents.py).
+
+    consumer = VeriniceEventConsumer(InMemoryBroker())
+    consumer.start()
+    consumer.broker.publish('veo.message.entity_revision', body)
+"""
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from config.settings import Settings
+
+# Routing-key suffixes / 'eventType' values published by veo (MessageCreatorImpl)
+EVENT_ENTITY_REVISION = 'entity_revision'
+EVENT_DOMAIN_CREATION = 'domain_creation'
+EVENT_ELEMENT_TYPE_DEFINITION_UPDATE = 'element_type_definition_update'
+EVENT_UNIT_DELETION = 'unit_deletion'
+# Not from veo: a full resync replaced everything (veriniceHistory fallback)
+EVENT_RESYNC = 'resync'
+
+# URI collection segment -> element type (as in VeriniceTool.OBJECT_TYPES)
+_ELEMENT_TYPES = {
+    'scopes': 'scope', 'assets': 'asset', 'controls': 'control', 'processes': 'process',
+    'persons': 'person', 'scenarios': 'scenario', 'incidents': 'incident', 'documents': 'document'
+}
+
+# Messages may be redelivered/duplicated; remember this many ids
+_SEEN_IDS_LIMIT = 2048
+
+
+@dataclass
+class VeriniceEvent:
+    """One veo change event, reduced to what the caches need"""
+    eventType: str
+    messageId: Optional[int] = None
+    # entity_revision: CREATION / MODIFICATION / HARD_DELETION
+    changeType: Optional[str] = None
+    # 'domain', 'unit' or an element type ('asset', ...)
+    resourceType: Optional[str] = None
+    resourceId: Optional[str] = None
+    # Domains the change is visible in (element revisions list all of them)
+    domainIds: List[str] = field(default_factory=list)
+    unitId: Optional[str] = None
+    # Element type of an element_type_definition_update
+    elementType: Optional[str] = None
+    # Element DTO of a creation/modification (None for deletions)
+    content: Optional[Dict[str, Any]] = None
+
+    @property
+    def isElement(self) -> bool:
+        return self.resourceType in _ELEMENT_TYPES.values()
+
+    @property
+    def isDeletion(self) -> bool:
+        return self.changeType == 'HARD_DELETION'
+
+
+def _parseUri(uri: str):
+    """(resourceType, resourceId) of a veo target URI; risks map to their element"""
+    segments = [s for s in urlparse(uri or '').path.split('/') if s]
+    for i, segment in enumerate(segments[:-1]):
+        if segment in _ELEMENT_TYPES:
+            return _ELEMENT_TYPES[segment], segments[i + 1]
+        if segment in ('domains', 'units'):
+            return segment[:-1], segments[i + 1]
+    return None, None
+
+
+def eventFromRevision(revision: Dict[str, Any]) -> VeriniceEvent:
+    """
+    VeriniceEvent from an entity revision - the entity_revision message body,
+    which is also what veo-history stores ({'uri', 'type', 'changeNumber',
+    'time', 'content', ...})
+    """
+    event = VeriniceEvent(eventType=EVENT_ENTITY_REVISION, changeType=revision.get('type'))
+    event.resourceType, event.resourceId = _parseUri(revision.get('uri'))
+    dto = revision.get('content') if isinstance(revision.get('content'), dict) else None
+    event.content = dto
+    if dto:
+        event.domainIds = list((dto.get('domains') or {}).keys())
+        owner = dto.get('owner') or {}
+        event.unitId = _parseUri(owner.get('targetUri'))[1] if isinstance(owner, dict) else None
+    if event.resourceType == 'domain' and event.resourceId:
+        event.domainIds = [event.resourceId]
+    return event
+
+
+def parseMessage(routingKey: str, body: Any) -> Optional[VeriniceEvent]:
+    """
+    VeriniceEvent from an AMQP delivery, None if it is not a veo event.
+
+    The body is veo's EventMessage ({'routingKey', 'content', 'id', 'timestamp'}
+    with the event JSON as a string in 'content'); a bare event JSON is accepted too.
+    """
+    if isinstance(body, (bytes, bytearray)):
+        body = body.decode('utf-8')
+    if isinstance(body, str):
+        body = json.loads(body)
+    if not isinstance(body, dict):
+        return None
+    messageId = body.get('id')
+    content = body.get('content', body)
+    if isinstance(content, str):
+        content = json.loads(content)
+    if not isinstance(content, dict):
+        return None
+
+    eventType = content.get('eventType') or (routingKey or '').rsplit('.', 1)[-1]
+    if eventType == EVENT_ENTITY_REVISION:
+        event = eventFromRevision(content)
+        event.messageId = messageId
+        return event
+
+    event = VeriniceEvent(eventType=eventType, messageId=messageId)
+    if eventType in (EVENT_DOMAIN_CREATION, EVENT_ELEMENT_TYPE_DEFINITION_UPDATE):
+        event.resourceType = 'domain'
+        event.resourceId = content.get('domainId')
+        event.domainIds = [content['domainId']] if content.get('domainId') else []
+        event.elementType = content.get('elementType')
+    elif eventType == EVENT_UNIT_DELETION:
+        event.resourceType = 'unit'
+        event.resourceId = event.unitId = content.get('unitId')
+        event.changeType = 'HARD_DELETION'
+    return event
+
+
+# ==================== LISTENERS ====================
+
+_listenersLock = threading.Lock()
+_listeners: List[Callable[[], Optional[Callable]]] = []
+
+
+def onEvent(listener: Callable[[VeriniceEvent], None], weak: bool = False):
+    """
+    Call listener(event) for every consumed veo event.
+
+    weak=True holds a bound method weakly, so per-instance caches (one per
+    VeriniceTool) do not keep their owner alive.
+    """
+    if weak and hasattr(listener, '__self__'):
+        ref = weakref.WeakMethod(listener)
+    else:
+        ref = lambda: listener
+    with _listenersLock:
+        _listeners.append(ref)
+    return listener
+
+
+def dispatchEvent(event: VeriniceEvent) -> int:
+    """Run every live listener; returns how many failed"""
+    with _listenersLock:
+        refs = list(_listeners)
+    failures = 0
+    dead = []
+    for ref in refs:
+        listener = ref()
+        if listener is None:
+            dead.append(ref)
+            continue
+        try:
+            listener(event)
+        except Exception:
+            failures += 1
+    if dead:
+        with _listenersLock:
+            for ref in dead:
+                if ref in _listeners:
+                    _listeners.remove(ref)
+    return failures
+
+
+def _applyToMirror(event: VeriniceEvent):
+    """Keep the local mirror in step: element rows, domain/unit collections"""
+    from tools.veriniceMirror import getVeriniceMirror
+    mirror = getVeriniceMirror()
+    if mirror is None:
+        return
+    if event.isElement and event.resourceId:
+        if event.isDeletion:
+            mirror.deleteObject(event.resourceId)
+            return
+        dto = event.content or {}
+        for domainId in event.domainIds:
+            association = (dto.get('domains') or {}).get(domainId) or {}
+            changes = {
+                'id': event.resourceId,
+                'name': dto.get('name'),
+                'abbreviation': dto.get('abbreviation'),
+                'description': dto.get('description'),
+                'subType': association.get('subType'),
+                'status': association.get('status'),
+            }
+            # The event carries only these fields: merge them into the mirrored
+            # row; an object the list does not have yet makes the list re-load
+            if not mirror.mergeObject(domainId, event.resourceType,
+                                      {k: v for k, v in changes.items() if v is not None}):
+                mirror.markStale(domainId, event.resourceType)
+        mirror.dropDetail(event.resourceId)
+    elif event.resourceType in ('domain', 'unit'):
+        mirror.dropCollection()
+        if event.resourceType == 'domain' and event.isDeletion and event.resourceId:
+            mirror.markStale(event.resourceId)
+
+
+onEvent(_applyToMirror)
+
+
+# ==================== BROKERS ====================
+
+class InMemoryBroker:
+    """
+    Broker stand-in for tests and local runs: publish() delivers to the
+    consuming callback synchronously, in the publisher's thread.
+    """
+
+    def __init__(self):
+        self._callback: Optional[Callable[[str, bytes], None]] = None
+        self._stopped = threading.Event()
+        self.published = 0
+
+    def consume(self, callback: Callable[[str, bytes], None], onReady: Optional[Callable[[], None]] = None):
+        """Register callback and block until stop() (the consumer thread body)"""
+        self._stopped.clear()
+        self._callback = callback
+        if onReady:
+            onReady()
+        self._stopped.wait()
+        self._callback = None
+
+    def publish(self, routingKey: str, body: Any):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.published += 1
+        if self._callback is not None:
+            self._callback(routingKey, body)
+
+    def stop(self):
+        self._stopped.set()
+
+
+class PikaBroker:
+    """AMQP broker via pika: an exclusive auto-delete queue bound to veo's exchange"""
+
+    def __init__(self, url: str, exchange: str, routingKey: str):
+        self.url = url
+        self.exchange = exchange
+        self.routingKey = routingKey
+        self._connection = None
+        self._channel = None
+
+    def consume(self, callback: Callable[[str, bytes], None], onReady: Optional[Callable[[], None]] = None):
+        """Consume until stop(); onReady() runs once the queue is bound and receiving"""
+        import pika  # optional dependency, only needed when events are enabled
+        self._connection = pika.BlockingConnection(pika.URLParameters(self.url))
+        try:
+            self._channel = self._connection.channel()
+            # Own server-named queue: never takes messages from veo's 'veo' queue
+            queue = self._channel.queue_declare(queue='', exclusive=True, auto_delete=True).method.queue
+            self._channel.queue_bind(queue=queue, exchange=self.exchange, routing_key=self.routingKey)
+            self._channel.basic_consume(
+                queue=queue, auto_ack=True,
+                on_message_callback=lambda ch, method, props, body: callback(method.routing_key, body)
+            )
+            if onReady:
+                onReady()
+            self._channel.start_consuming()
+        finally:
+            connection, self._connection, self._channel = self._connection, None, None
+            if connection is not None and connection.is_open:
+                connection.close()
+
+    def stop(self):
+        connection, channel = self._connection, self._channel
+        if connection is not None and channel is not None:
+            connection.add_callback_threadsafe(channel.stop_consuming)
+
+
+# ==================== CONSUMER ====================
+
+class VeriniceEventConsumer:
+    """Consumes veo events on a daemon thread and dispatches them to onEvent listeners"""
+
+    def __init__(self, broker, reconnectSeconds: float = 10.0):
+        self.broker = broker
+        self.reconnectSeconds = reconnectSeconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._seenIds: 'OrderedDict[int, None]' = OrderedDict()
+        self.connected = False
+        # Start of the current connection: every change since then is delivered
+        self.connectedSince: Optional[float] = None
+        self.lastError: Optional[str] = None
+        self.lastEventAt: Optional[float] = None
+        self.stats = {'received': 0, 'dispatched': 0, 'duplicates': 0, 'ignored': 0,
+                      'parseErrors': 0, 'listenerErrors': 0, 'reconnects': 0}
+        self.byType: Dict[str, int] = {}
+
+    def handleMessage(self, routingKey: str, body: Any) -> Optional[VeriniceEvent]:
+        """Parse, de-duplicate and dispatch one delivery"""
+        with self._lock:
+            self.stats['received'] += 1
+        try:
+            event = parseMessage(routingKey, body)
+        except (ValueError, TypeError, AttributeError) as e:
+            with self._lock:
+                self.stats['parseErrors'] += 1
+                self.lastError = f"Unparseable message on {routingKey}: {str(e)[:200]}"
+            return None
+        if event is None:
+            with self._lock:
+                self.stats['ignored'] += 1
+            return None
+        with self._lock:
+            if event.messageId is not None:
+                if event.messageId in self._seenIds:
+                    self.stats['duplicates'] += 1
+                    return None
+                self._seenIds[event.messageId] = None
+                while len(self._seenIds) > _SEEN_IDS_LIMIT:
+                    self._seenIds.popitem(last=False)
+        failures = dispatchEvent(event)
+        with self._lock:
+            self.stats['dispatched'] += 1
+            self.stats['listenerErrors'] += failures
+            self.byType[event.eventType] = self.byType.get(event.eventType, 0) + 1
+            self.lastEventAt = time.time()
+        return event
+
+    def start(self) -> bool:
+        """Start the consumer thread (no-op if running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='verinice-events', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+        self.broker.stop()
+
+    def _markConnected(self):
+        self.connectedSince = time.time()
+        self.connected = True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.broker.consume(self.handleMessage, onReady=self._markConnected)
+            except Exception as e:
+                self.lastError = f"{type(e).__name__}: {str(e)[:200]}"
+                print(f"[VeriniceEvents] Consumer disconnected: {self.lastError}")
+            finally:
+                self.connected = False
+                self.connectedSince = None
+            if self._stop.wait(self.reconnectSeconds):
+                break
+            with self._lock:
+                self.stats['reconnects'] += 1
+
+    def getMetrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'broker': type(self.broker).__name__,
+                'connected': self.connected,
+                'connectedSince': self.connectedSince,
+                'lastEventAt': self.lastEventAt,
+                'lastError': self.lastError,
+                'byType': dict(self.byType),
+                **self.stats
+            }
+
+
+_consumer: Optional[VeriniceEventConsumer] = None
+_consumerLock = threading.Lock()
+
+
+def startVeriniceEventConsumer() -> Optional[VeriniceEventConsumer]:
+    """Start the process-wide AMQP consumer if enabled (idempotent)"""
+    global _consumer
+    if not Settings.VERINICE_EVENTS_ENABLED:
+        return None
+    with _consumerLock:
+        if _consumer is None:
+            try:
+                import pika  # noqa: F401
+            except ImportError:
+                print("[VeriniceEvents] VERINICE_EVENTS_ENABLED is set but 'pika' is not installed")
+                return None
+            _consumer = VeriniceEventConsumer(PikaBroker(
+                Settings.VERINICE_EVENTS_AMQP_URL,
+                Settings.VERINICE_EVENTS_EXCHANGE,
+                Settings.VERINICE_EVENTS_ROUTING_KEY
+            ))
+        _consumer.start()
+        return _consumer
+
+
+def eventsDeliveredSince() -> Optional[float]:
+    """
+    Time since which every veo change has reached the listeners (the start of
+    the consumer's current connection), None when the consumer is off or
+    disconnected - data cached before that may have missed a change.
+    """
+    consumer = _consumer
+    if consumer is None or not consumer.connected:
+        return None
+    return consumer.connectedSince
+
+
+def getVeriniceEventMetrics() -> Dict[str, Any]:
+    """Consumer state and counters; {'enabled': False} when it is not running"""
+    consumer = _consumer
+    if consumer is None:
+        return {'enabled': False}
+    return {'enabled': True, **consumer.getMetrics()}
@@ -0,0 +1,297 @@
+"""
+Verinice History Sync
+
+Incremental refresh of the local mirror from veo-history. veo-history stores
+every entity revision veo publishes ({'uri', 'type', 'changeNumber', 'time',
+'content', ...}); instead of re-listing every element type of every domain,
+the mirror's sync job asks it for the revisions since the last run and
+applies them like live change events (tools/veriniceEvents.dispatchEvent), so
+the mirror rows, object details and the ISMS list cache follow the deltas.
+Refresh cost scales with the number of changes, not the size of the domains.
+
+A full resync (VeriniceMirror.sync) is still done when the increment cannot
+be trusted:
+
+- no cursor yet (first run, fresh mirror file)
+- the history service is unreachable or rejects the cursor
+- more than maxChanges revisions since the cursor (re-listing is cheaper)
+
+The changes endpoint (VEO_HISTORY_CHANGES_PATH) differs between veo-history
+deployments. The first reject (400/404/405/410) is logged as a warning; after
+maxRejects consecutive rejects incremental mode is switched off and every
+run is a full resync, until the process restarts.
+
+A changeNumber that skips ahead for one resource means revisions of it were
+missed; that resource's domain lists are marked stale so the next read
+re-lists them, without a full resync. The last changeNumber per resource is
+kept in the mirror file with the cursor, so gap detection survives restarts.
+
+Enable with VEO_HISTORY_SYNC_ENABLED=true (needs the mirror).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config.settings import Settings
+from tools.veriniceEvents import EVENT_RESYNC, VeriniceEvent, dispatchEvent, eventFromRevision
+
+logger = logging.getLogger(__name__)
+
+# sync_meta key of the revision-time cursor
+_CURSOR_KEY = 'history.cursor'
+# Re-read this much before the cursor (clock skew between veo and veo-history);
+# the overlap is de-duplicated by changeNumber
+_CURSOR_OVERLAP_SECONDS = 5
+# Resources whose last applied changeNumber is remembered (gap detection)
+_CHANGE_NUMBERS_LIMIT = 50000
+# Statuses meaning the endpoint or its parameters are wrong, not that it is down
+_REJECT_STATUSES = (400, 404, 405, 410)
+
+
+def _isoTime(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _parseTime(value: Any) -> Optional[float]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class HistoryGapError(Exception):
+    """The history service cannot provide a complete increment for the cursor"""
+
+
+class HistoryRejectedError(HistoryGapError):
+    """The changes endpoint answered with a client error (wrong path or parameters)"""
+
+
+class VeriniceHistorySync:
+    """Applies veo-history revisions since the last run to the mirror and caches"""
+
+    def __init__(self, mirror, historyUrl: str, changesPath: str = '/revisions/since',
+                 pageSize: int = 500, maxChanges: int = 5000, maxRejects: int = 3):
+        """
+        Args:
+            mirror: VeriniceMirror holding the cursor and receiving full resyncs
+            historyUrl: veo-history base URL (VEO_HISTORY_API_URL)
+            changesPath: Endpoint listing revisions since a time ('since', 'size', 'page')
+            pageSize: Revisions per page
+            maxChanges: Above this many changes a full resync is done instead
+            maxRejects: Consecutive endpoint rejects before incremental mode is switched off
+        """
+        self.mirror = mirror
+        self.historyUrl = historyUrl.rstrip('/')
+        self.changesPath = changesPath
+        self.pageSize = pageSize
+        self.maxChanges = maxChanges
+        self.maxRejects = maxRejects
+        self.incremental = True
+        self._rejects = 0
+        self._lock = threading.Lock()
+        self._changeNumbers: Optional['OrderedDict[str, int]'] = None
+        self.stats = {'incrementalSyncs': 0, 'fullResyncs': 0, 'changesApplied': 0,
+                      'duplicates': 0, 'resourceGaps': 0, 'errors': 0, 'rejects': 0}
+        self.lastSync: Dict[str, Any] = {}
+
+    def sync(self, veriniceTool) -> Dict[str, Any]:
+        """One refresh: incremental if possible, otherwise a full resync"""
+        started = time.time()
+        cursor = self.mirror.getMeta(_CURSOR_KEY)
+        summary: Dict[str, Any] = {'mode': 'incremental', 'errors': []}
+        if not self.incremental:
+            summary = self._fullResync(veriniceTool, started, 'incremental sync disabled')
+        elif cursor is None:
+            summary = self._fullResync(veriniceTool, started, 'no cursor')
+        else:
+            try:
+                revisions = self._fetchSince(veriniceTool, cursor)
+                self._rejects = 0
+                summary.update(self._apply(revisions))
+                summary['cursor'] = self._advanceCursor(cursor, revisions)
+                self.mirror.confirmCurrent()
+                with self._lock:
+                    self.stats['incrementalSyncs'] += 1
+            except HistoryRejectedError as e:
+                self._recordReject(e)
+                summary = self._fullResync(veriniceTool, started, str(e))
+            except HistoryGapError as e:
+                summary = self._fullResync(veriniceTool, started, str(e))
+            except Exception as e:
+                summary = self._fullResync(veriniceTool, started, f"history unavailable: {str(e)[:200]}")
+        summary['seconds'] = round(time.time() - started, 2)
+        summary['finishedAt'] = time.time()
+        with self._lock:
+            if summary['errors']:
+                self.stats['errors'] += 1
+            self.lastSync = summary
+        return summary
+
+    def _fetchSince(self, veriniceTool, cursor: str) -> List[Dict]:
+        """All revisions at or after cursor, oldest first"""
+        since = _parseTime(cursor)
+        if since is None:
+            raise HistoryGapError(f"unreadable cursor {cursor!r}")
+        params = {'since': _isoTime(since - _CURSOR_OVERLAP_SECONDS), 'size': self.pageSize}
+        revisions: List[Dict] = []
+        page = 0
+        while True:
+            # Straight through the session (same Keycloak token): veo-history
+            # failures must not trip the Verinice API circuit breaker
+            response = veriniceTool.client.session.get(
+                f"{self.historyUrl}{self.changesPath}", params={**params, 'page': page},
+                timeout=Settings.VEO_HISTORY_TIMEOUT_SECONDS
+            )
+            if response.status_code in _REJECT_STATUSES:
+                raise HistoryRejectedError(
+                    f"history rejected {self.changesPath} (HTTP {response.status_code})"
+                )
+            response.raise_for_status()
+            body = response.json()
+            items = body if isinstance(body, list) else (body.get('items') or body.get('content') or [])
+            revisions.extend(items)
+            if len(revisions) > self.maxChanges:
+                raise HistoryGapError(f"more than {self.maxChanges} changes since {cursor}")
+            pageCount = None if isinstance(body, list) else (body.get('pageCount') or body.get('totalPages'))
+            page += 1
+            if len(items) < self.pageSize or (pageCount is not None and page >= pageCount):
+                break
+        revisions.sort(key=lambda r: (r.get('time') or '', r.get('changeNumber') or 0))
+        return revisions
+
+    def _recordReject(self, error: HistoryRejectedError):
+        """Warn once, then stop asking an endpoint that keeps rejecting"""
+        with self._lock:
+            self._rejects += 1
+            self.stats['rejects'] += 1
+            rejects = self._rejects
+        if rejects == 1:
+            logger.warning(
+                f"[VeriniceHistory] {error} at {self.historyUrl}; doing a full resync. "
+                f"Check VEO_HISTORY_CHANGES_PATH for this veo-history deployment."
+            )
+        if rejects >= self.maxRejects and self.incremental:
+            self.incremental = False
+            logger.warning(
+                f"[VeriniceHistory] {rejects} consecutive rejects from {self.changesPath}: "
+                f"incremental sync disabled, every refresh is a full resync"
+            )
+
+    def _loadedChangeNumbers(self) -> 'OrderedDict[str, int]':
+        """Change numbers from the mirror file, read on first use (call with the lock held)"""
+        if self._changeNumbers is None:
+            self._changeNumbers = OrderedDict(self.mirror.loadChangeNumbers(_CHANGE_NUMBERS_LIMIT))
+        return self._changeNumbers
+
+    def _apply(self, revisions: List[Dict]) -> Dict[str, int]:
+        """Dispatch each new revision as a change event; de-duplicate and detect gaps"""
+        applied = duplicates = gaps = 0
+        updated: Dict[str, int] = {}
+        for revision in revisions:
+            uri = revision.get('uri')
+            changeNumber = revision.get('changeNumber')
+            if uri and isinstance(changeNumber, int):
+                with self._lock:
+                    changeNumbers = self._loadedChangeNumbers()
+                    last = changeNumbers.get(uri)
+                    if last is not None and changeNumber <= last:
+                        duplicates += 1
+                        continue
+                    changeNumbers[uri] = updated[uri] = changeNumber
+                    changeNumbers.move_to_end(uri)
+                    while len(changeNumbers) > _CHANGE_NUMBERS_LIMIT:
+                        changeNumbers.popitem(last=False)
+                if last is not None and changeNumber > last + 1:
+                    gaps += 1
+                    self._markGap(eventFromRevision(revision))
+            dispatchEvent(eventFromRevision(revision))
+            applied += 1
+        if updated:
+            self.mirror.storeChangeNumbers(updated, _CHANGE_NUMBERS_LIMIT)
+        with self._lock:
+            self.stats['changesApplied'] += applied
+            self.stats['duplicates'] += duplicates
+            self.stats['resourceGaps'] += gaps
+        return {'changes': len(revisions), 'applied': applied, 'duplicates': duplicates, 'gaps': gaps}
+
+    def _markGap(self, event: VeriniceEvent):
+        """Missed revisions of one resource: re-list its domain lists on next read"""
+        if event.isElement:
+            for domainId in event.domainIds:
+                self.mirror.markStale(domainId, event.resourceType)
+        elif event.resourceType == 'domain':
+            for domainId in event.domainIds:
+                self.mirror.markStale(domainId)
+            self.mirror.dropCollection()
+        else:
+            self.mirror.dropCollection()
+
+    def _advanceCursor(self, cursor: str, revisions: List[Dict]) -> str:
+        latest = max((t for t in (_parseTime(r.get('time')) for r in revisions) if t is not None), default=None)
+        if latest is not None and latest > (_parseTime(cursor) or 0):
+            cursor = _isoTime(latest)
+            self.mirror.setMeta(_CURSOR_KEY, cursor)
+        return cursor
+
+    def _fullResync(self, veriniceTool, started: float, reason: str) -> Dict[str, Any]:
+        """Re-list everything; the cursor restarts at the time this resync began"""
+        summary = self.mirror.sync(veriniceTool)
+        summary = {**summary, 'mode': 'full', 'reason': reason}
+        if not summary['errors']:
+            cursor = _isoTime(started)
+            self.mirror.setMeta(_CURSOR_KEY, cursor)
+            summary['cursor'] = cursor
+            with self._lock:
+                self._changeNumbers = OrderedDict()
+            self.mirror.clearChangeNumbers()
+        # Everything was replaced: caches keyed on the old state start over
+        dispatchEvent(VeriniceEvent(eventType=EVENT_RESYNC))
+        with self._lock:
+            self.stats['fullResyncs'] += 1
+        return summary
+
+    def getMetrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'historyUrl': self.historyUrl,
+                'cursor': self.mirror.getMeta(_CURSOR_KEY),
+                'incremental': self.incremental,
+                'lastSync': {k: v for k, v in self.lastSync.items() if k != 'domains'},
+                **self.stats
+            }
+
+
+_historySync: Optional[VeriniceHistorySync] = None
+_historyLock = threading.Lock()
+
+
+def getHistorySync(mirror) -> Optional[VeriniceHistorySync]:
+    """Process-wide history sync for the mirror, or None when VEO_HISTORY_SYNC_ENABLED is off"""
+    global _historySync
+    if not Settings.VEO_HISTORY_SYNC_ENABLED or mirror is None:
+        return None
+    with _historyLock:
+        if _historySync is None or _historySync.mirror is not mirror:
+            _historySync = VeriniceHistorySync(
+                mirror,
+                Settings.VEO_HISTORY_API_URL,
+                changesPath=Settings.VEO_HISTORY_CHANGES_PATH,
+                pageSize=Settings.VEO_HISTORY_PAGE_SIZE,
+                maxChanges=Settings.VEO_HISTORY_MAX_CHANGES,
+                maxRejects=Settings.VEO_HISTORY_MAX_REJECTS
+            )
+        return _historySync
+
+
+def getHistorySyncMetrics() -> Dict[str, Any]:
+    """Incremental vs full sync counts and the current cursor; {'enabled': False} when off"""
+    historySync = _historySync
+    if historySync is None:
+        return {'enabled': False}
+    return {'enabled': True, **historySync.getMetrics()}
@@ -0,0 +1,570 @@
+"""
+Verinice Read Mirror
+
+Optional local SQLite copy of Verinice objects so list / get / name-resolve
+reads are answered from indexes instead of REST calls.
+
+- A sync job pages through every element type of every domain and replaces
+  the mirrored (domain, type) lists; live list/get results are written back
+  opportunistically. A listing only replaces rows older than its fetch, and
+  deletions leave tombstones, so writes made while a listing was in flight
+  are neither lost nor undone.
+- VeriniceTool serves reads from the mirror while the mirrored data is
+  younger than maxAgeSeconds, and writes through on create/update/delete.
+- When the backend is unreachable, reads fall back to the mirror regardless
+  of age (degraded read-only mode); results carry 'degraded': True.
+
+Enable with VERINICE_MIRROR_ENABLED=true (see config.settings).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    domain_id  TEXT NOT NULL,
+    id         TEXT NOT NULL,
+    type       TEXT NOT NULL,
+    name       TEXT,
+    name_lower TEXT,
+    subtype    TEXT,
+    status     TEXT,
+    body       TEXT NOT NULL,
+    partial    INTEGER NOT NULL DEFAULT 0,
+    synced_at  REAL NOT NULL,
+    PRIMARY KEY (domain_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_objects_domain_type ON objects (domain_id, type);
+CREATE INDEX IF NOT EXISTS idx_objects_subtype ON objects (domain_id, type, subtype);
+CREATE INDEX IF NOT EXISTS idx_objects_status ON objects (domain_id, type, status);
+CREATE INDEX IF NOT EXISTS idx_objects_id ON objects (id);
+
+CREATE TABLE IF NOT EXISTS details (
+    id        TEXT PRIMARY KEY,
+    type      TEXT NOT NULL,
+    body      TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS collections (
+    kind      TEXT PRIMARY KEY,
+    body      TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    id         TEXT PRIMARY KEY,
+    deleted_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    domain_id  TEXT NOT NULL,
+    type       TEXT NOT NULL,
+    synced_at  REAL NOT NULL,
+    item_count INTEGER NOT NULL,
+    PRIMARY KEY (domain_id, type)
+);
+
+CREATE TABLE IF NOT EXISTS change_numbers (
+    uri           TEXT PRIMARY KEY,
+    change_number INTEGER NOT NULL,
+    updated_at    REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_meta (
+    key        TEXT PRIMARY KEY,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class VeriniceMirror:
+    """SQLite mirror of domain element lists, object details, domains and units"""
+
+    # Deletions are remembered this long - longer than any listing takes to fetch
+    TOMBSTONE_SECONDS = 3600.0
+
+    def __init__(self, path: str, maxAgeSeconds: float = 120.0, pageSize: int = 500):
+        """
+        Args:
+            path: SQLite file (':memory:' for a process-local mirror)
+            maxAgeSeconds: Freshness bound for normal (non-degraded) reads
+            pageSize: Items per page when the sync job lists a domain
+        """
+        self.path = path
+        self.maxAgeSeconds = maxAgeSeconds
+        self.pageSize = pageSize
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+        self._syncThread = None
+        self._stopSync = threading.Event()
+        self.stats = {'hits': 0, 'degradedHits': 0, 'misses': 0, 'syncs': 0,
+                      'syncErrors': 0, 'writeThroughs': 0}
+        self.lastSync: Dict[str, Any] = {}
+
+    # ==================== FRESHNESS ====================
+
+    def _isFresh(self, syncedAt: Optional[float], maxAge: Optional[float]) -> bool:
+        if syncedAt is None:
+            return False
+        return maxAge is None or (time.time() - syncedAt) <= maxAge
+
+    def listAge(self, domainId: str, objectType: str) -> Optional[float]:
+        """Seconds since (domain, type) was last fully synced, None if never"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT synced_at FROM sync_state WHERE domain_id = ? AND type = ?',
+                (domainId, objectType)
+            ).fetchone()
+        return time.time() - row['synced_at'] if row else None
+
+    def _count(self, served: bool, degraded: bool):
+        with self._lock:
+            if not served:
+                self.stats['misses'] += 1
+            elif degraded:
+                self.stats['degradedHits'] += 1
+            else:
+                self.stats['hits'] += 1
+
+    # ==================== READS ====================
+
+    def listObjects(self, domainId: str, objectType: str, filters: Optional[Dict] = None,
+                    matches: Optional[Callable[[Dict, Dict], bool]] = None,
+                    degraded: bool = False) -> Optional[Dict]:
+        """
+        Mirrored domain list in VeriniceTool.listObjects' result shape.
+
+        subType / status / name are answered by the indexes; other filters are
+        checked with `matches` (VeriniceTool._matchesFilters). Returns None when
+        the list was never synced or is older than maxAgeSeconds (unless degraded).
+        """
+        age = self.listAge(domainId, objectType)
+        if age is None or not (degraded or age <= self.maxAgeSeconds):
+            self._count(False, degraded)
+            return None
+
+        filters = {k: v for k, v in (filters or {}).items() if k not in ('size', 'page', 'sort')}
+        clauses = ['domain_id = ?', 'type = ?']
+        params: List[Any] = [domainId, objectType]
+        residual = {}
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key == 'subType' and isinstance(value, str):
+                clauses.append('subtype = ?')
+                params.append(value)
+            elif key == 'status' and isinstance(value, str):
+                clauses.append('status = ?')
+                params.append(value)
+            elif key == 'name' and isinstance(value, str):
+                clauses.append('instr(name_lower, ?) > 0')
+                params.append(value.lower())
+            else:
+                residual[key] = value
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT body FROM objects WHERE {' AND '.join(clauses)} ORDER BY name_lower",
+                params
+            ).fetchall()
+        items = [json.loads(row['body']) for row in rows]
+        if residual and matches:
+            items = [item for item in items if matches(item, residual)]
+        self._count(True, degraded)
+        return {
+            'success': True,
+            'count': len(items),
+            'objects': {'items': items},
+            'objectType': objectType,
+            'domainId': domainId,
+            'filters': {'server': {}, 'client': filters},
+            'source': 'mirror',
+            'mirrorAge': round(age, 1),
+            'degraded': degraded
+        }
+
+    def getObject(self, objectType: str, domainId: str, objectId: str, degraded: bool = False) -> Optional[Dict]:
+        """Mirrored full object (top-level GET shape) in VeriniceTool.getObject's result shape"""
+        with self._lock:
+            row = self._conn.execute('SELECT body, synced_at FROM details WHERE id = ?', (objectId,)).fetchone()
+        if row is None or not self._isFresh(row['synced_at'], None if degraded else self.maxAgeSeconds):
+            self._count(False, degraded)
+            return None
+        self._count(True, degraded)
+        return {
+            'success': True,
+            'data': json.loads(row['body']),
+            'objectId': objectId,
+            'objectType': objectType,
+            'domainId': domainId,
+            'source': 'mirror',
+            'mirrorAge': round(time.time() - row['synced_at'], 1),
+            'degraded': degraded
+        }
+
+    def getCollection(self, kind: str, degraded: bool = False) -> Optional[Any]:
+        """Mirrored domains/units list (body as returned by VeriniceTool)"""
+        with self._lock:
+            row = self._conn.execute('SELECT body, synced_at FROM collections WHERE kind = ?', (kind,)).fetchone()
+        if row is None or not self._isFresh(row['synced_at'], None if degraded else self.maxAgeSeconds):
+            self._count(False, degraded)
+            return None
+        self._count(True, degraded)
+        return json.loads(row['body'])
+
+    # ==================== WRITES ====================
+
+    @staticmethod
+    def _row(domainId: str, objectType: str, item: Dict, partial: bool, now: float) -> tuple:
+        name = item.get('name')
+        return (
+            domainId, item.get('id') or item.get('resourceId'), objectType,
+            name, (name or '').lower(), item.get('subType'), item.get('status'),
+            json.dumps(item, default=str), 1 if partial else 0, now
+        )
+
+    def _changedSince(self, domainId: str, objectType: str, fetchedAt: float) -> set:
+        """Ids a listing fetched at fetchedAt must not touch: rows written or objects deleted after it"""
+        rows = self._conn.execute(
+            'SELECT id FROM objects WHERE domain_id = ? AND type = ? AND synced_at > ?',
+            (domainId, objectType, fetchedAt)
+        ).fetchall()
+        deleted = self._conn.execute('SELECT id FROM tombstones WHERE deleted_at >= ?', (fetchedAt,)).fetchall()
+        return {row['id'] for row in rows} | {row['id'] for row in deleted}
+
+    def replaceList(self, domainId: str, objectType: str, items: Iterable[Dict],
+                    fetchedAt: Optional[float] = None):
+        """
+        Replace the mirrored (domain, type) list with a complete listing.
+
+        Args:
+            fetchedAt: When the listing was requested (default: now). Rows
+                written after that and objects deleted after it are kept as
+                they are; the list counts as synced at fetchedAt.
+        """
+        now = time.time()
+        fetchedAt = now if fetchedAt is None else min(fetchedAt, now)
+        with self._lock:
+            skip = self._changedSince(domainId, objectType, fetchedAt) | {None}
+            rows = [self._row(domainId, objectType, item, False, fetchedAt)
+                    for item in items if isinstance(item, dict)
+                    and (item.get('id') or item.get('resourceId')) not in skip]
+            self._conn.execute(
+                'DELETE FROM objects WHERE domain_id = ? AND type = ? AND synced_at <= ?',
+                (domainId, objectType, fetchedAt)
+            )
+            self._conn.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            count = self._conn.execute(
+                'SELECT COUNT(*) FROM objects WHERE domain_id = ? AND type = ?', (domainId, objectType)
+            ).fetchone()[0]
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)',
+                (domainId, objectType, fetchedAt, count)
+            )
+            self._conn.execute('DELETE FROM tombstones WHERE deleted_at < ?', (now - self.TOMBSTONE_SECONDS,))
+            self._conn.commit()
+
+    def upsertObjects(self, domainId: str, objectType: str, items: Iterable[Dict], partial: bool = False,
+                      fetchedAt: Optional[float] = None):
+        """
+        Insert/refresh individual list rows (filtered lists, write-through).
+
+        Args:
+            fetchedAt: When the items were read from the backend; None for
+                write-throughs, which are always current
+        """
+        now = time.time()
+        with self._lock:
+            skip = self._changedSince(domainId, objectType, fetchedAt) if fetchedAt is not None else set()
+            skip.add(None)
+            rows = [self._row(domainId, objectType, item, partial, now if fetchedAt is None else fetchedAt)
+                    for item in items if isinstance(item, dict)
+                    and (item.get('id') or item.get('resourceId')) not in skip]
+            if not rows:
+                return
+            self._conn.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.commit()
+
+    def mergeObject(self, domainId: str, objectType: str, changes: Dict) -> bool:
+        """
+        Update fields of an existing list row, keeping the rest of its body.
+        False if (domain, id) is not mirrored - there is nothing to merge into.
+        """
+        objectId = changes.get('id') or changes.get('resourceId')
+        if not objectId:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, partial FROM objects WHERE domain_id = ? AND id = ?', (domainId, objectId)
+            ).fetchone()
+            if row is None:
+                return False
+            item = {**json.loads(row['body']), **changes}
+            self._conn.execute(
+                'INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._row(domainId, objectType, item, bool(row['partial']), time.time())
+            )
+            self._conn.commit()
+        return True
+
+    def storeDetail(self, objectType: str, objectId: str, data: Dict):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?)',
+                (objectId, objectType, json.dumps(data, default=str), time.time())
+            )
+            self._conn.commit()
+
+    def storeCollection(self, kind: str, body: Any):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO collections VALUES (?, ?, ?)',
+                (kind, json.dumps(body, default=str), time.time())
+            )
+            self._conn.commit()
+
+    def dropDetail(self, objectId: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM details WHERE id = ?', (objectId,))
+            self._conn.commit()
+
+    def deleteObject(self, objectId: str):
+        """Remove an object from every domain list and the detail cache (listings in flight will not restore it)"""
+        with self._lock:
+            self._conn.execute('DELETE FROM objects WHERE id = ?', (objectId,))
+            self._conn.execute('DELETE FROM details WHERE id = ?', (objectId,))
+            self._conn.execute('INSERT OR REPLACE INTO tombstones VALUES (?, ?)', (objectId, time.time()))
+            self._conn.commit()
+
+    def dropCollection(self, kind: Optional[str] = None):
+        with self._lock:
+            if kind:
+                self._conn.execute('DELETE FROM collections WHERE kind = ?', (kind,))
+            else:
+                self._conn.execute('DELETE FROM collections')
+            self._conn.commit()
+
+    def markStale(self, domainId: Optional[str] = None, objectType: Optional[str] = None):
+        """Force the next read of (domain, type) - or everything - back to the backend"""
+        clauses, params = [], []
+        if domainId:
+            clauses.append('domain_id = ?')
+            params.append(domainId)
+        if objectType:
+            clauses.append('type = ?')
+            params.append(objectType)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            self._conn.execute(f'DELETE FROM sync_state{where}', params)
+            self._conn.commit()
+
+    def confirmCurrent(self):
+        """
+        Everything still mirrored is known to be current (an incremental sync
+        applied all changes since the last one): restart the freshness clocks.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE sync_state SET synced_at = ?', (now,))
+            self._conn.execute('UPDATE details SET synced_at = ?', (now,))
+            self._conn.execute('UPDATE collections SET synced_at = ?', (now,))
+            self._conn.commit()
+
+    def getMeta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM sync_meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def setMeta(self, key: str, value: Optional[str]):
+        with self._lock:
+            if value is None:
+                self._conn.execute('DELETE FROM sync_meta WHERE key = ?', (key,))
+            else:
+                self._conn.execute('INSERT OR REPLACE INTO sync_meta VALUES (?, ?, ?)', (key, value, time.time()))
+            self._conn.commit()
+
+    def loadChangeNumbers(self, limit: int) -> Dict[str, int]:
+        """Last applied changeNumber per resource URI (veriniceHistory), least recently updated first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT uri, change_number FROM (SELECT * FROM change_numbers ORDER BY updated_at DESC LIMIT ?) '
+                'ORDER BY updated_at', (limit,)
+            ).fetchall()
+        return {row['uri']: row['change_number'] for row in rows}
+
+    def storeChangeNumbers(self, changeNumbers: Dict[str, int], limit: int):
+        """Upsert changeNumbers and keep only the `limit` most recently updated resources"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO change_numbers VALUES (?, ?, ?)',
+                [(uri, number, now) for uri, number in changeNumbers.items()]
+            )
+            self._conn.execute(
+                'DELETE FROM change_numbers WHERE uri NOT IN '
+                '(SELECT uri FROM change_numbers ORDER BY updated_at DESC LIMIT ?)', (limit,)
+            )
+            self._conn.commit()
+
+    def clearChangeNumbers(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM change_numbers')
+            self._conn.commit()
+
+    def recordWrite(self):
+        with self._lock:
+            self.stats['writeThroughs'] += 1
+
+    # ==================== SYNC JOB ====================
+
+    def syncDomain(self, veriniceTool, domainId: str) -> Dict[str, int]:
+        """Page through every element type of one domain and replace the mirrored lists"""
+        counts = {}
+        apiUrl = veriniceTool.client.apiUrl
+        for objectType, plural in veriniceTool.OBJECT_TYPES.items():
+            items: List[Dict] = []
+            page = 0
+            fetchedAt = time.time()
+            while True:
+                response = veriniceTool.client.makeRequest(
+                    'GET', f"{apiUrl}/domains/{domainId}/{plural}",
+                    params={'size': self.pageSize, 'page': page}
+                )
+                response.raise_for_status()
+                body = response.json()
+                if isinstance(body, list):
+                    items.extend(body)
+                    break
+                items.extend(body.get('items') or body.get('content') or [])
+                pageCount = body.get('pageCount') or body.get('totalPages') or 1
+                page += 1
+                if page >= pageCount:
+                    break
+            self.replaceList(domainId, objectType, items, fetchedAt=fetchedAt)
+            counts[objectType] = len(items)
+        return counts
+
+    def _fetchCollection(self, veriniceTool, kind: str) -> List[Dict]:
+        """GET /domains or /units and mirror it in the shape listDomains/listUnits return"""
+        response = veriniceTool.client.makeRequest('GET', f"{veriniceTool.client.apiUrl}/{kind}")
+        response.raise_for_status()
+        body = response.json()
+        if isinstance(body, dict):
+            body = body.get('items') or []
+        self.storeCollection(kind, body)
+        return body
+
+    def sync(self, veriniceTool) -> Dict[str, Any]:
+        """Full sync: domains, units and every domain's element lists"""
+        started = time.time()
+        summary: Dict[str, Any] = {'domains': {}, 'errors': []}
+        try:
+            # Straight to REST: the tool's own list methods would answer from this mirror
+            domains = self._fetchCollection(veriniceTool, 'domains')
+            self._fetchCollection(veriniceTool, 'units')
+            for domain in domains:
+                domainId = domain.get('id') if isinstance(domain, dict) else domain
+                if not domainId:
+                    continue
+                try:
+                    summary['domains'][domainId] = self.syncDomain(veriniceTool, domainId)
+                except Exception as e:
+                    summary['errors'].append(f"{domainId}: {e}")
+        except Exception as e:
+            summary['errors'].append(str(e))
+        summary['seconds'] = round(time.time() - started, 2)
+        summary['finishedAt'] = time.time()
+        with self._lock:
+            self.stats['syncs'] += 1
+            if summary['errors']:
+                self.stats['syncErrors'] += 1
+            self.lastSync = summary
+        return summary
+
+    def startSyncJob(self, veriniceTool, intervalSeconds: float,
+                     syncFn: Optional[Callable[[Any], Dict[str, Any]]] = None) -> bool:
+        """
+        Run sync() now and then every intervalSeconds on a daemon thread.
+
+        syncFn replaces the full sync (VeriniceHistorySync.sync applies only the
+        changes since the previous run).
+        """
+        if intervalSeconds <= 0 or (self._syncThread and self._syncThread.is_alive()):
+            return False
+        syncFn = syncFn or self.sync
+
+        def loop():
+            while not self._stopSync.is_set():
+                if veriniceTool.isBackendAvailable():
+                    summary = syncFn(veriniceTool)
+                    if summary['errors']:
+                        logger.warning(f"[VeriniceMirror] Sync finished with errors: {summary['errors'][:3]}")
+                self._stopSync.wait(intervalSeconds)
+
+        self._stopSync.clear()
+        self._syncThread = threading.Thread(target=loop, name="verinice-mirror-sync", daemon=True)
+        self._syncThread.start()
+        return True
+
+    def stopSyncJob(self):
+        self._stopSync.set()
+
+    def getMetrics(self) -> Dict[str, Any]:
+        with self._lock:
+            objectCount = self._conn.execute('SELECT COUNT(*) FROM objects').fetchone()[0]
+            lists = self._conn.execute('SELECT COUNT(*), MIN(synced_at) FROM sync_state').fetchone()
+            return {
+                'path': self.path,
+                'maxAgeSeconds': self.maxAgeSeconds,
+                'objects': objectCount,
+                'syncedLists': lists[0],
+                'oldestListAge': round(time.time() - lists[1], 1) if lists[1] else None,
+                'syncRunning': bool(self._syncThread and self._syncThread.is_alive()),
+                'lastSync': {k: v for k, v in self.lastSync.items() if k != 'domains'},
+                **self.stats
+            }
+
+
+_mirror: Optional[VeriniceMirror] = None
+_mirrorLock = threading.Lock()
+
+
+def getVeriniceMirror() -> Optional[VeriniceMirror]:
+    """Process-wide mirror, or None when VERINICE_MIRROR_ENABLED is off"""
+    global _mirror
+    if not Settings.VERINICE_MIRROR_ENABLED:
+        return None
+    if _mirror is None:
+        with _mirrorLock:
+            if _mirror is None:
+                _mirror = VeriniceMirror(
+                    Settings.VERINICE_MIRROR_PATH,
+                    maxAgeSeconds=Settings.VERINICE_MIRROR_MAX_AGE_SECONDS,
+                    pageSize=Settings.VERINICE_MIRROR_PAGE_SIZE
+                )
+    return _mirror
+
+
+def getMirrorMetrics() -> Dict[str, Any]:
+    """Mirror metrics; {'enabled': False} when the mirror is off"""
+    mirror = getVeriniceMirror()
+    if mirror is None:
+        return {'enabled': False}
+    return {'enabled': True, **mirror.getMetrics()}
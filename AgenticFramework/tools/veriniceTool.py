@@ -1,30 +1,69 @@
 """Verinice ISMS integration tools - CRUD operations for all object types"""
+import itertools
+import json
+import logging
 import sys
 import os
-from typing import Dict, List, Optional, Any
+import threading
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
 from agents.instructions import get_error_message
+from tools.requestCache import requestScope, cachedRead, invalidatesReads
+from tools.writeBatch import writeBatch as openWriteBatch, getActiveBatch, PendingWrite
+from tools.veriniceMirror import getVeriniceMirror
+from tools.veriniceEvents import onEvent, startVeriniceEventConsumer
+from tools.veriniceHistory import getHistorySync
+from tools.reportStore import getReportStore, reportUrl, servableSince
+from tools.reportScheduler import startReportScheduler
+from tools.relationshipGraph import (
+    getRelationshipGraph, updateFromObject as updateGraphFromObject, removeObject as removeGraphObject
+)
 
 # Import path utilities and settings
 from utils.pathUtils import find_sparksbm_scripts_path, add_to_python_path
 from config.settings import Settings
 
-SPARKSBM_SCRIPTS_PATH = find_sparksbm_scripts_path()
-if SPARKSBM_SCRIPTS_PATH:
-    add_to_python_path(SPARKSBM_SCRIPTS_PATH)
+logger = logging.getLogger(__name__)
 
-try:
-    from sparksbmMgmt import SparksBMClient, SparksBMObjectManager, SparksBMUnitManager, SparksBMDomainManager, API_URL
-    VERINICE_AVAILABLE = True
-    # Use API_URL from sparksbmMgmt if available, otherwise use Settings
-    if not API_URL or API_URL == "http://localhost:8070":
-        API_URL = Settings.VERINICE_API_URL
-except ImportError:
-    VERINICE_AVAILABLE = False
-    SparksBMClient = None  # type: ignore
-    SparksBMObjectManager = None  # type: ignore
-    SparksBMUnitManager = None  # type: ignore
-    SparksBMDomainManager = None  # type: ignore
-    API_URL = Settings.VERINICE_API_URL
+# sparksbmMgmt (and requests) are imported on first use, not at module import,
+# so importing the agent stack does no path searching or HTTP-library loading
+SPARKSBM_SCRIPTS_PATH = None
+VERINICE_AVAILABLE = None  # None = not resolved yet, see _loadSparksBM()
+SparksBMClient = None  # type: ignore
+SparksBMObjectManager = None  # type: ignore
+SparksBMUnitManager = None  # type: ignore
+SparksBMDomainManager = None  # type: ignore
+API_URL = Settings.VERINICE_API_URL
+_sparksbmLock = threading.Lock()
+
+
+def _loadSparksBM() -> bool:
+    """Resolve and import sparksbmMgmt once; returns whether it is available"""
+    global SPARKSBM_SCRIPTS_PATH, VERINICE_AVAILABLE, API_URL
+    global SparksBMClient, SparksBMObjectManager, SparksBMUnitManager, SparksBMDomainManager
+    if VERINICE_AVAILABLE is not None:
+        return VERINICE_AVAILABLE
+    with _sparksbmLock:
+        if VERINICE_AVAILABLE is not None:
+            return VERINICE_AVAILABLE
+        SPARKSBM_SCRIPTS_PATH = find_sparksbm_scripts_path()
+        if SPARKSBM_SCRIPTS_PATH:
+            add_to_python_path(SPARKSBM_SCRIPTS_PATH)
+        try:
+            import sparksbmMgmt
+            SparksBMClient = sparksbmMgmt.SparksBMClient
+            SparksBMObjectManager = sparksbmMgmt.SparksBMObjectManager
+            SparksBMUnitManager = sparksbmMgmt.SparksBMUnitManager
+            SparksBMDomainManager = sparksbmMgmt.SparksBMDomainManager
+            # Use API_URL from sparksbmMgmt if available, otherwise use Settings
+            if sparksbmMgmt.API_URL and sparksbmMgmt.API_URL != "http://localhost:8070":
+                API_URL = sparksbmMgmt.API_URL
+            VERINICE_AVAILABLE = True
+        except ImportError:
+            VERINICE_AVAILABLE = False
+    return VERINICE_AVAILABLE
 
 
 class VeriniceTool:
@@ -42,41 +81,165 @@ class VeriniceTool:
         "document": "documents"
     }
     
-    def __init__(self):
-        """Initialize Verinice tool with SparksBM client"""
+    # Warm-up states
+    STATE_PENDING = "pending"
+    STATE_WARMING = "warming"
+    STATE_READY = "ready"
+    STATE_FAILED = "failed"
+    
+    # How long a handler waits for an in-flight warm-up before failing fast
+    READY_WAIT_SECONDS = float(os.getenv("VERINICE_READY_WAIT_SECONDS", "5"))
+    
+    # Element-list query parameters the Verinice API filters on server-side
+    # (domain-level lists only). Text predicates are case-insensitive "contains".
+    SERVER_FILTERS = {
+        'subType', 'status', 'name', 'displayName', 'abbreviation', 'description',
+        'designator', 'updatedBy', 'childElementIds', 'hasParentElements', 'hasChildElements'
+    }
+    TEXT_FILTERS = {'name', 'displayName', 'abbreviation', 'description', 'designator', 'updatedBy'}
+    SUBTYPE_PREFIXES = ('AST_', 'SCP_', 'PER_', 'CTL_', 'PRO_', 'INC_', 'DOC_', 'SCN_')
+    # Domain subtype keys used by resolveSubType are re-read after this long
+    # (veo events drop them sooner, but those are off by default)
+    SUBTYPE_CACHE_SECONDS = float(os.getenv("VERINICE_SUBTYPE_CACHE_SECONDS", "300"))
+    
+    # `with VeriniceTool.requestScope() as cache:` memoises reads for one chat turn
+    requestScope = staticmethod(requestScope)
+    
+    def __init__(self, warmUp: bool = True):
+        """
+        Initialize Verinice tool with SparksBM client
+        
+        Construction never blocks on the network. With warmUp=True the Keycloak
+        login runs on a background thread; handlers check isReady() or wait via
+        waitUntilReady(). Repeated auth failures trip the client's circuit
+        breaker, so callers fail fast instead of sleeping through retries.
+        """
         self.client = None
         self.objectManager = None
         self.unitManager = None
         self.domainManager = None
         
-        if VERINICE_AVAILABLE:
-            # Retry authentication up to 3 times with delays
-            import time
-            max_retries = 3
-            retry_delay = 2  # seconds
-            
-            for attempt in range(max_retries):
-                try:
-                    # Suppress print output during initialization
-                    import io
-                    import contextlib
-                    f = io.StringIO()
-                    with contextlib.redirect_stdout(f):
-                        self.client = SparksBMClient()
-                    if self.client and self.client.accessToken:
-                        self.objectManager = SparksBMObjectManager(self.client)
-                        self.unitManager = SparksBMUnitManager(self.client)
-                        if SparksBMDomainManager:
-                            self.domainManager = SparksBMDomainManager(self.client)
-                        break  # Success, exit retry loop
-                    else:
-                        if attempt < max_retries - 1:
-                            time.sleep(retry_delay)
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        time.sleep(retry_delay)
-                    else:
-                        self.client = None
+        self._state = self.STATE_PENDING
+        self._stateLock = threading.Lock()
+        self._readyEvent = threading.Event()
+        self._warmUpThread = None
+        self.lastError = None
+        self._subTypeCache: Dict[tuple, tuple] = {}  # (domainId, type) -> (loadedAt, keys)
+        # Domain definition changes published by veo drop the cached subtypes
+        onEvent(self._onVeriniceEvent, weak=True)
+        
+        if warmUp:
+            self.startWarmUp()
+    
+    def _connect(self) -> bool:
+        """Single login attempt; creates the client and managers on success"""
+        if not _loadSparksBM():
+            self.lastError = "sparksbmMgmt not available"
+            return False
+        try:
+            # Suppress print output during initialization
+            import io
+            import contextlib
+            f = io.StringIO()
+            with contextlib.redirect_stdout(f):
+                client = self.client or SparksBMClient(authenticate=False)
+                if not client.accessToken:
+                    client.getAccessToken()
+            self.client = client
+            if not client.accessToken:
+                breaker = getattr(client, 'authBreaker', None)
+                if breaker and breaker.state == breaker.OPEN:
+                    self.lastError = str(breaker.openError())
+                else:
+                    self.lastError = (breaker.lastError if breaker else None) or "Keycloak login failed"
+                return False
+            if not self.objectManager:
+                self.objectManager = SparksBMObjectManager(client)
+            if not self.unitManager:
+                self.unitManager = SparksBMUnitManager(client)
+            if SparksBMDomainManager and not self.domainManager:
+                self.domainManager = SparksBMDomainManager(client)
+            self.lastError = None
+            return True
+        except Exception as e:
+            self.lastError = str(e)
+            return False
+    
+    def _warmUp(self):
+        """Background warm-up body"""
+        ok = self._connect()
+        with self._stateLock:
+            self._state = self.STATE_READY if ok else self.STATE_FAILED
+            self._readyEvent.set()
+        mirror = getVeriniceMirror()
+        if ok and mirror is not None:
+            # With veo-history, refreshes after the first apply only the changes since the last one
+            historySync = getHistorySync(mirror)
+            mirror.startSyncJob(self, Settings.VERINICE_MIRROR_SYNC_INTERVAL_SECONDS,
+                                syncFn=historySync.sync if historySync else None)
+        if ok:
+            startVeriniceEventConsumer()
+            startReportScheduler(self)
+    
+    def startWarmUp(self) -> bool:
+        """
+        Start the background login if it is not already running or done
+        
+        Returns:
+            True if a warm-up thread was started
+        """
+        with self._stateLock:
+            if self._state in (self.STATE_WARMING, self.STATE_READY):
+                return False
+            self._state = self.STATE_WARMING
+            self._readyEvent.clear()
+            self._warmUpThread = threading.Thread(
+                target=self._warmUp, name="verinice-warmup", daemon=True
+            )
+            self._warmUpThread.start()
+            return True
+    
+    def isReady(self) -> bool:
+        """Whether the client is logged in and the managers exist"""
+        return self._state == self.STATE_READY
+    
+    def waitUntilReady(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until an in-flight warm-up finishes (or timeout)
+        
+        Returns:
+            True if the tool is ready
+        """
+        if self._state == self.STATE_WARMING:
+            self._readyEvent.wait(timeout)
+        return self.isReady()
+    
+    def _breakers(self) -> List:
+        """Circuit breakers guarding this tool's Keycloak and Verinice calls"""
+        return [b for b in (getattr(self.client, 'authBreaker', None),
+                            getattr(self.client, 'apiBreaker', None)) if b]
+    
+    def isBackendAvailable(self) -> bool:
+        """False while a circuit breaker is open (calls would fail fast, retrying is pointless)"""
+        return not any(b.state == b.OPEN for b in self._breakers())
+    
+    def getStatus(self) -> Dict:
+        """Readiness state, last error and circuit breaker metrics"""
+        authBreaker = getattr(self.client, 'authBreaker', None)
+        apiBreaker = getattr(self.client, 'apiBreaker', None)
+        return {
+            'state': self._state,
+            'ready': self.isReady(),
+            'backendAvailable': self.isBackendAvailable(),
+            'lastError': self.lastError,
+            'authBreaker': authBreaker.getMetrics() if authBreaker else None,
+            'apiBreaker': apiBreaker.getMetrics() if apiBreaker else None
+        }
+    
+    @staticmethod
+    def _isConnectionError(e: Exception) -> bool:
+        """True for failures that mean the backend is unreachable (not an HTTP error reply)"""
+        return getattr(e, 'response', None) is None
     
     def _checkClient(self) -> bool:
         """Check if client is available - tries to ensure authentication"""
@@ -84,67 +247,44 @@ class VeriniceTool:
     
     def _ensureAuthenticated(self) -> bool:
         """Ensure client is authenticated, refresh token if expired"""
-        # If client doesn't exist, try to initialize it
-        if not self.client and VERINICE_AVAILABLE:
-            try:
-                import io
-                import contextlib
-                f = io.StringIO()
-                with contextlib.redirect_stdout(f):
-                    self.client = SparksBMClient()
-                if self.client and self.client.accessToken:
-                    # Ensure ObjectManager is created
-                    if not self.objectManager:
-                        self.objectManager = SparksBMObjectManager(self.client)
-                    if not self.unitManager:
-                        self.unitManager = SparksBMUnitManager(self.client)
-                    if SparksBMDomainManager and not self.domainManager:
-                        self.domainManager = SparksBMDomainManager(self.client)
-            except Exception:
-                pass
-        
-        # If client exists but ObjectManager doesn't, create it
-        if self.client and self.client.accessToken and not self.objectManager:
-            try:
-                    self.objectManager = SparksBMObjectManager(self.client)
-                    self.unitManager = SparksBMUnitManager(self.client)
-                    if SparksBMDomainManager:
-                        self.domainManager = SparksBMDomainManager(self.client)
-            except Exception:
-                pass
-        
-        if not self.client:
-            return False
+        # Give an in-flight warm-up a bounded amount of time
+        if self._state == self.STATE_WARMING:
+            self._readyEvent.wait(self.READY_WAIT_SECONDS)
+            if self._state == self.STATE_WARMING:
+                self.lastError = "Verinice login still in progress"
+                return False
         
-        if not self.client.accessToken:
-            # Try to re-authenticate
-            if hasattr(self.client, 'getAccessToken'):
-                try:
-                    self.client.getAccessToken()
-                except Exception:
-                    return False
-            return self.client.accessToken is not None
+        # Not connected: one synchronous attempt (the auth breaker short-circuits
+        # it while Keycloak is known to be down)
+        if not self.isReady() or not self.client or not self.client.accessToken:
+            ok = self._connect()
+            with self._stateLock:
+                if self._state != self.STATE_WARMING:
+                    self._state = self.STATE_READY if ok else self.STATE_FAILED
+                    self._readyEvent.set()
+            return ok
         
         # Token exists, but might be expired - test it
         try:
-            # Use session to make request (has auth headers)
-            response = self.client.session.get(f"{self.client.apiUrl}/domains", timeout=5)
+            # makeRequest goes through the API circuit breaker, so a down backend
+            # fails here immediately instead of after the timeout
+            response = self.client.makeRequest('GET', f"{self.client.apiUrl}/domains", timeout=5)
             if response.status_code == 401:
                 # Token expired, re-authenticate
-                if hasattr(self.client, 'getAccessToken'):
-                    try:
-                        self.client.getAccessToken()
-                        return self.client.accessToken is not None
-                    except Exception:
-                        return False
-                return False
+                try:
+                    self.client.getAccessToken()
+                    return self.client.accessToken is not None
+                except Exception:
+                    return False
             return True
         except Exception as e:
             # Network error or other issue
+            self.lastError = str(e)
             return False
     
     # ==================== CREATE OPERATIONS ====================
     
+    @invalidatesReads
     def createObject(self, objectType: str, domainId: str, unitId: str, 
                     name: str, subType: Optional[str] = None,
                     description: str = "", abbreviation: Optional[str] = None) -> Dict:
@@ -184,6 +324,17 @@ class VeriniceTool:
             )
             
             if result:
+                updateGraphFromObject(domainId, objectType.lower(), {
+                    'id': result.get('resourceId') or result.get('id'), 'name': name, 'subType': subType
+                })
+                mirror = getVeriniceMirror()
+                if mirror is not None:
+                    # Partial row (no server-side fields) so lists and name lookups see it at once
+                    mirror.upsertObjects(domainId, objectType.lower(), [{
+                        'id': result.get('resourceId') or result.get('id'), 'name': name,
+                        'subType': subType, 'description': description, 'abbreviation': abbreviation
+                    }], partial=True)
+                    mirror.recordWrite()
                 # Use the name parameter we passed, not from result (result doesn't have name)
                 return {
                     'success': True,
@@ -215,6 +366,7 @@ class VeriniceTool:
     
     # ==================== READ OPERATIONS ====================
     
+    @cachedRead
     def listObjects(self, objectType: str, domainId: Optional[str] = None, filters: Optional[Dict] = None, unitId: Optional[str] = None) -> Dict:
         """
         List objects of a specific type in a domain or unit
@@ -222,14 +374,26 @@ class VeriniceTool:
         Args:
             objectType: Type of object (scope, asset, control, process, person, scenario, incident, document)
             domainId: Domain ID (optional for scopes - can list at unit level)
-            filters: Optional filters (subType, status, etc. - passed as query parameters)
+            filters: Optional filters. Keys in SERVER_FILTERS become query parameters on
+                domain-level lists; anything else (and every filter on unit-level lists)
+                is applied client-side to the returned items
             unitId: Unit ID (optional, used for scopes when domainId is not available)
         
         Returns:
-            Dict with success status and list of objects
+            Dict with success status and list of objects ('filters' shows where
+            each predicate was evaluated)
         """
+        # Domain lists are answered by the local mirror while it is fresh, and
+        # from whatever it has (degraded) when the backend cannot be reached
+        mirror = getVeriniceMirror() if domainId and objectType.lower() in self.OBJECT_TYPES else None
+        if mirror is not None:
+            mirrored = mirror.listObjects(domainId, objectType.lower(), filters, self._matchesFilters)
+            if mirrored is not None:
+                return mirrored
+        
         if not self._ensureAuthenticated():
-            return {
+            degraded = mirror.listObjects(domainId, objectType.lower(), filters, self._matchesFilters, degraded=True) if mirror else None
+            return degraded or {
                 'success': False, 
                 'error': get_error_message('connection', 'isms_client_not_available_detailed')
             }
@@ -245,6 +409,8 @@ class VeriniceTool:
             }
         
         try:
+            # Only the domain-level element lists accept filter parameters
+            serverSide = False
             # For scopes, can list at unit level if no domain
             if objectType.lower() == 'scope' and not domainId:
                 if unitId:
@@ -263,13 +429,10 @@ class VeriniceTool:
             elif domainId:
                 # Use direct API call to support filters
                 url = f"{API_URL}/domains/{domainId}/{plural}"
+                serverSide = True
             else:
                 return {'success': False, 'error': get_error_message('not_found', 'domain_or_unit_required')}
-            params = {}
-            if filters:
-                for key, value in filters.items():
-                    if value is not None:
-                        params[key] = value
+            params, residual = self._splitFilters(filters, serverSide=serverSide)
             
             # CRITICAL: Request all items by setting a large page size
             # Verinice API defaults to 20 items per page, so we need to explicitly request more
@@ -277,6 +440,7 @@ class VeriniceTool:
             if 'size' not in params:
                 params['size'] = 10000  # Request up to 10,000 items
             
+            fetchedAt = time.time()
             response = self.client.makeRequest('GET', url, params=params if params else None)
             response.raise_for_status()
             
@@ -298,19 +462,184 @@ class VeriniceTool:
                 objects = {'items': []}
             
             items = objects.get('items', []) if isinstance(objects, dict) else []
+            serverFilters = {k: v for k, v in params.items() if k not in ('size', 'page')}
+            if mirror is not None and serverSide:
+                # Only an unfiltered single-page listing may replace the mirrored list
+                complete = not serverFilters and not residual and 'page' not in params and len(items) < int(params['size'])
+                if complete:
+                    mirror.replaceList(domainId, objectType.lower(), items, fetchedAt=fetchedAt)
+                else:
+                    mirror.upsertObjects(domainId, objectType.lower(), items, fetchedAt=fetchedAt)
+            if residual:
+                items = [item for item in items if self._matchesFilters(item, residual)]
+                objects['items'] = items
             return {
                 'success': True,
                 'count': len(items),
                 'objects': objects,  # Keep as dict with 'items' key for consistency
                 'objectType': objectType,
-                'domainId': domainId
+                'domainId': domainId,
+                'filters': {
+                    'server': serverFilters,
+                    'client': residual
+                }
             }
         except Exception as e:
+            if mirror is not None and self._isConnectionError(e):
+                degraded = mirror.listObjects(domainId, objectType.lower(), filters, self._matchesFilters, degraded=True)
+                if degraded is not None:
+                    return degraded
             errorMsg = str(e)
             if hasattr(e, 'response') and e.response is not None:
                 errorMsg = f'HTTP {e.response.status_code}: {e.response.text[:200]}'
             return {'success': False, 'error': get_error_message('operation_failed', 'list_objects_exception', error=errorMsg)}
     
+    @cachedRead
+    def countObjects(self, objectType: str, domainId: Optional[str] = None, filters: Optional[Dict] = None, unitId: Optional[str] = None) -> Dict:
+        """
+        Count objects without fetching them
+
+        Requests a single item and reads the page total (totalItemCount), so the
+        cost does not depend on how many objects match. Falls back to listing and
+        counting when a predicate can only be evaluated client-side or the list
+        is unit-level.
+
+        Args:
+            objectType: Type of object (scope, asset, control, ...)
+            domainId: Domain ID
+            filters: Same filters as listObjects
+            unitId: Unit ID (scopes without a domain)
+
+        Returns:
+            Dict with success status, count and method ('page_total' or 'list')
+        """
+        plural = self.OBJECT_TYPES.get(objectType.lower())
+        params, residual = self._splitFilters(filters, serverSide=True)
+        if not domainId or not plural or residual:
+            result = self.listObjects(objectType, domainId, filters, unitId=unitId)
+            if result.get('success'):
+                result = {
+                    'success': True,
+                    'count': result.get('count', 0),
+                    'objectType': objectType,
+                    'domainId': domainId,
+                    'method': 'list'
+                }
+            return result
+
+        if not self._ensureAuthenticated():
+            return {
+                'success': False,
+                'error': get_error_message('connection', 'isms_client_not_available_detailed')
+            }
+
+        try:
+            params['size'] = 1
+            params.pop('page', None)
+            response = self.client.makeRequest('GET', f"{API_URL}/domains/{domainId}/{plural}", params=params)
+            response.raise_for_status()
+            page = response.json()
+
+            if isinstance(page, dict) and 'totalItemCount' in page:
+                count = int(page['totalItemCount'])
+            else:
+                # Unpaged response - the body is already the full list
+                items = page.get('items', page.get('content', [])) if isinstance(page, dict) else page
+                count = len(items) if isinstance(items, list) else 0
+            return {
+                'success': True,
+                'count': count,
+                'objectType': objectType,
+                'domainId': domainId,
+                'method': 'page_total',
+                'filters': {k: v for k, v in params.items() if k != 'size'}
+            }
+        except Exception as e:
+            errorMsg = str(e)
+            if hasattr(e, 'response') and e.response is not None:
+                errorMsg = f'HTTP {e.response.status_code}: {e.response.text[:200]}'
+            return {'success': False, 'error': get_error_message('operation_failed', 'list_objects_exception', error=errorMsg)}
+
+    def _splitFilters(self, filters: Optional[Dict], serverSide: bool) -> tuple:
+        """Split filters into (query params, residual client-side predicates)"""
+        params = {}
+        residual = {}
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            if key in ('size', 'page', 'sortBy', 'sortOrder'):
+                params[key] = value
+            elif serverSide and key in self.SERVER_FILTERS:
+                params[key] = str(value).lower() if isinstance(value, bool) else value
+            else:
+                residual[key] = value
+        return params, residual
+    
+    @classmethod
+    def _matchesFilters(cls, item: Dict, residual: Dict) -> bool:
+        """Client-side evaluation with the API's semantics (text contains, other fields equal)"""
+        if not isinstance(item, dict):
+            return False
+        for key, expected in residual.items():
+            actual = item.get(key)
+            if key in cls.TEXT_FILTERS:
+                if str(expected).lower() not in str(actual or '').lower():
+                    return False
+            elif isinstance(expected, (list, tuple, set)):
+                if actual not in expected:
+                    return False
+            elif actual != expected:
+                return False
+        return True
+    
+    @classmethod
+    def _normalizeSubType(cls, subType: str) -> str:
+        value = subType or ''
+        for prefix in cls.SUBTYPE_PREFIXES:
+            if value.upper().startswith(prefix):
+                value = value[len(prefix):]
+                break
+        return value.lower().replace('-', '').replace('_', '').replace(' ', '').rstrip('s')
+    
+    def resolveSubType(self, objectType: str, domainId: str, subTypeFilter: str) -> Optional[str]:
+        """
+        Map a user-facing subtype ("IT-System", "data protection officer", "AST_IT-System")
+        to the domain's exact subtype key, so it can be sent as a query parameter.
+        
+        Returns:
+            The subtype key, or None if it does not resolve to exactly one key
+            (callers then filter client-side as before)
+        """
+        if not subTypeFilter or not domainId:
+            return None
+        cacheKey = (domainId, objectType.lower())
+        cached = self._subTypeCache.get(cacheKey)
+        if cached is not None and time.time() - cached[0] < self.SUBTYPE_CACHE_SECONDS:
+            subTypes = cached[1]
+        else:
+            result = self.getDomainSubTypes(domainId, objectType.lower())
+            if not result.get('success'):
+                return None
+            subTypes = list(result.get('subTypes') or [])
+            self._subTypeCache[cacheKey] = (time.time(), subTypes)
+        if subTypeFilter in subTypes:
+            return subTypeFilter
+        wanted = self._normalizeSubType(subTypeFilter)
+        matches = [key for key in subTypes if self._normalizeSubType(key) == wanted]
+        return matches[0] if len(matches) == 1 else None
+    
+    def _onVeriniceEvent(self, event):
+        """Forget subtype definitions of a domain whose element types changed"""
+        if event.eventType == 'resync':
+            self._subTypeCache.clear()
+            return
+        if event.resourceType != 'domain' or not event.domainIds:
+            return
+        for key in list(self._subTypeCache):
+            if key[0] in event.domainIds and (not event.elementType or key[1] == event.elementType.lower()):
+                self._subTypeCache.pop(key, None)
+    
+    @cachedRead
     def getObject(self, objectType: str, domainId: str, objectId: str) -> Dict:
         """
         Get a specific object by ID - backend uses top-level /{plural}/{uuid} endpoint
@@ -323,8 +652,15 @@ class VeriniceTool:
         Returns:
             Dict with success status and object data
         """
+        mirror = getVeriniceMirror()
+        if mirror is not None:
+            mirrored = mirror.getObject(objectType, domainId, objectId)
+            if mirrored is not None:
+                return mirrored
+        
         if not self._ensureAuthenticated():
-            return {
+            degraded = mirror.getObject(objectType, domainId, objectId, degraded=True) if mirror else None
+            return degraded or {
                 'success': False, 
                 'error': get_error_message('connection', 'isms_client_not_available_detailed')
             }
@@ -343,6 +679,8 @@ class VeriniceTool:
             response.raise_for_status()
             
             objectData = response.json()
+            if mirror is not None and isinstance(objectData, dict):
+                mirror.storeDetail(objectType, objectId, objectData)
             return {
                 'success': True,
                 'data': objectData,
@@ -351,6 +689,10 @@ class VeriniceTool:
                 'domainId': domainId
             }
         except Exception as e:
+            if mirror is not None and self._isConnectionError(e):
+                degraded = mirror.getObject(objectType, domainId, objectId, degraded=True)
+                if degraded is not None:
+                    return degraded
             errorMsg = str(e)
             if hasattr(e, 'response') and e.response is not None:
                 status_code = e.response.status_code
@@ -363,6 +705,52 @@ class VeriniceTool:
                     errorMsg = f'HTTP {status_code}: {error_text}'
             return {'success': False, 'error': get_error_message('operation_failed', 'get_object', objectType=objectType, error=errorMsg)}
     
+    def getObjects(self, objectType: str, ids: List[str], domainId: Optional[str] = None) -> Dict:
+        """
+        Get several objects of one type by ID
+        
+        Verinice has no multi-ID filter on its element endpoints, so the GETs
+        run concurrently (up to Settings.VERINICE_FETCH_CONCURRENCY) over the
+        client's pooled session; each still goes through getObject, so the
+        turn's read cache, the mirror and ETag revalidation apply per item.
+        
+        Returns:
+            Dict with 'objects' (id -> object data, in request order) and
+            'errors' (id -> error) for the IDs that could not be fetched
+        """
+        if objectType.lower() not in self.OBJECT_TYPES:
+            return {
+                'success': False,
+                'error': get_error_message('validation', 'unknown_object_type', objectType=objectType, availableTypes=', '.join(self.OBJECT_TYPES.keys()))
+            }
+        uniqueIds = list(dict.fromkeys(objectId for objectId in ids if objectId))
+        workers = max(1, min(Settings.VERINICE_FETCH_CONCURRENCY, len(uniqueIds)))
+        if workers == 1:
+            results = {objectId: self.getObject(objectType, domainId, objectId) for objectId in uniqueIds}
+        else:
+            # Each task runs in a copy of this context so it sees the turn's read cache
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='verinice-get') as pool:
+                futures = {
+                    objectId: pool.submit(contextvars.copy_context().run, self.getObject, objectType, domainId, objectId)
+                    for objectId in uniqueIds
+                }
+            results = {objectId: future.result() for objectId, future in futures.items()}
+        
+        objects, errors = {}, {}
+        for objectId, result in results.items():
+            if result.get('success'):
+                objects[objectId] = result.get('data') or {}
+            else:
+                errors[objectId] = result.get('error', 'Unknown error')
+        return {
+            'success': bool(objects) or not errors,
+            'objects': objects,
+            'errors': errors,
+            'count': len(objects),
+            'objectType': objectType,
+            'domainId': domainId
+        }
+    
     # ==================== UPDATE OPERATIONS ====================
     
     def updateObject(self, objectType: str, domainId: str, objectId: str, 
@@ -379,6 +767,27 @@ class VeriniceTool:
         Returns:
             Dict with success status and updated object data
         """
+        def mergeFields(fullObject: Dict):
+            # FIX: Merge user's updates into full object
+            if data:
+                for key, value in data.items():
+                    fullObject[key] = value
+            if kwargs:
+                for key, value in kwargs.items():
+                    fullObject[key] = value
+        
+        return self._updateInDomain(objectType, domainId, objectId, mergeFields)
+    
+    @invalidatesReads
+    def _updateInDomain(self, objectType: str, domainId: str, objectId: str,
+                        mutate: Callable[[Dict], None], retryOnConflict: bool = False) -> Dict:
+        """
+        GET the InDomain view, apply `mutate` to it and PUT it back with If-Match
+        
+        With retryOnConflict a 412 (ETag mismatch) re-reads the object and
+        re-applies `mutate` once; only safe when `mutate` expresses a delta
+        (membership add/remove, field set) rather than a stale full value.
+        """
         if not self._ensureAuthenticated():
             return {
                 'success': False, 
@@ -389,14 +798,33 @@ class VeriniceTool:
         if not plural:
             return {'success': False, 'error': f'Unknown object type: {objectType}'}
         
+        result = {}
+        for attempt in range(2 if retryOnConflict else 1):
+            result = self._putInDomain(objectType, plural, domainId, objectId, mutate)
+            if not result.pop('conflict', False):
+                if attempt:
+                    result['conflictRetried'] = True
+                break
+            logger.info(f"ETag conflict on {objectType} {objectId}, re-reading (attempt {attempt + 1})")
+        
+        stored = result.get('object') if result.get('success') else None
+        if isinstance(stored, dict):
+            # The stored InDomain object is the list-row shape; the top-level detail is refetched
+            updateGraphFromObject(domainId, objectType.lower(), {**stored, 'id': objectId})
+            mirror = getVeriniceMirror()
+            if mirror is not None:
+                mirror.upsertObjects(domainId, objectType.lower(), [{**stored, 'id': objectId}])
+                mirror.dropDetail(objectId)
+                mirror.recordWrite()
+        return result
+    
+    def _putInDomain(self, objectType: str, plural: str, domainId: str, objectId: str,
+                     mutate: Callable[[Dict], None]) -> Dict:
+        """One GET + PUT round of _updateInDomain; marks 412 responses with 'conflict'"""
         try:
             # Step 1: GET the current object from domain-specific endpoint
             # FIX: For UPDATE, we need the InDomain view, not the top-level view
             # Use domain-specific GET endpoint: /domains/{domainId}/{plural}/{uuid}
-            plural = self.OBJECT_TYPES.get(objectType.lower())
-            if not plural:
-                return {'success': False, 'error': f'Unknown object type: {objectType}'}
-            
             inDomainUrl = f"{API_URL}/domains/{domainId}/{plural}/{objectId}"
             inDomainResponse = self.client.makeRequest('GET', inDomainUrl)
             inDomainResponse.raise_for_status()
@@ -414,13 +842,7 @@ class VeriniceTool:
             # FIX: InDomain GET already returns object with subType/status at top level
             # No need to extract from domains dict - the InDomain endpoint already does this
             
-            # FIX: Merge user's updates into full object
-            if data:
-                for key, value in data.items():
-                    fullObject[key] = value
-            if kwargs:
-                for key, value in kwargs.items():
-                    fullObject[key] = value
+            mutate(fullObject)
             
             # FIX: Remove frontend-only fields (matching frontend behavior)
             # Frontend deletes these before sending to backend
@@ -537,6 +959,7 @@ class VeriniceTool:
             elif response.status_code == 412:
                 return {
                     'success': False,
+                    'conflict': True,
                     'error': get_error_message('validation', 'precondition_failed')
                 }
             
@@ -546,6 +969,8 @@ class VeriniceTool:
             return {
                 'success': True,
                 'data': updatedData,
+                # What was stored (the PUT body); the response only acknowledges it
+                'object': fullObject,
                 'objectId': objectId,
                 'objectType': objectType
             }
@@ -558,8 +983,54 @@ class VeriniceTool:
                     errorMsg = f'HTTP {e.response.status_code}: {e.response.text[:200]}'
             return {'success': False, 'error': get_error_message('operation_failed', 'update_object_exception', error=errorMsg)}
     
+    def relationshipGraph(self, domainId: Optional[str]):
+        """
+        Members/parts graph of a domain (tools.relationshipGraph); None if disabled
+        or not built yet (the first call starts a background build from the domain lists).
+        """
+        return getRelationshipGraph(self, domainId)
+    
+    def writeBatch(self):
+        """`with tool.writeBatch() as batch:` coalesces stageUpdate() calls per object until exit"""
+        return openWriteBatch(self)
+    
+    def stageUpdate(self, objectType: str, domainId: str, objectId: str, fields: Optional[Dict] = None,
+                    membersKey: Optional[str] = None, addMembers: Optional[List[Dict]] = None,
+                    removeMembers: Optional[List[str]] = None) -> Dict:
+        """
+        Field / membership change expressed as a delta
+        
+        Inside writeBatch() the change is queued and merged with other changes
+        to the same object; otherwise it is applied now (one GET + PUT).
+        
+        Args:
+            objectType: Type of object
+            domainId: Domain ID
+            objectId: Object ID
+            fields: Fields to set
+            membersKey: 'members' (scopes) or 'parts' (composites)
+            addMembers: Member refs ({'targetUri', 'id'}) to add if missing
+            removeMembers: Member ids to remove
+        
+        Returns:
+            Update result, or {'success': True, 'queued': True, ...} when batched
+        """
+        batch = getActiveBatch()
+        if batch is not None:
+            batch.stage(objectType, domainId, objectId, fields, membersKey, addMembers, removeMembers)
+            return {'success': True, 'queued': True, 'objectId': objectId, 'objectType': objectType}
+        pending = PendingWrite(objectType, domainId, objectId)
+        pending.stage(fields, membersKey, addMembers, removeMembers)
+        return self._updateInDomain(objectType, domainId, objectId, pending.apply, retryOnConflict=True)
+    
+    def pendingMemberIds(self, domainId: str, objectId: str, membersKey: str) -> set:
+        """Member ids queued for addition in the active writeBatch() (empty outside one)"""
+        batch = getActiveBatch()
+        return batch.pendingMemberIds(domainId, objectId, membersKey) if batch is not None else set()
+    
     # ==================== DELETE OPERATIONS ====================
     
+    @invalidatesReads
     def deleteObject(self, objectType: str, domainId: str, objectId: str) -> Dict:
         """
         Delete an object - backend uses top-level /{plural}/{uuid} endpoint for ALL objects
@@ -589,6 +1060,11 @@ class VeriniceTool:
             response = self.client.makeRequest('DELETE', url)
             
             if response.status_code in [200, 204]:
+                removeGraphObject(objectId)
+                mirror = getVeriniceMirror()
+                if mirror is not None:
+                    mirror.deleteObject(objectId)
+                    mirror.recordWrite()
                 return {
                     'success': True,
                     'message': f'Deleted {objectType} successfully',
@@ -611,6 +1087,7 @@ class VeriniceTool:
     
     # ==================== REPORT OPERATIONS ====================
     
+    @cachedRead
     def listReports(self, domainId: Optional[str] = None) -> Dict:
         """
         List available reports for a domain (or all reports if domainId not provided)
@@ -657,7 +1134,8 @@ class VeriniceTool:
                 errorMsg = f'HTTP {e.response.status_code}: {e.response.text[:200]}'
             return {'success': False, 'error': get_error_message('operation_failed', 'list_reports', error=errorMsg)}
     
-    def generateReport(self, reportId: str, domainId: Optional[str] = None, params: Optional[Dict] = None) -> Dict:
+    def generateReport(self, reportId: str, domainId: Optional[str] = None, params: Optional[Dict] = None,
+                       onProgress: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         Generate a report
         
@@ -665,6 +1143,8 @@ class VeriniceTool:
             reportId: Report ID (e.g., 'inventory-of-assets', 'risk-assessment', 'statement-of-applicability')
             domainId: Optional Domain ID (for context, but reports are generated globally)
             params: Optional report parameters (outputType, language, targets, timeZone)
+            onProgress: Optional callback({'phase', 'bytes'}) - 'generating' before the
+                request, then 'downloading' as the report is written to the store
         
         Returns:
             Dict with success status and report data/URL
@@ -678,37 +1158,63 @@ class VeriniceTool:
         try:
             # Report generation endpoint matches frontend expectation
             url = f"{API_URL}/api/reporting/reports/{reportId}"
-            payload = params or {}
-            payload['outputType'] = payload.get('outputType', 'application/pdf')
-            payload['language'] = payload.get('language', 'en')
-            payload['targets'] = payload.get('targets', [])
-            payload['timeZone'] = payload.get('timeZone', 'UTC')
+            payload = _reportPayload(params)
             
-            # Make POST request - expect binary PDF response
-            response = self.client.makeRequest('POST', url, json=payload)
-            response.raise_for_status()
+            # Same report over the same data: hand out the stored file
+            store = getReportStore()
+            handle = store.reportKey(reportId, domainId, payload) if store else None
+            notBefore = servableSince()
+            if handle and notBefore is not None:
+                stored = store.get(handle, notBefore=notBefore)
+                if stored:
+                    return self._storedReportResult(stored, cached=True)
+            
+            # Make POST request - expect binary PDF response (streamed to disk when the store is on)
+            if onProgress:
+                onProgress({'phase': 'generating', 'bytes': 0})
+            response = self.client.makeRequest('POST', url, json=payload, stream=store is not None)
+            try:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if store is not None:
+                    chunks = response.iter_content(Settings.REPORT_STREAM_CHUNK_BYTES)
+                    first = next(chunks, b'')
+                    if 'pdf' in content_type.lower() or first[:4] == b'%PDF':
+                        chunks = itertools.chain([first], chunks)
+                        if onProgress:
+                            chunks = _reportProgress(chunks, onProgress)
+                        stored = store.put(handle, chunks, {
+                            'reportId': reportId,
+                            'domainId': domainId,
+                            'format': 'pdf',
+                            'contentType': 'application/pdf',
+                            'targets': payload['targets'],
+                            'generated_at': time.time()
+                        })
+                        return self._storedReportResult(stored, cached=False)
+                    body = first + b''.join(chunks)
+                else:
+                    body = response.content if isinstance(response.content, bytes) else b''
+            finally:
+                response.close()
             
-            content_type = response.headers.get('Content-Type', '')
-            # FIX: Safe access to response.content
-            content_preview = response.content[:4] if hasattr(response, 'content') and isinstance(response.content, bytes) and len(response.content) >= 4 else b''
-            if 'application/pdf' in content_type or 'pdf' in content_type.lower() or content_preview == b'%PDF':
-                # Return PDF data as base64 for transmission
+            if 'pdf' in content_type.lower() or body[:4] == b'%PDF':
+                # Store disabled: return PDF data as base64 for transmission
                 import base64
-                pdf_data = response.content
-                pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
+                pdf_base64 = base64.b64encode(body).decode('utf-8')
                 return {
                     'success': True,
                     'reportId': reportId,
                     'domainId': domainId,
                     'format': 'pdf',
                     'data': pdf_base64,
-                    'size': len(pdf_data),
-                    'message': f'Report "{reportId}" generated successfully ({len(pdf_data)} bytes). PDF data available in base64 format.'
+                    'size': len(body),
+                    'message': f'Report "{reportId}" generated successfully ({len(body)} bytes). PDF data available in base64 format.'
                 }
             else:
                 # Try JSON response
                 try:
-                    result = response.json()
+                    result = json.loads(body)
                     return {
                         'success': True,
                         'data': result,
@@ -717,10 +1223,7 @@ class VeriniceTool:
                     }
                 except Exception:
                     # Return raw response
-                    # FIX: Safe access to response content
-                    response_text = response.text[:500] if hasattr(response, 'text') else ''
-                    if not response_text and hasattr(response, 'content'):
-                        response_text = str(response.content[:500]) if isinstance(response.content, bytes) else str(response.content)[:500]
+                    response_text = body[:500].decode('utf-8', errors='replace')
                     return {
                         'success': True,
                         'data': response_text,
@@ -738,10 +1241,41 @@ class VeriniceTool:
                     errorMsg += f'\n   Report ID "{reportId}" not found. Available reports: inventory-of-assets, risk-assessment, statement-of-applicability'
             return {'success': False, 'error': get_error_message('operation_failed', 'generate_report', error=errorMsg)}
     
+    def storedReport(self, reportId: str, domainId: Optional[str] = None, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        generateReport's result if a current copy is already in the report store,
+        else None (no request). Without the veo event consumer no copy counts as
+        current (see reportStore.servableSince).
+        """
+        store = getReportStore()
+        notBefore = servableSince()
+        if store is None or notBefore is None:
+            return None
+        stored = store.get(store.reportKey(reportId, domainId, _reportPayload(params)), notBefore=notBefore)
+        return self._storedReportResult(stored, cached=True) if stored else None
+    
+    def _storedReportResult(self, stored: Dict, cached: bool) -> Dict:
+        """generateReport result for a stored report: handle and download URL, no bytes"""
+        handle = stored['handle']
+        size = stored.get('size', 0)
+        return {
+            'success': True,
+            'reportId': stored.get('reportId'),
+            'domainId': stored.get('domainId'),
+            'format': stored.get('format', 'pdf'),
+            'handle': handle,
+            'url': reportUrl(handle),
+            'size': size,
+            'generated_at': stored.get('generated_at'),
+            'cached': cached,
+            'message': f'Report "{stored.get("reportId")}" generated successfully ({size} bytes). Download: {reportUrl(handle)}'
+        }
+    
     # ==================== ANALYSIS OPERATIONS ====================
     
     # ==================== HELPER METHODS ====================
     
+    @cachedRead
     def getValidSubTypes(self, domainId: str, objectType: str) -> Dict:
         """
         Get valid subTypes for an object type in a domain
@@ -773,18 +1307,23 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'get_subtypes', error=str(e))}
     
+    @cachedRead
     def listDomains(self) -> Dict:
         """List all available domains"""
+        mirrored = self._mirroredCollection('domains')
+        if mirrored is not None:
+            return mirrored
+        
         if not self._ensureAuthenticated():
-            return {
+            return self._mirroredCollection('domains', degraded=True) or {
                 'success': False, 
                 'error': get_error_message('connection', 'isms_client_not_available_detailed')
             }
         
         try:
-            from sparksbmMgmt import SparksBMDomainManager
             domainManager = SparksBMDomainManager(self.client)
             domains = domainManager.listDomains()
+            self._storeCollection('domains', domains)
             return {
                 'success': True,
                 'count': len(domains),
@@ -793,10 +1332,15 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'list_domains', error=str(e))}
     
+    @cachedRead
     def listUnits(self) -> Dict:
         """List all available units"""
+        mirrored = self._mirroredCollection('units')
+        if mirrored is not None:
+            return mirrored
+        
         if not self._ensureAuthenticated():
-            return {
+            return self._mirroredCollection('units', degraded=True) or {
                 'success': False, 
                 'error': get_error_message('connection', 'isms_client_not_available_detailed')
             }
@@ -806,6 +1350,7 @@ class VeriniceTool:
         
         try:
             units = self.unitManager.listUnits()
+            self._storeCollection('units', units)
             return {
                 'success': True,
                 'count': len(units),
@@ -814,8 +1359,32 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'list_units_exception', error=str(e))}
     
+    def _mirroredCollection(self, kind: str, degraded: bool = False) -> Optional[Dict]:
+        """listDomains/listUnits result from the mirror ('domains' or 'units'), None if not usable"""
+        mirror = getVeriniceMirror()
+        body = mirror.getCollection(kind, degraded=degraded) if mirror is not None else None
+        if body is None:
+            return None
+        return {'success': True, 'count': len(body), kind: body, 'source': 'mirror', 'degraded': degraded}
+    
+    def _dropMirroredCollections(self, deletedDomainId: Optional[str] = None):
+        """Domains/units changed: refetch them (and forget a deleted domain's lists)"""
+        mirror = getVeriniceMirror()
+        if mirror is not None:
+            mirror.dropCollection()
+            if deletedDomainId:
+                mirror.markStale(deletedDomainId)
+            mirror.recordWrite()
+    
+    def _storeCollection(self, kind: str, body: Any):
+        # The managers return [] on request errors; never let that wipe the mirror
+        mirror = getVeriniceMirror()
+        if mirror is not None and body:
+            mirror.storeCollection(kind, body)
+    
     # ==================== DOMAIN MANAGEMENT ====================
     
+    @invalidatesReads
     def createDomain(self, templateId: str) -> Dict:
         """Create domain from template"""
         if not self._ensureAuthenticated():
@@ -831,6 +1400,7 @@ class VeriniceTool:
             # createDomainFromTemplate returns bool, not domain object
             success = self.domainManager.createDomainFromTemplate(templateId)
             if success:
+                self._dropMirroredCollections()
                 # Fetch the newly created domain by listing all domains and finding the latest
                 # or by template ID (domains created from same template might have similar names)
                 domains = self.domainManager.listDomains()
@@ -852,6 +1422,7 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'create_domain', error=str(e))}
     
+    @invalidatesReads
     def deleteDomain(self, domainId: str) -> Dict:
         """Delete a domain"""
         if not self._ensureAuthenticated():
@@ -865,6 +1436,8 @@ class VeriniceTool:
         
         try:
             result = self.domainManager.deleteDomain(domainId)
+            if result:
+                self._dropMirroredCollections(domainId)
             return {
                 'success': result,
                 'domainId': domainId
@@ -872,6 +1445,7 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'delete_domain', error=str(e))}
     
+    @cachedRead
     def getDomainTemplates(self) -> Dict:
         """Get available domain templates"""
         if not self._ensureAuthenticated():
@@ -893,6 +1467,7 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'get_templates', error=str(e))}
     
+    @cachedRead
     def getDomainSubTypes(self, domainId: str, objectType: str = None) -> Dict:
         """Get subtypes for a domain (all types or specific type)"""
         if not self._ensureAuthenticated():
@@ -930,6 +1505,7 @@ class VeriniceTool:
     
     # ==================== UNIT MANAGEMENT ====================
     
+    @invalidatesReads
     def createUnit(self, name: str, description: str = "", domainIds: List[str] = None) -> Dict:
         """Create a new unit"""
         if not self._ensureAuthenticated():
@@ -944,6 +1520,7 @@ class VeriniceTool:
         try:
             result = self.unitManager.createUnit(name, description, domainIds)
             if result:
+                self._dropMirroredCollections()
                 return {
                     'success': True,
                     'unitId': result.get('id'),
@@ -955,6 +1532,7 @@ class VeriniceTool:
     
     # ==================== RISK DEFINITIONS ====================
     
+    @cachedRead
     def listRiskDefinitions(self, domainId: str) -> Dict:
         """List risk definitions in a domain"""
         if not self._ensureAuthenticated():
@@ -979,6 +1557,7 @@ class VeriniceTool:
     
     # ==================== PROFILE MANAGEMENT ====================
     
+    @cachedRead
     def listProfiles(self, domainId: str) -> Dict:
         """List profiles in a domain"""
         if not self._ensureAuthenticated():
@@ -1001,6 +1580,7 @@ class VeriniceTool:
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'list_profiles', error=str(e))}
     
+    @cachedRead
     def getDomain(self, domainId: str) -> Dict:
         """Get detailed information about a domain"""
         if not self._ensureAuthenticated():
@@ -1029,6 +1609,7 @@ class VeriniceTool:
                     errorMsg = f'HTTP {status_code}: {error_text}'
             return {'success': False, 'error': get_error_message('operation_failed', 'get_domain', error=errorMsg)}
     
+    @cachedRead
     def getUnit(self, unitId: str) -> Dict:
         """Get detailed information about a unit"""
         if not self._ensureAuthenticated():
@@ -1060,6 +1641,7 @@ class VeriniceTool:
                     errorMsg = f'HTTP {status_code}: {error_text}'
             return {'success': False, 'error': get_error_message('operation_failed', 'get_unit', error=errorMsg)}
     
+    @cachedRead
     def listCatalogItems(self, domainId: str) -> Dict:
         """List catalog items in a domain"""
         if not self._ensureAuthenticated():
@@ -1113,17 +1695,16 @@ class VeriniceTool:
             }
         
         try:
-            obj1_result = self.getObject(objectType, domainId, objectId1)
-            obj2_result = self.getObject(objectType, domainId, objectId2)
+            fetched = self.getObjects(objectType, [objectId1, objectId2], domainId)
+            errors = fetched.get('errors', {})
             
-            if not obj1_result.get('success'):
-                return {'success': False, 'error': get_error_message('operation_failed', 'get_source_object', error=obj1_result.get("error"))}
-            if not obj2_result.get('success'):
-                return {'success': False, 'error': get_error_message('operation_failed', 'get_target_object', error=obj2_result.get("error"))}
+            if objectId1 in errors or 'error' in fetched:
+                return {'success': False, 'error': get_error_message('operation_failed', 'get_source_object', error=errors.get(objectId1, fetched.get('error')))}
+            if objectId2 in errors:
+                return {'success': False, 'error': get_error_message('operation_failed', 'get_target_object', error=errors[objectId2])}
             
-            # FIX: getObject returns 'data', not 'object'
-            obj1 = obj1_result.get('data', {})
-            obj2 = obj2_result.get('data', {})
+            obj1 = fetched['objects'].get(objectId1, {})
+            obj2 = fetched['objects'].get(objectId2, {})
             
             # Compare fields
             differences = []
@@ -1287,8 +1868,9 @@ class VeriniceTool:
             }
         
         try:
-            # List all objects
-            list_result = self.listObjects(objectType, domainId, filters)
+            # List all objects (the missing_* flags are checks, not list predicates)
+            listFilters = {k: v for k, v in filters.items() if k in self.SERVER_FILTERS} if isinstance(filters, dict) else None
+            list_result = self.listObjects(objectType, domainId, listFilters)
             if not list_result.get('success'):
                 return list_result
             
@@ -1333,3 +1915,45 @@ class VeriniceTool:
             }
         except Exception as e:
             return {'success': False, 'error': get_error_message('operation_failed', 'find_differences', error=str(e))}
+
+
+def _reportPayload(params: Optional[Dict]) -> Dict:
+    """Report request body with defaults filled in (also the report store key)"""
+    payload = dict(params or {})
+    payload['outputType'] = payload.get('outputType', 'application/pdf')
+    payload['language'] = payload.get('language', 'en')
+    payload['targets'] = payload.get('targets', [])
+    payload['timeZone'] = payload.get('timeZone', 'UTC')
+    return payload
+
+
+def _reportProgress(chunks, onProgress: Callable[[Dict], None], interval: float = 0.5):
+    """Pass chunks through, reporting the byte count at most every interval seconds"""
+    received = 0
+    lastReport = 0.0
+    for chunk in chunks:
+        received += len(chunk)
+        now = time.time()
+        if now - lastReport >= interval:
+            lastReport = now
+            onProgress({'phase': 'downloading', 'bytes': received})
+        yield chunk
+
+
+_sharedTool: Optional[VeriniceTool] = None
+_sharedToolLock = threading.Lock()
+
+
+def getSharedVeriniceTool() -> VeriniceTool:
+    """
+    Process-wide VeriniceTool; the first call starts its background warm-up
+    
+    Handlers share one logged-in client instead of each constructing (and
+    logging in) their own.
+    """
+    global _sharedTool
+    if _sharedTool is None:
+        with _sharedToolLock:
+            if _sharedTool is None:
+                _sharedTool = VeriniceTool(warmUp=True)
+    return _sharedTool
@@ -0,0 +1,180 @@
+"""
+Write Batch
+
+Coalesces field and membership changes to the same Verinice object within
+one turn. Multi-link requests ("link SCOPE-B with IT-System assets, and
+SCOPE-B link with Datatype assets", "link these persons to SCOPE-A") used to
+send one GET + PUT per link to the same scope; inside a writeBatch() the
+changes are recorded as deltas per object and flushed on exit as one InDomain
+GET + one PUT per object. Because the deltas are re-applied to whatever the
+backend returns, an ETag conflict (412) is resolved by re-reading once.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_currentBatch: ContextVar[Optional['WriteBatch']] = ContextVar('veriniceWriteBatch', default=None)
+
+# Totals across all flushed batches since process start
+_totalsLock = threading.Lock()
+_totals = {'batches': 0, 'mutations': 0, 'puts': 0, 'conflictRetries': 0, 'failures': 0}
+
+
+def memberRefId(ref: Any) -> Optional[str]:
+    """Object id of a members/parts entry ({'id': ...} or {'targetUri': '.../<id>'})"""
+    if not isinstance(ref, dict):
+        return None
+    if ref.get('id'):
+        return ref['id']
+    targetUri = ref.get('targetUri') or ''
+    return targetUri.rstrip('/').rsplit('/', 1)[-1] or None
+
+
+class PendingWrite:
+    """Accumulated changes for one object"""
+
+    def __init__(self, objectType: str, domainId: str, objectId: str):
+        self.objectType = objectType
+        self.domainId = domainId
+        self.objectId = objectId
+        self.fields: Dict[str, Any] = {}
+        self.addMembers: Dict[str, Dict[str, Dict]] = {}
+        self.removeMembers: Dict[str, Set[str]] = {}
+        self.mutations = 0
+
+    def stage(self, fields: Optional[Dict] = None, membersKey: Optional[str] = None,
+              add: Optional[Iterable[Dict]] = None, remove: Optional[Iterable[str]] = None):
+        """Merge one requested update (counted as one mutation) into the pending deltas"""
+        changed = bool(fields)
+        if fields:
+            self.fields.update(fields)
+        if membersKey:
+            adds = self.addMembers.setdefault(membersKey, {})
+            removes = self.removeMembers.setdefault(membersKey, set())
+            for ref in add or ():
+                refId = memberRefId(ref)
+                if refId:
+                    adds[refId] = ref
+                    removes.discard(refId)
+                    changed = True
+            for refId in remove or ():
+                adds.pop(refId, None)
+                removes.add(refId)
+                changed = True
+        if changed:
+            self.mutations += 1
+
+    def memberIds(self, membersKey: str) -> Set[str]:
+        return set(self.addMembers.get(membersKey, {}))
+
+    def apply(self, fullObject: Dict):
+        """Apply the deltas to a freshly fetched InDomain object"""
+        fullObject.update(self.fields)
+        for membersKey in set(self.addMembers) | set(self.removeMembers):
+            members = fullObject.get(membersKey)
+            members = list(members) if isinstance(members, list) else []
+            removes = self.removeMembers.get(membersKey, set())
+            if removes:
+                members = [m for m in members if memberRefId(m) not in removes]
+            present = {memberRefId(m) for m in members}
+            for refId, ref in self.addMembers.get(membersKey, {}).items():
+                if refId not in present:
+                    members.append(ref)
+            fullObject[membersKey] = members
+
+
+class WriteBatch:
+    """Pending writes for one turn, keyed by (domainId, objectId)"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[str, str], PendingWrite] = {}
+        self.results: Dict[str, Dict] = {}
+        self.mutations = 0
+        self.puts = 0
+        self.conflictRetries = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def stage(self, objectType: str, domainId: str, objectId: str, fields: Optional[Dict] = None,
+              membersKey: Optional[str] = None, add: Optional[Iterable[Dict]] = None,
+              remove: Optional[Iterable[str]] = None) -> PendingWrite:
+        key = (domainId, objectId)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = PendingWrite(objectType, domainId, objectId)
+        before = pending.mutations
+        pending.stage(fields, membersKey, add, remove)
+        self.mutations += pending.mutations - before
+        return pending
+
+    def pendingMemberIds(self, domainId: str, objectId: str, membersKey: str) -> Set[str]:
+        """Members already queued for addition (so callers can skip re-adding them)"""
+        pending = self._pending.get((domainId, objectId))
+        return pending.memberIds(membersKey) if pending else set()
+
+    def flush(self, veriniceTool) -> Dict[str, Dict]:
+        """One GET + PUT per object; a 412 re-reads and re-applies once"""
+        pendingWrites: List[PendingWrite] = list(self._pending.values())
+        self._pending.clear()
+        for pending in pendingWrites:
+            if not pending.mutations:
+                continue
+            result = veriniceTool._updateInDomain(
+                pending.objectType, pending.domainId, pending.objectId,
+                pending.apply, retryOnConflict=True
+            )
+            self.puts += 1
+            if result.get('conflictRetried'):
+                self.conflictRetries += 1
+            self.results[pending.objectId] = result
+        return self.results
+
+    def failedFor(self, objectId: str) -> Optional[str]:
+        """Error of the flushed write to objectId, or None if it succeeded / was not batched"""
+        result = self.results.get(objectId)
+        if result is None or result.get('success'):
+            return None
+        return result.get('error', 'Unknown error')
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'mutations': self.mutations,
+            'puts': self.puts,
+            'putsSaved': max(0, self.mutations - self.puts),
+            'conflictRetries': self.conflictRetries,
+        }
+
+
+def getActiveBatch() -> Optional[WriteBatch]:
+    return _currentBatch.get()
+
+
+@contextmanager
+def writeBatch(veriniceTool):
+    """
+    Queue staged writes until the block exits, then flush them.
+
+    Results are in batch.results (objectId -> update result) after the block.
+    If the block raises, queued writes are dropped.
+    """
+    batch = WriteBatch()
+    token = _currentBatch.set(batch)
+    try:
+        yield batch
+    finally:
+        _currentBatch.reset(token)
+    batch.flush(veriniceTool)
+    stats = batch.stats()
+    with _totalsLock:
+        _totals['batches'] += 1
+        _totals['mutations'] += stats['mutations']
+        _totals['puts'] += stats['puts']
+        _totals['conflictRetries'] += stats['conflictRetries']
+        _totals['failures'] += sum(1 for r in batch.results.values() if not r.get('success'))
+
+
+def getWriteBatchMetrics() -> Dict[str, int]:
+    with _totalsLock:
+        return dict(_totals)
@@ -0,0 +1,104 @@
+"""Shared Gemini client factory - lazy, cached model handles
+
+google.generativeai is only imported when the first model handle is
+requested, and genai.configure() is only called when the API key changes.
+LLMTool and GeminiReasoningEngine both go through this module so a process
+holds one GenerativeModel per model name. genai.configure() is process-global
+and a model binds its client to the key configured when it was first used, so
+a different key reconfigures the SDK and drops the cached handles.
+"""
+import threading
+import importlib.util
+from typing import Any, Dict, Optional
+
+_lock = threading.RLock()
+_genai = None
+_configuredKey: Optional[str] = None
+_models: Dict[str, Any] = {}
+
+
+def loadEnvironment() -> None:
+    """Load .env (AgenticFramework/.env overrides the environment, as LLMTool always did)"""
+    from config.settings import loadEnvironment as _loadEnvironment
+    _loadEnvironment(override=True)
+
+
+def isGeminiInstalled() -> bool:
+    """Check whether google-generativeai is installed without importing it"""
+    try:
+        return importlib.util.find_spec('google.generativeai') is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def getGenai():
+    """Import and return the google.generativeai module (first call only pays the import)"""
+    global _genai
+    if _genai is not None:
+        return _genai
+    with _lock:
+        if _genai is None:
+            try:
+                import google.generativeai as genai
+            except ImportError:
+                raise RuntimeError("Google Generative AI library not installed. Run: pip install google-generativeai")
+            _genai = genai
+    return _genai
+
+
+def getModel(modelName: str, apiKey: str):
+    """
+    Get the shared GenerativeModel for modelName under apiKey, creating it on first use.
+
+    Args:
+        modelName: Gemini model name (e.g., 'gemini-2.5-flash')
+        apiKey: Gemini API key
+
+    Returns:
+        genai.GenerativeModel instance
+    """
+    if not apiKey:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+    global _configuredKey
+    model = _models.get(modelName)
+    if model is not None and _configuredKey == apiKey:
+        return model
+
+    with _lock:
+        genai = getGenai()
+        try:
+            if _configuredKey != apiKey:
+                genai.configure(api_key=apiKey)
+                _configuredKey = apiKey
+                # Handles created under the previous key keep using it
+                _models.clear()
+            model = _models.get(modelName)
+            if model is None:
+                model = genai.GenerativeModel(modelName)
+                _models[modelName] = model
+        except Exception as e:
+            raise RuntimeError(f"Gemini setup failed: {e}")
+    return model
+
+
+def buildGenerationConfig(**kwargs):
+    """Build a genai GenerationConfig (imports the SDK if needed)"""
+    return getGenai().types.GenerationConfig(**kwargs)
+
+
+def getStats() -> Dict[str, Any]:
+    """Report factory state (for diagnostics)"""
+    return {
+        'sdkImported': _genai is not None,
+        'cachedModels': sorted(_models.keys()),
+        'configured': _configuredKey is not None,
+    }
+
+
+def reset() -> None:
+    """Drop cached model handles (forces re-creation on next use)"""
+    global _configuredKey
+    with _lock:
+        _models.clear()
+        _configuredKey = None
@@ -0,0 +1,201 @@
+"""
+Keyword Index
+
+Aho-Corasick automaton over named keyword families. One linear scan of a
+message reports every family with a hit, so routing no longer runs one
+`keyword in message` (or `re.search(r'\\bword\\b', ...)`) per keyword, and
+the keyword lists can grow without slowing it down.
+
+Each keyword is registered either as a substring match (the `in` semantics
+the old checks used) or as a whole-word match (`\\b` on both ends).
+
+Benchmark:
+    cd AgenticFramework
+    python -m utils.keywordIndex
+"""
+import re
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _isWordChar(char: str) -> bool:
+    return bool(_WORD_CHAR.match(char))
+
+
+def _atBoundary(text: str, position: int) -> bool:
+    """Same test as regex \\b at text[position]"""
+    before = position > 0 and _isWordChar(text[position - 1])
+    after = position < len(text) and _isWordChar(text[position])
+    return before != after
+
+
+class KeywordHits:
+    """Result of one scan: family -> matched keywords (first-occurrence order)"""
+
+    def __init__(self, families: Dict[str, List[str]]):
+        self.families = families
+
+    def __contains__(self, family: str) -> bool:
+        return family in self.families
+
+    def has(self, *families: str) -> bool:
+        """Whether any of the given families was hit"""
+        return any(family in self.families for family in families)
+
+    def keywords(self, family: str) -> List[str]:
+        return self.families.get(family, [])
+
+    def hasKeyword(self, family: str, keyword: str) -> bool:
+        return keyword in self.families.get(family, ())
+
+    def toDict(self) -> Dict[str, List[str]]:
+        return {family: list(keywords) for family, keywords in self.families.items()}
+
+
+class KeywordIndex:
+    """Multi-family keyword automaton (build once, scan many)"""
+
+    def __init__(self, families: Optional[Dict[str, Iterable[str]]] = None, wholeWord: bool = False):
+        """
+        Args:
+            families: Optional family -> keywords to register up front
+            wholeWord: Match mode for the families passed here
+        """
+        self._entries: List[Tuple[str, str, bool]] = []
+        self._built = False
+        for family, keywords in (families or {}).items():
+            self.addFamily(family, keywords, wholeWord=wholeWord)
+
+    def add(self, family: str, keyword: str, wholeWord: bool = False):
+        if not keyword:
+            return
+        self._entries.append((family, keyword, wholeWord))
+        self._built = False
+
+    def addFamily(self, family: str, keywords: Iterable[str], wholeWord: bool = False):
+        for keyword in keywords:
+            self.add(family, keyword, wholeWord=wholeWord)
+
+    @property
+    def families(self) -> List[str]:
+        return list(dict.fromkeys(family for family, _, _ in self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def build(self):
+        """Compile the goto/fail/output tables (called lazily by scan)"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[Tuple[str, str, bool]]] = [[]]
+        for entry in self._entries:
+            state = 0
+            for char in entry[1]:
+                nextState = goto[state].get(char)
+                if nextState is None:
+                    nextState = len(goto)
+                    goto[state][char] = nextState
+                    goto.append({})
+                    output.append([])
+                state = nextState
+            if entry not in output[state]:
+                output[state].append(entry)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nextState in goto[state].items():
+                queue.append(nextState)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nextState] = goto[fallback].get(char, 0)
+                output[nextState] = output[nextState] + output[fail[nextState]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        self._built = True
+
+    def scan(self, text: str) -> KeywordHits:
+        """
+        Find every registered keyword in text in a single pass.
+
+        Args:
+            text: Message (callers pass it already lowercased, keywords are case-sensitive)
+
+        Returns:
+            KeywordHits with each family that matched at least once
+        """
+        if not self._built:
+            self.build()
+        hits: Dict[str, List[str]] = {}
+        if not text:
+            return KeywordHits(hits)
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for family, keyword, wholeWord in output[state]:
+                if wholeWord:
+                    start = index - len(keyword) + 1
+                    if not (_atBoundary(text, start) and _atBoundary(text, index + 1)):
+                        continue
+                found = hits.setdefault(family, [])
+                if keyword not in found:
+                    found.append(keyword)
+        return KeywordHits(hits)
+
+
+def _legacyScan(text: str, families: Dict[str, List[str]]) -> Dict[str, bool]:
+    """Per-keyword `in` checks this module replaces (benchmark baseline only)"""
+    return {family: any(keyword in text for keyword in keywords) for family, keywords in families.items()}
+
+
+def benchmark(sizes=(50, 500, 5000, 50000), iterations: int = 200) -> list:
+    """
+    Compare per-message cost of per-keyword `in` checks and one KeywordIndex
+    scan as the keyword families grow.
+
+    Returns:
+        List of {'size', 'legacyUs', 'indexUs'} rows
+    """
+    message = "compare the production scope with staging and then delete all assets that drift"
+    base = {
+        'reconciliation': ['compare', 'reconcile', 'drift', 'gap'],
+        'dangerous': ['delete all', 'remove all', 'wipe', 'purge'],
+        'connectors': ['then', 'and', 'after', 'next'],
+    }
+    rows = []
+    for size in sizes:
+        families = {family: list(keywords) for family, keywords in base.items()}
+        i = 0
+        while sum(len(k) for k in families.values()) < size:
+            families[f"synthetic{i % 10}"] = families.get(f"synthetic{i % 10}", []) + [f"synthkeyword{i}"]
+            i += 1
+        index = KeywordIndex(families)
+        expected = {family for family, hit in _legacyScan(message, families).items() if hit}
+        assert set(index.scan(message).families) == expected
+        legacyIterations = max(3, iterations * 500 // max(size, 500))
+        start = time.perf_counter()
+        for _ in range(legacyIterations):
+            _legacyScan(message, families)
+        legacyUs = (time.perf_counter() - start) / legacyIterations * 1e6
+        start = time.perf_counter()
+        for _ in range(iterations):
+            index.scan(message)
+        indexUs = (time.perf_counter() - start) / iterations * 1e6
+        rows.append({'size': size, 'legacyUs': round(legacyUs, 1), 'indexUs': round(indexUs, 1)})
+    return rows
+
+
+if __name__ == '__main__':
+    print(f"{'keywords':>9}  {'`in` checks (us/msg)':>22}  {'KeywordIndex (us/msg)':>23}")
+    for row in benchmark():
+        print(f"{row['size']:>9}  {row['legacyUs']:>22}  {row['indexUs']:>23}")
@@ -0,0 +1,142 @@
+"""
+Stale-While-Revalidate Cache
+
+Serves the last known value for a key immediately while it is younger than a
+staleness bound, and refreshes it on a background thread. When the refresh
+produces a different value the caller's onChange callback receives it (the
+ISMS list view pushes it to the browser as an SSE event). Older entries, and
+keys never seen before, are loaded synchronously.
+
+    cache = StaleWhileRevalidateCache('isms-list', staleSeconds=300)
+    value, info = cache.get(key, loader, onChange=pushUpdate)
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# loader() -> (value, cacheable); failed loads are returned but not stored
+Loader = Callable[[], Tuple[Any, bool]]
+
+
+class _Entry:
+    __slots__ = ('value', 'storedAt')
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.storedAt = time.time()
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.storedAt
+
+
+class StaleWhileRevalidateCache:
+    """Thread-safe SWR cache with one background refresh per key at a time"""
+
+    def __init__(self, name: str, staleSeconds: float = 300.0, freshSeconds: float = 5.0,
+                 maxEntries: int = 256):
+        """
+        Args:
+            name: Label for metrics
+            staleSeconds: Entries older than this are reloaded synchronously
+            freshSeconds: Entries younger than this are served without a refresh
+            maxEntries: Oldest entries are evicted beyond this size
+        """
+        self.name = name
+        self.staleSeconds = staleSeconds
+        self.freshSeconds = freshSeconds
+        self.maxEntries = maxEntries
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._refreshing = set()
+        # Bumped by invalidate(); refreshes started before it are discarded
+        self._generation = 0
+        self.stats = {'hits': 0, 'staleHits': 0, 'misses': 0, 'refreshes': 0,
+                      'changed': 0, 'refreshErrors': 0, 'invalidations': 0}
+
+    def get(self, key: Hashable, loader: Loader,
+            onChange: Optional[Callable[[Any], None]] = None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Value for key, plus {'cached': bool, 'age': seconds, 'revalidating': bool}.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.age < self.staleSeconds:
+                age = entry.age
+                revalidate = age >= self.freshSeconds and key not in self._refreshing
+                if revalidate:
+                    self._refreshing.add(key)
+                    self.stats['staleHits'] += 1
+                else:
+                    self.stats['hits'] += 1
+                value = entry.value
+                generation = self._generation
+            else:
+                entry = None
+                self.stats['misses'] += 1
+
+        if entry is None:
+            value, cacheable = loader()
+            if cacheable:
+                self._store(key, value)
+            return value, {'cached': False, 'age': 0.0, 'revalidating': False}
+
+        if revalidate:
+            threading.Thread(
+                target=self._refresh, args=(key, loader, onChange, value, generation),
+                name=f"swr-{self.name}", daemon=True
+            ).start()
+        return value, {'cached': True, 'age': round(age, 1), 'revalidating': revalidate}
+
+    def _refresh(self, key: Hashable, loader: Loader, onChange, previous: Any, generation: int):
+        try:
+            value, cacheable = loader()
+        except Exception:
+            with self._lock:
+                self.stats['refreshErrors'] += 1
+                self._refreshing.discard(key)
+            return
+        with self._lock:
+            self._refreshing.discard(key)
+            self.stats['refreshes'] += 1
+            if not cacheable or generation != self._generation:
+                return
+        self._store(key, value)
+        if value != previous:
+            with self._lock:
+                self.stats['changed'] += 1
+            if onChange:
+                try:
+                    onChange(value)
+                except Exception:
+                    pass
+
+    def _store(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(value)
+            while len(self._entries) > self.maxEntries:
+                self._entries.pop(next(iter(self._entries)))
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """Drop all entries (or those whose key matches predicate)"""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if predicate(k)]:
+                    del self._entries[key]
+            self._generation += 1
+            self.stats['invalidations'] += 1
+
+    def getMetrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['staleHits'] + self.stats['misses']
+            served = self.stats['hits'] + self.stats['staleHits']
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'staleSeconds': self.staleSeconds,
+                'hitRate': round(served / lookups, 3) if lookups else 0.0,
+                **self.stats
+            }
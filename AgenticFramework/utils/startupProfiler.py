@@ -0,0 +1,216 @@
+"""
+Startup Profiler
+
+Records phase timings and per-module import cost during agent startup so
+cold-start regressions can be spotted without attaching an external profiler.
+"""
+import os
+import sys
+import time
+import importlib
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+
+class StartupProfiler:
+    """Collects phase timers and per-module import costs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.startedAt = time.time()
+        self.phases: List[Dict[str, Any]] = []
+        self.imports: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named startup phase"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            entry = {
+                'phase': name,
+                'ms': round((time.perf_counter() - start) * 1000, 2),
+                'at': time.time()
+            }
+            if error:
+                entry['error'] = error
+            with self._lock:
+                self.phases.append(entry)
+
+    def mark(self, name: str):
+        """Record a milestone as time elapsed since the profiler was created"""
+        with self._lock:
+            self.phases.append({
+                'phase': name,
+                'ms': round((time.time() - self.startedAt) * 1000, 2),
+                'at': time.time(),
+                'milestone': True
+            })
+
+    def importModule(self, moduleName: str, reload: bool = False):
+        """
+        Import (or reload) a module and record how long it took.
+
+        Args:
+            moduleName: Dotted module name
+            reload: Re-execute the module if it is already imported
+
+        Returns:
+            The imported module
+        """
+        cached = moduleName in sys.modules and not reload
+        before = set(sys.modules)
+        start = time.perf_counter()
+        if reload and moduleName in sys.modules:
+            module = importlib.reload(sys.modules[moduleName])
+        else:
+            module = importlib.import_module(moduleName)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.imports.append({
+                'module': moduleName,
+                'ms': round(elapsed, 2),
+                'cached': cached,
+                'reloaded': bool(reload),
+                'newModules': len(set(sys.modules) - before)
+            })
+        return module
+
+    def report(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build a profile report.
+
+        Args:
+            top: Only include the N most expensive imports
+
+        Returns:
+            Dict with phases, imports (most expensive first) and totals
+        """
+        with self._lock:
+            phases = list(self.phases)
+            imports = sorted(self.imports, key=lambda e: e['ms'], reverse=True)
+        if top:
+            imports = imports[:top]
+        return {
+            'startedAt': self.startedAt,
+            'phases': phases,
+            'imports': imports,
+            'totalPhaseMs': round(sum(p['ms'] for p in phases if not p.get('milestone')), 2),
+            'totalImportMs': round(sum(i['ms'] for i in imports), 2)
+        }
+
+    def formatReport(self, top: Optional[int] = 20) -> str:
+        """Render the report as a plain-text table"""
+        report = self.report(top)
+        lines = ["Startup phases:"]
+        for p in report['phases']:
+            suffix = f"  (error: {p['error']})" if p.get('error') else ("  (since start)" if p.get('milestone') else "")
+            lines.append(f"  {p['ms']:>10.2f} ms  {p['phase']}{suffix}")
+        lines.append("Module imports:")
+        for i in report['imports']:
+            flag = "reloaded" if i['reloaded'] else ("cached" if i['cached'] else f"+{i['newModules']} modules")
+            lines.append(f"  {i['ms']:>10.2f} ms  {i['module']}  [{flag}]")
+        return "\n".join(lines)
+
+
+def parseImportTime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse `python -X importtime` output.
+
+    Args:
+        stderr: Interpreter stderr containing 'import time:' lines
+
+    Returns:
+        List of {'module', 'selfUs', 'cumulativeUs', 'depth'} in import order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            selfUs = int(parts[0].strip())
+            cumulativeUs = int(parts[1].strip())
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        entries.append({
+            'module': stripped,
+            'selfUs': selfUs,
+            'cumulativeUs': cumulativeUs,
+            'depth': (len(name) - len(stripped) - 1) // 2
+        })
+    return entries
+
+
+def runImportTimeProfile(moduleName: str, cwd: Optional[str] = None,
+                         extraPaths: Optional[List[str]] = None,
+                         top: int = 30, timeout: int = 120) -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter under `-X importtime`.
+
+    Running in a subprocess measures a true cold import without disturbing
+    modules already loaded in the calling process.
+
+    Args:
+        moduleName: Module to import (e.g., 'api.main')
+        cwd: Working directory for the interpreter
+        extraPaths: Paths prepended to PYTHONPATH
+        top: Number of most expensive modules (by self time) to return
+        timeout: Subprocess timeout in seconds
+
+    Returns:
+        Dict with wall time, top modules by self and cumulative time, and errors
+    """
+    if not moduleName or not all(part.isidentifier() for part in moduleName.split('.')):
+        return {'success': False, 'module': moduleName, 'error': f'Invalid module name: {moduleName}'}
+
+    env = dict(os.environ)
+    if extraPaths:
+        env['PYTHONPATH'] = os.pathsep.join(list(extraPaths) + [p for p in [env.get('PYTHONPATH')] if p])
+
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {moduleName}'],
+            cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return {'success': False, 'module': moduleName, 'error': f'Import timed out after {timeout}s'}
+    wallMs = (time.perf_counter() - start) * 1000
+
+    entries = parseImportTime(proc.stderr)
+    result = {
+        'success': proc.returncode == 0,
+        'module': moduleName,
+        'wallMs': round(wallMs, 2),
+        'moduleCount': len(entries),
+        'totalSelfMs': round(sum(e['selfUs'] for e in entries) / 1000, 2),
+        'bySelf': sorted(entries, key=lambda e: e['selfUs'], reverse=True)[:top],
+        'byCumulative': sorted(entries, key=lambda e: e['cumulativeUs'], reverse=True)[:top]
+    }
+    if proc.returncode != 0:
+        errorLines = [l for l in proc.stderr.splitlines() if not l.startswith('import time:')]
+        result['error'] = "\n".join(errorLines[-10:])
+    return result
+
+
+# Process-wide profiler (startup happens once per process)
+_profiler = StartupProfiler()
+
+
+def getStartupProfiler() -> StartupProfiler:
+    """Get the global startup profiler instance"""
+    return _profiler
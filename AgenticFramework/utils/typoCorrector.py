@@ -0,0 +1,141 @@
+"""
+Typo Corrector
+
+Whole-word typo correction in a single pass over the message. Replaces the
+per-typo `re.sub(r'\\bTYPO\\b', ...)` loops, whose cost grew with the size of
+the correction dictionary.
+
+Benchmark:
+    cd AgenticFramework
+    python -m utils.typoCorrector
+"""
+import re
+import time
+from typing import Dict, Optional, Callable
+
+# Word tokens; a typo made only of word characters matches exactly when
+# r'\bTYPO\b' would, so it can be looked up per token in a dict
+_WORD_PATTERN = re.compile(r'\w+')
+_SINGLE_WORD = re.compile(r'\w+$')
+
+
+class TypoCorrector:
+    """Applies a typo -> correction map to text in one scan"""
+
+    def __init__(self, corrections: Dict[str, str]):
+        """
+        Args:
+            corrections: Mapping of typo to correct word (case-sensitive)
+        """
+        self.words: Dict[str, str] = {}
+        self.phrases: Dict[str, str] = {}
+        for typo, correct in corrections.items():
+            if not typo or typo == correct:
+                continue
+            if _SINGLE_WORD.match(typo):
+                self.words[typo] = correct
+            else:
+                self.phrases[typo] = correct
+
+        # Multi-word / punctuated typos (rare) fall back to one compiled
+        # alternation, longest first so overlapping entries prefer the longer one
+        self._phrasePattern = None
+        if self.phrases:
+            alternatives = sorted(self.phrases, key=len, reverse=True)
+            self._phrasePattern = re.compile(
+                r'\b(?:' + '|'.join(re.escape(a) for a in alternatives) + r')\b'
+            )
+
+    def __len__(self) -> int:
+        return len(self.words) + len(self.phrases)
+
+    def _replaceWord(self, match) -> str:
+        word = match.group(0)
+        return self.words.get(word, word)
+
+    def _replacePhrase(self, match) -> str:
+        return self.phrases[match.group(0)]
+
+    def correct(self, text: str) -> str:
+        """
+        Replace every whole-word typo in text.
+
+        Args:
+            text: Message (callers pass it already lowercased)
+
+        Returns:
+            Corrected text
+        """
+        if not text:
+            return text
+        if self._phrasePattern is not None:
+            text = self._phrasePattern.sub(self._replacePhrase, text)
+        if self.words:
+            text = _WORD_PATTERN.sub(self._replaceWord, text)
+        return text
+
+
+def buildTypoMap(variations: Optional[Dict[str, list]] = None,
+                 corrections: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Merge correct -> [typos] variations with typo -> correct corrections.
+
+    Later entries win, matching the order the old per-typo loops applied them.
+    """
+    typoMap: Dict[str, str] = {}
+    for correct, typos in (variations or {}).items():
+        for typo in typos:
+            typoMap[typo] = correct
+    typoMap.update(corrections or {})
+    return typoMap
+
+
+def _legacyCorrect(text: str, corrections: Dict[str, str]) -> str:
+    """The per-typo loop this module replaces (benchmark baseline only)"""
+    for typo, correct in corrections.items():
+        text = re.sub(r'\b' + re.escape(typo) + r'\b', correct, text)
+    return text
+
+
+def _timeCall(func: Callable[[], str], iterations: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def benchmark(sizes=(12, 100, 1000, 10000), iterations: int = 200) -> list:
+    """
+    Compare per-message cost of the legacy loop and TypoCorrector as the
+    dictionary grows.
+
+    Returns:
+        List of {'size', 'legacyUs', 'correctorUs'} rows
+    """
+    from agents.instructions import VERINICE_TYPO_CORRECTIONS
+
+    message = "creat a new assest called main firewall in the socpe for persn bob and list all scops"
+    rows = []
+    for size in sizes:
+        corrections = dict(VERINICE_TYPO_CORRECTIONS)
+        i = 0
+        while len(corrections) < size:
+            corrections[f"synthtypo{i}"] = f"word{i}"
+            i += 1
+        corrector = TypoCorrector(corrections)
+        assert corrector.correct(message) == _legacyCorrect(message, corrections)
+        # The legacy loop gets very slow at large sizes; fewer iterations there
+        legacyIterations = max(3, iterations * 100 // max(size, 100))
+        rows.append({
+            'size': size,
+            'legacyUs': round(_timeCall(lambda: _legacyCorrect(message, corrections), legacyIterations), 1),
+            'correctorUs': round(_timeCall(lambda: corrector.correct(message), iterations), 1)
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    print(f"{'typos':>8}  {'legacy loop (us/msg)':>22}  {'TypoCorrector (us/msg)':>24}")
+    for row in benchmark():
+        print(f"{row['size']:>8}  {row['legacyUs']:>22}  {row['correctorUs']:>24}")
@@ -9,21 +9,33 @@ _currentDir = os.path.dirname(os.path.abspath(__file__))
 _parentDir = os.path.dirname(_currentDir)
 if _parentDir not in sys.path:
     sys.path.insert(0, _parentDir)
+_agenticFrameworkPath = os.path.abspath(os.path.join(_parentDir, '..', 'AgenticFramework'))
+if os.path.exists(_agenticFrameworkPath) and _agenticFrameworkPath not in sys.path:
+    sys.path.insert(0, _agenticFrameworkPath)
+
+from utils.startupProfiler import getStartupProfiler  # noqa: E402
+
+_profiler = getStartupProfiler()
 
 # Load environment variables from config file before importing routers
 # This must be done before CORS configuration
 _configDir = Path(_parentDir) / "config"
 _configFile = _configDir / "notebookllm.env"
-if _configFile.exists():
-    with open(_configFile, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ.setdefault(key.strip(), value.strip())
+with _profiler.phase('api.loadConfig'):
+    if _configFile.exists():
+        with open(_configFile, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    os.environ.setdefault(key.strip(), value.strip())
 
 # Import routers after environment is loaded
-from api.routers import chat  # noqa: E402
+with _profiler.phase('api.importRouters'):
+    from api.routers import chat  # noqa: E402
+
+# /debug exposes cache internals, file paths and backend errors: opt-in per deployment
+DEBUG_ENDPOINTS_ENABLED = os.getenv('DEBUG_ENDPOINTS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
 
 app = FastAPI(
     title="NotebookLLM API",
@@ -31,15 +43,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Eager initialization of AgentBridge to avoid first-request delay
 @app.on_event("startup")
 async def startup_event():
-    """Initialize agent bridge on startup instead of first request"""
-    try:
-        from api.services.agentService import AgentService
-        _ = AgentService()
-    except Exception:
-        pass
+    """Record time-to-ready; no network calls here so the pod turns healthy fast"""
+    # The chat router already owns the AgentService; AgentBridge and the ISMS
+    # client are initialized on first use, not at startup
+    _profiler.mark('api.ready')
 
 # CORS middleware - must be added before routes
 # Allow common localhost origins for development
@@ -69,6 +78,9 @@ app.add_middleware(
 
 # Include routers
 app.include_router(chat.router)
+if DEBUG_ENDPOINTS_ENABLED:
+    from api.routers import debug  # noqa: E402
+    app.include_router(debug.router)
 
 
 @app.get("/")
@@ -109,6 +109,50 @@ async def removeContext(sessionId: str, sourceId: str):
     return ContextResponse(**result)
 
 
+@router.get("/reports/{handle}")
+async def downloadReport(handle: str):
+    """Stream a generated report from the report store (chat responses carry only its handle)"""
+    from tools.reportStore import getReportStore, CONTENT_TYPES
+    store = getReportStore()
+    meta = store.lookup(handle) if store else None
+    if not meta:
+        raise HTTPException(status_code=404, detail="Report not found or expired")
+    try:
+        chunks = store.iterChunks(handle)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Report not found or expired")
+    reportFormat = meta.get('format', 'pdf')
+    fileName = f"{meta.get('reportId') or 'report'}.{reportFormat}"
+    return StreamingResponse(
+        chunks,
+        media_type=meta.get('contentType') or CONTENT_TYPES.get(reportFormat, 'application/octet-stream'),
+        headers={
+            "Content-Disposition": f'attachment; filename="{fileName}"',
+            "Content-Length": str(meta.get('size', 0))
+        }
+    )
+
+
+@router.get("/report-jobs/{jobId}", response_model=Dict[str, Any])
+async def getReportJob(jobId: str):
+    """Status of a background report job; 'result' has the download URL once completed"""
+    from tools.reportJobs import getReportJobRunner
+    runner = getReportJobRunner()
+    job = runner.getJob(jobId) if runner else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return {'status': 'success', 'job': job.toDict()}
+
+
+@router.get("/report-jobs", response_model=Dict[str, Any])
+async def listReportJobs(sessionId: Optional[str] = None):
+    """Background report jobs, optionally of one session"""
+    from tools.reportJobs import getReportJobRunner
+    runner = getReportJobRunner()
+    jobs = runner.listJobs(sessionId) if runner else []
+    return {'status': 'success', 'jobs': [job.toDict() for job in jobs]}
+
+
 @router.get("/stream/{sessionId}")
 async def stream_agent_events(sessionId: str):
     """
@@ -0,0 +1,129 @@
+"""Debug endpoints - startup profiling, backend circuit breakers and request metrics"""
+import os
+import sys
+import asyncio
+import importlib
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Dict, Any, List, Tuple
+
+from api.utils.startupProfile import collectStartupProfile
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+def _sparksbmMetrics(name: str, default):
+    """
+    Metrics function `name` of sparksbmMgmt if it has been loaded; a debug
+    request never triggers the import (and its path search)
+    """
+    module = sys.modules.get('sparksbmMgmt')
+    if module is None or not hasattr(module, name):
+        return default
+    return getattr(module, name)()
+
+
+def _importTimeEnabled() -> bool:
+    """The -X importtime run spawns an interpreter, so it is opt-in per deployment"""
+    return os.getenv('DEBUG_STARTUP_IMPORTTIME', 'false').lower() in ('1', 'true', 'yes')
+
+
+@router.get("/startup")
+async def startupProfile(importtime: bool = False, top: int = 30) -> Dict[str, Any]:
+    """
+    Startup profile: phase timers recorded in this process and, optionally,
+    a fresh `-X importtime` cold import of api.main.
+    """
+    top = max(1, min(top, 200))
+    runImportTime = importtime and _importTimeEnabled()
+
+    result = await asyncio.to_thread(collectStartupProfile, top=top, importTime=runImportTime)
+    result['status'] = 'success'
+    if importtime and not runImportTime:
+        result['message'] = 'importtime profiling is disabled (set DEBUG_STARTUP_IMPORTTIME=true)'
+    return result
+
+
+_BREAKER_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+_BREAKER_COUNTERS = {
+    'successes': 'sparksbm_breaker_successes_total',
+    'failures': 'sparksbm_breaker_failures_total',
+    'shortCircuited': 'sparksbm_breaker_short_circuited_total',
+    'opened': 'sparksbm_breaker_opened_total',
+    'probes': 'sparksbm_breaker_probes_total',
+    'probeFailures': 'sparksbm_breaker_probe_failures_total'
+}
+
+
+def _formatPrometheus(breakers: List[Dict[str, Any]]) -> str:
+    """Render breaker metrics in the Prometheus text exposition format"""
+    labels = [b['name'].replace('\\', '\\\\').replace('"', '\\"') for b in breakers]
+    lines = [
+        '# HELP sparksbm_breaker_state Circuit breaker state (0=closed, 1=half_open, 2=open)',
+        '# TYPE sparksbm_breaker_state gauge'
+    ]
+    for b, label in zip(breakers, labels):
+        lines.append(f'sparksbm_breaker_state{{breaker="{label}"}} {_BREAKER_STATE_VALUES.get(b["state"], -1)}')
+    for key, metric in _BREAKER_COUNTERS.items():
+        lines.append(f'# TYPE {metric} counter')
+        for b, label in zip(breakers, labels):
+            lines.append(f'{metric}{{breaker="{label}"}} {b.get(key, 0)}')
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/breakers")
+async def circuitBreakers(format: str = "json"):
+    """
+    Circuit breaker state for Keycloak and the Verinice API.
+    `format=prometheus` returns the Prometheus text format.
+    """
+    breakers = _sparksbmMetrics('getCircuitBreakerMetrics', [])
+    if format == "prometheus":
+        return PlainTextResponse(_formatPrometheus(breakers))
+    return {'status': 'success', 'breakers': breakers}
+
+
+# Metrics sources served under /debug/metrics: name -> (module, function).
+# Modules in _LOADED_ONLY are read only once something else has imported them.
+_METRICS: Dict[str, Tuple[str, str]] = {
+    'read-cache': ('tools.requestCache', 'getReadCacheMetrics'),
+    'write-batch': ('tools.writeBatch', 'getWriteBatchMetrics'),
+    'singleflight': ('sparksbmMgmt', 'getSingleFlightMetrics'),
+    'conditional-get': ('sparksbmMgmt', 'getConditionalGetMetrics'),
+    'list-cache': ('agents.coordinators.ismsCoordinator', 'getListCacheMetrics'),
+    'mirror': ('tools.veriniceMirror', 'getMirrorMetrics'),
+    'mirror-history': ('tools.veriniceHistory', 'getHistorySyncMetrics'),
+    'verinice-events': ('tools.veriniceEvents', 'getVeriniceEventMetrics'),
+    'relationship-graph': ('tools.relationshipGraph', 'getRelationshipGraphMetrics'),
+    'context-cache': ('integration.contextMapper', 'getContextCacheMetrics'),
+    'report-store': ('tools.reportStore', 'getReportStoreMetrics'),
+    'report-jobs': ('tools.reportJobs', 'getReportJobMetrics'),
+    'report-pregen': ('tools.reportScheduler', 'getReportSchedulerMetrics')
+}
+_LOADED_ONLY = {'sparksbmMgmt'}
+
+
+def _readMetrics(name: str) -> Any:
+    """Current value of one registered metrics source ({} while its module is not loaded)"""
+    moduleName, functionName = _METRICS[name]
+    if moduleName in _LOADED_ONLY:
+        module = sys.modules.get(moduleName)
+        if module is None or not hasattr(module, functionName):
+            return {}
+    else:
+        module = importlib.import_module(moduleName)
+    return getattr(module, functionName)()
+
+
+@router.get("/metrics")
+async def allMetrics() -> Dict[str, Any]:
+    """Every registered metrics source, keyed by name"""
+    return {'status': 'success', 'metrics': {name: _readMetrics(name) for name in _METRICS}}
+
+
+@router.get("/metrics/{name}")
+async def metrics(name: str) -> Dict[str, Any]:
+    """One registered metrics source (see GET /debug/metrics for the names)"""
+    if name not in _METRICS:
+        raise HTTPException(status_code=404, detail=f"Unknown metrics source: {name}")
+    return {'status': 'success', 'name': name, 'metrics': _readMetrics(name)}
@@ -76,7 +76,7 @@ class AgentService:
             # If sources are empty/placeholder, keep existing session context (don't overwrite)
         
         activeSources = session.get('activeContext', [])
-        contextDict = self.contextMapper.buildContext(activeSources)
+        contextDict = self.contextMapper.buildContext(activeSources, sessionId=sessionId)
         # Extract context string and metadata - contextDict is now a dict with metadata
         context = contextDict.get('context', '')
         # Use contextDict directly as context (it has all metadata)
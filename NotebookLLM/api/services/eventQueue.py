@@ -21,6 +21,9 @@ class EventQueue:
         # session_id -> list of events (for history)
         self._history: Dict[str, List[Dict]] = defaultdict(list)
         self._max_history = 100  # Keep last 100 events per session
+        # Loop the SSE consumers run on; events pushed from worker threads
+        # (e.g. background report jobs) are handed over to it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
     def get_queue(self, session_id: str) -> asyncio.Queue:
         """Get or create event queue for a session"""
@@ -58,6 +61,21 @@ class EventQueue:
             logger.error(f"Event validation failed: {e}")
             return
             
+        loop = self._loop
+        if loop is not None and loop.is_running() and not self._onLoop(loop):
+            loop.call_soon_threadsafe(self._enqueue, session_id, event_dict)
+        else:
+            self._enqueue(session_id, event_dict)
+    
+    @staticmethod
+    def _onLoop(loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+    
+    def _enqueue(self, session_id: str, event_dict: Dict):
+        """Record and queue a validated event (on the consumers' loop thread)"""
         queue = self.get_queue(session_id)
         
         self._history[session_id].append(event_dict)
@@ -82,6 +100,7 @@ class EventQueue:
         Returns:
             Event dict or None if timeout
         """
+        self._loop = asyncio.get_running_loop()
         queue = self.get_queue(session_id)
         try:
             if timeout:
@@ -0,0 +1,102 @@
+"""
+Cold-start profiler for the NotebookLLM API
+
+Combines `python -X importtime` (fresh interpreter) with the in-process
+phase timers recorded by AgentBridge and api.main.
+
+Usage:
+    cd NotebookLLM
+    python -m api.utils.startupProfile                 # profile importing api.main
+    python -m api.utils.startupProfile --init-agent    # also time AgentBridge.initialize()
+    python -m api.utils.startupProfile --module integration.agentBridge --top 40 --json
+"""
+import os
+import sys
+import json
+import argparse
+from typing import Dict, Any
+
+_currentDir = os.path.dirname(os.path.abspath(__file__))
+_notebookDir = os.path.abspath(os.path.join(_currentDir, '..', '..'))
+_agenticFrameworkPath = os.path.abspath(os.path.join(_notebookDir, '..', 'AgenticFramework'))
+for _path in (_notebookDir, _agenticFrameworkPath):
+    if os.path.exists(_path) and _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from utils.startupProfiler import getStartupProfiler, runImportTimeProfile  # noqa: E402
+
+DEFAULT_MODULE = 'api.main'
+
+
+def collectStartupProfile(module: str = DEFAULT_MODULE, top: int = 30,
+                          importTime: bool = True, initAgent: bool = False) -> Dict[str, Any]:
+    """
+    Collect a startup profile.
+
+    Args:
+        module: Module whose cold import is measured
+        top: Number of most expensive modules to report
+        importTime: Run the `-X importtime` subprocess
+        initAgent: Also import the module in-process and time AgentBridge.initialize()
+
+    Returns:
+        Dict with 'importTime' (subprocess) and 'inProcess' (phase timers) sections
+    """
+    profiler = getStartupProfiler()
+    result: Dict[str, Any] = {}
+
+    if importTime:
+        result['importTime'] = runImportTimeProfile(
+            module, cwd=_notebookDir, extraPaths=[_notebookDir, _agenticFrameworkPath], top=top
+        )
+
+    if initAgent:
+        with profiler.phase(f'cli.import:{module}'):
+            profiler.importModule(module)
+        from integration.agentBridge import AgentBridge
+        with profiler.phase('cli.agentBridge.initialize'):
+            AgentBridge().initialize()
+
+    result['inProcess'] = profiler.report(top)
+    return result
+
+
+def _printReport(result: Dict[str, Any]):
+    """Print a human-readable report"""
+    importTime = result.get('importTime')
+    if importTime:
+        print(f"Cold import of {importTime['module']}: {importTime.get('wallMs', 0):.0f} ms wall, "
+              f"{importTime.get('moduleCount', 0)} modules, {importTime.get('totalSelfMs', 0):.0f} ms self")
+        if importTime.get('error'):
+            print(f"  Import failed:\n{importTime['error']}")
+        print("Top modules by self time:")
+        for entry in importTime.get('bySelf', []):
+            print(f"  {entry['selfUs'] / 1000:>10.2f} ms  {entry['module']}")
+        print("Top modules by cumulative time:")
+        for entry in importTime.get('byCumulative', []):
+            print(f"  {entry['cumulativeUs'] / 1000:>10.2f} ms  {entry['module']}")
+        print()
+    print(getStartupProfiler().formatReport())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Profile NotebookLLM API cold start")
+    parser.add_argument('--module', default=DEFAULT_MODULE, help='Module to cold-import (default: api.main)')
+    parser.add_argument('--top', type=int, default=30, help='Number of modules to show')
+    parser.add_argument('--init-agent', action='store_true', help='Also time AgentBridge.initialize() in-process')
+    parser.add_argument('--no-importtime', action='store_true', help='Skip the -X importtime subprocess')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    args = parser.parse_args(argv)
+
+    result = collectStartupProfile(args.module, args.top, not args.no_importtime, args.init_agent)
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        _printReport(result)
+
+    importTime = result.get('importTime')
+    return 0 if not importTime or importTime.get('success') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,11 +8,27 @@ _agenticFrameworkPath = os.path.join(_currentDir, '..', '..', 'AgenticFramework'
 if os.path.exists(_agenticFrameworkPath) and _agenticFrameworkPath not in sys.path:
     sys.path.insert(0, _agenticFrameworkPath)
 
-from agents.mainAgent import MainAgent
 from orchestrator.executor import AgentExecutor
 from integration.responseFormatter import ResponseFormatter
+from utils.startupProfiler import getStartupProfiler
 from typing import Any
 
+# Agent modules loaded by initialize(), leaf modules first so each timing
+# approximates the module's own cost rather than its dependencies'
+AGENT_MODULES = [
+    'agents.instructions',
+    'agents.ismsHandler',
+    'mcp.tools.linking',
+    'orchestrator.chatRouter',
+    'agents.coordinators.ismsCoordinator',
+    'agents.mainAgent'
+]
+
+
+def isHotReloadEnabled() -> bool:
+    """Dev-only: re-execute agent modules on every initialize() (AGENT_HOT_RELOAD=true)"""
+    return os.getenv('AGENT_HOT_RELOAD', 'false').lower() in ('1', 'true', 'yes')
+
 
 class AgentBridge:
     """Bridge between web API and MainAgent"""
@@ -25,29 +41,26 @@ class AgentBridge:
     def initialize(self) -> bool:
         """Initialize agent and register tools"""
         try:
-            # Force reload of ALL agent modules to pick up latest changes
-            import sys
-            import importlib
-            
-            modules_to_reload = [
-                'agents.ismsHandler',
-                'mcp.tools.linking',
-                'orchestrator.chatRouter',
-                'agents.coordinators.ismsCoordinator',
-                'agents.mainAgent'
-            ]
+            profiler = getStartupProfiler()
+            hotReload = isHotReloadEnabled()
             
-            for module_name in modules_to_reload:
-                if module_name in sys.modules:
-                    print(f"[AgentBridge] Reloading module: {module_name}")
-                    importlib.reload(sys.modules[module_name])
+            # Production path imports each module once; dev hot-reload re-executes
+            # them so code edits are picked up without restarting the server
+            with profiler.phase('agentBridge.importAgentModules'):
+                for module_name in AGENT_MODULES:
+                    if hotReload and module_name in sys.modules:
+                        print(f"[AgentBridge] Reloading module: {module_name}")
+                    profiler.importModule(module_name, reload=hotReload)
             
-            self.agent = MainAgent("SparksBM ISMS Assistant")
+            from agents.mainAgent import MainAgent
+            with profiler.phase('agentBridge.createMainAgent'):
+                self.agent = MainAgent("SparksBM ISMS Assistant")
             
             # Register Reasoning Engine (Gemini API) - INTERNAL ONLY, not shown in UI
             try:
                 from orchestrator.reasoningEngine import createReasoningEngine
-                reasoningEngine = createReasoningEngine("gemini")
+                with profiler.phase('agentBridge.createReasoningEngine'):
+                    reasoningEngine = createReasoningEngine("gemini")
                 
                 # Store reasoning engine reference for document handlers and knowledge questions
                 self.agent._reasoningEngine = reasoningEngine
@@ -104,10 +117,15 @@ class AgentBridge:
                 self.agent.llmTool = None
                 # Continue without LLM - agent can still process ISMS operations
             
-            # Register ISMS tool (lazy initialization - will initialize on first use)
-            # Don't initialize at startup to avoid timing issues with Keycloak
-            # VeriniceTool will be initialized when first ISMS operation is requested
-            self.agent._veriniceTool = None
+            # Register ISMS tool: the shared VeriniceTool logs in on a background
+            # thread, so startup never waits on Keycloak; handlers wait (bounded)
+            # for readiness on first use
+            try:
+                from tools.veriniceTool import getSharedVeriniceTool
+                self.agent._veriniceTool = getSharedVeriniceTool()
+            except Exception as e:
+                print(f"[!] ISMS tool warm-up not started: {e}")
+                self.agent._veriniceTool = None
             
             self.executor = AgentExecutor([self.agent])
             self.agent.executor = self.executor
@@ -262,3 +280,10 @@ class AgentBridge:
     def isInitialized(self) -> bool:
         """Check if agent is initialized"""
         return self._initialized
+    
+    def getStartupReport(self) -> Dict[str, Any]:
+        """Get startup profile (phase timers and per-module import cost)"""
+        report = getStartupProfiler().report()
+        report['hotReload'] = isHotReloadEnabled()
+        report['initialized'] = self._initialized
+        return report
@@ -1,37 +1,203 @@
 """Context mapper - converts ISMS objects to agent-readable context"""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
+import threading
+import time
 
 _currentDir = os.path.dirname(os.path.abspath(__file__))
 _scriptsPath = os.path.join(_currentDir, '..', '..', 'SparksbmISMS', 'scripts')
 if os.path.exists(_scriptsPath) and _scriptsPath not in sys.path:
     sys.path.insert(0, _scriptsPath)
+_agenticFrameworkPath = os.path.join(_currentDir, '..', '..', 'AgenticFramework')
+if os.path.exists(_agenticFrameworkPath) and _agenticFrameworkPath not in sys.path:
+    sys.path.insert(0, _agenticFrameworkPath)
 
-try:
-    from sparksbmMgmt import SparksBMClient, API_URL
-    ISMS_AVAILABLE = True
-except ImportError:
-    ISMS_AVAILABLE = False
-    SparksBMClient = None
-    API_URL = "http://localhost:8070"
+API_URL = os.getenv("VERINICE_API_URL", os.getenv("API_URL", "http://localhost:8070")).rstrip("/")
+
+# Formatted blocks younger than this are reused without asking the backend;
+# older ones are revalidated by ETag (changes made here or announced by veo
+# events drop them immediately)
+CONTEXT_BLOCK_FRESH_SECONDS = float(os.getenv("CONTEXT_BLOCK_FRESH_SECONDS", "30"))
+CONTEXT_FETCH_CONCURRENCY = int(os.getenv("CONTEXT_FETCH_CONCURRENCY", "8"))
+CONTEXT_CACHE_MAX_SESSIONS = int(os.getenv("CONTEXT_CACHE_MAX_SESSIONS", "256"))
+# Statuses meaning the source object is gone or no longer visible: its block is dropped
+_DROP_STATUSES = (403, 404, 410)
+
+OBJECT_TYPE_PLURALS = {
+    "scope": "scopes",
+    "asset": "assets",
+    "control": "controls",
+    "process": "processes",
+    "person": "persons",
+    "scenario": "scenarios",
+    "incident": "incidents",
+    "document": "documents"
+}
+
+
+def _importClient():
+    """Import SparksBMClient on first use (keeps requests off the import path)"""
+    try:
+        from sparksbmMgmt import SparksBMClient, API_URL as apiUrl
+        return SparksBMClient, apiUrl
+    except ImportError:
+        return None, API_URL
+
+
+def _importSharedTool():
+    """The agent's process-wide VeriniceTool (one login for chat and context), or None"""
+    try:
+        from tools.veriniceTool import getSharedVeriniceTool
+        return getSharedVeriniceTool()
+    except Exception:
+        return None
+
+
+class _ContextBlock:
+    """Formatted context for one source object, with the ETag it was built from"""
+    
+    __slots__ = ('text', 'etag', 'checkedAt')
+    
+    def __init__(self, text: str, etag: Optional[str]):
+        self.text = text
+        self.etag = etag
+        self.checkedAt = time.time()
+
+
+_statsLock = threading.Lock()
+_stats = {'builds': 0, 'fresh': 0, 'revalidated': 0, 'fetched': 0, 'errors': 0, 'invalidations': 0}
+
+# sessionId -> {(type, domainId, id): _ContextBlock}, least recently used
+# first; module-level so every ContextMapper (one per AgentService) shares it
+_blocks: "OrderedDict[str, Dict[Tuple[str, str, str], _ContextBlock]]" = OrderedDict()
+_blocksLock = threading.Lock()
+_listening = False
+
+
+def _count(**deltas):
+    with _statsLock:
+        for key, value in deltas.items():
+            _stats[key] += value
+
+
+def _sessionBlocks(sessionId: Optional[str]) -> Optional[Dict]:
+    if not sessionId:
+        return None
+    with _blocksLock:
+        blocks = _blocks.get(sessionId)
+        if blocks is None:
+            blocks = _blocks[sessionId] = {}
+            while len(_blocks) > CONTEXT_CACHE_MAX_SESSIONS:
+                _blocks.popitem(last=False)
+        else:
+            _blocks.move_to_end(sessionId)
+        return blocks
+
+
+def invalidateContextBlocks(objectId: Optional[str] = None):
+    """Forget cached blocks for objectId in every session (all blocks if None)"""
+    with _blocksLock:
+        for blocks in _blocks.values():
+            for key in [k for k in blocks if objectId is None or k[2] == objectId]:
+                del blocks[key]
+    _count(invalidations=1)
+
+
+def _onWrite(methodName: str, args: tuple):
+    # VeriniceTool writes take (objectType, domainId, objectId, ...); a new
+    # object cannot be in any session's blocks yet
+    if methodName == 'createObject':
+        return
+    invalidateContextBlocks(args[2] if len(args) > 2 else None)
+
+
+def _onVeriniceEvent(event):
+    if event.eventType == 'resync':
+        invalidateContextBlocks()
+    elif event.isElement and event.resourceId:
+        invalidateContextBlocks(event.resourceId)
+
+
+def _listenForChanges():
+    """Drop cached blocks of objects written through the agent or changed in veo"""
+    global _listening
+    if _listening:
+        return
+    try:
+        from tools.requestCache import onWrite
+        from tools.veriniceEvents import onEvent
+    except ImportError:
+        return
+    onWrite(_onWrite)
+    onEvent(_onVeriniceEvent)
+    _listening = True
+
+
+def getContextCacheMetrics() -> Dict[str, Any]:
+    """How source blocks were served: fresh from memory, revalidated (unchanged ETag), refetched"""
+    with _statsLock:
+        stats = dict(_stats)
+    with _blocksLock:
+        stats['sessions'] = len(_blocks)
+        stats['blocks'] = sum(len(b) for b in _blocks.values())
+    served = stats['fresh'] + stats['revalidated'] + stats['fetched']
+    stats['reuseRate'] = round((stats['fresh'] + stats['revalidated']) / served, 3) if served else 0.0
+    return stats
 
 
 class ContextMapper:
     """Maps ISMS objects to agent context"""
     
     def __init__(self):
-        self.client = None
-        if ISMS_AVAILABLE:
-            try:
-                self.client = SparksBMClient()
-            except Exception:
-                pass
+        # Authentication happens on first fetch, not at construction, so
+        # building the API service never blocks on Keycloak
+        self._client = None
+        self._clientAttempted = False
+        self._apiUrl = API_URL
+        self._tool = None
+        self._toolAttempted = False
     
-    def buildContext(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @property
+    def client(self):
+        """
+        SparksBM client: the shared VeriniceTool's when the agent framework is
+        importable, otherwise an own one - created (and logged in) on first access
+        """
+        tool = self._sharedTool()
+        if tool is not None:
+            # Lazy auth: the first fetch logs in (or waits for the warm-up)
+            if tool._ensureAuthenticated():
+                return tool.client
+            return None
+        if not self._clientAttempted:
+            self._clientAttempted = True
+            clientClass, self._apiUrl = _importClient()
+            if clientClass:
+                try:
+                    self._client = clientClass()
+                except Exception:
+                    self._client = None
+        return self._client
+    
+    def _sharedTool(self):
+        if not self._toolAttempted:
+            self._toolAttempted = True
+            self._tool = _importSharedTool()
+            if self._tool is not None:
+                _listenForChanges()
+        return self._tool
+    
+    def buildContext(self, sources: List[Dict[str, Any]], sessionId: Optional[str] = None) -> Dict[str, Any]:
         """
         Build context from ISMS object sources
         
+        Sources are fetched concurrently; with a sessionId, each source's
+        formatted block is kept and reused while fresh, then revalidated by
+        ETag so an unchanged object is neither decoded nor formatted again.
+        
         Returns:
             Dict with context string and metadata
         """
@@ -41,21 +207,48 @@ class ContextMapper:
                 'activeSources': []
             }
         
-        contextParts = []
-        
+        keys = []
         for source in sources:
             sourceId = source.get('id')
             sourceType = source.get('type')
             domainId = source.get('domainId')
-            
-            if not sourceId or not sourceType or not domainId:
-                continue
-            
-            # Fetch object details
-            objectData = self._fetchObject(sourceType, domainId, sourceId)
-            if objectData:
-                contextParts.append(self._formatObject(objectData, sourceType))
+            if sourceId and sourceType and domainId:
+                keys.append((sourceType, domainId, sourceId))
+        keys = list(dict.fromkeys(keys))
         
+        cached = _sessionBlocks(sessionId)
+        now = time.time()
+        texts: Dict[Tuple[str, str, str], str] = {}
+        stale = []
+        for key in keys:
+            block = cached.get(key) if cached is not None else None
+            if block is not None and now - block.checkedAt < CONTEXT_BLOCK_FRESH_SECONDS:
+                texts[key] = block.text
+            else:
+                stale.append((key, block))
+        _count(builds=1, fresh=len(texts))
+        
+        if stale:
+            client = self.client
+            if client and client.accessToken:
+                workers = max(1, min(CONTEXT_FETCH_CONCURRENCY, len(stale)))
+                if workers == 1:
+                    results = [self._refreshBlock(client, key, block) for key, block in stale]
+                else:
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='context-fetch') as pool:
+                        results = list(pool.map(lambda item: self._refreshBlock(client, *item), stale))
+                for (key, _), block in zip(stale, results):
+                    if block is None:
+                        if cached is not None:
+                            with _blocksLock:
+                                cached.pop(key, None)
+                        continue
+                    texts[key] = block.text
+                    if cached is not None:
+                        with _blocksLock:
+                            cached[key] = block
+        
+        contextParts = [texts[key] for key in keys if key in texts]
         contextStr = "\n\n".join(contextParts) if contextParts else ""
         
         return {
@@ -63,34 +256,62 @@ class ContextMapper:
             'activeSources': sources
         }
     
+    def _refreshBlock(self, client, key: Tuple[str, str, str], block: Optional[_ContextBlock]) -> Optional[_ContextBlock]:
+        """
+        Re-check one source; an unchanged ETag keeps the formatted text as is.
+        Only a status saying the object is gone or forbidden (403/404/410)
+        drops the block; while the backend is unreachable, failing (5xx) or
+        re-authenticating (401) the last text is kept.
+        """
+        objectType, domainId, objectId = key
+        response = self._fetchResponse(client, objectType, domainId, objectId)
+        if response is None:
+            _count(errors=1)
+            return block
+        if not response.ok:
+            _count(errors=1)
+            return None if response.status_code in _DROP_STATUSES else block
+        etag = response.headers.get('ETag')
+        if block is not None and etag and etag == block.etag:
+            block.checkedAt = time.time()
+            _count(revalidated=1)
+            return block
+        try:
+            objectData = response.json()
+        except ValueError:
+            _count(errors=1)
+            return block
+        _count(fetched=1)
+        return _ContextBlock(self._formatObject(objectData, objectType), etag)
+    
+    def _fetchResponse(self, client, objectType: str, domainId: str, objectId: str):
+        """
+        GET the InDomain object; repeat GETs carry If-None-Match (see
+        SparksBMClient.makeRequest), so an unchanged object costs a 304.
+        
+        Returns the response whatever its status, None if no response arrived
+        (connection error, timeout, open circuit breaker).
+        """
+        plural = OBJECT_TYPE_PLURALS.get(objectType.lower())
+        if not plural:
+            return None
+        try:
+            url = f"{client.apiUrl}/domains/{domainId}/{plural}/{objectId}"
+            return client.makeRequest('GET', url)
+        except Exception:
+            return None
+    
     def _fetchObject(self, objectType: str, domainId: str, objectId: str) -> Optional[Dict]:
         """Fetch object from ISMS API"""
-        if not self.client or not self.client.accessToken:
+        client = self.client
+        if not client or not client.accessToken:
+            return None
+        response = self._fetchResponse(client, objectType, domainId, objectId)
+        if response is None or not response.ok:
             return None
-        
         try:
-            objectTypeMap = {
-                "scope": "scopes",
-                "asset": "assets",
-                "control": "controls",
-                "process": "processes",
-                "person": "persons",
-                "scenario": "scenarios",
-                "incident": "incidents",
-                "document": "documents"
-            }
-            
-            plural = objectTypeMap.get(objectType.lower())
-            if not plural:
-                return None
-            
-            url = f"{API_URL}/domains/{domainId}/{plural}/{objectId}"
-            response = self.client.makeRequest('GET', url)
-            response.raise_for_status()
-            
             return response.json()
-            
-        except Exception:
+        except ValueError:
             return None
     
     def _formatObject(self, objectData: Dict, objectType: str) -> str:
@@ -116,4 +337,4 @@ class ContextMapper:
                 parts.append(f"{key}: {objectData[key]}")
         
         return "\n".join(parts)
-    
+
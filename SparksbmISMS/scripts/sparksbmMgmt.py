@@ -26,6 +26,11 @@ import requests
 import json
 import sys
 import os
+import copy
+import re
+import time
+import threading
+from collections import OrderedDict
 from typing import Dict, Optional, List
 
 # Configuration - use env in deployed environments (e.g. Render), else localhost
@@ -43,6 +48,390 @@ CREATE_DOMAINS_URL = f"{API_URL}/domain-templates/{{template_id}}/createdomains"
 DOMAINS_URL = f"{API_URL}/domains"
 UNITS_URL = f"{API_URL}/units"
 
+# Circuit breaker settings (shared by all clients in the process)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("SPARKSBM_BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("SPARKSBM_BREAKER_RESET_SECONDS", "30"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("SPARKSBM_HEALTH_PROBE_TIMEOUT", "2"))
+# Default timeout for API calls that don't pass one (requests has no default)
+REQUEST_TIMEOUT = float(os.getenv("SPARKSBM_REQUEST_TIMEOUT", "30"))
+# Keep-alive connections per host; concurrent fetches (VeriniceTool.getObjects) share them
+CONNECTION_POOL_SIZE = int(os.getenv("SPARKSBM_CONNECTION_POOL_SIZE", "16"))
+# Responses that mean the backend itself is unhealthy (4xx means it is up)
+BREAKER_FAILURE_STATUSES = (502, 503, 504)
+# Identical concurrent GETs share one HTTP call (process-wide, all clients)
+SINGLEFLIGHT_ENABLED = os.getenv("SPARKSBM_SINGLEFLIGHT", "true").lower() in ("1", "true", "yes")
+# Repeat GETs of objects/domains/units revalidate with If-None-Match (process-wide)
+ETAG_CACHE_ENABLED = os.getenv("SPARKSBM_ETAG_CACHE", "true").lower() in ("1", "true", "yes")
+ETAG_CACHE_MAX_ENTRIES = int(os.getenv("SPARKSBM_ETAG_CACHE_ENTRIES", "512"))
+# Bodies larger than this are not kept (large list pages would crowd out everything else)
+ETAG_CACHE_MAX_BODY_BYTES = int(os.getenv("SPARKSBM_ETAG_CACHE_MAX_BODY_BYTES", str(1024 * 1024)))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised when a call is short-circuited because its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+    
+    closed    - calls pass through; consecutive failures are counted
+    open      - calls fail immediately until resetTimeout has elapsed
+    half_open - a single trial call is let through; success closes the
+                breaker, failure re-opens it. With a probe (e.g. a GET on
+                /actuator/health) the cheap probe runs first and the real
+                call only proceeds if it passes.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failureThreshold: int = None, resetTimeout: float = None,
+                 probe=None):
+        self.name = name
+        self.probe = probe
+        self.failureThreshold = failureThreshold or BREAKER_FAILURE_THRESHOLD
+        self.resetTimeout = resetTimeout if resetTimeout is not None else BREAKER_RESET_SECONDS
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutiveFailures = 0
+        self._openedAt = 0.0
+        self._trialInFlight = False
+        self.lastError = None
+        self.stats = {"successes": 0, "failures": 0, "shortCircuited": 0, "opened": 0,
+                      "probes": 0, "probeFailures": 0}
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+    
+    def allowRequest(self) -> bool:
+        """Whether a call may proceed now (moves open -> half_open after the reset timeout)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.time() - self._openedAt < self.resetTimeout:
+                    self.stats["shortCircuited"] += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._trialInFlight = False
+            # Half-open: let exactly one trial call through
+            if self._trialInFlight:
+                self.stats["shortCircuited"] += 1
+                return False
+            self._trialInFlight = True
+            probe = self.probe
+        
+        if probe is None:
+            return True
+        # Probe outside the lock; other callers keep short-circuiting meanwhile
+        try:
+            healthy, detail = bool(probe()), "unhealthy"
+        except Exception as e:
+            healthy, detail = False, str(e)[:200]
+        with self._lock:
+            self.stats["probes"] += 1
+            if not healthy:
+                self.stats["probeFailures"] += 1
+        if not healthy:
+            self.recordFailure(f"Health probe failed: {detail}")
+            return False
+        return True
+    
+    def releaseTrial(self):
+        """End a trial call whose outcome says nothing about backend health"""
+        with self._lock:
+            self._trialInFlight = False
+    
+    def recordSuccess(self):
+        with self._lock:
+            self.stats["successes"] += 1
+            self._consecutiveFailures = 0
+            self._trialInFlight = False
+            self._state = self.CLOSED
+    
+    def recordFailure(self, error: Optional[str] = None):
+        with self._lock:
+            self.stats["failures"] += 1
+            self._consecutiveFailures += 1
+            self._trialInFlight = False
+            self.lastError = error
+            if self._state == self.HALF_OPEN or self._consecutiveFailures >= self.failureThreshold:
+                if self._state != self.OPEN:
+                    self.stats["opened"] += 1
+                self._state = self.OPEN
+                self._openedAt = time.time()
+    
+    def retryAfter(self) -> float:
+        """Seconds until an open breaker allows a trial call (0 if not open)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.resetTimeout - (time.time() - self._openedAt))
+    
+    def openError(self) -> CircuitOpenError:
+        """Build the fail-fast error raised while the breaker is open"""
+        detail = f" Last error: {self.lastError}" if self.lastError else ""
+        return CircuitOpenError(
+            f"{self.name} is unavailable (circuit open, retry in {self.retryAfter():.0f}s).{detail}"
+        )
+    
+    def getMetrics(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutiveFailures": self._consecutiveFailures,
+                "retryAfter": round(max(0.0, self.resetTimeout - (time.time() - self._openedAt)), 1)
+                              if self._state == self.OPEN else 0.0,
+                "lastError": self.lastError,
+                **self.stats
+            }
+    
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutiveFailures = 0
+            self._trialInFlight = False
+            self.lastError = None
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakersLock = threading.Lock()
+
+
+def getCircuitBreaker(name: str, probe=None) -> CircuitBreaker:
+    """Get (or create) the process-wide circuit breaker with this name"""
+    with _breakersLock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, probe=probe)
+            _breakers[name] = breaker
+        elif probe is not None and breaker.probe is None:
+            breaker.probe = probe
+        return breaker
+
+
+def healthProbe(url: str, timeout: float = None):
+    """Build a breaker probe that passes when GET url returns 200"""
+    def probe() -> bool:
+        return requests.get(url, timeout=timeout or HEALTH_PROBE_TIMEOUT).status_code == 200
+    return probe
+
+
+def getCircuitBreakerMetrics() -> List[Dict]:
+    """Metrics for every circuit breaker created in this process"""
+    with _breakersLock:
+        breakers = list(_breakers.values())
+    return [b.getMetrics() for b in breakers]
+
+
+class _Flight:
+    """One in-flight call that other callers can wait on"""
+    
+    __slots__ = ("done", "response", "error", "waiters")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread-safe request de-duplication.
+    
+    The first caller for a key (the leader) performs the call; callers that
+    arrive with the same key while it is in flight wait and receive a copy of
+    the leader's response (or its exception). Nothing is cached after the
+    call completes - this only collapses concurrent duplicates.
+    
+    markWrite() starts a new generation: calls made after a write never join
+    a flight that started before it, so a GET right after a PUT/POST/DELETE
+    cannot be answered with the pre-write response.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inFlight: Dict[tuple, _Flight] = {}
+        self._generation = 0
+        self.stats = {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0, "maxWaiters": 0, "writes": 0}
+    
+    def markWrite(self):
+        """A write completed: later calls start their own flights"""
+        with self._lock:
+            self._generation += 1
+            self.stats["writes"] += 1
+    
+    def do(self, key: tuple, call):
+        """Run call() once per key among concurrent callers; returns its response"""
+        with self._lock:
+            self.stats["calls"] += 1
+            key = (key, self._generation)
+            flight = self._inFlight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inFlight[key] = flight
+                self.stats["executed"] += 1
+            else:
+                flight.waiters += 1
+                self.stats["coalesced"] += 1
+                self.stats["maxWaiters"] = max(self.stats["maxWaiters"], flight.waiters)
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # Own Response object per caller; the body bytes are shared, each
+            # caller decodes (and may mutate) its own .json()
+            return copy.copy(flight.response)
+        
+        try:
+            response = call()
+            # Read the body now so followers never touch the leader's stream
+            response.content
+            flight.response = response
+            return response
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inFlight.pop(key, None)
+            flight.done.set()
+    
+    def getMetrics(self) -> Dict:
+        with self._lock:
+            calls = self.stats["calls"]
+            return {
+                "name": self.name,
+                "inFlight": len(self._inFlight),
+                "coalescedRate": round(self.stats["coalesced"] / calls, 3) if calls else 0.0,
+                **self.stats
+            }
+
+
+_getFlight = SingleFlight("Verinice GET")
+
+
+# Resources whose ETags are reused: /domains[/id], /units[/id], /<elements>/id and
+# /domains/<id>/<elements>/id (the element plurals as in SparksBMObjectManager)
+_ETAG_PATH = re.compile(
+    r"/(?:domains|units)(?:/[^/]+)?"
+    r"|/(?:domains/[^/]+/)?(?:scopes|assets|controls|processes|persons|scenarios|incidents|documents)/[^/]+"
+)
+
+
+class _ETagEntry:
+    __slots__ = ("etag", "content", "headers", "encoding")
+    
+    def __init__(self, response: requests.Response):
+        self.etag = response.headers.get("ETag")
+        self.content = response.content
+        self.headers = dict(response.headers)
+        self.encoding = response.encoding
+
+
+class ConditionalGetCache:
+    """
+    Bounded LRU of (GET identity -> ETag, body) for conditional revalidation.
+    
+    A repeat GET is sent with If-None-Match; on 304 Not Modified the stored
+    body is replayed as a 200 response, so unchanged objects, domains and
+    units cost a header round trip instead of a full transfer. Every hit is
+    still revalidated with the backend - nothing is served without a 304.
+    """
+    
+    def __init__(self, name: str, maxEntries: int = 512, maxBodyBytes: int = 1024 * 1024):
+        self.name = name
+        self.maxEntries = maxEntries
+        self.maxBodyBytes = maxBodyBytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _ETagEntry]" = OrderedDict()
+        self.stats = {"requests": 0, "conditional": 0, "notModified": 0, "stored": 0,
+                      "evictions": 0, "invalidations": 0, "bytesSaved": 0}
+    
+    def lookup(self, key: tuple) -> Optional[_ETagEntry]:
+        with self._lock:
+            self.stats["requests"] += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["conditional"] += 1
+            return entry
+    
+    def store(self, key: tuple, response: requests.Response):
+        """Keep a 200 response that carries an ETag"""
+        if not response.headers.get("ETag") or len(response.content) > self.maxBodyBytes:
+            return
+        entry = _ETagEntry(response)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def replay(self, entry: _ETagEntry, notModified: requests.Response) -> requests.Response:
+        """The stored body as a 200 response to the request that got the 304"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = entry.content
+        response.headers = requests.structures.CaseInsensitiveDict(entry.headers)
+        response.encoding = entry.encoding
+        response.url = notModified.url
+        response.request = notModified.request
+        response.elapsed = notModified.elapsed
+        with self._lock:
+            self.stats["notModified"] += 1
+            self.stats["bytesSaved"] += len(entry.content)
+        return response
+    
+    def invalidate(self, url: str):
+        """Forget every cached GET of url (it was just written)"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == url]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self.stats["invalidations"] += len(stale)
+    
+    def getMetrics(self) -> Dict:
+        with self._lock:
+            requestsSeen = self.stats["requests"]
+            conditional = self.stats["conditional"]
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "maxEntries": self.maxEntries,
+                "hitRate": round(conditional / requestsSeen, 3) if requestsSeen else 0.0,
+                "notModifiedRate": round(self.stats["notModified"] / conditional, 3) if conditional else 0.0,
+                **self.stats
+            }
+
+
+_etagCache = ConditionalGetCache("Verinice ETag", ETAG_CACHE_MAX_ENTRIES, ETAG_CACHE_MAX_BODY_BYTES)
+
+
+def getSingleFlightMetrics() -> Dict:
+    """Counters for GETs that shared an in-flight call instead of sending their own"""
+    return _getFlight.getMetrics()
+
+
+def getConditionalGetMetrics() -> Dict:
+    """Hit (sent with If-None-Match) and 304 rates of the ETag cache"""
+    return _etagCache.getMetrics()
+
 
 class SparksBMKeycloakAdmin:
     """Keycloak Admin API operations"""
@@ -274,8 +663,8 @@ class SparksBMClient:
     
     def __init__(self, keycloak_url: str = None, realm: str = None, 
                  client_id: str = None, username: str = None, password: str = None,
-                 api_url: str = None):
-        """Initialize SparksBM client"""
+                 api_url: str = None, authenticate: bool = True):
+        """Initialize SparksBM client (authenticate=False defers the Keycloak login)"""
         self.keycloakUrl = keycloak_url or KEYCLOAK_URL
         self.realm = realm or REALM
         self.clientId = client_id or CLIENT_ID
@@ -284,12 +673,32 @@ class SparksBMClient:
         self.apiUrl = api_url or API_URL
         self.accessToken = None
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=CONNECTION_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Token failures are tracked per Keycloak realm across all clients, so a
+        # down Keycloak is detected once instead of by every caller
+        self.authBreaker = getCircuitBreaker(
+            f"Keycloak ({self.keycloakUrl}/realms/{self.realm})",
+            probe=healthProbe(f"{self.keycloakUrl}/realms/{self.realm}")
+        )
+        # Same for the Verinice API; half-open trials are gated on /actuator/health
+        self.apiBreaker = getCircuitBreaker(
+            f"Verinice API ({self.apiUrl})",
+            probe=healthProbe(f"{self.apiUrl}/actuator/health")
+        )
         
         # Get access token
-        self.getAccessToken()
+        if authenticate:
+            self.getAccessToken()
     
     def getAccessToken(self) -> bool:
         """Get access token from Keycloak"""
+        if not self.authBreaker.allowRequest():
+            print(f"⏸️  Skipping Keycloak login: {self.authBreaker.openError()}")
+            return False
+        
         print("🔐 Authenticating with Keycloak...")
         
         tokenUrl = f"{self.keycloakUrl}/realms/{self.realm}/protocol/openid-connect/token"
@@ -310,8 +719,11 @@ class SparksBMClient:
             
             if not self.accessToken:
                 print("❌ Failed to get access token")
+                self.authBreaker.recordFailure("No access_token in Keycloak response")
                 return False
             
+            self.authBreaker.recordSuccess()
+            
             # Set authorization header for all requests
             self.session.headers.update({
                 "Authorization": f"Bearer {self.accessToken}",
@@ -324,14 +736,91 @@ class SparksBMClient:
             
         except requests.exceptions.RequestException as e:
             print(f"❌ Authentication failed: {e}")
+            self.authBreaker.recordFailure(str(e)[:200])
             if hasattr(e, 'response') and e.response is not None:
                 print(f"   Status: {e.response.status_code}")
                 print(f"   Response: {e.response.text[:200]}")
             return False
     
     def makeRequest(self, method: str, url: str, **kwargs) -> requests.Response:
-        """Make authenticated request"""
-        return self.session.request(method, url, **kwargs)
+        """
+        Make authenticated request
+        
+        Goes through the API circuit breaker: while the backend is known to be
+        down this raises CircuitOpenError immediately instead of waiting out
+        a timeout. Connection errors, timeouts and 502/503/504 count as failures.
+        
+        Identical GETs issued concurrently (by any client in the process, e.g.
+        several dashboard sessions loading domains/units/scopes at once) share
+        one HTTP call; see SingleFlight. Repeat GETs of objects, domains and
+        units are revalidated by ETag; see ConditionalGetCache.
+        """
+        if method.upper() == 'GET' and not kwargs.get('stream'):
+            key = self._singleFlightKey(url, kwargs)
+            if key is not None:
+                send = lambda: self._conditionalGet(url, key, kwargs)
+                return _getFlight.do(key, send) if SINGLEFLIGHT_ENABLED else send()
+            return self._send(method, url, **kwargs)
+        try:
+            response = self._send(method, url, **kwargs)
+        finally:
+            # Even a failed write may have reached the backend
+            _getFlight.markWrite()
+        if ETAG_CACHE_ENABLED and response.status_code < 400:
+            _etagCache.invalidate(url)
+        return response
+    
+    def _conditionalGet(self, url: str, key: tuple, kwargs: Dict) -> requests.Response:
+        """GET, revalidating a cached body with If-None-Match when there is one"""
+        headers = kwargs.get('headers') or {}
+        if (not ETAG_CACHE_ENABLED or 'If-None-Match' in headers
+                or not _ETAG_PATH.fullmatch(url[len(self.apiUrl):] if url.startswith(self.apiUrl) else '')):
+            return self._send('GET', url, **kwargs)
+        entry = _etagCache.lookup(key)
+        if entry is not None:
+            kwargs = dict(kwargs, headers={**headers, 'If-None-Match': entry.etag})
+        response = self._send('GET', url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            return _etagCache.replay(entry, response)
+        if response.status_code == 200:
+            _etagCache.store(key, response)
+        return response
+    
+    def _singleFlightKey(self, url: str, kwargs: Dict) -> Optional[tuple]:
+        """
+        Identity of a GET for coalescing: URL, query and the credentials/accept
+        headers it is sent with, so callers with different tokens never share
+        a response. None if the request carries a body.
+        """
+        if kwargs.get('data') is not None or kwargs.get('json') is not None:
+            return None
+        headers = dict(self.session.headers)
+        headers.update(kwargs.get('headers') or {})
+        params = kwargs.get('params')
+        if isinstance(params, dict):
+            params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+        elif params is not None:
+            params = str(params)
+        return (url, params, headers.get('Authorization'), headers.get('Accept'))
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send one request through the API circuit breaker"""
+        if not self.apiBreaker.allowRequest():
+            raise self.apiBreaker.openError()
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.apiBreaker.recordFailure(str(e)[:200])
+            raise
+        except Exception:
+            self.apiBreaker.releaseTrial()
+            raise
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            self.apiBreaker.recordFailure(f"HTTP {response.status_code} from {method} {url}")
+        else:
+            self.apiBreaker.recordSuccess()
+        return response
     
     def testConnection(self) -> bool:
         """Test connection to SparksBM API"""